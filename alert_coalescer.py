@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+TrenchCoat Pro - Alert Coalescer
+In-memory deduplication in front of every runner/coin notification:
+one message per (coin, alert type, channel) per window, with rapid
+updates merged into a single trailing message carrying the latest numbers
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+AlertKey = Tuple[str, str, str]
+Sender = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+@dataclass
+class AlertWindow:
+    """Coalescing state for one (coin, alert type, channel)"""
+    last_sent: float                       # Wall-clock time of the last delivered message
+    last_payload: Optional[Dict[str, Any]] = field(default=None, repr=False)
+    pending: Optional[Dict[str, Any]] = None
+    pending_updates: int = 0
+    sender: Optional[Sender] = None
+    flush_future: Optional[concurrent.futures.Future] = field(default=None, repr=False)
+
+class AlertCoalescer:
+    """
+    Leading-edge throttle per alert key: the first alert goes out at once,
+    later ones inside `window_seconds` are merged over it (newer fields win) and sent
+    as one message when the window closes. Trailing sends run on the
+    coalescer's own loop thread, so they still go out when the caller's loop
+    (e.g. one asyncio.run per alert) has closed. Send times are kept in memory and
+    written to `state_path` in batches so a restart does not re-alert.
+    """
+
+    def __init__(self, window_seconds: float = 60.0,
+                 state_path: Optional[str] = "data/alert_coalescer_state.json",
+                 flush_every: int = 50, flush_interval: float = 30.0):
+        self.window_seconds = window_seconds
+        self.windows: Dict[AlertKey, AlertWindow] = {}
+        self.stats = {'sent': 0, 'merged': 0, 'coalesced_sends': 0, 'send_errors': 0}
+
+        self.state_path = Path(state_path) if state_path else None
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._load_state()
+
+    @staticmethod
+    def make_key(coin: str, alert_type: str, channel: str) -> AlertKey:
+        return (str(coin).upper(), alert_type, channel)
+
+    async def submit(self, coin: str, alert_type: str, channel: str,
+                     payload: Dict[str, Any], send: Sender) -> Tuple[str, Any]:
+        """
+        Offer an alert. Returns ('sent', send's result) when delivered now, or
+        ('merged', None) when folded into the pending message for this key.
+        """
+        key = self.make_key(coin, alert_type, channel)
+        now = time.time()
+        with self._lock:
+            window = self.windows.get(key)
+
+            if window is not None and now - window.last_sent < self.window_seconds:
+                window.pending = {**(window.pending or window.last_payload or {}), **payload}
+                window.pending_updates += 1
+                window.sender = send
+                self.stats['merged'] += 1
+                if window.flush_future is None:
+                    delay = window.last_sent + self.window_seconds - now
+                    window.flush_future = asyncio.run_coroutine_threadsafe(
+                        self._flush_after(key, delay), self._timer_loop()
+                    )
+                return 'merged', None
+
+            if window is None:
+                window = self.windows[key] = AlertWindow(last_sent=now)
+            else:
+                window.last_sent = now
+            window.last_payload = payload
+            self._mark_dirty()
+        result = await self._deliver(send, payload)
+        self.stats['sent'] += 1
+        return 'sent', result
+
+    async def _deliver(self, send: Sender, payload: Dict[str, Any]) -> Any:
+        try:
+            return await send(payload)
+        except Exception as e:
+            self.stats['send_errors'] += 1
+            print(f"Alert delivery failed: {e}")
+            return False
+
+    def _timer_loop(self) -> asyncio.AbstractEventLoop:
+        """The long-lived loop trailing sends are scheduled on, started on first use"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="alert-coalescer", daemon=True).start()
+            return self._loop
+
+    async def _flush_after(self, key: AlertKey, delay: float):
+        await asyncio.sleep(max(0.0, delay))
+        await self._send_pending(key)
+
+    async def _send_pending(self, key: AlertKey):
+        with self._lock:
+            window = self.windows.get(key)
+            if window is None:
+                return
+            window.flush_future = None
+            if window.pending is None:
+                return
+
+            payload, send = window.pending, window.sender
+            window.pending, window.pending_updates, window.sender = None, 0, None
+            window.last_sent, window.last_payload = time.time(), payload
+            self._mark_dirty()
+
+        await self._deliver(send, payload)
+        self.stats['sent'] += 1
+        self.stats['coalesced_sends'] += 1
+
+    async def drain(self):
+        """Send every pending merged alert now and persist the windows (e.g. on shutdown)"""
+        for key, window in list(self.windows.items()):
+            if window.flush_future is not None:
+                window.flush_future.cancel()
+                window.flush_future = None
+            await self._send_pending(key)
+        self.flush()
+
+    def pending_count(self) -> int:
+        return sum(1 for window in self.windows.values() if window.pending is not None)
+
+    def prune(self, now: Optional[float] = None):
+        """Forget keys whose window has closed with nothing pending"""
+        now = now if now is not None else time.time()
+        for key in [k for k, w in self.windows.items()
+                    if w.pending is None and now - w.last_sent >= self.window_seconds]:
+            del self.windows[key]
+
+    def _mark_dirty(self):
+        self._dirty += 1
+        if self._dirty >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Persist the last-sent time of every open window"""
+        self._last_flush = time.monotonic()
+        if not self.state_path or not self._dirty:
+            return
+        with self._lock:
+            self.prune()
+            state = {'|'.join(key): window.last_sent for key, window in self.windows.items()}
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.state_path.with_suffix('.tmp')
+            with open(temp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_path)
+            self._dirty = 0
+        except OSError as e:
+            print(f"Could not save alert coalescer state: {e}")
+
+    def _load_state(self):
+        if not self.state_path or not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for joined, last_sent in state.items():
+            parts = tuple(joined.split('|', 2))
+            if len(parts) == 3 and now - last_sent < self.window_seconds:
+                self.windows[parts] = AlertWindow(last_sent=last_sent)
+
+# Shared instance so every notifier coalesces against the same windows
+alert_coalescer = AlertCoalescer()
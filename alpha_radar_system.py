@@ -15,6 +15,9 @@ import numpy as np
 from collections import deque
 import aiohttp
 
+from loop_monitor import monitor_loop
+from sampling_profiler import profile_worker
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -382,9 +385,29 @@ class AlphaRadarSystem:
         self.signals = deque(maxlen=100)
         self.active_signals = {}
         self.session: Optional[aiohttp.ClientSession] = None
-        
+
+        # Detection cycle budget and per-cycle fan-out width
+        self.scan_interval = config.get('scan_interval', 30)
+        self.max_concurrency = config.get('max_concurrency', 50)
+
+        # Rolling price history per token; each cycle only fetches points newer than the last cached one
+        self.history_window = config.get('history_window', 200)
+        self.history_cache: Dict[str, deque] = {}
+
+        self.cycle_times = deque(maxlen=100)
+        self.cycle_stats = {
+            'cycles': 0,
+            'over_budget': 0,
+            'last_cycle_s': 0.0,
+            'last_token_count': 0,
+            'token_errors': 0,
+            'history_points_fetched': 0
+        }
+
     async def start(self):
         """Start the Alpha Radar system"""
+        profile_worker('alpha_radar')
+        monitor_loop('alpha_radar')
         self.session = aiohttp.ClientSession()
         
         # Start monitoring tasks
@@ -399,38 +422,106 @@ class AlphaRadarSystem:
     async def _monitor_tokens(self):
         """Monitor tokens for alpha signals"""
         while True:
+            start = time.monotonic()
             try:
-                # Get token data from various sources
-                tokens = await self._fetch_trending_tokens()
-                
-                for token in tokens:
-                    # Get additional data
-                    historical = await self._fetch_historical_data(token['address'])
-                    transactions = await self._fetch_transactions(token['address'])
-                    social = await self._fetch_social_data(token['symbol'])
-                    
-                    # Run detectors
-                    signals = await asyncio.gather(
-                        self.detector.detect_volume_spike(token, historical),
-                        self.detector.detect_whale_activity(token, transactions),
-                        self.detector.detect_breakout(token, historical),
-                        self.detector.detect_social_buzz(token, social)
-                    )
-                    
-                    # Process valid signals
-                    for signal in signals:
-                        if signal and signal.confidence > self.config.get('min_confidence', 60):
-                            await self._add_signal(signal)
-                            
+                await self.run_detection_cycle()
             except Exception as e:
                 logger.error(f"Error in token monitoring: {e}")
-                
-            await asyncio.sleep(30)  # Check every 30 seconds
-    
-    async def _add_signal(self, signal: AlphaSignal):
+
+            # Check every scan_interval seconds, counting the cycle itself
+            await asyncio.sleep(max(0.0, self.scan_interval - (time.monotonic() - start)))
+
+    async def run_detection_cycle(self) -> List[AlphaSignal]:
+        """Scan every trending token concurrently (bounded by max_concurrency) and record the cycle time"""
+        start = time.monotonic()
+
+        # Get token data from various sources
+        tokens = await self._fetch_trending_tokens()
+
+        # Drop history for tokens that fell off the trending list
+        addresses = {token['address'] for token in tokens}
+        for address in [a for a in self.history_cache if a not in addresses]:
+            del self.history_cache[address]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *(self._scan_token(token, semaphore) for token in tokens),
+            return_exceptions=True
+        )
+
+        # Process valid signals
+        min_confidence = self.config.get('min_confidence', 60)
+        found = []
+        for token, result in zip(tokens, results):
+            if isinstance(result, Exception):
+                self.cycle_stats['token_errors'] += 1
+                logger.error(f"Error scanning {token.get('symbol', token['address'])}: {result}")
+                continue
+            found.extend(signal for signal in result if signal and signal.confidence > min_confidence)
+
+        if found:
+            market_context = await self._get_market_context()
+            for signal in found:
+                await self._add_signal(signal, market_context)
+
+        elapsed = time.monotonic() - start
+        self.cycle_times.append(elapsed)
+        self.cycle_stats['cycles'] += 1
+        self.cycle_stats['last_cycle_s'] = elapsed
+        self.cycle_stats['last_token_count'] = len(tokens)
+        if elapsed > self.scan_interval:
+            self.cycle_stats['over_budget'] += 1
+            logger.warning(f"Detection cycle took {elapsed:.1f}s for {len(tokens)} tokens "
+                           f"(budget {self.scan_interval}s)")
+
+        return found
+
+    async def _scan_token(self, token: Dict, semaphore: asyncio.Semaphore) -> List[Optional[AlphaSignal]]:
+        """Fetch one token's inputs in parallel and run the detectors on them"""
+        async with semaphore:
+            historical, transactions, social = await asyncio.gather(
+                self._get_history(token['address']),
+                self._fetch_transactions(token['address']),
+                self._fetch_social_data(token['symbol'])
+            )
+
+        # Run detectors
+        return await asyncio.gather(
+            self.detector.detect_volume_spike(token, historical),
+            self.detector.detect_whale_activity(token, transactions),
+            self.detector.detect_breakout(token, historical),
+            self.detector.detect_social_buzz(token, social)
+        )
+
+    async def _get_history(self, address: str) -> List[Dict]:
+        """Cached price history for a token, topped up with only the points since the last fetch"""
+        history = self.history_cache.get(address)
+        since = history[-1].get('timestamp') if history else None
+
+        delta = await self._fetch_historical_data(address, since=since)
+        if history is None:
+            history = self.history_cache[address] = deque(maxlen=self.history_window)
+        history.extend(delta)
+        self.cycle_stats['history_points_fetched'] += len(delta)
+
+        return list(history)
+
+    def get_radar_stats(self) -> Dict:
+        """Detection cycle timings against the scan_interval budget"""
+        times = np.array(self.cycle_times) if self.cycle_times else np.zeros(1)
+        return {
+            **self.cycle_stats,
+            'avg_cycle_s': float(times.mean()),
+            'p95_cycle_s': float(np.percentile(times, 95)),
+            'budget_s': self.scan_interval,
+            'cached_tokens': len(self.history_cache)
+        }
+
+    async def _add_signal(self, signal: AlphaSignal, market_context: Optional[Dict] = None):
         """Add a new signal to the system"""
         # Get market context
-        market_context = await self._get_market_context()
+        if market_context is None:
+            market_context = await self._get_market_context()
         
         # AI analysis
         analysis = self.ai.analyze_signal(signal, market_context)
@@ -498,8 +589,8 @@ class AlphaRadarSystem:
         # Implementation would fetch from DexScreener, etc.
         return []
     
-    async def _fetch_historical_data(self, address: str) -> List[Dict]:
-        """Fetch historical price data"""
+    async def _fetch_historical_data(self, address: str, since: Optional[float] = None) -> List[Dict]:
+        """Fetch historical price data, oldest first, newer than `since` (epoch seconds) when given"""
         return []
     
     async def _fetch_transactions(self, address: str) -> List[Dict]:
@@ -11,9 +11,9 @@ import aiohttp
 from typing import Dict, List, Optional, Any, Tuple, Set
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
-from collections import deque, defaultdict
+from collections import defaultdict
 import json
-import statistics
+import math
 from enum import Enum
 import streamlit as st
 import plotly.graph_objects as go
@@ -40,6 +40,138 @@ class HealthMetric:
     rate_limit_remaining: Optional[int] = None
     rate_limit_reset: Optional[datetime] = None
 
+class LatencySketch:
+    """
+    Log-bucketed latency histogram (about 2% relative error). Values can be
+    removed as well as added, so it tracks exactly what a ring buffer holds.
+    """
+    
+    def __init__(self, min_ms: float = 0.1, max_ms: float = 120000.0, growth: float = 1.04):
+        self.min_ms = min_ms
+        self.growth = growth
+        self.log_growth = math.log(growth)
+        self.counts = np.zeros(int(math.log(max_ms / min_ms) / self.log_growth) + 2, dtype=np.int64)
+        self.total = 0
+    
+    def _index(self, value_ms: float) -> int:
+        if value_ms <= self.min_ms:
+            return 0
+        return min(int(math.log(value_ms / self.min_ms) / self.log_growth) + 1, len(self.counts) - 1)
+    
+    def add(self, value_ms: float):
+        self.counts[self._index(value_ms)] += 1
+        self.total += 1
+    
+    def remove(self, value_ms: float):
+        self.counts[self._index(value_ms)] -= 1
+        self.total -= 1
+    
+    def quantiles(self, qs: Tuple[float, ...]) -> List[float]:
+        """Approximate quantiles (0-1) in one pass over the fixed bucket array"""
+        if not self.total:
+            return [0.0 for _ in qs]
+        cumulative = np.cumsum(self.counts)
+        values = []
+        for q in qs:
+            index = int(np.searchsorted(cumulative, max(math.ceil(q * self.total), 1)))
+            # Geometric midpoint of the bucket
+            values.append(self.min_ms if index == 0 else self.min_ms * self.growth ** (index - 0.5))
+        return values
+
+class ProviderMetricsBuffer:
+    """
+    Fixed-size, array-backed check history for one provider with running
+    aggregates, so summaries never rescan history: mean latency and failures
+    over the last `window` checks, an EWMA of latency, and latency
+    percentiles over everything the buffer holds.
+    """
+    
+    PERCENTILES = (0.5, 0.95, 0.99)
+    
+    def __init__(self, capacity: int = 1440, window: int = 100, ewma_alpha: float = 0.2):
+        self.capacity = capacity
+        self.window = min(window, capacity)
+        self.ewma_alpha = ewma_alpha
+        
+        self.timestamps = np.zeros(capacity)  # Epoch seconds
+        self.response_time_ms = np.zeros(capacity)
+        self.status_code = np.zeros(capacity, dtype=np.int16)
+        self.success = np.zeros(capacity, dtype=bool)
+        self.rate_limit_remaining = np.full(capacity, -1, dtype=np.int64)  # -1 when not reported
+        self.pos = 0
+        self.count = 0
+        
+        self.window_latency_sum = 0.0
+        self.window_failures = 0
+        self.ewma_response_time_ms = 0.0
+        self.latency_sketch = LatencySketch()
+        self._percentiles: Optional[List[float]] = None
+    
+    def push(self, metric: HealthMetric):
+        # The check leaving the rolling window, then the slot being overwritten
+        if self.count >= self.window:
+            old = (self.pos - self.window) % self.capacity
+            self.window_latency_sum -= self.response_time_ms[old]
+            self.window_failures -= int(not self.success[old])
+        if self.count == self.capacity:
+            self.latency_sketch.remove(self.response_time_ms[self.pos])
+        
+        response_time = metric.response_time_ms
+        self.timestamps[self.pos] = metric.timestamp.timestamp()
+        self.response_time_ms[self.pos] = response_time
+        self.status_code[self.pos] = metric.status_code
+        self.success[self.pos] = metric.success
+        self.rate_limit_remaining[self.pos] = (
+            metric.rate_limit_remaining if metric.rate_limit_remaining is not None else -1
+        )
+        
+        self.window_latency_sum += response_time
+        self.window_failures += int(not metric.success)
+        self.latency_sketch.add(response_time)
+        self._percentiles = None
+        
+        if self.count == 0:
+            self.ewma_response_time_ms = response_time
+        else:
+            self.ewma_response_time_ms += self.ewma_alpha * (response_time - self.ewma_response_time_ms)
+        
+        self.pos = (self.pos + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+    
+    @property
+    def window_size(self) -> int:
+        return min(self.count, self.window)
+    
+    @property
+    def avg_response_time_ms(self) -> float:
+        return max(self.window_latency_sum, 0.0) / self.window_size if self.count else 0.0
+    
+    @property
+    def error_rate(self) -> float:
+        return self.window_failures / self.window_size if self.count else 0.0
+    
+    def percentiles(self) -> Dict[str, float]:
+        """p50/p95/p99 latency over the whole buffer, cached until the next push"""
+        if self._percentiles is None:
+            self._percentiles = self.latency_sketch.quantiles(self.PERCENTILES)
+        return dict(zip(('p50', 'p95', 'p99'), self._percentiles))
+    
+    def history(self, since: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """Stored checks in chronological order, optionally only those after `since`"""
+        if self.count < self.capacity:
+            order = np.arange(self.count)
+        else:
+            order = np.roll(np.arange(self.capacity), -self.pos)
+        if since is not None:
+            order = order[self.timestamps[order] > since.timestamp()]
+        return {
+            'timestamps': self.timestamps[order],
+            'response_time_ms': self.response_time_ms[order],
+            'status_code': self.status_code[order],
+            'success': self.success[order],
+            'rate_limit_remaining': self.rate_limit_remaining[order]
+        }
+
 @dataclass 
 class APIHealthStatus:
     """Current health status for an API"""
@@ -52,7 +184,7 @@ class APIHealthStatus:
     last_error: Optional[str] = None
     consecutive_failures: int = 0
     rate_limit_status: Dict[str, Any] = field(default_factory=dict)
-    recent_metrics: deque = field(default_factory=lambda: deque(maxlen=100))
+    ewma_response_time_ms: float = 0.0
 
 @dataclass
 class HealthAlert:
@@ -69,7 +201,9 @@ class APIHealthMonitor:
     Monitors health of all API providers
     """
     
-    def __init__(self, check_interval: int = 300):  # 5 minutes default
+    def __init__(self, check_interval: int = 300,  # 5 minutes default
+                 history_hours: float = 24, max_history_points: int = 10000,
+                 status_window: int = 100):
         self.check_interval = check_interval
         self.health_status: Dict[str, APIHealthStatus] = {}
         self.alerts: List[HealthAlert] = []
@@ -89,8 +223,20 @@ class APIHealthMonitor:
             'consecutive_failures_critical': 5
         }
         
-        # Historical data for analysis
-        self.historical_data: Dict[str, List[HealthMetric]] = defaultdict(list)
+        # Historical data for analysis: one ring buffer per provider sized for the history window
+        self.history_hours = history_hours
+        self.history_capacity = max(
+            min(math.ceil(history_hours * 3600 / max(check_interval, 1)), max_history_points),
+            status_window
+        )
+        self.status_window = status_window  # Checks behind avg response time, error rate and uptime
+        self.metrics_buffers: Dict[str, ProviderMetricsBuffer] = {}
+        
+        # Fleet-wide running totals, adjusted whenever a provider's status changes
+        self._status_counts: Dict[HealthStatus, int] = defaultdict(int)
+        self._response_time_sum = 0.0
+        self._response_time_providers = 0
+        self._error_rate_sum = 0.0
         
     async def start_monitoring(self, providers: List[str]):
         """Start monitoring specified providers"""
@@ -102,15 +248,21 @@ class APIHealthMonitor:
                 task = asyncio.create_task(self._monitor_provider(provider))
                 self.monitoring_tasks[provider] = task
                 
-                # Initialize health status
-                self.health_status[provider] = APIHealthStatus(
-                    provider=provider,
-                    status=HealthStatus.UNKNOWN,
-                    uptime_percentage=100.0,
-                    avg_response_time_ms=0.0,
-                    error_rate=0.0,
-                    last_check=datetime.utcnow()
-                )
+                # Initialize health status; a restarted provider keeps its history
+                if provider not in self.health_status:
+                    self.health_status[provider] = APIHealthStatus(
+                        provider=provider,
+                        status=HealthStatus.UNKNOWN,
+                        uptime_percentage=100.0,
+                        avg_response_time_ms=0.0,
+                        error_rate=0.0,
+                        last_check=datetime.utcnow()
+                    )
+                    self._apply_totals(self.health_status[provider], 1)
+                if provider not in self.metrics_buffers:
+                    self.metrics_buffers[provider] = ProviderMetricsBuffer(
+                        capacity=self.history_capacity, window=self.status_window
+                    )
     
     async def stop_monitoring(self, providers: Optional[List[str]] = None):
         """Stop monitoring specified providers or all"""
@@ -132,19 +284,9 @@ class APIHealthMonitor:
                 # Perform health check
                 metric = await self._check_provider_health(provider)
                 
-                # Update health status
+                # Update health status and historical data
                 self._update_health_status(provider, metric)
                 
-                # Store historical data
-                self.historical_data[provider].append(metric)
-                
-                # Trim historical data to last 24 hours
-                cutoff = datetime.utcnow() - timedelta(hours=24)
-                self.historical_data[provider] = [
-                    m for m in self.historical_data[provider]
-                    if m.timestamp > cutoff
-                ]
-                
                 # Check for alerts
                 await self._check_alerts(provider)
                 
@@ -259,9 +401,11 @@ class APIHealthMonitor:
     def _update_health_status(self, provider: str, metric: HealthMetric):
         """Update health status based on new metric"""
         status = self.health_status[provider]
+        buffer = self.metrics_buffers[provider]
+        self._apply_totals(status, -1)
         
-        # Add to recent metrics
-        status.recent_metrics.append(metric)
+        # Add to the provider's ring buffer
+        buffer.push(metric)
         status.last_check = metric.timestamp
         
         # Update consecutive failures
@@ -271,19 +415,11 @@ class APIHealthMonitor:
             status.consecutive_failures += 1
             status.last_error = metric.error_message
         
-        # Calculate metrics from recent data
-        recent_list = list(status.recent_metrics)
-        if recent_list:
-            # Response time
-            response_times = [m.response_time_ms for m in recent_list]
-            status.avg_response_time_ms = statistics.mean(response_times)
-            
-            # Error rate
-            failures = sum(1 for m in recent_list if not m.success)
-            status.error_rate = failures / len(recent_list)
-            
-            # Uptime (from last 100 checks)
-            status.uptime_percentage = (len(recent_list) - failures) / len(recent_list)
+        # Running aggregates over the last `status_window` checks
+        status.avg_response_time_ms = buffer.avg_response_time_ms
+        status.ewma_response_time_ms = buffer.ewma_response_time_ms
+        status.error_rate = buffer.error_rate
+        status.uptime_percentage = 1 - buffer.error_rate
         
         # Update rate limit status
         if metric.rate_limit_remaining is not None:
@@ -295,6 +431,23 @@ class APIHealthMonitor:
         
         # Determine overall status
         status.status = self._calculate_health_status(status)
+        self._apply_totals(status, 1)
+    
+    def _apply_totals(self, status: APIHealthStatus, sign: int):
+        """Add (sign=1) or remove (sign=-1) a provider's contribution to the fleet totals"""
+        self._status_counts[status.status] += sign
+        self._error_rate_sum += sign * status.error_rate
+        if status.avg_response_time_ms > 0:
+            self._response_time_sum += sign * status.avg_response_time_ms
+            self._response_time_providers += sign
+    
+    def get_history(self, provider: str, hours: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """A provider's stored checks within the last `hours` (default: the history window)"""
+        buffer = self.metrics_buffers.get(provider)
+        if buffer is None:
+            return ProviderMetricsBuffer(capacity=1).history()
+        cutoff = datetime.utcnow() - timedelta(hours=hours if hours is not None else self.history_hours)
+        return buffer.history(since=cutoff)
     
     def _calculate_health_status(self, status: APIHealthStatus) -> HealthStatus:
         """Calculate overall health status from metrics"""
@@ -392,6 +545,8 @@ class APIHealthMonitor:
                     'status': status.status.value,
                     'uptime': status.uptime_percentage,
                     'response_time': status.avg_response_time_ms,
+                    'ewma_response_time': status.ewma_response_time_ms,
+                    'response_time_percentiles': self.metrics_buffers[provider].percentiles(),
                     'error_rate': status.error_rate,
                     'last_check': status.last_check.isoformat(),
                     'rate_limit': status.rate_limit_status
@@ -409,18 +564,16 @@ class APIHealthMonitor:
         if not self.health_status:
             return {'status': 'unknown', 'score': 0}
         
-        statuses = [s.status for s in self.health_status.values()]
-        
         # Count by status
         status_counts = {
-            'healthy': sum(1 for s in statuses if s == HealthStatus.HEALTHY),
-            'degraded': sum(1 for s in statuses if s == HealthStatus.DEGRADED),
-            'unhealthy': sum(1 for s in statuses if s == HealthStatus.UNHEALTHY),
-            'offline': sum(1 for s in statuses if s == HealthStatus.OFFLINE)
+            'healthy': self._status_counts[HealthStatus.HEALTHY],
+            'degraded': self._status_counts[HealthStatus.DEGRADED],
+            'unhealthy': self._status_counts[HealthStatus.UNHEALTHY],
+            'offline': self._status_counts[HealthStatus.OFFLINE]
         }
         
         # Calculate score (0-100)
-        total = len(statuses)
+        total = len(self.health_status)
         score = (
             status_counts['healthy'] * 100 +
             status_counts['degraded'] * 70 +
@@ -448,21 +601,15 @@ class APIHealthMonitor:
         if not self.health_status:
             return {}
         
-        response_times = [
-            s.avg_response_time_ms 
-            for s in self.health_status.values()
-            if s.avg_response_time_ms > 0
-        ]
-        
-        error_rates = [
-            s.error_rate 
-            for s in self.health_status.values()
-        ]
+        providers = len(self.health_status)
         
         return {
-            'avg_response_time': statistics.mean(response_times) if response_times else 0,
-            'max_response_time': max(response_times) if response_times else 0,
-            'avg_error_rate': statistics.mean(error_rates) if error_rates else 0,
+            'avg_response_time': (
+                self._response_time_sum / self._response_time_providers
+                if self._response_time_providers else 0
+            ),
+            'max_response_time': max(s.avg_response_time_ms for s in self.health_status.values()),
+            'avg_error_rate': self._error_rate_sum / providers,
             'providers_monitored': len(self.health_status),
             'active_alerts': sum(1 for a in self.alerts if not a.resolved)
         }
@@ -575,17 +722,17 @@ def render_health_monitoring_dashboard(monitor: APIHealthMonitor):
     )
     
     # Add traces for each provider
-    for provider, history in monitor.historical_data.items():
-        if history:
-            timestamps = [m.timestamp for m in history]
-            response_times = [m.response_time_ms for m in history]
-            error_rate = []
+    for provider in monitor.metrics_buffers:
+        history = monitor.get_history(provider)
+        if len(history['timestamps']):
+            timestamps = [datetime.fromtimestamp(ts) for ts in history['timestamps']]
+            response_times = history['response_time_ms']
             
-            # Calculate rolling error rate
-            for i in range(len(history)):
-                window = history[max(0, i-10):i+1]
-                failures = sum(1 for m in window if not m.success)
-                error_rate.append(failures / len(window) * 100)
+            # Calculate rolling error rate over the last 11 checks
+            failures = np.concatenate([[0], np.cumsum(~history['success'])])
+            index = np.arange(len(response_times))
+            window_start = np.maximum(index - 10, 0)
+            error_rate = (failures[index + 1] - failures[window_start]) / (index + 1 - window_start) * 100
             
             # Response time trace
             fig.add_trace(
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+TrenchCoat Pro - Async Helpers
+Shared by synchronous entry points (Streamlit pages, CLI scripts) that
+drive async code
+"""
+
+import asyncio
+import concurrent.futures
+
+def run_async_safe(coro):
+    """Safely run async code in potentially existing event loop"""
+    try:
+        # Try to get the current event loop
+        loop = asyncio.get_running_loop()
+        # If we're in an existing loop, create a new thread
+        if loop.is_running():
+            with concurrent.futures.ThreadPoolExecutor() as executor:
+                future = executor.submit(asyncio.run, coro)
+                return future.result()
+        else:
+            return asyncio.run(coro)
+    except RuntimeError:
+        # No event loop running, safe to use asyncio.run
+        return asyncio.run(coro)
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Candle Service - Multi-resolution OHLCV rollups for charts
+Keeps 1m/5m/1h/1d candles per coin updated tick by tick and serves chart
+requests downsampled to the pixel width (min/max buckets or LTTB)
+"""
+
+import calendar
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+import numpy as np
+import pandas as pd
+
+RESOLUTIONS = {
+    '1m': 60,
+    '5m': 300,
+    '1h': 3600,
+    '1d': 86400,
+}
+
+# Bars kept per resolution (7 days of 1m, 30 days of 5m, 1 year of 1h, 10 years of 1d)
+DEFAULT_RETENTION = {
+    '1m': 7 * 1440,
+    '5m': 30 * 288,
+    '1h': 365 * 24,
+    '1d': 3650,
+}
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+def _to_epoch(timestamp) -> int:
+    if timestamp is None:
+        return int(datetime.now().timestamp())
+    if isinstance(timestamp, (int, float, np.integer, np.floating)):
+        return int(timestamp)
+    if isinstance(timestamp, np.datetime64):
+        return int(timestamp.astype('datetime64[s]').astype(np.int64))
+    timestamp = pd.Timestamp(timestamp).to_pydatetime()
+    if timestamp.tzinfo is None:
+        # Naive values are local wall-clock time, like datetime.now() in the chart callers
+        return int(timestamp.timestamp())
+    return calendar.timegm(timestamp.utctimetuple())
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points preserving the line shape"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+
+        area = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+def minmax_indices(y: np.ndarray, buckets: int) -> np.ndarray:
+    """Indices of the min and max of each bucket, in time order (at most 2 * buckets points)"""
+    n = len(y)
+    if 2 * buckets >= n or buckets < 1:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    y = np.asarray(y, dtype=float)
+    lows = np.minimum.reduceat(y, edges[:-1])
+    highs = np.maximum.reduceat(y, edges[:-1])
+    indices = []
+    for start, end, lo, hi in zip(edges[:-1], edges[1:], lows, highs):
+        window = y[start:end]
+        indices.append(start + int(np.argmax(window == lo)))
+        indices.append(start + int(np.argmax(window == hi)))
+    return np.unique(indices)
+
+def aggregate_candles(candles: Dict[str, np.ndarray], buckets: int) -> Dict[str, np.ndarray]:
+    """Merge consecutive candles into `buckets` wider candles (keeps true highs and lows)"""
+    n = len(candles['timestamp'])
+    if buckets >= n or buckets < 1:
+        return candles
+
+    starts = np.linspace(0, n, buckets + 1).astype(int)[:-1]
+    ends = np.append(starts[1:], n) - 1
+    return {
+        'timestamp': candles['timestamp'][starts],
+        'open': candles['open'][starts],
+        'high': np.maximum.reduceat(candles['high'], starts),
+        'low': np.minimum.reduceat(candles['low'], starts),
+        'close': candles['close'][ends],
+        'volume': np.add.reduceat(candles['volume'], starts),
+    }
+
+class _CandleSeries:
+    """Append-mostly columnar candle buffer for one coin at one resolution"""
+
+    def __init__(self, seconds: int, retention: int):
+        self.seconds = seconds
+        self.retention = retention
+        self.size = 0
+        self.timestamp = np.empty(64, dtype=np.int64)
+        self.columns = {name: np.empty(64) for name in FIELDS}
+        self.trimmed = False  # True once old bars have been dropped
+        self.dropped = 0  # Late ticks and backfilled bars older than the retained range
+
+    def _reserve(self, count: int = 1):
+        if self.size + count > 2 * self.retention and self.size > self.retention:
+            # Drop the oldest bars rather than growing past twice the retention
+            keep = slice(self.size - self.retention, self.size)
+            self.timestamp[:self.retention] = self.timestamp[keep]
+            for values in self.columns.values():
+                values[:self.retention] = values[keep]
+            self.size = self.retention
+            self.trimmed = True
+        needed = self.size + count
+        if needed > len(self.timestamp):
+            capacity = max(needed, len(self.timestamp) * 2)
+            self.timestamp = np.resize(self.timestamp, capacity)
+            self.columns = {name: np.resize(values, capacity) for name, values in self.columns.items()}
+
+    def add_tick(self, ts: int, price: float, volume: float):
+        bucket = ts - ts % self.seconds
+        last = self.timestamp[self.size - 1] if self.size else None
+
+        if last is not None and bucket == last:
+            i = self.size - 1
+        elif last is None or bucket > last:
+            self._reserve()
+            i = self.size
+            self.timestamp[i] = bucket
+            for name in ('open', 'high', 'low', 'close'):
+                self.columns[name][i] = price
+            self.columns['volume'][i] = 0.0
+            self.size += 1
+        else:
+            # Late tick: update its bucket if we still have it, otherwise drop it
+            i = int(np.searchsorted(self.timestamp[:self.size], bucket))
+            if i >= self.size or self.timestamp[i] != bucket:
+                self.dropped += 1
+                return
+            self.columns['high'][i] = max(self.columns['high'][i], price)
+            self.columns['low'][i] = min(self.columns['low'][i], price)
+            self.columns['volume'][i] += volume
+            return
+
+        self.columns['high'][i] = max(self.columns['high'][i], price)
+        self.columns['low'][i] = min(self.columns['low'][i], price)
+        self.columns['close'][i] = price
+        self.columns['volume'][i] += volume
+
+    def add_candles(self, timestamps: np.ndarray, o, h, l, c, v):
+        """Merge finer candles (sorted by time) into this resolution, vectorized"""
+        buckets = timestamps - timestamps % self.seconds
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(buckets)] - 1
+        rolled = {
+            'timestamp': buckets[starts],
+            'open': o[starts],
+            'high': np.maximum.reduceat(h, starts),
+            'low': np.minimum.reduceat(l, starts),
+            'close': c[ends],
+            'volume': np.add.reduceat(v, starts),
+        }
+
+        # Fold the first rolled bucket into the current last candle if they coincide
+        if self.size and rolled['timestamp'][0] == self.timestamp[self.size - 1]:
+            i = self.size - 1
+            self.columns['high'][i] = max(self.columns['high'][i], rolled['high'][0])
+            self.columns['low'][i] = min(self.columns['low'][i], rolled['low'][0])
+            self.columns['close'][i] = rolled['close'][0]
+            self.columns['volume'][i] += rolled['volume'][0]
+            rolled = {name: values[1:] for name, values in rolled.items()}
+
+        newer = rolled['timestamp'] > (self.timestamp[self.size - 1] if self.size else -1)
+        if not newer.all():
+            self._merge_older({name: values[~newer] for name, values in rolled.items()})
+        if newer.sum() > self.retention:
+            self.trimmed = True
+        rolled = {name: values[newer][-self.retention:] for name, values in rolled.items()}
+        count = len(rolled['timestamp'])
+        self._reserve(count)
+        self.timestamp[self.size:self.size + count] = rolled['timestamp']
+        for name in FIELDS:
+            self.columns[name][self.size:self.size + count] = rolled[name]
+        self.size += count
+
+    def _merge_older(self, rolled: Dict[str, np.ndarray]):
+        """Backfill rolled bars that fall before the current last candle"""
+        timestamps = self.timestamp[:self.size]
+        if self.trimmed:
+            # Anything before the retained range was already given up on
+            outside = rolled['timestamp'] < timestamps[0]
+            self.dropped += int(outside.sum())
+            rolled = {name: values[~outside] for name, values in rolled.items()}
+
+        positions = np.searchsorted(timestamps, rolled['timestamp'])
+        present = timestamps[np.minimum(positions, self.size - 1)] == rolled['timestamp']
+
+        # Buckets we already have: widen the range and add the volume (open/close stay as they are)
+        i = positions[present]
+        self.columns['high'][i] = np.maximum(self.columns['high'][i], rolled['high'][present])
+        self.columns['low'][i] = np.minimum(self.columns['low'][i], rolled['low'][present])
+        self.columns['volume'][i] += rolled['volume'][present]
+
+        # Missing buckets are inserted in time order
+        missing = ~present
+        if missing.any():
+            merged = np.concatenate([timestamps, rolled['timestamp'][missing]])
+            order = np.argsort(merged, kind='stable')
+            if len(order) > self.retention:
+                order = order[-self.retention:]
+                self.trimmed = True
+            self.columns = {
+                name: np.concatenate([values[:self.size], rolled[name][missing]])[order]
+                for name, values in self.columns.items()
+            }
+            self.timestamp = merged[order]
+            self.size = len(order)
+
+    def window(self, start: Optional[int], end: Optional[int]) -> Dict[str, np.ndarray]:
+        timestamps = self.timestamp[:self.size]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start - start % self.seconds))
+        hi = self.size if end is None else int(np.searchsorted(timestamps, end, side='right'))
+        result = {'timestamp': timestamps[lo:hi].copy()}
+        result.update({name: values[lo:hi].copy() for name, values in self.columns.items()})
+        return result
+
+class CandleService:
+    """
+    Per-coin multi-resolution candle rollups.
+    Ticks update every resolution in O(1); chart reads pick the finest
+    resolution that covers the range and downsample to the requested width.
+    """
+
+    def __init__(self, retention: Optional[Dict[str, int]] = None):
+        self.retention = {**DEFAULT_RETENTION, **(retention or {})}
+        self.series: Dict[str, Dict[str, _CandleSeries]] = {}
+        self.lock = threading.Lock()
+
+    def _coin_series(self, coin: str) -> Dict[str, _CandleSeries]:
+        key = coin.upper()
+        if key not in self.series:
+            self.series[key] = {
+                name: _CandleSeries(seconds, self.retention[name])
+                for name, seconds in RESOLUTIONS.items()
+            }
+        return self.series[key]
+
+    def add_tick(self, coin: str, price: float, volume: float = 0.0, timestamp=None):
+        """Apply one trade/price tick to every resolution"""
+        if price is None or not np.isfinite(price):
+            return
+        ts = _to_epoch(timestamp)
+        with self.lock:
+            for series in self._coin_series(coin).values():
+                series.add_tick(ts, float(price), float(volume or 0.0))
+
+    def add_candles(self, coin: str, timestamps, open, high, low, close, volume=None):
+        """Bulk load finer-grained candles (e.g. 1m bars from PriceSeriesStore) into all rollups"""
+        timestamps = np.asarray([_to_epoch(t) for t in timestamps] if not isinstance(timestamps, np.ndarray)
+                                or timestamps.dtype.kind not in 'iu' else timestamps, dtype=np.int64)
+        if len(timestamps) == 0:
+            return
+        order = np.argsort(timestamps, kind='stable')
+        columns = [np.asarray(values, dtype=float)[order] for values in (open, high, low, close)]
+        volume = np.zeros(len(timestamps)) if volume is None else np.asarray(volume, dtype=float)[order]
+        with self.lock:
+            for series in self._coin_series(coin).values():
+                series.add_candles(timestamps[order], *columns, volume)
+
+    def has_data(self, coin: str) -> bool:
+        series = self.series.get(coin.upper())
+        return bool(series and series['1d'].size)
+
+    def get_candles(self, coin: str, start=None, end=None, max_points: int = 1000,
+                    resolution: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Candles for [start, end] with at most max_points bars. Picks the finest
+        resolution that still has the range, then merges bars to fit.
+        """
+        start_ts = None if start is None else _to_epoch(start)
+        end_ts = None if end is None else _to_epoch(end)
+
+        with self.lock:
+            series = self.series.get(coin.upper())
+            if not series:
+                return {name: np.empty(0) for name in ('timestamp',) + FIELDS}
+
+            names = [resolution] if resolution else list(RESOLUTIONS)
+            chosen = None
+            for name in names:
+                candidate = series[name]
+                if not candidate.size:
+                    continue
+                covers = not candidate.trimmed or (
+                    start_ts is not None and candidate.timestamp[0] <= start_ts
+                )
+                if not covers and name != names[-1]:
+                    continue
+                chosen = candidate.window(start_ts, end_ts)
+                # Merging more than ~4 bars per point is wasted work; try a coarser resolution
+                if len(chosen['timestamp']) <= max_points * 4:
+                    break
+            if chosen is None:
+                chosen = series[names[-1]].window(start_ts, end_ts)
+
+        return aggregate_candles(chosen, max_points)
+
+    def get_line(self, coin: str, start=None, end=None, max_points: int = 1000,
+                 method: str = 'lttb') -> Dict[str, np.ndarray]:
+        """Close-price line downsampled with LTTB or per-bucket min/max"""
+        candles = self.get_candles(coin, start, end, max_points=max_points * 4)
+        if method == 'minmax':
+            indices = minmax_indices(candles['close'], max_points // 2)
+        else:
+            indices = lttb(candles['timestamp'], candles['close'], max_points)
+        return {
+            'timestamp': candles['timestamp'][indices],
+            'price': candles['close'][indices],
+            'volume': candles['volume'][indices],
+        }
+
+    def get_candles_frame(self, coin: str, start=None, end=None, max_points: int = 1000) -> pd.DataFrame:
+        """Candles as a DataFrame with a 'date' column, the shape the Plotly charts use"""
+        candles = self.get_candles(coin, start, end, max_points)
+        df = pd.DataFrame({name: candles[name] for name in FIELDS})
+        # Local wall-clock time, so dates read back from the frame are valid start/end arguments
+        df.insert(0, 'date', pd.to_datetime([datetime.fromtimestamp(int(ts)) for ts in candles['timestamp']]))
+        return df
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'coins': len(self.series),
+                'bars': {
+                    name: sum(coin[name].size for coin in self.series.values())
+                    for name in RESOLUTIONS
+                },
+                'dropped': {
+                    name: sum(coin[name].dropped for coin in self.series.values())
+                    for name in RESOLUTIONS
+                },
+            }
+
+# Global candle service instance
+_candle_service = None
+
+def get_candle_service() -> CandleService:
+    """Get or create the global candle service"""
+    global _candle_service
+
+    if _candle_service is None:
+        _candle_service = CandleService()
+
+    return _candle_service
@@ -5,16 +5,48 @@ Comprehensive logo/image fetching and caching for beautiful coin displays
 """
 import asyncio
 import aiohttp
+import base64
+import io
 import json
 import os
 import hashlib
-from typing import Dict, List, Optional, Any
+import time
+import uuid
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 from urllib.parse import urlparse
 from dataclasses import dataclass
 from unicode_handler import safe_print
 
+# Pillow is optional - without it originals are stored as-is
+PIL_AVAILABLE = False
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    pass
+
+THUMBNAIL_SIZES = (64, 192)
+MAX_IMAGE_BYTES = 2 * 1024 * 1024
+IMAGE_EXTENSIONS = {
+    'image/png': '.png', 'image/jpeg': '.jpg', 'image/gif': '.gif',
+    'image/webp': '.webp', 'image/svg+xml': '.svg'
+}
+MIME_TYPES = {ext: mime for mime, ext in IMAGE_EXTENSIONS.items()}
+
+@lru_cache(maxsize=1024)
+def _data_uri(path: str) -> Optional[str]:
+    """Inline a stored image; paths are content-addressed so the cache never goes stale"""
+    try:
+        with open(path, 'rb') as f:
+            encoded = base64.b64encode(f.read()).decode('ascii')
+    except OSError:
+        return None
+    mime = MIME_TYPES.get(Path(path).suffix, 'image/png')
+    return f"data:{mime};base64,{encoded}"
+
 @dataclass
 class CoinImage:
     ticker: str
@@ -24,17 +56,32 @@ class CoinImage:
     cached_path: Optional[str] = None
     fetched_at: Optional[datetime] = None
     verified: bool = False
+    content_hash: Optional[str] = None
 
 class CoinImageSystem:
     """Comprehensive coin image fetching and management system"""
     
-    def __init__(self):
-        self.cache_dir = Path("data/coin_images")
-        self.cache_dir.mkdir(exist_ok=True)
+    def __init__(self, cache_dir: str = "data/coin_images", flush_every: int = 25):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         self.metadata_file = self.cache_dir / "image_metadata.json"
         self.metadata = self.load_metadata()
         
+        # Index writes are batched: flushed every `flush_every` changes or on demand
+        self.flush_every = flush_every
+        self._dirty = 0
+        
+        # Earliest monotonic time each source may be called again
+        self._next_slot: Dict[str, float] = {}
+        
+        # content hash -> thumbnail write in progress, shared by coins with the same logo
+        self._storing: Dict[str, asyncio.Future] = {}
+        
+        # url -> (fetched at, download) for bulk sources, whose one document covers every coin
+        self._bulk_responses: Dict[str, Tuple[float, asyncio.Future]] = {}
+        self.bulk_ttl = 3600.0
+        
         # Image sources in priority order
         self.image_sources = [
             {
@@ -59,7 +106,8 @@ class CoinImageSystem:
                 'name': 'cryptocompare',
                 'url_template': 'https://min-api.cryptocompare.com/data/all/coinlist',
                 'data_path': 'Data.{symbol}.ImageUrl',
-                'rate_limit': 1.0
+                'rate_limit': 1.0,
+                'bulk': True  # Several MB listing every coin: fallback only, downloaded once per bulk_ttl
             },
             {
                 'name': 'coinmarketcap',
@@ -91,11 +139,25 @@ class CoinImageSystem:
     def save_metadata(self):
         """Save image metadata to cache"""
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2, default=str)
+            temp_file = self.metadata_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump(self.metadata, f, separators=(',', ':'), default=str)
+            os.replace(temp_file, self.metadata_file)
+            self._dirty = 0
         except Exception as e:
             safe_print(f"Warning: Could not save image metadata: {e}")
     
+    def flush_metadata(self):
+        """Write the index if anything changed since the last flush"""
+        if self._dirty:
+            self.save_metadata()
+    
+    def _record(self, cache_key: str, entry: Dict[str, Any]):
+        self.metadata[cache_key] = entry
+        self._dirty += 1
+        if self._dirty >= self.flush_every:
+            self.save_metadata()
+    
     def get_cache_key(self, ticker: str, contract_address: str) -> str:
         """Generate cache key for coin"""
         data = f"{ticker}_{contract_address}".lower()
@@ -125,7 +187,20 @@ class CoinImageSystem:
         
         return False
     
-    async def fetch_image_url_from_api(self, source: Dict[str, Any], ticker: str, contract_address: str) -> Optional[str]:
+    @staticmethod
+    def _new_session() -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+    
+    async def _wait_for_slot(self, source: Dict[str, Any]):
+        """Space calls to each source by its rate limit, across concurrent fetches"""
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(source['name'], 0.0))
+        self._next_slot[source['name']] = slot + 1.0 / source['rate_limit']
+        if slot > now:
+            await asyncio.sleep(slot - now)
+    
+    async def fetch_image_url_from_api(self, source: Dict[str, Any], ticker: str, contract_address: str,
+                                       session: Optional[aiohttp.ClientSession] = None) -> Optional[str]:
         """Fetch image URL from a specific API source"""
         try:
             url = source['url_template'].format(
@@ -134,23 +209,155 @@ class CoinImageSystem:
                 symbol=ticker.upper()
             )
             
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Navigate to image URL using data_path
-                        image_url = self.extract_nested_value(data, source['data_path'])
-                        
-                        if image_url and self.is_valid_image_url(image_url):
-                            return image_url
+            if session is None:
+                async with self._new_session() as own_session:
+                    return await self.fetch_image_url_from_api(source, ticker, contract_address, own_session)
             
+            if source.get('bulk'):
+                data = await self._fetch_bulk(source, url, session)
+            else:
+                data = await self._fetch_json(source, url, session)
+            
+            if data is not None:
+                # Navigate to image URL using data_path
+                image_url = self.extract_nested_value(data, source['data_path'])
+                
+                if image_url and self.is_valid_image_url(image_url):
+                    return image_url
+            
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             safe_print(f"Error fetching from {source['name']}: {e}")
         
         return None
     
+    async def _fetch_json(self, source: Dict[str, Any], url: str, session: aiohttp.ClientSession) -> Optional[Any]:
+        await self._wait_for_slot(source)
+        async with session.get(url) as response:
+            if response.status == 200:
+                return await response.json(content_type=None)
+        return None
+    
+    async def _fetch_bulk(self, source: Dict[str, Any], url: str, session: aiohttp.ClientSession) -> Optional[Any]:
+        """One download of a bulk source, shared by concurrent and later coins for bulk_ttl seconds"""
+        cached = self._bulk_responses.get(url)
+        if cached is None or time.monotonic() - cached[0] > self.bulk_ttl:
+            cached = self._bulk_responses[url] = (
+                time.monotonic(), asyncio.ensure_future(self._fetch_json(source, url, session)))
+        try:
+            data = await asyncio.shield(cached[1])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            data = None
+        if data is None and self._bulk_responses.get(url) is cached:
+            # Failed downloads are retried by the next coin
+            del self._bulk_responses[url]
+        return data
+    
+    async def resolve_image_url(self, ticker: str, contract_address: str,
+                                session: aiohttp.ClientSession) -> Optional[Tuple[str, str]]:
+        """
+        Query every per-coin source at once; the first valid URL wins and the rest
+        are cancelled. Bulk sources are only tried, in order, when all of them miss.
+        """
+        async def query(source):
+            return source['name'], await self.fetch_image_url_from_api(source, ticker, contract_address, session)
+        
+        tasks = [asyncio.ensure_future(query(source)) for source in self.image_sources if not source.get('bulk')]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                source_name, image_url = await next_done
+                if image_url:
+                    return image_url, source_name
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for source in self.image_sources:
+            if source.get('bulk'):
+                image_url = await self.fetch_image_url_from_api(source, ticker, contract_address, session)
+                if image_url:
+                    return image_url, source['name']
+        return None
+    
+    def _image_paths(self, content_hash: str, extension: str) -> Dict[int, Path]:
+        folder = self.cache_dir / content_hash[:2]
+        if PIL_AVAILABLE and extension != '.svg':
+            return {size: folder / f"{content_hash}_{size}.png" for size in THUMBNAIL_SIZES}
+        # Vector images (and everything without Pillow) are kept as the original
+        return {size: folder / f"{content_hash}{extension}" for size in THUMBNAIL_SIZES}
+    
+    @staticmethod
+    def _temp_path(target: Path) -> Path:
+        # Unique per writer, so concurrent writes of the same image never share a temp file
+        return target.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+    
+    def _write_thumbnails(self, data: bytes, paths: Dict[int, Path]):
+        """Resize into every thumbnail size; runs in a worker thread"""
+        next(iter(paths.values())).parent.mkdir(parents=True, exist_ok=True)
+        if len(set(paths.values())) == 1:
+            target = next(iter(paths.values()))
+            temp = self._temp_path(target)
+            temp.write_bytes(data)
+            os.replace(temp, target)
+            return
+        
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert('RGBA')
+            for size, target in paths.items():
+                thumbnail = image.copy()
+                thumbnail.thumbnail((size, size), Image.LANCZOS)
+                temp = self._temp_path(target)
+                thumbnail.save(temp, format='PNG', optimize=True)
+                os.replace(temp, target)
+    
+    async def store_image(self, image_url: str, session: aiohttp.ClientSession) -> Optional[Dict[str, Any]]:
+        """Download an image and store its thumbnails under its content hash"""
+        try:
+            async with session.get(image_url) as response:
+                if response.status != 200:
+                    return None
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                data = await response.content.read(MAX_IMAGE_BYTES + 1)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            safe_print(f"Error downloading image {image_url}: {e}")
+            return None
+        
+        if not data or len(data) > MAX_IMAGE_BYTES:
+            return None
+        extension = IMAGE_EXTENSIONS.get(content_type) or Path(urlparse(image_url).path).suffix.lower()
+        if extension not in MIME_TYPES:
+            return None
+        
+        content_hash = hashlib.sha256(data).hexdigest()
+        paths = self._image_paths(content_hash, extension)
+        
+        # Identical images from different coins or sources are stored once
+        if not all(path.exists() for path in paths.values()):
+            writing = self._storing.get(content_hash)
+            if writing is None:
+                writing = self._storing[content_hash] = asyncio.ensure_future(
+                    asyncio.get_running_loop().run_in_executor(None, self._write_thumbnails, data, paths)
+                )
+                writing.add_done_callback(lambda _: self._storing.pop(content_hash, None))
+            try:
+                await asyncio.shield(writing)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                safe_print(f"Error storing image {image_url}: {e}")
+                return None
+        
+        return {
+            'content_hash': content_hash,
+            'thumbnails': {str(size): str(path) for size, path in paths.items()}
+        }
+    
     def extract_nested_value(self, data: Dict, path: str) -> Optional[str]:
         """Extract nested value from API response using dot notation"""
         try:
@@ -195,8 +402,13 @@ class CoinImageSystem:
         except:
             return False
     
-    async def fetch_coin_image(self, ticker: str, contract_address: str) -> CoinImage:
+    async def fetch_coin_image(self, ticker: str, contract_address: str,
+                               session: Optional[aiohttp.ClientSession] = None) -> CoinImage:
         """Fetch coin image from multiple sources"""
+        if session is None:
+            async with self._new_session() as own_session:
+                return await self.fetch_coin_image(ticker, contract_address, own_session)
+        
         cache_key = self.get_cache_key(ticker, contract_address)
         
         # Check cache first
@@ -209,44 +421,43 @@ class CoinImageSystem:
                 image_source=cached_entry['image_source'],
                 cached_path=cached_entry.get('cached_path'),
                 fetched_at=datetime.fromisoformat(cached_entry['fetched_at']),
-                verified=cached_entry.get('verified', False)
+                verified=cached_entry.get('verified', False),
+                content_hash=cached_entry.get('content_hash')
             )
         
-        # Try each source in priority order
-        for source in self.image_sources:
-            try:
-                image_url = await self.fetch_image_url_from_api(source, ticker, contract_address)
-                
-                if image_url:
-                    coin_image = CoinImage(
-                        ticker=ticker,
-                        contract_address=contract_address,
-                        image_url=image_url,
-                        image_source=source['name'],
-                        fetched_at=datetime.now(),
-                        verified=True
-                    )
-                    
-                    # Cache the result
-                    self.metadata[cache_key] = {
-                        'ticker': ticker,
-                        'contract_address': contract_address,
-                        'image_url': image_url,
-                        'image_source': source['name'],
-                        'fetched_at': datetime.now().isoformat(),
-                        'verified': True
-                    }
-                    
-                    self.save_metadata()
-                    safe_print(f"✅ Found image for {ticker} from {source['name']}")
-                    return coin_image
-                
-                # Rate limiting between sources
-                await asyncio.sleep(1.0 / source['rate_limit'])
-                
-            except Exception as e:
-                safe_print(f"Error with {source['name']} for {ticker}: {e}")
-                continue
+        # Race all sources; the first valid URL wins
+        resolved = await self.resolve_image_url(ticker, contract_address, session)
+        
+        if resolved:
+            image_url, source_name = resolved
+            stored = await self.store_image(image_url, session)
+            fetched_at = datetime.now()
+            
+            entry = {
+                'ticker': ticker,
+                'contract_address': contract_address,
+                'image_url': image_url,
+                'image_source': source_name,
+                'fetched_at': fetched_at.isoformat(),
+                'verified': True
+            }
+            if stored:
+                entry.update(stored)
+                entry['cached_path'] = stored['thumbnails'][str(THUMBNAIL_SIZES[0])]
+            
+            # Cache the result
+            self._record(cache_key, entry)
+            safe_print(f"✅ Found image for {ticker} from {source_name}")
+            return CoinImage(
+                ticker=ticker,
+                contract_address=contract_address,
+                image_url=image_url,
+                image_source=source_name,
+                cached_path=entry.get('cached_path'),
+                fetched_at=fetched_at,
+                verified=True,
+                content_hash=entry.get('content_hash')
+            )
         
         # No image found - use fallback
         fallback_url = self.get_fallback_image(ticker)
@@ -260,16 +471,15 @@ class CoinImageSystem:
         )
         
         # Cache fallback too
-        self.metadata[cache_key] = {
+        self._record(cache_key, {
             'ticker': ticker,
             'contract_address': contract_address,
             'image_url': fallback_url,
             'image_source': 'fallback',
             'fetched_at': datetime.now().isoformat(),
             'verified': False
-        }
+        })
         
-        self.save_metadata()
         safe_print(f"⚠️ Using fallback image for {ticker}")
         return coin_image
     
@@ -283,31 +493,30 @@ class CoinImageSystem:
         """Batch fetch images for multiple coins"""
         safe_print(f"🖼️ Fetching images for {len(coins)} coins...")
         
-        # Create tasks for concurrent fetching
-        tasks = []
-        for coin in coins:
-            ticker = coin.get('ticker', 'UNK')
-            contract_address = coin.get('ca', coin.get('contract_address', ''))
-            
-            if ticker and contract_address:
-                task = self.fetch_coin_image(ticker, contract_address)
-                tasks.append((ticker, task))
-        
-        # Execute tasks with concurrency limit
+        # Execute with a concurrency limit over one shared session
         results = {}
-        semaphore = asyncio.Semaphore(5)  # Max 5 concurrent requests
-        
-        async def fetch_with_semaphore(ticker, task):
-            async with semaphore:
-                return ticker, await task
+        semaphore = asyncio.Semaphore(5)  # Max 5 coins in flight
         
-        # Run all tasks
-        for ticker, result in await asyncio.gather(*[
-            fetch_with_semaphore(ticker, task) for ticker, task in tasks
-        ], return_exceptions=True):
-            if not isinstance(result, Exception):
-                results[ticker] = result
+        async with self._new_session() as session:
+            async def fetch_with_semaphore(ticker, contract_address):
+                async with semaphore:
+                    return ticker, await self.fetch_coin_image(ticker, contract_address, session)
+            
+            pending = []
+            for coin in coins:
+                ticker = coin.get('ticker', 'UNK')
+                contract_address = coin.get('ca', coin.get('contract_address', ''))
+                
+                if ticker and contract_address:
+                    pending.append(fetch_with_semaphore(ticker, contract_address))
+            
+            # Run all tasks
+            for outcome in await asyncio.gather(*pending, return_exceptions=True):
+                if not isinstance(outcome, BaseException):
+                    ticker, result = outcome
+                    results[ticker] = result
         
+        self.flush_metadata()
         safe_print(f"✅ Fetched images for {len(results)} coins")
         return results
     
@@ -320,6 +529,25 @@ class CoinImageSystem:
         
         return self.get_fallback_image(ticker)
     
+    def get_local_image_path(self, ticker: str, contract_address: str, size: int = THUMBNAIL_SIZES[0]) -> Optional[str]:
+        """Path of the smallest stored thumbnail at least `size` pixels wide"""
+        entry = self.metadata.get(self.get_cache_key(ticker, contract_address))
+        thumbnails = entry.get('thumbnails') if entry else None
+        if not thumbnails:
+            return None
+        fitting = [int(s) for s in thumbnails if int(s) >= size]
+        best = min(fitting) if fitting else max(int(s) for s in thumbnails)
+        return thumbnails[str(best)]
+    
+    def get_image_src(self, ticker: str, contract_address: str, size: int = THUMBNAIL_SIZES[0],
+                      fallback_url: Optional[str] = None) -> str:
+        """Inline data URI of the stored thumbnail, else the remote URL"""
+        path = self.get_local_image_path(ticker, contract_address, size)
+        local = _data_uri(path) if path else None
+        if local:
+            return local
+        return fallback_url or self.get_image_url(ticker, contract_address)
+    
     def get_coin_images_for_dashboard(self, coins: List[Dict[str, Any]]) -> Dict[str, str]:
         """Get image URLs for dashboard display (sync version)"""
         images = {}
@@ -364,6 +592,7 @@ def main():
             ticker = sys.argv[1]
             address = sys.argv[2]
             image = await coin_image_system.fetch_coin_image(ticker, address)
+            coin_image_system.flush_metadata()
             safe_print(f"Image for {ticker}: {image.image_url}")
         else:
             safe_print("Usage: python coin_image_system.py <TICKER> <CONTRACT_ADDRESS>")
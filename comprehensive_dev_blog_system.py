@@ -14,7 +14,8 @@ import asyncio
 import threading
 from contextlib import contextmanager
 import pandas as pd  # Added for data analysis methods
-from enhanced_blog_with_queue import DiscordRateLimitQueue, QueuedMessage, MessagePriority, run_async_safe
+from enhanced_blog_with_queue import DiscordRateLimitQueue, QueuedMessage, MessagePriority
+from async_utils import run_async_safe
 
 # Import all our systems
 from integrated_webhook_blog_system import IntegratedWebhookBlogSystem, DevelopmentUpdate
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+TrenchCoat Pro - Transaction Confirmation Tracker
+Tracks every pending Solana signature with one batched getSignatureStatuses
+call per interval (plus signatureSubscribe when a WebSocket endpoint is set)
+and resolves a future per signature as soon as its status lands
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Any
+
+import aiohttp
+
+COMMITMENT_LEVELS = {"processed": 0, "confirmed": 1, "finalized": 2}
+MAX_SIGNATURES_PER_CALL = 256  # getSignatureStatuses limit
+
+class SignatureConfirmationTracker:
+    """Shared confirmation tracker for all in-flight transactions"""
+
+    def __init__(self,
+                 rpc_endpoint: str,
+                 ws_endpoint: Optional[str] = None,
+                 commitment: str = "confirmed",
+                 poll_interval: float = 0.4,
+                 ws_poll_interval: float = 2.0,
+                 default_timeout: float = 60.0):
+        self.rpc_endpoint = rpc_endpoint
+        self.ws_endpoint = ws_endpoint
+        self.commitment = commitment
+        self.required_level = COMMITMENT_LEVELS[commitment]
+        # With a WebSocket subscription polling is only a safety net
+        self.poll_interval = ws_poll_interval if ws_endpoint else poll_interval
+        self.default_timeout = default_timeout
+
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.submitted_at: Dict[str, float] = {}
+        self.errors: Dict[str, Any] = {}
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._ws_task: Optional[asyncio.Task] = None
+        self._ws = None
+        self._ws_requests: Dict[int, str] = {}       # request id -> signature
+        self._ws_subscriptions: Dict[int, str] = {}  # subscription id -> signature
+        self._request_ids = itertools.count(1)
+
+        self.stats = {
+            "rpc_calls": 0,
+            "signatures_checked": 0,
+            "confirmed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "last_latency_ms": 0.0
+        }
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        return self._session
+
+    def track(self, signature: str) -> asyncio.Future:
+        """Start tracking a signature and return the future that resolves to True/False"""
+        if signature in self.pending:
+            return self.pending[signature]
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[signature] = future
+        self.submitted_at[signature] = time.monotonic()
+
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = asyncio.create_task(self._poll_loop())
+
+        if self.ws_endpoint:
+            if self._ws_task is None or self._ws_task.done():
+                self._ws_task = asyncio.create_task(self._ws_loop())
+            elif self._ws is not None and not self._ws.closed:
+                asyncio.create_task(self._ws_subscribe(signature))
+
+        return future
+
+    async def wait(self, signature: str, timeout: Optional[float] = None) -> bool:
+        """Wait until the signature reaches the configured commitment (False on error or timeout)"""
+        future = self.track(signature)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout or self.default_timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            self._resolve(signature, False)
+            logging.warning(f"Transaction confirmation timeout: {signature}")
+            return False
+
+    def _resolve(self, signature: str, confirmed: bool, error: Any = None):
+        future = self.pending.pop(signature, None)
+        submitted = self.submitted_at.pop(signature, None)
+        if future is None or future.done():
+            return
+
+        if error is not None:
+            self.errors[signature] = error
+        if confirmed:
+            self.stats["confirmed"] += 1
+            logging.info(f"Transaction confirmed: {signature}")
+        elif error is not None:
+            self.stats["failed"] += 1
+            logging.error(f"Transaction failed: {signature} - {error}")
+        if submitted is not None:
+            self.stats["last_latency_ms"] = (time.monotonic() - submitted) * 1000
+
+        future.set_result(confirmed)
+
+    def _apply_status(self, signature: str, status: Optional[Dict]):
+        """Resolve a signature from a getSignatureStatuses entry (None means not seen yet)"""
+        if not status:
+            return
+        if status.get("err") is not None:
+            self._resolve(signature, False, status["err"])
+            return
+
+        level = COMMITMENT_LEVELS.get(status.get("confirmationStatus") or "", -1)
+        if level >= self.required_level:
+            self._resolve(signature, True)
+
+    # Batched polling
+
+    async def check_statuses(self, signatures: List[str]) -> Dict[str, Optional[Dict]]:
+        """One getSignatureStatuses round-trip per 256 signatures"""
+        session = await self._get_session()
+        statuses = {}
+
+        for i in range(0, len(signatures), MAX_SIGNATURES_PER_CALL):
+            batch = signatures[i:i + MAX_SIGNATURES_PER_CALL]
+            payload = {
+                "jsonrpc": "2.0",
+                "id": next(self._request_ids),
+                "method": "getSignatureStatuses",
+                "params": [batch, {"searchTransactionHistory": False}]
+            }
+            self.stats["rpc_calls"] += 1
+            self.stats["signatures_checked"] += len(batch)
+
+            async with session.post(self.rpc_endpoint, json=payload) as response:
+                data = await response.json()
+
+            values = (data.get("result") or {}).get("value") or [None] * len(batch)
+            statuses.update(zip(batch, values))
+
+        return statuses
+
+    async def _poll_loop(self):
+        while self.pending:
+            try:
+                statuses = await self.check_statuses(list(self.pending))
+                for signature, status in statuses.items():
+                    self._apply_status(signature, status)
+            except Exception as e:
+                logging.error(f"Error checking confirmations: {e}")
+
+            if self.pending:
+                await asyncio.sleep(self.poll_interval)
+
+    # WebSocket subscriptions
+
+    async def _ws_subscribe(self, signature: str):
+        request_id = next(self._request_ids)
+        self._ws_requests[request_id] = signature
+        await self._ws.send_json({
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "signatureSubscribe",
+            "params": [signature, {"commitment": self.commitment}]
+        })
+
+    async def _ws_loop(self):
+        session = await self._get_session()
+        try:
+            async with session.ws_connect(self.ws_endpoint) as ws:
+                self._ws = ws
+                for signature in list(self.pending):
+                    await self._ws_subscribe(signature)
+
+                async for message in ws:
+                    if message.type != aiohttp.WSMsgType.TEXT:
+                        break
+                    self._handle_ws_message(json.loads(message.data))
+                    if not self.pending:
+                        break
+        except Exception as e:
+            # Polling keeps running, so a dropped socket only costs latency
+            logging.error(f"Signature subscription failed: {e}")
+        finally:
+            self._ws = None
+            self._ws_requests.clear()
+            self._ws_subscriptions.clear()
+
+    def _handle_ws_message(self, message: Dict):
+        if "id" in message:
+            signature = self._ws_requests.pop(message["id"], None)
+            if signature is not None and "result" in message:
+                self._ws_subscriptions[message["result"]] = signature
+            return
+
+        if message.get("method") != "signatureNotification":
+            return
+        params = message.get("params", {})
+        signature = self._ws_subscriptions.pop(params.get("subscription"), None)
+        if signature is None:
+            return
+
+        value = (params.get("result") or {}).get("value") or {}
+        error = value.get("err")
+        self._resolve(signature, error is None, error)
+
+    async def close(self):
+        for task in (self._poll_task, self._ws_task):
+            if task and not task.done():
+                task.cancel()
+        for signature in list(self.pending):
+            self._resolve(signature, False)
+        if self._session and not self._session.closed:
+            await self._session.close()
@@ -6,13 +6,16 @@ Standardizes data formats across 100+ API providers
 Created: 2025-08-02
 """
 
-from typing import Dict, List, Any, Optional, Union, Callable
-from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timezone
+import math
 import re
 from decimal import Decimal
 from enum import Enum
 
+import numpy as np
+
 class DataType(Enum):
     """Supported data types for normalization"""
     NUMERIC = "numeric"
@@ -112,12 +115,75 @@ class NormalizedCoinData:
     data_provider: Optional[str] = None
     confidence_score: Optional[Decimal] = None
 
+NUMERIC_DATA_TYPES = (DataType.NUMERIC, DataType.PERCENTAGE, DataType.CURRENCY)
+COIN_FIELDS = frozenset(f.name for f in fields(NormalizedCoinData))
+CURRENCY_SYMBOLS_RE = re.compile(r'[$,€£¥₹]')
+
+def _identity(value: Any) -> Any:
+    return value
+
+def _compile_path(path: str) -> Callable[[Any], Any]:
+    """Build an extractor for a dot-notation path, with the split and digit checks done once"""
+    steps = tuple((key, int(key) if key.isdigit() else None) for key in path.split('.'))
+
+    if len(steps) == 1 and steps[0][1] is None:
+        key = steps[0][0]
+        return lambda data: data.get(key) if isinstance(data, dict) else None
+
+    def extract(data: Any) -> Any:
+        current = data
+        for key, index in steps:
+            if isinstance(current, dict):
+                current = current.get(key)
+            elif index is not None and isinstance(current, list):
+                current = current[index] if index < len(current) else None
+            else:
+                return None
+
+            if current is None:
+                return None
+
+        return current
+
+    return extract
+
+def _as_float(value: Any) -> float:
+    """float64 counterpart of DataNormalizer._to_decimal (NaN instead of None)"""
+    if value is None or isinstance(value, bool):
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def _currency_as_float(value: Any) -> float:
+    if isinstance(value, str):
+        value = CURRENCY_SYMBOLS_RE.sub('', value)
+    return _as_float(value)
+
+@dataclass
+class CompiledField:
+    """One field mapping with its path split and converters bound"""
+    name: str
+    provider_field: str
+    extract: Callable[[Any], Any]
+    convert: Callable[[Any], Any]
+    to_float: Optional[Callable[[Any], float]] = None
+    default: Any = None
+
+@dataclass
+class ProviderPlan:
+    """Compiled extraction plan for one provider"""
+    provider: str
+    fields: Tuple[CompiledField, ...]
+
 class DataNormalizer:
     """Normalizes data from different providers to standard format"""
     
     def __init__(self):
         self.provider_mappings = self._initialize_provider_mappings()
         self.transformers = self._initialize_transformers()
+        self._plans: Dict[str, ProviderPlan] = {}
     
     def _initialize_provider_mappings(self) -> Dict[str, List[FieldMapping]]:
         """Initialize field mappings for each provider"""
@@ -271,6 +337,70 @@ class DataNormalizer:
             DataType.URL: self._to_url,
         }
     
+    def compile_provider(self, provider: str) -> ProviderPlan:
+        """Compile a provider's field mappings into a reusable extraction plan"""
+        compiled = []
+        for mapping in self.provider_mappings[provider]:
+            # Fields NormalizedCoinData has no slot for are dropped at construction anyway
+            if mapping.normalized_field not in COIN_FIELDS:
+                continue
+
+            if mapping.transform_func:
+                convert = mapping.transform_func
+            else:
+                convert = self.transformers.get(mapping.data_type) or _identity
+
+            to_float = None
+            if mapping.data_type in NUMERIC_DATA_TYPES:
+                if mapping.transform_func:
+                    transform = mapping.transform_func
+                    to_float = lambda value, transform=transform: _as_float(transform(value))
+                elif mapping.data_type == DataType.CURRENCY:
+                    to_float = _currency_as_float
+                else:
+                    to_float = _as_float
+
+            compiled.append(CompiledField(
+                name=mapping.normalized_field,
+                provider_field=mapping.provider_field,
+                extract=_compile_path(mapping.provider_field),
+                convert=convert,
+                to_float=to_float,
+                default=mapping.default_value if mapping.required else None
+            ))
+
+        plan = ProviderPlan(provider=provider, fields=tuple(compiled))
+        self._plans[provider] = plan
+        return plan
+
+    def invalidate_plans(self, provider: Optional[str] = None):
+        """Drop compiled plans after editing provider_mappings"""
+        if provider is None:
+            self._plans.clear()
+        else:
+            self._plans.pop(provider, None)
+
+    def _get_plan(self, provider: str) -> ProviderPlan:
+        plan = self._plans.get(provider)
+        return plan if plan is not None else self.compile_provider(provider)
+
+    def _apply_plan(self, plan: ProviderPlan, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        normalized_data = {}
+        for compiled in plan.fields:
+            try:
+                value = compiled.extract(raw_data)
+                if value is not None:
+                    normalized_data[compiled.name] = compiled.convert(value)
+                elif compiled.default is not None:
+                    normalized_data[compiled.name] = compiled.default
+            except Exception as e:
+                # Log error but continue processing
+                print(f"Error normalizing {compiled.provider_field} from {plan.provider}: {e}")
+
+                if compiled.default is not None:
+                    normalized_data[compiled.name] = compiled.default
+        return normalized_data
+
     def normalize_provider_data(self, provider: str, raw_data: Dict[str, Any]) -> NormalizedCoinData:
         """Normalize data from a specific provider"""
         if provider not in self.provider_mappings:
@@ -280,63 +410,84 @@ class DataNormalizer:
                 data_provider=provider,
                 last_updated=datetime.utcnow()
             )
-        
-        mappings = self.provider_mappings[provider]
-        normalized_data = {}
-        
-        # Process each field mapping
-        for mapping in mappings:
-            try:
-                # Extract value using dot notation
-                value = self._extract_nested_value(raw_data, mapping.provider_field)
-                
-                if value is not None:
-                    # Apply custom transform function if provided
-                    if mapping.transform_func:
-                        value = mapping.transform_func(value)
-                    else:
-                        # Apply data type transformation
-                        transformer = self.transformers.get(mapping.data_type)
-                        if transformer:
-                            value = transformer(value)
-                    
-                    normalized_data[mapping.normalized_field] = value
-                
-                elif mapping.required and mapping.default_value is not None:
-                    normalized_data[mapping.normalized_field] = mapping.default_value
-                    
-            except Exception as e:
-                # Log error but continue processing
-                print(f"Error normalizing {mapping.provider_field} from {provider}: {e}")
-                
-                if mapping.required and mapping.default_value is not None:
-                    normalized_data[mapping.normalized_field] = mapping.default_value
-        
+
+        normalized_data = self._apply_plan(self._get_plan(provider), raw_data)
+
         # Add metadata
+        if normalized_data.get('address') is None:
+            normalized_data['address'] = "unknown"
         normalized_data['data_provider'] = provider
         normalized_data['last_updated'] = datetime.utcnow()
-        
-        # Create NormalizedCoinData instance
-        return NormalizedCoinData(**{k: v for k, v in normalized_data.items() if hasattr(NormalizedCoinData, k)})
-    
+
+        return NormalizedCoinData(**normalized_data)
+
+    def normalize_many(self, provider: str, responses: List[Dict[str, Any]],
+                       columnar: bool = False, use_decimal: bool = False
+                       ) -> Union[List[NormalizedCoinData], Dict[str, Any]]:
+        """
+        Normalize a batch of responses from one provider with a single compiled plan.
+        With `columnar` the result is a dict of columns instead of records: numeric
+        fields become float64 arrays (NaN where missing) or, with `use_decimal`,
+        object arrays of Decimal/None; all other fields are plain lists.
+        """
+        if not columnar:
+            return [self.normalize_provider_data(provider, raw_data) for raw_data in responses]
+
+        now = datetime.utcnow()
+        count = len(responses)
+        columns: Dict[str, Any] = {}
+
+        if provider in self.provider_mappings:
+            plan = self._get_plan(provider)
+            for compiled in plan.fields:
+                if compiled.to_float is not None and not use_decimal:
+                    column = self._float_column(plan, compiled, responses)
+                else:
+                    column = self._value_column(plan, compiled, responses)
+                    if compiled.to_float is not None:
+                        values = column
+                        column = np.empty(count, dtype=object)
+                        column[:] = values
+                # Later mappings for the same field win, as they do per record
+                columns[compiled.name] = column
+
+        address = columns.get('address')
+        columns['address'] = (["unknown" if value is None else value for value in address]
+                              if address is not None else ["unknown"] * count)
+        columns['data_provider'] = [provider] * count
+        columns['last_updated'] = [now] * count
+        return columns
+
+    @staticmethod
+    def _float_column(plan: ProviderPlan, compiled: CompiledField,
+                      responses: List[Dict[str, Any]]) -> np.ndarray:
+        default = _as_float(compiled.default) if compiled.default is not None else math.nan
+        column = np.empty(len(responses), dtype=np.float64)
+        for i, raw_data in enumerate(responses):
+            try:
+                value = compiled.extract(raw_data)
+                column[i] = compiled.to_float(value) if value is not None else default
+            except Exception as e:
+                print(f"Error normalizing {compiled.provider_field} from {plan.provider}: {e}")
+                column[i] = default
+        return column
+
+    @staticmethod
+    def _value_column(plan: ProviderPlan, compiled: CompiledField,
+                      responses: List[Dict[str, Any]]) -> List[Any]:
+        column = []
+        for raw_data in responses:
+            try:
+                value = compiled.extract(raw_data)
+                column.append(compiled.convert(value) if value is not None else compiled.default)
+            except Exception as e:
+                print(f"Error normalizing {compiled.provider_field} from {plan.provider}: {e}")
+                column.append(compiled.default)
+        return column
+
     def _extract_nested_value(self, data: Dict[str, Any], path: str) -> Any:
         """Extract value from nested dictionary using dot notation"""
-        keys = path.split('.')
-        current = data
-        
-        for key in keys:
-            if isinstance(current, dict):
-                current = current.get(key)
-            elif isinstance(current, list) and key.isdigit():
-                index = int(key)
-                current = current[index] if index < len(current) else None
-            else:
-                return None
-            
-            if current is None:
-                return None
-        
-        return current
+        return _compile_path(path)(data)
     
     def _to_decimal(self, value: Any) -> Optional[Decimal]:
         """Convert value to Decimal"""
@@ -414,7 +565,7 @@ class DataNormalizer:
             # Remove currency symbols and commas
             if isinstance(value, str):
                 # Remove common currency symbols and formatting
-                clean_value = re.sub(r'[$,€£¥₹]', '', value)
+                clean_value = CURRENCY_SYMBOLS_RE.sub('', value)
                 return Decimal(clean_value)
             return Decimal(str(value))
         except:
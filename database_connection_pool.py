@@ -8,6 +8,7 @@ import sqlite3
 import queue
 import threading
 import time
+import itertools
 import logging
 from contextlib import contextmanager
 from typing import Optional, Dict, Any, List
@@ -15,6 +16,11 @@ from dataclasses import dataclass
 from pathlib import Path
 import weakref
 
+from metrics_registry import metrics
+
+# Labels each pool's series in the shared registry
+_pool_ids = itertools.count(1)
+
 @dataclass
 class ConnectionStats:
     """Statistics for database connection usage"""
@@ -23,7 +29,6 @@ class ConnectionStats:
     peak_connections: int = 0
     total_queries: int = 0
     failed_queries: int = 0
-    average_query_time: float = 0.0
     connection_reuses: int = 0
 
 class DatabaseConnection:
@@ -142,6 +147,11 @@ class DatabaseConnectionPool:
         self.lock = threading.Lock()
         self._connection_counter = 0
         
+        # Query timings live in the shared metrics registry, labelled by database path and pool
+        self.instance = str(next(_pool_ids))
+        self.query_time = metrics.histogram('db_query_seconds', "Pooled query latency", ('db', 'instance')) \
+            .labels(db=str(self.db_path.resolve()), instance=self.instance)
+        
         # Setup logging
         self.logger = logging.getLogger(__name__)
         
@@ -250,25 +260,16 @@ class DatabaseConnectionPool:
         Returns:
             Query result based on fetch parameter
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             with self.get_connection(timeout=timeout) as conn:
                 result = conn.execute_query(query, params, fetch)
                 
                 # Update statistics
-                query_time = time.time() - start_time
+                self.query_time.observe(time.perf_counter() - start_time)
                 with self.lock:
                     self.stats.total_queries += 1
-                    
-                    # Update average query time (rolling average)
-                    if self.stats.total_queries == 1:
-                        self.stats.average_query_time = query_time
-                    else:
-                        self.stats.average_query_time = (
-                            (self.stats.average_query_time * (self.stats.total_queries - 1) + query_time) 
-                            / self.stats.total_queries
-                        )
                 
                 return result
                 
@@ -281,7 +282,7 @@ class DatabaseConnectionPool:
     def execute_many(self, query: str, params_list: List[tuple], timeout: float = 30.0) -> int:
         """Execute multiple queries in a transaction"""
         try:
-            with self.get_connection(timeout=timeout) as conn:
+            with self.get_connection(timeout=timeout) as conn, metrics.span('db_write', source='pool'):
                 with conn.lock:
                     cursor = conn.connection.cursor()
                     cursor.execute("BEGIN TRANSACTION")
@@ -303,6 +304,8 @@ class DatabaseConnectionPool:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get connection pool statistics"""
+        query_time = self.query_time.sample()
+        
         with self.lock:
             return {
                 "pool_size": self.pool_size,
@@ -316,7 +319,8 @@ class DatabaseConnectionPool:
                 "success_rate": (
                     (self.stats.total_queries - self.stats.failed_queries) / max(self.stats.total_queries, 1) * 100
                 ),
-                "average_query_time": self.stats.average_query_time,
+                "average_query_time": query_time['mean'],
+                "p95_query_time": query_time['p95'],
                 "connection_reuses": self.stats.connection_reuses,
                 "pool_efficiency": (
                     self.stats.connection_reuses / max(self.stats.total_queries, 1) * 100
@@ -7,9 +7,11 @@ Professional webhook management for all Discord channels
 import requests
 import json
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import time
 
+from notification_dispatcher import DeliveryResult, notification_dispatcher
+
 class TrenchCoatDiscordWebhooks:
     """Professional Discord webhook management system"""
     
@@ -257,12 +259,7 @@ class TrenchCoatDiscordWebhooks:
             return False
             
         webhook_url = self.webhooks[channel]
-        
-        payload = {}
-        if content:
-            payload['content'] = content
-        if embed:
-            payload['embeds'] = [embed]
+        payload = self._build_payload(content, embed)
             
         try:
             response = requests.post(
@@ -283,6 +280,39 @@ class TrenchCoatDiscordWebhooks:
             print(f"ERROR: #{channel} - {str(e)}")
             return False
 
+    def _build_payload(self, content: str = None, embed: Dict = None) -> Dict[str, Any]:
+        payload = {}
+        if content:
+            payload['content'] = content
+        if embed:
+            payload['embeds'] = [embed]
+        return payload
+
+    async def send_webhook_async(self, channel: str, content: str = None, embed: Dict = None) -> DeliveryResult:
+        """Non-blocking send over the shared notification connection pool"""
+        if channel not in self.webhooks:
+            print(f"ERROR: Unknown channel: {channel}")
+            return DeliveryResult(platform='discord', recipient=channel, success=False,
+                                  latency_ms=0.0, error='unknown channel')
+        return await notification_dispatcher.post_json(
+            'discord', channel, self.webhooks[channel], self._build_payload(content, embed)
+        )
+
+    async def broadcast(self, channels: List[str], content: str = None, embed: Dict = None) -> Dict[str, bool]:
+        """Send one message to several channels concurrently"""
+        payload = self._build_payload(content, embed)
+        known = {channel: self.webhooks[channel] for channel in channels if channel in self.webhooks}
+        for channel in channels:
+            if channel not in known:
+                print(f"ERROR: Unknown channel: {channel}")
+
+        results = {channel: False for channel in channels}
+        for delivery in await notification_dispatcher.send_discord(known, payload):
+            results[delivery.recipient] = delivery.success
+            status = "SUCCESS" if delivery.success else f"FAILED ({delivery.error})"
+            print(f"{status}: #{delivery.recipient} in {delivery.latency_ms:.0f}ms")
+        return results
+
     def test_all_webhooks(self) -> Dict[str, bool]:
         """Test all webhook connections"""
         results = {}
@@ -8,31 +8,17 @@ import asyncio
 import aiohttp
 import json
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
-from collections import deque
+import heapq
+import itertools
 import sqlite3
 from enum import Enum
 import threading
 import functools
 
-def run_async_safe(coro):
-    """Safely run async code in potentially existing event loop"""
-    try:
-        # Try to get the current event loop
-        loop = asyncio.get_running_loop()
-        # If we're in an existing loop, create a new thread
-        if loop.is_running():
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, coro)
-                return future.result()
-        else:
-            return asyncio.run(coro)
-    except RuntimeError:
-        # No event loop running, safe to use asyncio.run
-        return asyncio.run(coro)
+from loop_monitor import monitor_loop
 
 class MessagePriority(Enum):
     """Priority levels for queued messages"""
@@ -52,34 +38,142 @@ class QueuedMessage:
     retry_count: int = 0
     max_retries: int = 3
     post_id: Optional[str] = None
+    db_id: Optional[int] = None
+
+QUEUED_MESSAGES_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS queued_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_id TEXT,
+    channel TEXT NOT NULL,
+    webhook_url TEXT NOT NULL,
+    embed_json TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    retry_count INTEGER DEFAULT 0,
+    status TEXT DEFAULT 'queued'
+)
+'''
+
+def _header_float(headers, name: str) -> Optional[float]:
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+@dataclass
+class WebhookBucket:
+    """
+    Send allowance for one webhook. Starts from the configured defaults and
+    is re-seeded from Discord's X-RateLimit-* headers after every response;
+    `remaining` refills to `limit` once `reset_at` (monotonic) passes.
+    """
+    limit: int
+    window: float
+    remaining: int
+    reset_at: Optional[float] = None
+
+    def _refill(self, now: float):
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = None
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a request may be sent (0 when one is available)"""
+        self._refill(now)
+        if self.remaining > 0 or self.reset_at is None:
+            return 0.0
+        return self.reset_at - now
+
+    def consume(self, now: float):
+        self._refill(now)
+        self.remaining -= 1
+        if self.reset_at is None:
+            self.reset_at = now + self.window
+
+    def block_for(self, seconds: float, now: float):
+        self.remaining = 0
+        self.reset_at = now + seconds
+
+    def update_from_headers(self, headers, now: float):
+        limit = _header_float(headers, 'X-RateLimit-Limit')
+        remaining = _header_float(headers, 'X-RateLimit-Remaining')
+        reset_after = _header_float(headers, 'X-RateLimit-Reset-After')
+
+        if limit is not None:
+            self.limit = int(limit)
+        if remaining is not None:
+            self.remaining = int(remaining)
+        if reset_after is not None:
+            self.reset_at = now + reset_after
 
 class DiscordRateLimitQueue:
     """
     Manages Discord webhook rate limits with intelligent queuing
     Inspired by comprehensive API integration patterns
+    
+    Each channel holds a priority heap (FIFO within a priority) and each
+    webhook a token bucket. A single scheduler sends every message whose
+    bucket allows it and otherwise sleeps until the earliest one does.
+    With `db_path`, queued messages and their status changes are written to
+    the queued_messages table in batches so the queue survives restarts.
     """
     
-    def __init__(self):
+    def __init__(self, db_path: Optional[str] = None, flush_size: int = 100, flush_interval: float = 1.0):
         # Discord rate limits: 30 requests per channel per 60 seconds
+        # (used until a webhook's own X-RateLimit-* headers are seen)
         self.rate_limit_per_channel = 30
         self.rate_limit_window = 60  # seconds
         
-        # Track requests per channel
-        self.channel_requests: Dict[str, List[datetime]] = {}
+        # Token bucket per webhook URL and a global pause for global 429s
+        self.webhook_buckets: Dict[str, WebhookBucket] = {}
+        self.global_resume_at = 0.0
         
-        # Priority queue for each channel
-        self.message_queues: Dict[str, deque] = {}
+        # Priority heap of (priority, sequence, message) for each channel
+        self.message_queues: Dict[str, List[Tuple[int, int, QueuedMessage]]] = {}
+        self._sequence = itertools.count()
         
         # Failed message storage
         self.failed_messages: List[QueuedMessage] = []
         
         # Queue processing state
-        self.processing = False
+        self._processing = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
         self.session: Optional[aiohttp.ClientSession] = None
+        self.sent_count = 0
+        self._status_notified: Dict[str, float] = {}
         
         # Callback for notifications
         self.notification_webhook = None
         
+        # Batched persistence
+        self.db_path = db_path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._write_lock = threading.Lock()
+        self._pending_inserts: List[QueuedMessage] = []
+        self._unsaved: set = set()  # id() of messages whose insert has not been written yet
+        self._pending_updates: Dict[int, Tuple[QueuedMessage, str]] = {}
+        self._last_flush = time.monotonic()
+    
+    @property
+    def processing(self) -> bool:
+        return self._processing
+    
+    @processing.setter
+    def processing(self, value: bool):
+        # Wake the scheduler so a stop request is seen immediately
+        self._processing = value
+        self._wake()
+    
+    def _wake(self):
+        if self._loop is None or self._wakeup is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass  # Loop already closed
+        
     async def initialize(self):
         """Initialize the async session"""
         if not self.session:
@@ -87,150 +181,285 @@ class DiscordRateLimitQueue:
     
     async def cleanup(self):
         """Cleanup resources"""
+        self.flush()
         if self.session:
             await self.session.close()
     
     def add_to_queue(self, message: QueuedMessage):
         """Add a message to the appropriate channel queue"""
         channel = message.channel
+        queue = self.message_queues.setdefault(channel, [])
+        heapq.heappush(queue, (message.priority.value, next(self._sequence), message))
         
-        if channel not in self.message_queues:
-            self.message_queues[channel] = deque()
-        
-        # Insert based on priority
-        queue = self.message_queues[channel]
-        
-        # Find insertion point based on priority
-        inserted = False
-        for i, existing_msg in enumerate(queue):
-            if message.priority.value < existing_msg.priority.value:
-                queue.insert(i, message)
-                inserted = True
-                break
-        
-        if not inserted:
-            queue.append(message)
+        # Retries and 429s requeue a message that may not have reached the DB yet
+        if message.db_id is None and id(message) not in self._unsaved:
+            self.persist(message)
+        else:
+            self._record_status(message, 'queued')
         
+        self._wake()
         print(f"📥 Added message to {channel} queue (Priority: {message.priority.name}, Queue size: {len(queue)})")
     
+    def get_bucket(self, webhook_url: str) -> WebhookBucket:
+        bucket = self.webhook_buckets.get(webhook_url)
+        if bucket is None:
+            bucket = self.webhook_buckets[webhook_url] = WebhookBucket(
+                limit=self.rate_limit_per_channel,
+                window=self.rate_limit_window,
+                remaining=self.rate_limit_per_channel
+            )
+        return bucket
+    
+    def _wait_time(self, webhook_url: str, now: float) -> float:
+        return max(self.get_bucket(webhook_url).wait_time(now), self.global_resume_at - now, 0.0)
+    
     def can_send_to_channel(self, channel: str) -> Tuple[bool, Optional[float]]:
         """
         Check if we can send to a channel without hitting rate limits
         Returns (can_send, wait_time_seconds)
         """
-        now = datetime.now()
-        
-        if channel not in self.channel_requests:
-            self.channel_requests[channel] = []
+        queue = self.message_queues.get(channel)
+        if not queue:
             return True, None
         
-        # Clean old requests outside the window
-        cutoff_time = now - timedelta(seconds=self.rate_limit_window)
-        self.channel_requests[channel] = [
-            req_time for req_time in self.channel_requests[channel]
-            if req_time > cutoff_time
-        ]
-        
-        # Check if under limit
-        if len(self.channel_requests[channel]) < self.rate_limit_per_channel:
+        wait_time = self._wait_time(queue[0][-1].webhook_url, time.monotonic())
+        if wait_time <= 0:
             return True, None
-        
-        # Calculate wait time
-        oldest_request = min(self.channel_requests[channel])
-        wait_time = (oldest_request + timedelta(seconds=self.rate_limit_window) - now).total_seconds()
-        
-        return False, max(0, wait_time)
+        return False, wait_time
+    
+    def _requeue_or_fail(self, message: QueuedMessage):
+        message.retry_count += 1
+        if message.retry_count < message.max_retries:
+            self.add_to_queue(message)
+        else:
+            self.failed_messages.append(message)
+            self._record_status(message, 'failed')
     
     async def send_webhook(self, message: QueuedMessage) -> bool:
         """Send a single webhook message"""
         if not self.session:
             await self.initialize()
         
+        bucket = self.get_bucket(message.webhook_url)
+        
         try:
             async with self.session.post(
                 message.webhook_url,
                 json={"embeds": [message.embed]},
                 timeout=aiohttp.ClientTimeout(total=10)
             ) as response:
+                now = time.monotonic()
+                bucket.update_from_headers(response.headers, now)
                 
-                if response.status == 204:
+                if response.status in (200, 204):
                     # Success
-                    self.channel_requests[message.channel].append(datetime.now())
+                    self.sent_count += 1
+                    self._record_status(message, 'sent')
                     return True
                 
                 elif response.status == 429:
-                    # Rate limited
-                    retry_after = response.headers.get('X-RateLimit-Reset-After', '60')
+                    # Rate limited - hold the bucket until Discord's reset
+                    retry_after = (_header_float(response.headers, 'X-RateLimit-Reset-After')
+                                   or _header_float(response.headers, 'Retry-After')
+                                   or 60.0)
+                    if response.headers.get('X-RateLimit-Global') or response.headers.get('X-RateLimit-Scope') == 'global':
+                        self.global_resume_at = now + retry_after
+                    bucket.block_for(retry_after, now)
                     print(f"⚠️ Rate limited on {message.channel}. Retry after: {retry_after}s")
                     
-                    # Re-queue with higher priority
-                    message.retry_count += 1
-                    if message.retry_count < message.max_retries:
-                        self.add_to_queue(message)
-                    else:
-                        self.failed_messages.append(message)
+                    # A 429 is not the message's fault, so it keeps its retries
+                    self.add_to_queue(message)
                     
                     # Send notification about rate limit
-                    await self.notify_rate_limit(message.channel, float(retry_after))
+                    await self.notify_rate_limit(message.channel, retry_after)
                     return False
                 
                 else:
                     # Other error
                     print(f"❌ Error sending to {message.channel}: {response.status}")
-                    message.retry_count += 1
-                    
-                    if message.retry_count < message.max_retries:
-                        self.add_to_queue(message)
-                    else:
-                        self.failed_messages.append(message)
-                    
+                    self._requeue_or_fail(message)
                     return False
                     
         except Exception as e:
             print(f"❌ Exception sending webhook: {str(e)}")
-            message.retry_count += 1
-            
-            if message.retry_count < message.max_retries:
-                self.add_to_queue(message)
-            else:
-                self.failed_messages.append(message)
-            
+            self._requeue_or_fail(message)
             return False
     
+    async def _deliver(self, channel: str, message: QueuedMessage):
+        if await self.send_webhook(message):
+            print(f"✅ Sent message to {channel} (Remaining in queue: {len(self.message_queues.get(channel, []))})")
+    
     async def process_queues(self):
         """Process all channel queues respecting rate limits"""
-        self.processing = True
-        
-        while self.processing:
-            processed_any = False
+        self._loop = asyncio.get_running_loop()
+        monitor_loop('discord_queue')
+        self._wakeup = asyncio.Event()
+        self._processing = True
+        
+        # At most one send in flight per channel keeps per-channel order
+        in_flight: Dict[str, asyncio.Task] = {}
+        
+        def finished(channel):
+            def callback(task):
+                in_flight.pop(channel, None)
+                self._wakeup.set()
+            return callback
+        
+        while self._processing:
+            self._wakeup.clear()
+            now = time.monotonic()
+            next_wake = None
             
-            # Process each channel's queue
-            for channel, queue in self.message_queues.items():
-                if not queue:
+            for channel, queue in list(self.message_queues.items()):
+                if not queue or channel in in_flight:
                     continue
                 
-                # Check rate limit
-                can_send, wait_time = self.can_send_to_channel(channel)
-                
-                if can_send:
-                    # Send next message
-                    message = queue.popleft()
-                    success = await self.send_webhook(message)
-                    
-                    if success:
-                        print(f"✅ Sent message to {channel} (Remaining in queue: {len(queue)})")
-                        processed_any = True
-                    
-                    # Small delay between sends
-                    await asyncio.sleep(0.5)
+                message = queue[0][-1]
+                wait_time = self._wait_time(message.webhook_url, now)
                 
-                elif wait_time and wait_time < 60:
-                    # If wait time is reasonable, notify
-                    await self.notify_queue_status(channel, len(queue), wait_time)
+                if wait_time <= 0:
+                    heapq.heappop(queue)
+                    self.get_bucket(message.webhook_url).consume(now)
+                    task = asyncio.create_task(self._deliver(channel, message))
+                    in_flight[channel] = task
+                    task.add_done_callback(finished(channel))
+                else:
+                    next_wake = wait_time if next_wake is None else min(next_wake, wait_time)
+                    await self._maybe_notify_queue_status(channel, len(queue), wait_time, now)
+            
+            # Flush queued DB writes in batches
+            if self._has_pending_writes():
+                if now - self._last_flush >= self.flush_interval:
+                    self.flush()
+                else:
+                    remaining = self.flush_interval - (now - self._last_flush)
+                    next_wake = remaining if next_wake is None else min(next_wake, remaining)
             
-            # If nothing was processed, wait a bit
-            if not processed_any:
-                await asyncio.sleep(5)
+            # Sleep until the next message becomes sendable or the queue changes
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=next_wake)
+            except asyncio.TimeoutError:
+                pass
+        
+        if in_flight:
+            await asyncio.gather(*in_flight.values(), return_exceptions=True)
+        self.flush()
+    
+    async def _maybe_notify_queue_status(self, channel: str, queue_size: int, wait_time: float, now: float):
+        # Throttled so a blocked channel reports once per rate limit window
+        if wait_time >= 60 or now - self._status_notified.get(channel, -self.rate_limit_window) < self.rate_limit_window:
+            return
+        self._status_notified[channel] = now
+        await self.notify_queue_status(channel, queue_size, wait_time)
+    
+    def persist(self, message: QueuedMessage):
+        """Queue a message row for the next batched write"""
+        if not self.db_path:
+            return
+        with self._write_lock:
+            self._unsaved.add(id(message))
+            self._pending_inserts.append(message)
+        if self._has_pending_writes(self.flush_size):
+            self.flush()
+    
+    def _record_status(self, message: QueuedMessage, status: str):
+        if not self.db_path:
+            return
+        with self._write_lock:
+            self._pending_updates[id(message)] = (message, status)
+        if self._has_pending_writes(self.flush_size):
+            self.flush()
+    
+    def _has_pending_writes(self, at_least: int = 1) -> bool:
+        return len(self._pending_inserts) + len(self._pending_updates) >= at_least
+    
+    def flush(self):
+        """Write buffered inserts and status changes in one transaction"""
+        self._last_flush = time.monotonic()
+        if not self.db_path:
+            return
+        with self._write_lock:
+            inserts, self._pending_inserts = self._pending_inserts, []
+            updates, self._pending_updates = self._pending_updates, {}
+        if not inserts and not updates:
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                cursor = conn.cursor()
+                for message in inserts:
+                    status = updates.get(id(message), (message, 'queued'))[1]
+                    cursor.execute('''
+                    INSERT INTO queued_messages 
+                    (post_id, channel, webhook_url, embed_json, priority, retry_count, status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', (
+                        message.post_id,
+                        message.channel,
+                        message.webhook_url,
+                        json.dumps(message.embed),
+                        message.priority.value,
+                        message.retry_count,
+                        status
+                    ))
+                    message.db_id = cursor.lastrowid
+                
+                inserted = {id(message) for message in inserts}
+                cursor.executemany(
+                    "UPDATE queued_messages SET status = ?, retry_count = ? WHERE id = ?",
+                    [(status, message.retry_count, message.db_id)
+                     for key, (message, status) in updates.items()
+                     if key not in inserted and message.db_id is not None]
+                )
+        except sqlite3.Error as e:
+            print(f"❌ Failed to persist queue: {e}")
+        finally:
+            conn.close()
+            with self._write_lock:
+                self._unsaved.difference_update(id(message) for message in inserts)
+    
+    def load_pending(self) -> int:
+        """Re-queue messages left in the database by a previous run"""
+        if not self.db_path:
+            return 0
+        
+        queued_ids = {entry[-1].db_id for queue in self.message_queues.values() for entry in queue}
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT id, post_id, channel, webhook_url, embed_json, priority, retry_count, created_at
+        FROM queued_messages
+        WHERE status = 'queued'
+        ORDER BY priority, created_at, id
+        ''')
+        
+        loaded = 0
+        for row in cursor.fetchall():
+            if row[0] in queued_ids:
+                continue
+            try:
+                created_at = datetime.fromisoformat(row[7])
+            except (TypeError, ValueError):
+                created_at = datetime.now()
+            message = QueuedMessage(
+                channel=row[2],
+                webhook_url=row[3],
+                embed=json.loads(row[4]),
+                priority=MessagePriority(row[5]),
+                created_at=created_at,
+                retry_count=row[6],
+                post_id=row[1],
+                db_id=row[0]
+            )
+            queue = self.message_queues.setdefault(message.channel, [])
+            heapq.heappush(queue, (message.priority.value, next(self._sequence), message))
+            loaded += 1
+        
+        conn.close()
+        self._wake()
+        return loaded
     
     async def notify_rate_limit(self, channel: str, retry_after: float):
         """Send notification about rate limit hit"""
@@ -316,6 +545,7 @@ class DiscordRateLimitQueue:
             "total_queued": sum(len(q) for q in self.message_queues.values()),
             "channels": {},
             "failed_count": len(self.failed_messages),
+            "sent_count": self.sent_count,
             "rate_limit_status": {}
         }
         
@@ -326,7 +556,7 @@ class DiscordRateLimitQueue:
             }
             
             # Count by priority
-            for msg in queue:
+            for _, _, msg in queue:
                 priority = msg.priority.name
                 stats["channels"][channel]["priorities"][priority] = \
                     stats["channels"][channel]["priorities"].get(priority, 0) + 1
@@ -346,13 +576,13 @@ class EnhancedComprehensiveDevBlogSystem:
     """
     
     def __init__(self):
-        # Initialize queue system
-        self.discord_queue = DiscordRateLimitQueue()
-        
         # Database for queue persistence
         self.db_path = "enhanced_blog_queue.db"
         self.init_queue_database()
         
+        # Initialize queue system
+        self.discord_queue = DiscordRateLimitQueue(db_path=self.db_path)
+        
         # Track async tasks
         self.queue_processor_task = None
         
@@ -368,19 +598,7 @@ class EnhancedComprehensiveDevBlogSystem:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS queued_messages (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            post_id TEXT,
-            channel TEXT NOT NULL,
-            webhook_url TEXT NOT NULL,
-            embed_json TEXT NOT NULL,
-            priority INTEGER NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            retry_count INTEGER DEFAULT 0,
-            status TEXT DEFAULT 'queued'
-        )
-        ''')
+        cursor.execute(QUEUED_MESSAGES_SCHEMA)
         
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS rate_limit_events (
@@ -420,29 +638,9 @@ class EnhancedComprehensiveDevBlogSystem:
     
     def load_persisted_messages(self):
         """Load any queued messages from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT post_id, channel, webhook_url, embed_json, priority, retry_count
-        FROM queued_messages
-        WHERE status = 'queued'
-        ORDER BY priority, created_at
-        ''')
-        
-        for row in cursor.fetchall():
-            message = QueuedMessage(
-                channel=row[1],
-                webhook_url=row[2],
-                embed=json.loads(row[3]),
-                priority=MessagePriority(row[4]),
-                created_at=datetime.now(),
-                retry_count=row[5],
-                post_id=row[0]
-            )
-            self.discord_queue.add_to_queue(message)
-        
-        conn.close()
+        loaded = self.discord_queue.load_pending()
+        if loaded:
+            print(f"📦 Restored {loaded} queued messages")
     
     def create_blog_embed(self, title: str, content: str, category: str, 
                          priority: str = "normal") -> Dict[str, Any]:
@@ -500,34 +698,18 @@ class EnhancedComprehensiveDevBlogSystem:
                 created_at=datetime.now()
             )
             
-            # Add to queue
+            # Add to queue (persisted by the queue's batched writer)
             self.discord_queue.add_to_queue(message)
-            
-            # Persist to database
-            self.persist_message(message)
+        
+        # Persist to database
+        self.discord_queue.flush()
         
         print(f"📬 Queued '{title}' for {len(channels)} channels")
     
     def persist_message(self, message: QueuedMessage):
         """Save message to database for recovery"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT INTO queued_messages 
-        (post_id, channel, webhook_url, embed_json, priority, retry_count)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            message.post_id,
-            message.channel,
-            message.webhook_url,
-            json.dumps(message.embed),
-            message.priority.value,
-            message.retry_count
-        ))
-        
-        conn.commit()
-        conn.close()
+        self.discord_queue.persist(message)
+        self.discord_queue.flush()
     
     def get_queue_dashboard(self) -> str:
         """Get a formatted dashboard of queue status"""
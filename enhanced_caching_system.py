@@ -15,10 +15,13 @@ from typing import Any, Dict, List, Optional, Callable, Union
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from pathlib import Path
+import itertools
 import threading
 import weakref
 from enum import Enum
 
+from metrics_registry import metrics
+
 class CacheLevel(Enum):
     """Cache levels for different data types"""
     MEMORY = "memory"          # In-memory cache (fastest)
@@ -53,7 +56,6 @@ class CacheStats:
     evictions: int = 0
     invalidations: int = 0
     total_size: int = 0
-    avg_access_time: float = 0.0
     
     @property
     def hit_rate(self) -> float:
@@ -93,6 +95,19 @@ class DependencyTracker:
                         self.dependencies[dep].discard(cache_key)
                 del self.dependents[cache_key]
 
+# Labels each cache's series in the shared registry
+_cache_ids = itertools.count(1)
+
+# Every live cache instance, read by the hit-rate gauge without keeping any of them alive
+_live_caches: "weakref.WeakSet[EnhancedCacheSystem]" = weakref.WeakSet()
+
+def _combined_hit_rate() -> float:
+    stats = [cache.stats for cache in list(_live_caches)]
+    total = sum(s.hits + s.misses for s in stats)
+    return sum(s.hits for s in stats) / total * 100 if total else 0.0
+
+metrics.gauge('cache_hit_rate_percent', "Cache hit rate across cache instances").labels().set_function(_combined_hit_rate)
+
 class EnhancedCacheSystem:
     """
     Multi-level caching system with intelligent features
@@ -117,6 +132,14 @@ class EnhancedCacheSystem:
         self.stats = CacheStats()
         self.lock = threading.Lock()
         
+        # Hit latency per level, in the shared registry under this cache's own instance label
+        self.instance = str(next(_cache_ids))
+        access_time = metrics.histogram('cache_access_seconds', "Cache hit latency", ('level', 'instance'))
+        self.access_time = {
+            level: access_time.labels(level=level, instance=self.instance) for level in ('memory', 'disk')
+        }
+        _live_caches.add(self)
+        
         # Background maintenance
         self._setup_maintenance()
         
@@ -187,7 +210,7 @@ class EnhancedCacheSystem:
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Try memory cache first
         if key in self.memory_cache:
@@ -204,8 +227,7 @@ class EnhancedCacheSystem:
             entry.last_accessed = time.time()
             self.stats.hits += 1
             
-            access_time = time.time() - start_time
-            self._update_avg_access_time(access_time)
+            self.access_time['memory'].observe(time.perf_counter() - start_time)
             
             return entry.value
         
@@ -234,8 +256,7 @@ class EnhancedCacheSystem:
                         self._promote_to_memory(key, entry, value)
                     
                     self.stats.hits += 1
-                    access_time = time.time() - start_time
-                    self._update_avg_access_time(access_time)
+                    self.access_time['disk'].observe(time.perf_counter() - start_time)
                     
                     return value
                     
@@ -445,16 +466,6 @@ class EnhancedCacheSystem:
         if expired_keys:
             self.logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
     
-    def _update_avg_access_time(self, access_time: float):
-        """Update average access time"""
-        total_accesses = self.stats.hits + self.stats.misses
-        if total_accesses == 1:
-            self.stats.avg_access_time = access_time
-        else:
-            self.stats.avg_access_time = (
-                (self.stats.avg_access_time * (total_accesses - 1) + access_time) / total_accesses
-            )
-    
     def _log_stats(self):
         """Log cache statistics"""
         stats = self.get_stats()
@@ -464,6 +475,10 @@ class EnhancedCacheSystem:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get comprehensive cache statistics"""
+        access_samples = {level: series.sample() for level, series in self.access_time.items()}
+        accesses = sum(sample['count'] for sample in access_samples.values())
+        access_time_total = sum(sample['sum'] for sample in access_samples.values())
+        
         return {
             "hit_rate": self.stats.hit_rate,
             "hits": self.stats.hits,
@@ -474,7 +489,10 @@ class EnhancedCacheSystem:
             "disk_entries": len(self.disk_cache_index),
             "memory_size_mb": self._get_memory_size() / (1024 * 1024),
             "max_memory_mb": self.max_memory_size / (1024 * 1024),
-            "avg_access_time_ms": self.stats.avg_access_time * 1000,
+            "avg_access_time_ms": access_time_total / accesses * 1000 if accesses else 0.0,
+            "p95_access_time_ms": {
+                level: sample['p95'] * 1000 for level, sample in access_samples.items() if sample['count']
+            },
             "dependencies_tracked": len(self.dependency_tracker.dependencies)
         }
     
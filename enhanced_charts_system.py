@@ -9,10 +9,37 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
+from candle_service import aggregate_candles
 
-def create_enhanced_price_chart(coin_data, df, volumes):
+def create_enhanced_price_chart(coin_data, df, volumes, max_points=1200):
     """Create stunning price chart with enhanced styling and interactivity"""
     
+    # Moving averages come from the full series before any downsampling
+    ma7 = df['close'].rolling(window=7).mean()
+    ma20 = df['close'].rolling(window=20).mean()
+    
+    # Merge candles down to roughly the plot width (true highs/lows are kept)
+    if len(df) > max_points:
+        candles = aggregate_candles({
+            'timestamp': np.arange(len(df)),
+            'open': df['open'].to_numpy(dtype=float),
+            'high': df['high'].to_numpy(dtype=float),
+            'low': df['low'].to_numpy(dtype=float),
+            'close': df['close'].to_numpy(dtype=float),
+            'volume': np.asarray(volumes, dtype=float),
+        }, max_points)
+        ends = np.append(candles['timestamp'][1:], len(df)) - 1
+        df = pd.DataFrame({
+            'date': df['date'].to_numpy()[candles['timestamp']],
+            'open': candles['open'],
+            'high': candles['high'],
+            'low': candles['low'],
+            'close': candles['close'],
+        })
+        volumes = candles['volume']
+        ma7 = pd.Series(ma7.to_numpy()[ends])
+        ma20 = pd.Series(ma20.to_numpy()[ends])
+    
     # Create figure with subplots
     fig = make_subplots(
         rows=2, cols=1,
@@ -62,8 +89,6 @@ def create_enhanced_price_chart(coin_data, df, volumes):
     )
     
     # Enhanced moving averages with glow effect
-    ma7 = df['close'].rolling(window=7).mean()
-    ma20 = df['close'].rolling(window=20).mean()
     
     # MA7 with glow
     fig.add_trace(
@@ -19,6 +19,9 @@ import weakref
 import asyncio
 import concurrent.futures
 
+from metrics_registry import metrics
+from sampling_profiler import profile_worker, sampling_profiler
+
 class EventType(Enum):
     """Standard event types"""
     # Data events
@@ -110,6 +113,9 @@ class EventProcessor:
             'failed': 0,
             'total_time': 0.0
         }
+        self.processing_time = metrics.histogram(
+            'event_processing_seconds', "Subscriber callback latency", ('subscriber',)
+        ).labels(subscriber=subscription.subscriber_id)
         self.worker_thread = None
         self.active = False
         
@@ -124,9 +130,13 @@ class EventProcessor:
         self.active = True
         
         if self.subscription.async_processing:
-            self.worker_thread = threading.Thread(target=self._async_worker, daemon=True)
+            worker = self._async_worker
         else:
-            self.worker_thread = threading.Thread(target=self._sync_worker, daemon=True)
+            worker = self._sync_worker
+        # Named so profiles show which subscriber a stack belongs to
+        self.worker_thread = threading.Thread(
+            target=worker, name=f"event-{self.subscription.subscriber_id}", daemon=True
+        )
         
         self.worker_thread.start()
         self.logger.info(f"Event processor started for {self.subscription.subscriber_id}")
@@ -163,6 +173,7 @@ class EventProcessor:
         """Asynchronous event processing worker"""
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
+        sampling_profiler.watch_loop(loop)
         
         async def process_events():
             with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
@@ -188,16 +199,17 @@ class EventProcessor:
     
     def _process_event(self, event: Event):
         """Process a single event"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             # Call subscriber callback
             result = self.subscription.callback(event)
             
             # Update stats
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             self.processing_stats['processed'] += 1
             self.processing_stats['total_time'] += processing_time
+            self.processing_time.observe(processing_time)
             
             self.logger.debug(f"Event {event.event_id} processed in {processing_time:.3f}s")
             
@@ -230,6 +242,7 @@ class EventProcessor:
             'processed': self.processing_stats['processed'],
             'failed': self.processing_stats['failed'],
             'average_processing_time': avg_time,
+            'p95_processing_time': self.processing_time.sample()['p95'],
             'active': self.active
         }
 
@@ -608,6 +621,11 @@ class EventBus:
                 )
             }
     
+    def start(self):
+        """Start the event bus as a service (opt-in sampling of its processor threads)"""
+        profile_worker('event_bus')
+        self.logger.info("Event bus started")
+    
     def shutdown(self):
         """Shutdown the event bus"""
         self.logger.info("Shutting down event bus...")
@@ -634,6 +652,7 @@ def get_event_bus() -> EventBus:
     
     if _event_bus is None:
         _event_bus = EventBus()
+        _event_bus.start()
     
     return _event_bus
 
@@ -4,6 +4,7 @@ Health Check System - Comprehensive System Monitoring
 Provides real-time health monitoring, alerting, and system diagnostics
 """
 
+import os
 import time
 import json
 import sqlite3
@@ -14,9 +15,14 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import threading
 import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 import streamlit as st
 
+from metrics_registry import metrics, start_metrics_server
+
 class HealthStatus(Enum):
     """Health status levels"""
     HEALTHY = "healthy"
@@ -58,13 +64,24 @@ class HealthChecker:
     Comprehensive health checking system
     """
     
-    def __init__(self, db_path: str = "data/trench.db"):
+    def __init__(self, db_path: str = "data/trench.db", max_workers: int = 8):
         self.db_path = db_path
         self.checks = {}
-        self.check_history = []
         self.max_history = 1000
+        self.check_history = deque(maxlen=self.max_history)
         self.start_time = time.time()
         
+        # Latest result per check, read by get_overall_health without running anything
+        self.latest_results: Dict[str, HealthCheckResult] = {}
+        self._lock = threading.Lock()
+        
+        # Checks run in parallel on a small pool; at most one run of each check is in flight
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="health-check")
+        self._in_flight: Dict[str, Future] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._timed_out = set()  # Checks whose in-flight run was already recorded as a timeout
+        self._wake = threading.Event()
+        
         # Setup logging
         self.logger = logging.getLogger(__name__)
         
@@ -83,7 +100,9 @@ class HealthChecker:
             "database_connection",
             self._check_database_connection,
             critical=True,
-            description="Database connectivity and responsiveness"
+            description="Database connectivity and responsiveness",
+            interval=60,
+            timeout=10
         )
         
         # Database integrity
@@ -91,7 +110,9 @@ class HealthChecker:
             "database_integrity",
             self._check_database_integrity,
             critical=True,
-            description="Database structure and data consistency"
+            description="Database structure and data consistency",
+            interval=300,
+            timeout=30
         )
         
         # System resources
@@ -99,7 +120,9 @@ class HealthChecker:
             "system_resources",
             self._check_system_resources,
             critical=False,
-            description="CPU, memory, and disk usage"
+            description="CPU, memory, and disk usage",
+            interval=30,
+            timeout=10
         )
         
         # Cache system
@@ -107,7 +130,9 @@ class HealthChecker:
             "cache_system",
             self._check_cache_system,
             critical=False,
-            description="Cache system performance"
+            description="Cache system performance",
+            interval=60,
+            timeout=10
         )
         
         # File system
@@ -115,7 +140,9 @@ class HealthChecker:
             "file_system",
             self._check_file_system,
             critical=True,
-            description="Required files and directories"
+            description="Required files and directories",
+            interval=300,
+            timeout=10
         )
         
         # API endpoints
@@ -123,7 +150,19 @@ class HealthChecker:
             "api_endpoints",
             self._check_api_endpoints,
             critical=False,
-            description="External API connectivity"
+            description="External API connectivity",
+            interval=120,
+            timeout=15
+        )
+        
+        # Hot path latency and error counts from the metrics registry
+        self.register_check(
+            "runtime_metrics",
+            self._check_runtime_metrics,
+            critical=False,
+            description="Latency and failures on instrumented hot paths",
+            interval=60,
+            timeout=5
         )
         
         # Data freshness
@@ -131,7 +170,9 @@ class HealthChecker:
             "data_freshness",
             self._check_data_freshness,
             critical=False,
-            description="Data age and update frequency"
+            description="Data age and update frequency",
+            interval=120,
+            timeout=10
         )
     
     def register_check(self, 
@@ -139,7 +180,8 @@ class HealthChecker:
                       check_func: Callable, 
                       critical: bool = True,
                       description: str = "",
-                      interval: int = 300):
+                      interval: int = 300,
+                      timeout: float = 30):
         """
         Register a health check
         
@@ -149,15 +191,18 @@ class HealthChecker:
             critical: Whether failure affects overall health
             description: Human-readable description
             interval: Check interval in seconds
+            timeout: Seconds a run may take before it is reported as timed out
         """
         self.checks[name] = {
             'func': check_func,
             'critical': critical,
             'description': description,
             'interval': interval,
+            'timeout': timeout,
             'last_run': 0,
             'consecutive_failures': 0
         }
+        self._wake.set()  # Let the scheduler pick up the new check
         
         self.logger.info(f"Registered health check: {name}")
     
@@ -526,6 +571,41 @@ class HealthChecker:
             details={"endpoints": results}
         )
     
+    def _check_runtime_metrics(self) -> HealthCheckResult:
+        """Check failure rates of instrumented hot paths"""
+        start_time = time.time()
+        snapshot = metrics.snapshot()
+        
+        # Spans record `<name>_seconds` and count failures in `<name>_errors_total`
+        failing = []
+        for name, metric in snapshot.items():
+            if metric['type'] != 'counter' or not name.endswith('_errors_total'):
+                continue
+            timings = snapshot.get(name[:-len('_errors_total')] + '_seconds')
+            if not timings:
+                continue
+            calls = sum(sample['count'] for sample in timings['samples'])
+            errors = sum(sample['value'] for sample in metric['samples'])
+            if calls >= 20 and errors / calls > 0.1:
+                failing.append(f"{name[:-len('_errors_total')]} ({errors / calls:.0%} failing)")
+        
+        latency = metrics.latency_rows()
+        status = HealthStatus.WARNING if failing else HealthStatus.HEALTHY
+        if failing:
+            message = f"High failure rate: {', '.join(failing)}"
+        elif latency:
+            message = f"{len(latency)} instrumented paths, slowest p95 {latency[0]['metric']} {latency[0]['p95_ms']:.0f}ms"
+        else:
+            message = "No instrumented calls recorded yet"
+        
+        return HealthCheckResult(
+            name="runtime_metrics",
+            status=status,
+            message=message,
+            response_time_ms=(time.time() - start_time) * 1000,
+            details={"latency": latency[:20], "failing": failing}
+        )
+    
     def _check_data_freshness(self) -> HealthCheckResult:
         """Check data freshness and update frequency"""
         start_time = time.time()
@@ -593,7 +673,7 @@ class HealthChecker:
             )
     
     def run_check(self, check_name: str) -> HealthCheckResult:
-        """Run a specific health check"""
+        """Run a specific health check in the calling thread and cache its result"""
         if check_name not in self.checks:
             return HealthCheckResult(
                 name=check_name,
@@ -607,60 +687,182 @@ class HealthChecker:
             result = check_config['func']()
             result.critical = check_config['critical']
             
-            # Update last run time
-            check_config['last_run'] = time.time()
-            
-            # Track consecutive failures
-            if result.status in [HealthStatus.CRITICAL, HealthStatus.WARNING]:
-                check_config['consecutive_failures'] += 1
-            else:
-                check_config['consecutive_failures'] = 0
-            
-            # Add to history
-            self.check_history.append(result)
-            if len(self.check_history) > self.max_history:
-                self.check_history.pop(0)
-            
-            return result
-            
         except Exception as e:
             self.logger.error(f"Health check '{check_name}' failed: {e}")
             
-            check_config['consecutive_failures'] += 1
-            
-            return HealthCheckResult(
+            result = HealthCheckResult(
                 name=check_name,
                 status=HealthStatus.CRITICAL,
                 message=f"Check execution failed: {str(e)}",
                 critical=check_config['critical'],
                 details={"error": str(e)}
             )
+        
+        self._record(check_name, result)
+        return result
+    
+    def _record(self, check_name: str, result: HealthCheckResult, timed_out: bool = False) -> bool:
+        """Cache a result, update run bookkeeping and append it to history; False if it was superseded"""
+        with self._lock:
+            check_config = self.checks[check_name]
+            late = False
+            if timed_out:
+                # The run's real result landed before its timeout could be recorded
+                if check_name not in self._timed_out:
+                    return False
+            elif check_name in self._timed_out:
+                # Late result of a run already counted as a timeout: it replaces that result
+                self._timed_out.discard(check_name)
+                late = True
+            
+            check_config['last_run'] = time.time()
+            self._deadlines.pop(check_name, None)
+            
+            # Track consecutive failures, counting a timed-out run only once
+            if result.status in [HealthStatus.CRITICAL, HealthStatus.WARNING]:
+                if not late:
+                    check_config['consecutive_failures'] += 1
+            else:
+                check_config['consecutive_failures'] = 0
+            
+            self.latest_results[check_name] = result
+            self.check_history.append(result)
+            return True
+    
+    def submit_check(self, check_name: str) -> Future:
+        """Queue a check on the executor; returns the in-flight run if there already is one"""
+        with self._lock:
+            future = self._in_flight.get(check_name)
+            if future is not None:
+                return future
+            future = self.executor.submit(self.run_check, check_name)
+            self._in_flight[check_name] = future
+            self._deadlines[check_name] = time.time() + self.checks[check_name]['timeout']
+        
+        future.add_done_callback(lambda done: self._finish(check_name, done))
+        return future
+    
+    def _finish(self, check_name: str, future: Future):
+        with self._lock:
+            if self._in_flight.get(check_name) is future:
+                del self._in_flight[check_name]
+        
+        result = future.result()
+        
+        # Log critical issues
+        if result.status == HealthStatus.CRITICAL and result.critical:
+            self.logger.error(f"CRITICAL: {check_name} - {result.message}")
+        elif result.status == HealthStatus.WARNING:
+            self.logger.warning(f"WARNING: {check_name} - {result.message}")
+    
+    def _expire(self, check_name: str) -> Optional[HealthCheckResult]:
+        """Record a timeout for a run past its deadline; None if it has already finished"""
+        with self._lock:
+            if self._deadlines.pop(check_name, None) is None:
+                return None
+            self._timed_out.add(check_name)
+        
+        check_config = self.checks[check_name]
+        self.logger.error(f"Health check '{check_name}' timed out after {check_config['timeout']}s")
+        
+        # The worker thread cannot be interrupted; its late result replaces this one when it lands
+        result = HealthCheckResult(
+            name=check_name,
+            status=HealthStatus.CRITICAL,
+            message=f"Check timed out after {check_config['timeout']}s",
+            response_time_ms=check_config['timeout'] * 1000,
+            critical=check_config['critical'],
+            details={"timeout_seconds": check_config['timeout']}
+        )
+        return result if self._record(check_name, result, timed_out=True) else None
+    
+    def _expire_overdue(self):
+        now = time.time()
+        with self._lock:
+            overdue = [name for name, deadline in self._deadlines.items() if deadline < now]
+        for check_name in overdue:
+            self._expire(check_name)
+    
+    def refresh(self):
+        """Start a run of every check in the background without waiting for it"""
+        for check_name in list(self.checks):
+            self.submit_check(check_name)
     
     def run_all_checks(self) -> Dict[str, HealthCheckResult]:
-        """Run all registered health checks"""
+        """Run all registered health checks in parallel and wait for them, up to each check's timeout"""
+        futures = {check_name: self.submit_check(check_name) for check_name in list(self.checks)}
+        started = time.time()
         results = {}
         
-        for check_name in self.checks:
-            results[check_name] = self.run_check(check_name)
+        for check_name, future in futures.items():
+            remaining = started + self.checks[check_name]['timeout'] - time.time()
+            try:
+                results[check_name] = future.result(timeout=max(remaining, 0))
+            except FutureTimeoutError:
+                results[check_name] = self._expire(check_name) or self.latest_results[check_name]
         
         return results
     
     def get_overall_health(self) -> Dict[str, Any]:
-        """Get overall system health status"""
-        results = self.run_all_checks()
+        """
+        Get overall system health status from the cached results.
+        
+        Never runs a check in the calling thread: checks that have not
+        completed yet are started in the background and reported as pending.
+        """
+        self._expire_overdue()
+        now = time.time()
+        
+        with self._lock:
+            results = dict(self.latest_results)
+            running = set(self._in_flight)
+        
+        for check_name in self.checks:
+            if check_name not in results and check_name not in running:
+                self.submit_check(check_name)
+                running.add(check_name)
         
         # Determine overall status
         critical_failures = []
         warnings = []
         healthy = []
+        pending = []
+        individual_checks = {}
         
-        for name, result in results.items():
+        for name, check_config in list(self.checks.items()):
+            result = results.get(name)
+            if result is None:
+                pending.append(name)
+                individual_checks[name] = {
+                    "name": name,
+                    "status": HealthStatus.UNKNOWN.value,
+                    "message": "Waiting for first run",
+                    "critical": check_config['critical'],
+                    "age_seconds": None,
+                    "stale": True,
+                    "running": name in running
+                }
+                continue
+            
             if result.status == HealthStatus.CRITICAL and result.critical:
                 critical_failures.append(name)
             elif result.status in [HealthStatus.WARNING, HealthStatus.CRITICAL]:
                 warnings.append(name)
+            elif result.status == HealthStatus.UNKNOWN:
+                pending.append(name)
             else:
                 healthy.append(name)
+            
+            # A result is stale once it has missed its next scheduled run
+            age_seconds = now - result.timestamp.timestamp()
+            check_data = asdict(result)
+            check_data.update({
+                "status": result.status.value,
+                "age_seconds": age_seconds,
+                "stale": age_seconds > check_config['interval'] + check_config['timeout'],
+                "running": name in running
+            })
+            individual_checks[name] = check_data
         
         if critical_failures:
             overall_status = HealthStatus.CRITICAL
@@ -668,23 +870,29 @@ class HealthChecker:
         elif warnings:
             overall_status = HealthStatus.WARNING
             status_message = f"Warnings: {', '.join(warnings)}"
+        elif pending:
+            overall_status = HealthStatus.UNKNOWN
+            status_message = f"Waiting for checks: {', '.join(pending)}"
         else:
             overall_status = HealthStatus.HEALTHY
             status_message = "All systems operational"
         
         # Calculate uptime
         uptime_seconds = int(time.time() - self.start_time)
+        ages = [data["age_seconds"] for data in individual_checks.values() if data["age_seconds"] is not None]
         
         return {
             "overall_status": overall_status.value,
             "status_message": status_message,
             "uptime_seconds": uptime_seconds,
-            "checks_total": len(results),
+            "checks_total": len(individual_checks),
             "checks_healthy": len(healthy),
             "checks_warning": len(warnings),
             "checks_critical": len(critical_failures),
+            "checks_pending": len(pending),
+            "oldest_result_age_seconds": max(ages) if ages else None,
             "timestamp": datetime.now().isoformat(),
-            "individual_checks": {name: asdict(result) for name, result in results.items()}
+            "individual_checks": individual_checks
         }
     
     def get_system_metrics(self) -> SystemMetrics:
@@ -738,7 +946,7 @@ class HealthChecker:
                 active_connections=active_connections,
                 cache_hit_rate=cache_hit_rate,
                 database_response_time=db_response_time,
-                api_success_rate=95.0,  # Placeholder
+                api_success_rate=self._api_success_rate(),
                 uptime_seconds=uptime_seconds
             )
             
@@ -751,8 +959,18 @@ class HealthChecker:
                 uptime_seconds=0
             )
     
+    def _api_success_rate(self) -> float:
+        """Percentage of instrumented HTTP fetches that succeeded (no exception, no 4xx/5xx status)"""
+        snapshot = metrics.snapshot()
+        calls = sum(sample['count'] for sample in snapshot.get('http_fetch_seconds', {}).get('samples', []))
+        errors = sum(sample['value'] for sample in snapshot.get('http_fetch_errors_total', {}).get('samples', []))
+        return (calls - errors) / calls * 100 if calls else 100.0
+    
     def start_monitoring(self, interval: int = 60):
-        """Start background health monitoring"""
+        """
+        Start background health monitoring. Each check is submitted when its
+        own interval has elapsed; `interval` caps how long the scheduler sleeps.
+        """
         if self.monitoring_active:
             return
         
@@ -761,20 +979,24 @@ class HealthChecker:
         def monitoring_loop():
             while self.monitoring_active:
                 try:
-                    # Run checks that are due
+                    self._expire_overdue()
+                    
+                    # Run checks that are due and sleep until the next one is
                     current_time = time.time()
+                    next_wake = current_time + interval
                     
-                    for check_name, check_config in self.checks.items():
-                        if current_time - check_config['last_run'] >= check_config['interval']:
-                            result = self.run_check(check_name)
-                            
-                            # Log critical issues
-                            if result.status == HealthStatus.CRITICAL and result.critical:
-                                self.logger.error(f"CRITICAL: {check_name} - {result.message}")
-                            elif result.status == HealthStatus.WARNING:
-                                self.logger.warning(f"WARNING: {check_name} - {result.message}")
+                    for check_name, check_config in list(self.checks.items()):
+                        due = check_config['last_run'] + check_config['interval']
+                        if due <= current_time:
+                            self.submit_check(check_name)
+                            due = current_time + check_config['interval']
+                        next_wake = min(next_wake, due)
                     
-                    time.sleep(interval)
+                    with self._lock:
+                        next_wake = min([next_wake] + list(self._deadlines.values()))
+                    
+                    self._wake.wait(max(next_wake - time.time(), 0.05))
+                    self._wake.clear()
                     
                 except Exception as e:
                     self.logger.error(f"Monitoring loop error: {e}")
@@ -788,6 +1010,7 @@ class HealthChecker:
     def stop_monitoring(self):
         """Stop background health monitoring"""
         self.monitoring_active = False
+        self._wake.set()
         if self.monitoring_thread:
             self.monitoring_thread.join(timeout=5)
         self.logger.info("Health monitoring stopped")
@@ -796,6 +1019,9 @@ class HealthChecker:
         """Render health check dashboard in Streamlit"""
         st.subheader("🏥 System Health Dashboard")
         
+        # Checks run on the scheduler; the dashboard only reads their latest results
+        self.start_monitoring()
+        
         # Get overall health
         health_data = self.get_overall_health()
         overall_status = health_data['overall_status']
@@ -805,6 +1031,8 @@ class HealthChecker:
             st.success(f"✅ {health_data['status_message']}")
         elif overall_status == 'warning':
             st.warning(f"⚠️ {health_data['status_message']}")
+        elif overall_status == 'unknown':
+            st.info(f"⏳ {health_data['status_message']}")
         else:
             st.error(f"❌ {health_data['status_message']}")
         
@@ -832,18 +1060,31 @@ class HealthChecker:
             status = check_data['status']
             message = check_data['message']
             response_time = check_data.get('response_time_ms', 0)
+            age_seconds = check_data.get('age_seconds')
             
             with st.expander(f"{'✅' if status == 'healthy' else '⚠️' if status == 'warning' else '❌'} {check_name.replace('_', ' ').title()}"):
                 st.write(f"**Status:** {str(status).upper()}")
                 st.write(f"**Message:** {message}")
                 st.write(f"**Response Time:** {response_time:.1f}ms")
+                if age_seconds is not None:
+                    st.write(f"**Last Run:** {age_seconds:.0f}s ago{' (stale)' if check_data['stale'] else ''}")
+                if check_data.get('running'):
+                    st.caption("Check currently running")
                 
                 if check_data.get('details'):
                     st.write("**Details:**")
                     st.json(check_data['details'])
         
+        # Hot path latency from the metrics registry
+        latency = metrics.latency_rows()
+        if latency:
+            st.markdown("---")
+            st.subheader("⏱️ Hot Path Latency")
+            st.dataframe(latency, use_container_width=True, hide_index=True)
+        
         # System metrics chart
         if st.button("🔄 Refresh Health Checks"):
+            self.refresh()
             st.rerun()
 
 # Global health checker instance
@@ -855,5 +1096,13 @@ def get_health_checker() -> HealthChecker:
     
     if _health_checker is None:
         _health_checker = HealthChecker()
+        
+        # Expose the metrics registry to Prometheus when a port is configured
+        metrics_port = os.getenv("METRICS_PORT")
+        if metrics_port:
+            try:
+                start_metrics_server(int(metrics_port))
+            except (OSError, ValueError) as e:
+                _health_checker.logger.error(f"Could not start metrics server on {metrics_port}: {e}")
     
     return _health_checker
\ No newline at end of file
@@ -11,9 +11,12 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import logging
 from dataclasses import dataclass
-from collections import deque
+from collections import deque, OrderedDict
 import numpy as np
 
+from loop_monitor import monitor_loop
+from sampling_profiler import profile_worker
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -187,24 +190,121 @@ class AISnipeScorer:
             
         return opportunities
 
+class SeenTokenWindow:
+    """Bounded dedup set: remembers addresses for `ttl_seconds`, at most `max_size` of them"""
+    
+    def __init__(self, ttl_seconds: float = 3600.0, max_size: int = 50000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._seen: "OrderedDict[str, float]" = OrderedDict()  # Insertion order == first-seen order
+        
+    def _expire(self, now: float):
+        while self._seen:
+            first_seen = next(iter(self._seen.values()))
+            if now - first_seen <= self.ttl_seconds and len(self._seen) <= self.max_size:
+                break
+            self._seen.popitem(last=False)
+    
+    def add(self, address: str) -> bool:
+        """Remember an address; False if it was already seen inside the window"""
+        now = time.monotonic()
+        self._expire(now)
+        if address in self._seen:
+            return False
+        self._seen[address] = now
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return True
+    
+    def discard(self, address: str):
+        self._seen.pop(address, None)
+    
+    def __contains__(self, address: str) -> bool:
+        first_seen = self._seen.get(address)
+        return first_seen is not None and time.monotonic() - first_seen <= self.ttl_seconds
+    
+    def __len__(self) -> int:
+        return len(self._seen)
+
+@dataclass
+class PlatformPoller:
+    """
+    Adaptive poll interval for one platform: snaps to the minimum on new
+    launches, backs off when quiet. The cap keeps worst-case detection
+    latency at the old fixed 0.5s poll.
+    """
+    min_interval: float = 0.25
+    max_interval: float = 0.5
+    backoff: float = 1.5
+    interval: float = 0.5
+    polls: int = 0
+    not_modified: int = 0
+    launches: int = 0
+    
+    def record(self, new_launches: int):
+        self.polls += 1
+        self.launches += new_launches
+        if new_launches:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+
 class HuntHubScanner:
     """Real-time memecoin scanner with sub-second detection"""
     
+    ENDPOINTS = {
+        'pumpfun': "https://api.pump.fun/tokens/new",
+        'raydium': "https://api.raydium.io/v2/ammV3/pools/recent",
+        'jupiter': "https://price.jup.ag/v4/tokens/new"
+    }
+    
     def __init__(self, config: Dict):
         self.config = config
         self.ai_scorer = AISnipeScorer()
         self.session: Optional[aiohttp.ClientSession] = None
         self.launch_queue = deque(maxlen=1000)
-        self.seen_tokens = set()
+        self.seen_tokens = SeenTokenWindow(
+            ttl_seconds=config.get('dedup_ttl_seconds', 3600),
+            max_size=config.get('dedup_max_size', 50000)
+        )
+        self.endpoints = {**self.ENDPOINTS, **config.get('endpoints', {})}
         self.scanners = {
             'pumpfun': self._scan_pumpfun,
             'raydium': self._scan_raydium,
             'jupiter': self._scan_jupiter
         }
+        self.pollers = {
+            platform: PlatformPoller(
+                min_interval=config.get('min_poll_interval', 0.25),
+                max_interval=config.get('max_poll_interval', 0.5)
+            )
+            for platform in self.scanners
+        }
+        # ETag / Last-Modified per URL for conditional requests
+        self._validators: Dict[str, Dict[str, str]] = {}
+        
+        # Launches wait here for market data + scoring so scans never block on them
+        self.score_workers = config.get('score_workers', 8)
+        self.score_queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self.running = False
+        
+        self.stats = {
+            'queued': 0,
+            'scored': 0,
+            'dropped': 0,
+            'last_queue_wait_ms': 0.0,
+            'last_scoring_ms': 0.0
+        }
         
     async def start(self):
         """Start the scanner"""
+        profile_worker('hunt_hub_scanner')
+        monitor_loop('hunt_hub_scanner')
         self.session = aiohttp.ClientSession()
+        self.score_queue = asyncio.Queue(maxsize=self.config.get('score_queue_size', 1000))
+        self._worker_tasks = [asyncio.create_task(self._score_worker()) for _ in range(self.score_workers)]
+        self.running = True
         
         # Start all scanners concurrently
         tasks = [
@@ -215,78 +315,98 @@ class HuntHubScanner:
         await asyncio.gather(*tasks)
     
     async def _scanner_loop(self, platform: str, scanner_func):
-        """Run a scanner in a loop"""
+        """Run a scanner in a loop, polling faster while launches keep arriving"""
         logger.info(f"Starting {platform} scanner...")
+        poller = self.pollers[platform]
         
-        while True:
+        while self.running:
             try:
-                await scanner_func()
-                await asyncio.sleep(0.5)  # Sub-second scanning
+                new_launches = await scanner_func()
+                poller.record(new_launches)
+                await asyncio.sleep(poller.interval)
             except Exception as e:
                 logger.error(f"Error in {platform} scanner: {e}")
                 await asyncio.sleep(5)
     
-    async def _scan_pumpfun(self):
+    async def _conditional_get(self, platform: str, url: str,
+                               headers: Optional[Dict] = None) -> Optional[Dict]:
+        """GET with If-None-Match / If-Modified-Since; None when unchanged or unavailable"""
+        request_headers = dict(headers or {})
+        validators = self._validators.get(url, {})
+        if 'etag' in validators:
+            request_headers['If-None-Match'] = validators['etag']
+        if 'last_modified' in validators:
+            request_headers['If-Modified-Since'] = validators['last_modified']
+        
+        async with self.session.get(url, headers=request_headers) as response:
+            if response.status == 304:
+                self.pollers[platform].not_modified += 1
+                return None
+            if response.status != 200:
+                return None
+            
+            validators = {}
+            if response.headers.get('ETag'):
+                validators['etag'] = response.headers['ETag']
+            if response.headers.get('Last-Modified'):
+                validators['last_modified'] = response.headers['Last-Modified']
+            self._validators[url] = validators
+            
+            return await response.json()
+    
+    async def _scan_pumpfun(self) -> int:
         """Scan Pump.fun for new launches"""
+        new_launches = 0
         try:
-            # Pump.fun API endpoint (example)
-            url = "https://api.pump.fun/tokens/new"
             headers = {"Accept": "application/json"}
+            data = await self._conditional_get('pumpfun', self.endpoints['pumpfun'], headers)
             
-            async with self.session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    for token_data in data.get('tokens', []):
-                        await self._process_launch(token_data, 'pumpfun')
+            for token_data in (data or {}).get('tokens', []):
+                new_launches += await self._process_launch(token_data, 'pumpfun')
                         
         except Exception as e:
             logger.error(f"Pump.fun scan error: {e}")
+        return new_launches
     
-    async def _scan_raydium(self):
+    async def _scan_raydium(self) -> int:
         """Scan Raydium for new pools"""
+        new_launches = 0
         try:
-            # Raydium pool creation monitoring
-            url = "https://api.raydium.io/v2/ammV3/pools/recent"
+            data = await self._conditional_get('raydium', self.endpoints['raydium'])
             
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    for pool in data.get('data', []):
-                        if pool['createTime'] > time.time() - 300:  # Last 5 mins
-                            await self._process_launch(pool, 'raydium')
+            for pool in (data or {}).get('data', []):
+                if pool['createTime'] > time.time() - 300:  # Last 5 mins
+                    new_launches += await self._process_launch(pool, 'raydium')
                             
         except Exception as e:
             logger.error(f"Raydium scan error: {e}")
+        return new_launches
     
-    async def _scan_jupiter(self):
+    async def _scan_jupiter(self) -> int:
         """Scan Jupiter for new tokens"""
+        new_launches = 0
         try:
-            # Jupiter aggregator monitoring
-            url = "https://price.jup.ag/v4/tokens/new"
+            data = await self._conditional_get('jupiter', self.endpoints['jupiter'])
             
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    for token in data.get('tokens', []):
-                        await self._process_launch(token, 'jupiter')
+            for token in (data or {}).get('tokens', []):
+                new_launches += await self._process_launch(token, 'jupiter')
                         
         except Exception as e:
             logger.error(f"Jupiter scan error: {e}")
+        return new_launches
     
-    async def _process_launch(self, raw_data: Dict, platform: str):
-        """Process a detected launch"""
+    async def _process_launch(self, raw_data: Dict, platform: str) -> bool:
+        """Dedup a detected launch and queue it for scoring; True if it was new"""
         try:
             # Extract token address
             token_address = raw_data.get('mint') or raw_data.get('address')
             
             # Skip if already seen
-            if token_address in self.seen_tokens:
-                return
-                
-            self.seen_tokens.add(token_address)
+            if not token_address or token_address in self.seen_tokens:
+                return False
+            if self.score_queue is None:
+                logger.warning(f"Scanner not started, not queuing {token_address}")
+                return False
             
             # Create TokenLaunch object
             token = TokenLaunch(
@@ -303,31 +423,63 @@ class HuntHubScanner:
                 metadata=raw_data
             )
             
-            # Get additional market data
-            market_data = await self._fetch_market_data(token)
-            
-            # Calculate AI score
-            score, analysis = await self.ai_scorer.calculate_score(token, market_data)
-            
-            # Create launch alert
-            alert = {
-                'token': token,
-                'score': score,
-                'analysis': analysis,
-                'timestamp': datetime.now(),
-                'platform': platform
-            }
-            
-            # Add to queue for processing
-            self.launch_queue.append(alert)
+            try:
+                self.score_queue.put_nowait((token, time.monotonic()))
+            except asyncio.QueueFull:
+                # Left unseen so a later poll can pick it up again
+                self.stats['dropped'] += 1
+                logger.warning(f"Scoring queue full, dropped {token.symbol}")
+                return False
             
-            # Log high-score launches
-            if score > 75:
-                logger.info(f"🎯 HIGH SCORE LAUNCH: {token.symbol} "
-                          f"Score: {score} | {analysis['rationale']}")
+            # Only marked once queued; nothing awaits between the check and here
+            self.seen_tokens.add(token_address)
+            self.stats['queued'] += 1
+            return True
             
         except Exception as e:
             logger.error(f"Error processing launch: {e}")
+            return False
+    
+    async def _score_worker(self):
+        """Pull launches off the scoring queue until cancelled"""
+        while True:
+            token, queued_at = await self.score_queue.get()
+            try:
+                await self._score_launch(token, queued_at)
+            except Exception as e:
+                logger.error(f"Error scoring launch {token.address}: {e}")
+            finally:
+                self.score_queue.task_done()
+    
+    async def _score_launch(self, token: TokenLaunch, queued_at: float):
+        """Fetch market data, score a queued launch and publish the alert"""
+        start = time.monotonic()
+        self.stats['last_queue_wait_ms'] = (start - queued_at) * 1000
+        
+        # Get additional market data
+        market_data = await self._fetch_market_data(token)
+        
+        # Calculate AI score
+        score, analysis = await self.ai_scorer.calculate_score(token, market_data)
+        self.stats['last_scoring_ms'] = (time.monotonic() - start) * 1000
+        self.stats['scored'] += 1
+        
+        # Create launch alert
+        alert = {
+            'token': token,
+            'score': score,
+            'analysis': analysis,
+            'timestamp': datetime.now(),
+            'platform': token.platform
+        }
+        
+        # Add to queue for processing
+        self.launch_queue.append(alert)
+        
+        # Log high-score launches
+        if score > 75:
+            logger.info(f"🎯 HIGH SCORE LAUNCH: {token.symbol} "
+                      f"Score: {score} | {analysis['rationale']}")
     
     async def _fetch_market_data(self, token: TokenLaunch) -> Dict:
         """Fetch additional market data for scoring"""
@@ -370,8 +522,29 @@ class HuntHubScanner:
         launches = list(self.launch_queue)[-limit:]
         return sorted(launches, key=lambda x: x['score'], reverse=True)
     
+    def get_scanner_stats(self) -> Dict:
+        """Polling, dedup and scoring-queue counters"""
+        return {
+            'platforms': {
+                platform: {
+                    'interval': poller.interval,
+                    'polls': poller.polls,
+                    'not_modified': poller.not_modified,
+                    'launches': poller.launches
+                }
+                for platform, poller in self.pollers.items()
+            },
+            'seen_tokens': len(self.seen_tokens),
+            'score_queue_depth': self.score_queue.qsize() if self.score_queue else 0,
+            **self.stats
+        }
+    
     async def stop(self):
         """Stop the scanner"""
+        self.running = False
+        for task in self._worker_tasks:
+            task.cancel()
+        self._worker_tasks = []
         if self.session:
             await self.session.close()
 
@@ -35,10 +35,12 @@ except ImportError:
 
 try:
     from unified_notifications import unified_notifier
+    from alert_coalescer import alert_coalescer
     notifications_available = True
 except ImportError:
     notifications_available = False
     unified_notifier = None
+    alert_coalescer = None
 
 try:
     from database_manager import DatabaseManager
@@ -184,6 +186,25 @@ class IncomingCoinsProcessor:
             self.db_manager = DatabaseManager()
         else:
             self.db_manager = None
+        
+        # Optional hot-path sniping: likely targets get buys pre-built as soon as they are seen
+        self.snipe_executor = None
+        self.snipe_min_confidence = 0.7
+    
+    def attach_snipe_executor(self, executor, min_confidence: float = 0.7):
+        """Pre-warm quotes in `executor` (a SnipeExecutor) for buy signals above min_confidence"""
+        self.snipe_executor = executor
+        self.snipe_min_confidence = min_confidence
+    
+    def _prewarm_snipe_targets(self, coins: List[IncomingCoin]):
+        if not self.snipe_executor:
+            return
+        for coin in coins:
+            if (coin.contract_address and coin.signal_type in ('buy', 'strong_buy')
+                    and coin.confidence >= self.snipe_min_confidence):
+                self.snipe_executor.watch(coin.contract_address)
+                # Keeps the watched buys rebuilt on this loop
+                self.snipe_executor.start()
     
     async def process_telegram_message(self, message: str, channel_name: str) -> List[IncomingCoin]:
         """Process a new Telegram message for coins"""
@@ -197,6 +218,9 @@ class IncomingCoinsProcessor:
                 new_coins.append(coin)
                 self.processing_queue.append(coin)
         
+        # Start building buys before the slower enrichment stages run
+        self._prewarm_snipe_targets(new_coins)
+        
         # Process new coins
         for coin in new_coins:
             await self._process_single_coin(coin)
@@ -313,37 +337,54 @@ class IncomingCoinsProcessor:
             return
             
         try:
-            # Prepare notification message
-            message = f"""🚨 **NEW COIN DETECTED & PROCESSED**
+            # The same coin often arrives from several channels within seconds;
+            # those land in one Discord message with the latest numbers
+            payload = {
+                'ticker': coin.ticker,
+                'channel_name': coin.channel_name,
+                'signal_type': coin.signal_type,
+                'confidence': coin.confidence,
+                'detected_time': coin.detected_time,
+                'contract_address': coin.contract_address,
+                **(coin.enrichment_data or {})
+            }
+            await alert_coalescer.submit(
+                coin.ticker, 'new_coin', 'coin_data', payload, self._deliver_coin_notification
+            )
+            
+            coin.notification_sent = True
+            
+        except Exception as e:
+            print(f"Error sending notification for {coin.ticker}: {e}")
+    
+    async def _deliver_coin_notification(self, data: Dict) -> bool:
+        """Render and send one (possibly merged) new-coin notification"""
+        # Prepare notification message
+        message = f"""🚨 **NEW COIN DETECTED & PROCESSED**
 
-🪙 **Coin:** ${coin.ticker}
-📡 **Channel:** {coin.channel_name}
-🎯 **Signal:** {coin.signal_type.upper()}
-📊 **Confidence:** {coin.confidence:.1%}
-⏰ **Detected:** {coin.detected_time.strftime('%H:%M:%S')}
+🪙 **Coin:** ${data['ticker']}
+📡 **Channel:** {data['channel_name']}
+🎯 **Signal:** {data['signal_type'].upper()}
+📊 **Confidence:** {data['confidence']:.1%}
+⏰ **Detected:** {data['detected_time'].strftime('%H:%M:%S')}
 
 📈 **Quick Stats:**
-• Market Cap: ${coin.enrichment_data.get('market_cap', 0):,.0f}
-• Volume 24h: ${coin.enrichment_data.get('volume_24h', 0):,.0f}
-• Smart Wallets: {coin.enrichment_data.get('smart_wallets', 0)}
+• Market Cap: ${data.get('market_cap', 0):,.0f}
+• Volume 24h: ${data.get('volume_24h', 0):,.0f}
+• Smart Wallets: {data.get('smart_wallets', 0)}
 
-🔗 **Contract:** `{coin.contract_address or 'Not available'}`
+🔗 **Contract:** `{data['contract_address'] or 'Not available'}`
 
 ✅ **Status:** Fully processed and added to database
 """
-            
-            # Send to Discord
-            await unified_notifier.send_discord_notification(
-                message=message,
-                title="New Coin Alert",
-                color=0x00ff00,  # Green
-                channel_type="coin_data"
-            )
-            
-            coin.notification_sent = True
-            
-        except Exception as e:
-            print(f"Error sending notification for {coin.ticker}: {e}")
+        
+        # Send to Discord
+        return await unified_notifier.send_discord_notification(
+            message=message,
+            title="New Coin Alert",
+            color=0x00ff00,  # Green
+            channel_type="coin_data"
+        )
     
     def _is_recently_processed(self, ticker: str, hours: int = 24) -> bool:
         """Check if coin was processed recently"""
@@ -481,6 +522,9 @@ async def simulate_telegram_activity():
     for message, channel in sample_messages:
         await incoming_coins_processor.process_telegram_message(message, channel)
         await asyncio.sleep(2)  # Simulate time between messages
+    
+    if notifications_available:
+        await unified_notifier.shutdown()
 
 if __name__ == "__main__":
     # Run simulation
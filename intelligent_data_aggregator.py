@@ -38,6 +38,9 @@ class AggregatedResult:
 class ConflictResolver:
     """Resolves conflicts between different data sources"""
     
+    # Strategies resolve_batch can run as array operations
+    VECTORIZED_STRATEGIES = ('weighted_average', 'median', 'outlier_removal')
+    
     def __init__(self):
         self.source_weights = self._initialize_source_weights()
         self.resolution_strategies = {
@@ -137,6 +140,160 @@ class ConflictResolver:
         
         return result
     
+    def resolve_batch(self, cells: List[Tuple[str, List[str], List[Any], List[float]]]) -> List[AggregatedResult]:
+        """
+        Resolve many metrics at once. Each cell is (strategy, sources, values,
+        confidences). Numeric cells resolved by weighted_average, median or
+        outlier_removal are grouped by source count and resolved as dense
+        arrays in one pass; every other cell goes through resolve().
+        """
+        results: List[Optional[AggregatedResult]] = [None] * len(cells)
+        groups = defaultdict(list)
+        
+        for index, (strategy, sources, values, confidences) in enumerate(cells):
+            if strategy not in self.resolution_strategies:
+                strategy = 'weighted_average'
+            if (len(values) > 1 and strategy in self.VECTORIZED_STRATEGIES
+                    and all(type(v) in (int, float) for v in values)):
+                groups[(strategy, len(values))].append(index)
+        
+        for (strategy, count), indices in groups.items():
+            group_results = self._resolve_group(strategy, count, [cells[i] for i in indices])
+            for index, result in zip(indices, group_results):
+                results[index] = result
+        
+        # Single sources, categorical data and degenerate rows keep the scalar path
+        for index, result in enumerate(results):
+            if result is None:
+                strategy, sources, values, confidences = cells[index]
+                now = datetime.utcnow()
+                data_points = [
+                    DataPoint(source=source, value=value, timestamp=now, confidence=confidence)
+                    for source, value, confidence in zip(sources, values, confidences)
+                ]
+                results[index] = self.resolve(data_points, strategy)
+        
+        return results
+    
+    @staticmethod
+    def _sequential_sum(columns: np.ndarray) -> np.ndarray:
+        """Row sums accumulated left to right, matching Python's sum() bit for bit"""
+        total = np.zeros(columns.shape[0])
+        for j in range(columns.shape[1]):
+            total += columns[:, j]
+        return total
+    
+    @classmethod
+    def _masked_variance(cls, values: np.ndarray, mask: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Sample variance of the masked values per row (0.0 below two values)"""
+        mean = cls._sequential_sum(np.where(mask, values, 0.0)) / np.maximum(counts, 1)
+        squares = np.where(mask, (values - mean[:, None]) ** 2, 0.0)
+        return np.where(counts > 1, cls._sequential_sum(squares) / np.maximum(counts - 1, 1), 0.0)
+    
+    @staticmethod
+    def _as_statistics_variance(value: float, values: List[Any]) -> Any:
+        """Match statistics.variance, which stays exact (and int when integral) for ints with an integral mean"""
+        n = len(values)
+        total = sum(values) if all(type(v) is int for v in values) else None
+        if total is not None and total % n == 0:
+            mean = total // n
+            squares = sum((v - mean) ** 2 for v in values)
+            return squares // (n - 1) if squares % (n - 1) == 0 else squares / (n - 1)
+        return float(value)
+    
+    def _resolve_group(self, strategy: str, count: int,
+                       cells: List[Tuple[str, List[str], List[Any], List[float]]]) -> List[Optional[AggregatedResult]]:
+        """Resolve cells that share a strategy and source count; None marks rows left to the scalar path"""
+        values = np.array([cell[2] for cell in cells], dtype=float)
+        source_weights = np.array([
+            [self.source_weights.get(source, self.source_weights['default']) for source in cell[1]]
+            for cell in cells
+        ])
+        weights = source_weights * np.array([cell[3] for cell in cells], dtype=float)
+        
+        # Conflict flags against the unweighted mean of every point
+        mean = self._sequential_sum(values) / count
+        safe_mean = np.where(mean != 0, mean, 1.0)
+        deviations = np.where(mean[:, None] != 0, np.abs(values - mean[:, None]) / safe_mean[:, None], 0.0)
+        conflict_mask = deviations > 0.1
+        
+        if strategy == 'median':
+            medians = np.median(values, axis=1)
+            closest = np.argmin(np.abs(values - medians[:, None]), axis=1)
+            variances = self._masked_variance(values, np.ones_like(values, dtype=bool), np.full(len(cells), count))
+            resolved = []
+            for row, (_, sources, raw_values, _) in enumerate(cells):
+                median = medians[row]
+                if count % 2 and all(type(v) is int for v in raw_values):
+                    median = int(median)
+                else:
+                    median = float(median)
+                resolved.append(AggregatedResult(
+                    value=median,
+                    confidence=0.8,  # Median is generally reliable
+                    sources=list(sources),
+                    variance=self._as_statistics_variance(variances[row], raw_values),
+                    conflicts=[],
+                    resolution_method='median',
+                    metadata={'closest_source': sources[closest[row]]}
+                ))
+        else:
+            keep = np.ones_like(values, dtype=bool)
+            if strategy == 'outlier_removal' and count >= 4:
+                q1 = np.percentile(values, 25, axis=1)
+                q3 = np.percentile(values, 75, axis=1)
+                iqr = q3 - q1
+                keep = ((q1 - 1.5 * iqr)[:, None] <= values) & (values <= (q3 + 1.5 * iqr)[:, None])
+            
+            kept = keep.sum(axis=1)
+            total_weight = self._sequential_sum(np.where(keep, weights, 0.0))
+            weighted_sum = self._sequential_sum(np.where(keep, values * weights, 0.0))
+            variances = self._masked_variance(values, keep, kept)
+            
+            resolved = []
+            for row, (_, sources, raw_values, _) in enumerate(cells):
+                if kept[row] == 0 or total_weight[row] == 0:
+                    resolved.append(None)
+                    continue
+                
+                kept_sources = [s for s, k in zip(sources, keep[row]) if k]
+                kept_values = [v for v, k in zip(raw_values, keep[row]) if k]
+                kept_weights = weights[row][keep[row]].tolist()
+                metadata = {
+                    'weights': dict(zip(kept_sources, kept_weights)),
+                    'raw_values': dict(zip(kept_sources, kept_values))
+                }
+                if strategy == 'outlier_removal' and count >= 4:
+                    metadata['removed_count'] = count - int(kept[row])
+                
+                variance = self._as_statistics_variance(variances[row], kept_values) if kept[row] > 1 else 0.0
+                resolved.append(AggregatedResult(
+                    value=float(weighted_sum[row] / total_weight[row]),
+                    confidence=min(1.0, float(total_weight[row] / kept[row])),
+                    sources=kept_sources,
+                    variance=variance,
+                    conflicts=[],
+                    resolution_method=strategy,
+                    metadata=metadata
+                ))
+        
+        for row, result in enumerate(resolved):
+            if result is None:
+                continue
+            sources, raw_values = cells[row][1], cells[row][2]
+            result.conflicts = [
+                {
+                    'source': sources[j],
+                    'value': raw_values[j],
+                    'deviation': float(deviations[row, j]),
+                    'type': 'numeric_deviation'
+                }
+                for j in np.flatnonzero(conflict_mask[row])
+            ]
+            result.resolution_method = strategy
+        
+        return resolved
+    
     def _detect_conflicts(self, data_points: List[DataPoint]) -> List[Dict[str, Any]]:
         """Detect significant conflicts between data points"""
         conflicts = []
@@ -354,6 +511,54 @@ class IntelligentDataAggregator:
     Main aggregator that orchestrates data fusion from 100+ sources
     """
     
+    # (metric, source keys in priority order, cast to float) in extraction order
+    EXTRACTION_PLAN = [
+        # Price
+        ('price', ('price', 'current_price', 'usd_price', 'price_usd'), True),
+        ('price_change_24h', ('price_change_24h',), True),
+        ('price_change_pct_24h', ('price_change_percentage_24h',), True),
+        ('price_change_7d', ('price_change_7d',), True),
+        ('price_change_30d', ('price_change_30d',), True),
+        
+        # Volume / market cap
+        ('volume_24h', ('volume', 'volume_24h', 'total_volume', 'usd_volume_24h'), True),
+        ('market_cap', ('market_cap', 'marketcap', 'market_cap_usd', 'mcap'), True),
+        ('fdv', ('fully_diluted_valuation', 'fdv', 'fully_diluted_market_cap'), True),
+        
+        # Technical indicators
+        ('rsi', ('rsi', 'rsi_14'), True),
+        ('macd', ('macd', 'macd_signal'), True),
+        ('bollinger_upper', ('bb_upper', 'bollinger_upper'), True),
+        ('bollinger_lower', ('bb_lower', 'bollinger_lower'), True),
+        ('ema_20', ('ema_20', 'ema20'), True),
+        ('sma_50', ('sma_50', 'sma50'), True),
+        ('sma_200', ('sma_200', 'sma200'), True),
+        
+        # Social
+        ('twitter_followers', ('twitter_followers', 'twitter_count'), False),
+        ('reddit_subscribers', ('reddit_subscribers', 'reddit_count'), False),
+        ('telegram_members', ('telegram_members', 'telegram_count'), False),
+        ('social_score', ('social_score', 'community_score'), False),
+        ('sentiment_score', ('sentiment', 'sentiment_score', 'social_sentiment'), False),
+        
+        # Security
+        ('security_score', ('security_score', 'safety_score', 'trust_score'), False),
+        ('honeypot', ('is_honeypot', 'honeypot_status'), False),
+        ('rugpull_risk', ('rugpull_risk', 'rug_risk', 'scam_risk'), False),
+        ('contract_verified', ('contract_verified', 'is_verified'), False),
+        
+        # DeFi
+        ('tvl', ('tvl', 'total_value_locked'), False),
+        ('liquidity', ('liquidity', 'total_liquidity'), False),
+        ('apy', ('apy', 'annual_percentage_yield'), False),
+        ('pool_count', ('pool_count', 'liquidity_pools'), False),
+        
+        # Whale activity
+        ('whale_transactions', ('whale_transactions', 'large_transactions'), False),
+        ('whale_holdings', ('whale_holdings', 'top_holders_percentage'), False),
+        ('smart_money_flow', ('smart_money', 'smart_money_flow'), False)
+    ]
+    
     def __init__(self):
         self.conflict_resolver = ConflictResolver()
         self.cache = {}
@@ -363,7 +568,51 @@ class IntelligentDataAggregator:
         """
         Aggregate all data for a single coin from multiple sources
         """
-        aggregated = {
+        aggregated = self._empty_aggregate(raw_data)
+        
+        # Process each data source
+        data_by_metric = self._organize_by_metric(raw_data.get('data_sources', {}))
+        
+        # Aggregate each metric type
+        for metric_type, data_points in data_by_metric.items():
+            if data_points:
+                result = self._aggregate_metric(metric_type, data_points)
+                category = self._get_metric_category(metric_type)
+                aggregated.setdefault(category, {})[metric_type] = result
+        
+        return self._finalize_aggregate(aggregated)
+    
+    def aggregate_many(self, raw_data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Aggregate many coins at once. Output matches aggregate_coin_data per
+        coin, but every coin's metrics are resolved in one vectorized
+        ConflictResolver.resolve_batch pass.
+        """
+        coins = []
+        cells = []
+        
+        for raw_data in raw_data_list:
+            metrics = []
+            for metric_type, (sources, values, confidences) in self._collect_metric_values(
+                    raw_data.get('data_sources', {})).items():
+                metrics.append((metric_type, len(cells)))
+                cells.append((self._get_aggregation_strategy(metric_type), sources, values, confidences))
+            coins.append((raw_data, metrics))
+        
+        results = self.conflict_resolver.resolve_batch(cells)
+        
+        output = []
+        for raw_data, metrics in coins:
+            aggregated = self._empty_aggregate(raw_data)
+            for metric_type, index in metrics:
+                category = self._get_metric_category(metric_type)
+                aggregated.setdefault(category, {})[metric_type] = self._result_to_dict(results[index])
+            output.append(self._finalize_aggregate(aggregated))
+        
+        return output
+    
+    def _empty_aggregate(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
             'metadata': {
                 'aggregation_timestamp': datetime.utcnow().isoformat(),
                 'total_sources': len(raw_data.get('data_sources', {})),
@@ -380,17 +629,8 @@ class IntelligentDataAggregator:
             'whale_activity': {},
             'developer_metrics': {}
         }
-        
-        # Process each data source
-        data_by_metric = self._organize_by_metric(raw_data.get('data_sources', {}))
-        
-        # Aggregate each metric type
-        for metric_type, data_points in data_by_metric.items():
-            if data_points:
-                result = self._aggregate_metric(metric_type, data_points)
-                category = self._get_metric_category(metric_type)
-                aggregated[category][metric_type] = result
-        
+    
+    def _finalize_aggregate(self, aggregated: Dict[str, Any]) -> Dict[str, Any]:
         # Calculate overall confidence
         aggregated['metadata']['overall_confidence'] = self._calculate_overall_confidence(aggregated)
         
@@ -399,197 +639,37 @@ class IntelligentDataAggregator:
         
         return aggregated
     
-    def _organize_by_metric(self, data_sources: Dict[str, Any]) -> Dict[str, List[DataPoint]]:
-        """Organize raw data by metric type"""
-        metric_data = defaultdict(list)
+    def _collect_metric_values(self, data_sources: Dict[str, Any]) -> Dict[str, Tuple[List[str], List[Any], List[float]]]:
+        """Organize raw data by metric type as parallel (sources, values, confidences) lists"""
+        metric_values = {}
         
         for source, source_data in data_sources.items():
             if isinstance(source_data, dict) and 'error' not in source_data:
-                # Extract standard metrics
-                self._extract_price_data(source, source_data, metric_data)
-                self._extract_volume_data(source, source_data, metric_data)
-                self._extract_market_cap_data(source, source_data, metric_data)
-                self._extract_technical_data(source, source_data, metric_data)
-                self._extract_social_data(source, source_data, metric_data)
-                self._extract_security_data(source, source_data, metric_data)
-                self._extract_defi_data(source, source_data, metric_data)
-                self._extract_whale_data(source, source_data, metric_data)
-        
-        return metric_data
-    
-    def _extract_price_data(self, source: str, data: Dict[str, Any], metric_data: Dict[str, List[DataPoint]]):
-        """Extract price-related metrics"""
-        price_keys = ['price', 'current_price', 'usd_price', 'price_usd']
-        
-        for key in price_keys:
-            if key in data:
-                metric_data['price'].append(DataPoint(
-                    source=source,
-                    value=float(data[key]),
-                    timestamp=datetime.utcnow(),
-                    confidence=self._calculate_source_confidence(source, data)
-                ))
-                break
-        
-        # Extract price changes
-        change_keys = [
-            ('price_change_24h', 'price_change_24h'),
-            ('price_change_percentage_24h', 'price_change_pct_24h'),
-            ('price_change_7d', 'price_change_7d'),
-            ('price_change_30d', 'price_change_30d')
-        ]
-        
-        for data_key, metric_key in change_keys:
-            if data_key in data:
-                metric_data[metric_key].append(DataPoint(
-                    source=source,
-                    value=float(data[data_key]),
-                    timestamp=datetime.utcnow(),
-                    confidence=self._calculate_source_confidence(source, data)
-                ))
+                confidence = self._calculate_source_confidence(source, source_data)
+                
+                for metric, keys, cast in self.EXTRACTION_PLAN:
+                    for key in keys:
+                        if key in source_data:
+                            entry = metric_values.get(metric)
+                            if entry is None:
+                                entry = metric_values[metric] = ([], [], [])
+                            entry[0].append(source)
+                            entry[1].append(float(source_data[key]) if cast else source_data[key])
+                            entry[2].append(confidence)
+                            break
+        
+        return metric_values
     
-    def _extract_volume_data(self, source: str, data: Dict[str, Any], metric_data: Dict[str, List[DataPoint]]):
-        """Extract volume metrics"""
-        volume_keys = ['volume', 'volume_24h', 'total_volume', 'usd_volume_24h']
-        
-        for key in volume_keys:
-            if key in data:
-                metric_data['volume_24h'].append(DataPoint(
-                    source=source,
-                    value=float(data[key]),
-                    timestamp=datetime.utcnow(),
-                    confidence=self._calculate_source_confidence(source, data)
-                ))
-                break
-    
-    def _extract_market_cap_data(self, source: str, data: Dict[str, Any], metric_data: Dict[str, List[DataPoint]]):
-        """Extract market cap metrics"""
-        mcap_keys = ['market_cap', 'marketcap', 'market_cap_usd', 'mcap']
-        
-        for key in mcap_keys:
-            if key in data:
-                metric_data['market_cap'].append(DataPoint(
-                    source=source,
-                    value=float(data[key]),
-                    timestamp=datetime.utcnow(),
-                    confidence=self._calculate_source_confidence(source, data)
-                ))
-                break
-        
-        # Fully diluted market cap
-        fdv_keys = ['fully_diluted_valuation', 'fdv', 'fully_diluted_market_cap']
-        for key in fdv_keys:
-            if key in data:
-                metric_data['fdv'].append(DataPoint(
-                    source=source,
-                    value=float(data[key]),
-                    timestamp=datetime.utcnow(),
-                    confidence=self._calculate_source_confidence(source, data)
-                ))
-                break
-    
-    def _extract_technical_data(self, source: str, data: Dict[str, Any], metric_data: Dict[str, List[DataPoint]]):
-        """Extract technical indicators"""
-        technical_indicators = {
-            'rsi': ['rsi', 'rsi_14'],
-            'macd': ['macd', 'macd_signal'],
-            'bollinger_upper': ['bb_upper', 'bollinger_upper'],
-            'bollinger_lower': ['bb_lower', 'bollinger_lower'],
-            'ema_20': ['ema_20', 'ema20'],
-            'sma_50': ['sma_50', 'sma50'],
-            'sma_200': ['sma_200', 'sma200']
-        }
-        
-        for metric, keys in technical_indicators.items():
-            for key in keys:
-                if key in data:
-                    metric_data[metric].append(DataPoint(
-                        source=source,
-                        value=float(data[key]),
-                        timestamp=datetime.utcnow(),
-                        confidence=self._calculate_source_confidence(source, data)
-                    ))
-                    break
-    
-    def _extract_social_data(self, source: str, data: Dict[str, Any], metric_data: Dict[str, List[DataPoint]]):
-        """Extract social metrics"""
-        social_metrics = {
-            'twitter_followers': ['twitter_followers', 'twitter_count'],
-            'reddit_subscribers': ['reddit_subscribers', 'reddit_count'],
-            'telegram_members': ['telegram_members', 'telegram_count'],
-            'social_score': ['social_score', 'community_score'],
-            'sentiment_score': ['sentiment', 'sentiment_score', 'social_sentiment']
-        }
-        
-        for metric, keys in social_metrics.items():
-            for key in keys:
-                if key in data:
-                    metric_data[metric].append(DataPoint(
-                        source=source,
-                        value=data[key],
-                        timestamp=datetime.utcnow(),
-                        confidence=self._calculate_source_confidence(source, data)
-                    ))
-                    break
-    
-    def _extract_security_data(self, source: str, data: Dict[str, Any], metric_data: Dict[str, List[DataPoint]]):
-        """Extract security metrics"""
-        security_metrics = {
-            'security_score': ['security_score', 'safety_score', 'trust_score'],
-            'honeypot': ['is_honeypot', 'honeypot_status'],
-            'rugpull_risk': ['rugpull_risk', 'rug_risk', 'scam_risk'],
-            'contract_verified': ['contract_verified', 'is_verified']
-        }
-        
-        for metric, keys in security_metrics.items():
-            for key in keys:
-                if key in data:
-                    metric_data[metric].append(DataPoint(
-                        source=source,
-                        value=data[key],
-                        timestamp=datetime.utcnow(),
-                        confidence=self._calculate_source_confidence(source, data)
-                    ))
-                    break
-    
-    def _extract_defi_data(self, source: str, data: Dict[str, Any], metric_data: Dict[str, List[DataPoint]]):
-        """Extract DeFi metrics"""
-        defi_metrics = {
-            'tvl': ['tvl', 'total_value_locked'],
-            'liquidity': ['liquidity', 'total_liquidity'],
-            'apy': ['apy', 'annual_percentage_yield'],
-            'pool_count': ['pool_count', 'liquidity_pools']
-        }
-        
-        for metric, keys in defi_metrics.items():
-            for key in keys:
-                if key in data:
-                    metric_data[metric].append(DataPoint(
-                        source=source,
-                        value=data[key],
-                        timestamp=datetime.utcnow(),
-                        confidence=self._calculate_source_confidence(source, data)
-                    ))
-                    break
-    
-    def _extract_whale_data(self, source: str, data: Dict[str, Any], metric_data: Dict[str, List[DataPoint]]):
-        """Extract whale activity metrics"""
-        whale_metrics = {
-            'whale_transactions': ['whale_transactions', 'large_transactions'],
-            'whale_holdings': ['whale_holdings', 'top_holders_percentage'],
-            'smart_money_flow': ['smart_money', 'smart_money_flow']
+    def _organize_by_metric(self, data_sources: Dict[str, Any]) -> Dict[str, List[DataPoint]]:
+        """Organize raw data by metric type"""
+        now = datetime.utcnow()
+        return {
+            metric: [
+                DataPoint(source=source, value=value, timestamp=now, confidence=confidence)
+                for source, value, confidence in zip(sources, values, confidences)
+            ]
+            for metric, (sources, values, confidences) in self._collect_metric_values(data_sources).items()
         }
-        
-        for metric, keys in whale_metrics.items():
-            for key in keys:
-                if key in data:
-                    metric_data[metric].append(DataPoint(
-                        source=source,
-                        value=data[key],
-                        timestamp=datetime.utcnow(),
-                        confidence=self._calculate_source_confidence(source, data)
-                    ))
-                    break
     
     def _aggregate_metric(self, metric_type: str, data_points: List[DataPoint]) -> Dict[str, Any]:
         """Aggregate a specific metric from multiple sources"""
@@ -599,7 +679,10 @@ class IntelligentDataAggregator:
         # Resolve conflicts and aggregate
         result = self.conflict_resolver.resolve(data_points, strategy)
         
-        # Convert to dictionary format
+        return self._result_to_dict(result)
+    
+    def _result_to_dict(self, result: AggregatedResult) -> Dict[str, Any]:
+        """Convert to dictionary format"""
         return {
             'value': result.value,
             'confidence': result.confidence,
@@ -802,4 +885,4 @@ if __name__ == "__main__":
     }
     
     result = aggregator.aggregate_coin_data(raw_data)
-    print(json.dumps(result, indent=2, default=str))
\ No newline at end of file
+    print(json.dumps(result, indent=2, default=str))
\ No newline at end of file
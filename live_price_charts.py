@@ -12,18 +12,27 @@ import random
 import math
 from live_coin_data import LiveCoinDataConnector
 from unicode_handler import safe_print
+from candle_service import get_candle_service
 
 class LivePriceChartsProvider:
     """Provides live price chart data for dashboard"""
     
     def __init__(self):
         self.coin_connector = LiveCoinDataConnector()
+        self.candle_service = get_candle_service()
+    
+    def _record_ticks(self, coins: List[Dict[str, Any]]):
+        """Feed the latest live prices into the candle rollups"""
+        for coin in coins:
+            if coin.get('ticker') and coin.get('price'):
+                self.candle_service.add_tick(coin['ticker'], coin['price'])
         
     def get_performance_chart_data(self, days: int = 30) -> Dict[str, Any]:
         """Get performance chart data for dashboard"""
         try:
             # Get top performing coins
             top_coins = self.coin_connector.get_live_coins(5)
+            self._record_ticks(top_coins)
             
             if not top_coins:
                 return self._get_empty_chart_data()
@@ -70,11 +79,13 @@ class LivePriceChartsProvider:
             safe_print(f"Error generating performance chart data: {e}")
             return self._get_empty_chart_data()
     
-    def get_coin_price_chart(self, ticker: str, timeframe: str = '24h') -> Dict[str, Any]:
+    def get_coin_price_chart(self, ticker: str, timeframe: str = '24h',
+                             max_points: int = 500) -> Dict[str, Any]:
         """Get detailed price chart for a specific coin"""
         try:
             # Get coin data
             coins = self.coin_connector.get_live_coins(100)
+            self._record_ticks(coins)
             target_coin = None
             
             for coin in coins:
@@ -90,6 +101,29 @@ class LivePriceChartsProvider:
             end_time = datetime.now()
             start_time = end_time - timedelta(hours=hours)
             
+            # Serve recorded candles, downsampled to the chart width, once we have some
+            candles = self.candle_service.get_candles(ticker, start_time, end_time, max_points=max_points)
+            if len(candles['timestamp']) >= 2:
+                ohlcv_data = [
+                    {
+                        'timestamp': datetime.fromtimestamp(int(ts)).strftime('%Y-%m-%d %H:%M'),
+                        'open': float(o), 'high': float(h), 'low': float(l),
+                        'close': float(c), 'volume': float(v)
+                    }
+                    for ts, o, h, l, c, v in zip(candles['timestamp'], candles['open'], candles['high'],
+                                                 candles['low'], candles['close'], candles['volume'])
+                ]
+                return {
+                    'coin': target_coin,
+                    'timeframe': timeframe,
+                    'data': ohlcv_data,
+                    'total_points': len(ohlcv_data),
+                    'price_change': target_coin['change_24h'],
+                    'volume': target_coin['volume'],
+                    'market_cap': target_coin['market_cap'],
+                    'source': 'candles'
+                }
+            
             # Generate time points
             time_points = []
             current = start_time
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+TrenchCoat Pro - Event Loop Monitor
+Continuous scheduling-lag measurement for asyncio services, with stack
+traces of whatever blocks the loop past a threshold (sqlite writes,
+`requests`, Streamlit calls in async paths) and live task counts
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from metrics_registry import metrics
+
+loop_lag_seconds = metrics.histogram(
+    'event_loop_lag_seconds', "Delay between a heartbeat's due time and when it ran", ('loop',)
+)
+loop_stalls = metrics.counter('event_loop_stalls_total', "Times the loop was blocked past the threshold", ('loop',))
+loop_tasks = metrics.gauge('event_loop_tasks', "Pending tasks by coroutine", ('loop', 'coroutine'))
+
+class LoopMonitor:
+    """
+    A heartbeat task on the monitored loop records how late each wake-up is;
+    a watchdog thread notices when the heartbeat is overdue and captures the
+    loop thread's stack while the blocking call is still on it.
+    """
+
+    def __init__(self, name: str, interval: float = 0.25, slow_threshold: float = 0.1,
+                 task_count_interval: float = 5.0, max_stalls: int = 50, stack_limit: int = 25):
+        self.name = name
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.task_count_interval = task_count_interval
+        self.stack_limit = stack_limit
+
+        self.stalls: deque = deque(maxlen=max_stalls)
+        self.task_counts: Dict[str, int] = {}
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+        # Weak, so the loop (and its entry in _monitors) can be freed once it closes
+        self._loop_ref: Optional["weakref.ref[asyncio.AbstractEventLoop]"] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._open_stall: Optional[Dict[str, Any]] = None  # Caught by the watchdog, not yet ended
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self.lag = loop_lag_seconds.labels(loop=name)
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop_ref() if self._loop_ref is not None else None
+
+    def start(self):
+        """Begin monitoring the running loop; call from a coroutine on that loop"""
+        if self._heartbeat_task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._loop_ref = weakref.ref(loop)
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name=f"loop-watchdog-{self.name}", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        _forget(self)
+
+    async def _heartbeat(self):
+        next_task_count = 0.0
+        while not self._stop.is_set():
+            due = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - due)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.lag.observe(lag)
+
+            with self._lock:
+                self._last_beat = now
+                stall, self._open_stall = self._open_stall, None
+            if stall is not None:
+                self._close_stall(stall, lag)
+            elif lag >= self.slow_threshold:
+                # Too short for the watchdog to catch in the act; record it without a stack
+                self._close_stall(self._new_stall(None), lag)
+
+            if now >= next_task_count:
+                self._count_tasks()
+                next_task_count = now + self.task_count_interval
+
+    def _watch(self):
+        poll = max(0.01, self.slow_threshold / 2)
+        while not self._stop.wait(poll):
+            loop = self.loop
+            if loop is None or loop.is_closed():
+                _forget(self)
+                return
+            now = time.monotonic()
+            with self._lock:
+                if not loop.is_running():
+                    self._last_beat = now  # Idle between run_until_complete calls, not blocked
+                    continue
+                if self._open_stall is not None or now - self._last_beat < self.interval + self.slow_threshold:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stall = self._open_stall = self._new_stall(frame)
+            self.logger.warning(
+                f"Event loop '{self.name}' blocked for over {self.slow_threshold * 1000:.0f}ms "
+                f"in {stall['task'] or 'a callback'}:\n{stall['stack']}"
+            )
+
+    def _new_stall(self, frame) -> Dict[str, Any]:
+        task = None
+        try:
+            current = asyncio.current_task(self.loop)
+            if current is not None:
+                task = _coroutine_name(current)
+        except RuntimeError:
+            pass
+        return {
+            'loop': self.name,
+            'detected_at': datetime.now().isoformat(),
+            'task': task,
+            'stack': "".join(traceback.format_stack(frame)[-self.stack_limit:]) if frame else None,
+            'duration_ms': None
+        }
+
+    def _close_stall(self, stall: Dict[str, Any], lag: float):
+        stall['duration_ms'] = lag * 1000
+        self.stalls.append(stall)
+        loop_stalls.labels(loop=self.name).inc()
+        if stall['stack'] is None:
+            self.logger.warning(f"Event loop '{self.name}' lagged {lag * 1000:.0f}ms")
+
+    def _count_tasks(self):
+        counts = Counter(_coroutine_name(task) for task in asyncio.all_tasks(self.loop) if not task.done())
+        for coroutine in set(self.task_counts) - set(counts):
+            loop_tasks.labels(loop=self.name, coroutine=coroutine).set(0)
+        for coroutine, count in counts.items():
+            loop_tasks.labels(loop=self.name, coroutine=coroutine).set(count)
+        self.task_counts = dict(counts)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'loop': self.name,
+            'last_lag_ms': self.last_lag * 1000,
+            'p50_lag_ms': self.lag.quantile(0.5) * 1000,
+            'p99_lag_ms': self.lag.quantile(0.99) * 1000,
+            'max_lag_ms': self.max_lag * 1000,
+            'stalls': len(self.stalls),
+            'recent_stalls': list(self.stalls)[-5:],
+            'tasks': sum(self.task_counts.values()),
+            'task_counts': dict(sorted(self.task_counts.items(), key=lambda item: -item[1]))
+        }
+
+def _coroutine_name(task: asyncio.Task) -> str:
+    coro = task.get_coro()
+    return getattr(coro, '__qualname__', None) or task.get_name()
+
+# One monitor per event loop, however many services share it
+_monitors: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LoopMonitor]" = weakref.WeakKeyDictionary()
+_monitors_lock = threading.Lock()
+
+def _forget(monitor: LoopMonitor):
+    """Drop a stopped monitor, or one whose loop has closed"""
+    loop = monitor.loop
+    with _monitors_lock:
+        if loop is not None and _monitors.get(loop) is monitor:
+            del _monitors[loop]
+
+def monitor_loop(name: str, **kwargs) -> LoopMonitor:
+    """Start monitoring the running loop under `name` (no-op if it is already monitored)"""
+    loop = asyncio.get_running_loop()
+    with _monitors_lock:
+        monitor = _monitors.get(loop)
+        if monitor is None:
+            monitor = _monitors[loop] = LoopMonitor(name, **kwargs)
+            monitor.start()
+    return monitor
+
+def loop_health() -> List[Dict[str, Any]]:
+    """Status of every monitored loop in this process"""
+    with _monitors_lock:
+        monitors = list(_monitors.items())
+    return [monitor.status() for loop, monitor in monitors if not loop.is_closed()]
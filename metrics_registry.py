@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+TrenchCoat Pro - Metrics Registry
+One in-process home for counters, gauges and latency histograms, with a
+@timed decorator and span context for hot paths, a Prometheus text export
+and a snapshot API for the health checker and dashboards
+"""
+
+import asyncio
+import bisect
+import contextvars
+import functools
+import math
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+# Histogram layout: log buckets with 8 sub-buckets per power of two (about 4%
+# relative error) from 1µs to ~1000s, cheap to update and to merge
+HISTOGRAM_MIN = 1e-6
+SUB_BUCKETS = 8
+HISTOGRAM_BUCKETS = SUB_BUCKETS * 30 + 2
+
+# Buckets written to the Prometheus export, in seconds
+EXPORT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _bucket_index(value: float) -> int:
+    if value <= HISTOGRAM_MIN:
+        return 0
+    return min(int(math.log2(value / HISTOGRAM_MIN) * SUB_BUCKETS) + 1, HISTOGRAM_BUCKETS - 1)
+
+def _bucket_upper(index: int) -> float:
+    return HISTOGRAM_MIN * 2 ** (index / SUB_BUCKETS)
+
+class _PerThread:
+    """
+    Per-thread cells for one labelled series: a thread only ever writes its
+    own cell, so updates take no lock; readers combine all cells. Cells of
+    finished threads are folded into a base cell, so short-lived threads
+    (e.g. one per run_async_safe call) do not accumulate.
+    """
+
+    def __init__(self, new_cell: Callable[[], list], merge: Callable[[list, list], None]):
+        self._new_cell = new_cell
+        self._merge = merge
+        self._local = threading.local()
+        self._base = new_cell()
+        self._cells: List[Tuple[threading.Thread, list]] = []
+        self._lock = threading.Lock()
+
+    def cell(self) -> list:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = self._new_cell()
+            with self._lock:
+                self._reap()
+                self._cells.append((threading.current_thread(), cell))
+            return cell
+
+    def _reap(self):
+        live = []
+        for thread, cell in self._cells:
+            if thread.is_alive():
+                live.append((thread, cell))
+            else:
+                self._merge(self._base, cell)
+        self._cells = live
+
+    def cells(self) -> List[list]:
+        with self._lock:
+            self._reap()
+            return [self._base] + [cell for _, cell in self._cells]
+
+def _merge_counter(into: list, cell: list):
+    into[0] += cell[0]
+
+def _merge_histogram(into: list, cell: list):
+    into[0] += cell[0]
+    into[1] += cell[1]
+    into[2] = max(into[2], cell[2])
+    for i, n in enumerate(cell[3]):
+        if n:
+            into[3][i] += n
+    for i, n in enumerate(cell[4]):
+        into[4][i] += n
+
+class CounterSeries:
+    """Monotonic count for one label combination"""
+
+    def __init__(self):
+        self._cells = _PerThread(lambda: [0.0], _merge_counter)
+
+    def inc(self, amount: float = 1.0):
+        self._cells.cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return sum(cell[0] for cell in self._cells.cells())
+
+    def sample(self) -> Dict[str, Any]:
+        return {'value': self.value}
+
+class GaugeSeries:
+    """Current value for one label combination, set directly or read from a callback"""
+
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from `function` at export time instead of storing it"""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception:
+                return float('nan')
+        return self._value
+
+    def sample(self) -> Dict[str, Any]:
+        return {'value': self.value}
+
+class HistogramSeries:
+    """Latency distribution (seconds) for one label combination"""
+
+    def __init__(self):
+        # [count, sum, max, log bucket counts, exact counts per export bucket]
+        self._cells = _PerThread(
+            lambda: [0, 0.0, 0.0, [0] * HISTOGRAM_BUCKETS, [0] * (len(EXPORT_BUCKETS) + 1)],
+            _merge_histogram
+        )
+
+    def observe(self, value: float):
+        cell = self._cells.cell()
+        cell[0] += 1
+        cell[1] += value
+        if value > cell[2]:
+            cell[2] = value
+        cell[3][_bucket_index(value)] += 1
+        cell[4][bisect.bisect_left(EXPORT_BUCKETS, value)] += 1
+
+    def time(self) -> 'Timer':
+        return Timer(self)
+
+    def _merged(self) -> Tuple[int, float, float, List[int]]:
+        count, total, peak = 0, 0.0, 0.0
+        buckets = [0] * HISTOGRAM_BUCKETS
+        for cell in self._cells.cells():
+            count += cell[0]
+            total += cell[1]
+            peak = max(peak, cell[2])
+            for i, n in enumerate(cell[3]):
+                if n:
+                    buckets[i] += n
+        return count, total, peak, buckets
+
+    @staticmethod
+    def _quantiles(count: int, buckets: List[int], qs: Tuple[float, ...]) -> List[float]:
+        results = []
+        for q in qs:
+            target = max(math.ceil(q * count), 1)
+            seen = 0
+            for index, n in enumerate(buckets):
+                seen += n
+                if seen >= target:
+                    # Geometric midpoint of the bucket
+                    results.append(HISTOGRAM_MIN if index == 0 else _bucket_upper(index - 0.5))
+                    break
+        return results
+
+    def quantile(self, q: float) -> float:
+        count, _, _, buckets = self._merged()
+        return self._quantiles(count, buckets, (q,))[0] if count else 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(cell[0] for cell in self._cells.cells())
+
+    def sample(self) -> Dict[str, Any]:
+        count, total, peak, buckets = self._merged()
+        if not count:
+            return {'count': 0, 'sum': 0.0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        p50, p95, p99 = self._quantiles(count, buckets, (0.5, 0.95, 0.99))
+        return {
+            'count': count,
+            'sum': total,
+            'mean': total / count,
+            'p50': min(p50, peak),
+            'p95': min(p95, peak),
+            'p99': min(p99, peak),
+            'max': peak
+        }
+
+    def export_buckets(self) -> Tuple[int, float, List[int]]:
+        """Count, sum and cumulative counts at EXPORT_BUCKETS"""
+        count, total = 0, 0.0
+        per_bucket = [0] * (len(EXPORT_BUCKETS) + 1)
+        for cell in self._cells.cells():
+            count += cell[0]
+            total += cell[1]
+            for i, n in enumerate(cell[4]):
+                per_bucket[i] += n
+        cumulative, running = [], 0
+        for n in per_bucket[:-1]:
+            running += n
+            cumulative.append(running)
+        return count, total, cumulative
+
+class Timer:
+    """Context manager that observes elapsed seconds into a histogram series"""
+
+    __slots__ = ('series', 'start')
+
+    def __init__(self, series: HistogramSeries):
+        self.series = series
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.series.observe(time.perf_counter() - self.start)
+        return False
+
+_SERIES_TYPES = {'counter': CounterSeries, 'gauge': GaugeSeries, 'histogram': HistogramSeries}
+
+class Metric:
+    """A named metric family; `labels(...)` returns the series for one label combination"""
+
+    def __init__(self, name: str, kind: str, description: str = "", labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.kind = kind
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.series: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels) -> Any:
+        try:
+            key = tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError:
+            key = None
+        series = self.series.get(key)
+        if series is None:
+            if key is None or len(labels) != len(self.labelnames):
+                raise ValueError(f"Metric '{self.name}' takes labels {self.labelnames}, got {tuple(labels)}")
+            with self._lock:
+                series = self.series.get(key)
+                if series is None:
+                    series = self.series[key] = _SERIES_TYPES[self.kind]()
+        return series
+
+    # Unlabelled metrics can be used directly
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self) -> Timer:
+        return self.labels().time()
+
+    def samples(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self.series.items())
+        return [
+            {'labels': dict(zip(self.labelnames, key)), **series.sample()}
+            for key, series in items
+        ]
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    """
+    Timed section of a hot path. Records its duration into the histogram
+    `<name>_seconds`, counts failures in `<name>_errors_total`, and keeps
+    parent/child links so recent spans read as a trace.
+    """
+
+    __slots__ = ('registry', 'name', 'labels', 'trace_id', 'span_id', 'parent_id',
+                 'started_at', 'duration', 'error', '_start', '_token')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.duration = None
+        self.error = None
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.parent_id = parent.span_id if parent else None
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def fail(self, error: Union[BaseException, str]):
+        """Count this span as failed without raising (a handled exception, an HTTP error status)"""
+        self.error = error if isinstance(error, str) else type(error).__name__
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._start
+        _current_span.reset(self._token)
+        self.registry.histogram(f"{self.name}_seconds", labelnames=tuple(self.labels)) \
+            .labels(**self.labels).observe(self.duration)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        if self.error is not None:
+            self.registry.counter(f"{self.name}_errors_total", labelnames=tuple(self.labels)) \
+                .labels(**self.labels).inc()
+        self.registry.recent_spans.append(self)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'labels': dict(self.labels),
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'started_at': self.started_at,
+            'duration_ms': self.duration * 1000 if self.duration is not None else None,
+            'error': self.error
+        }
+
+class MetricsRegistry:
+    """Get-or-create registry of metric families, exportable as Prometheus text or a snapshot dict"""
+
+    def __init__(self, max_recent_spans: int = 1000):
+        self.metrics: Dict[str, Metric] = {}
+        self.recent_spans: deque = deque(maxlen=max_recent_spans)
+        self._lock = threading.Lock()
+
+    def _get(self, name: str, kind: str, description: str, labelnames: Tuple[str, ...]) -> Metric:
+        metric = self.metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self.metrics.get(name)
+                if metric is None:
+                    metric = self.metrics[name] = Metric(name, kind, description, tuple(sorted(labelnames)))
+        if metric.kind != kind:
+            raise ValueError(f"Metric '{name}' is a {metric.kind}, not a {kind}")
+        return metric
+
+    def counter(self, name: str, description: str = "", labelnames: Tuple[str, ...] = ()) -> Metric:
+        return self._get(name, 'counter', description, labelnames)
+
+    def gauge(self, name: str, description: str = "", labelnames: Tuple[str, ...] = ()) -> Metric:
+        return self._get(name, 'gauge', description, labelnames)
+
+    def histogram(self, name: str, description: str = "", labelnames: Tuple[str, ...] = ()) -> Metric:
+        return self._get(name, 'histogram', description, labelnames)
+
+    def span(self, name: str, **labels) -> Span:
+        """`with metrics.span('http_fetch', provider='dexscreener'):` (also `async with`)"""
+        return Span(self, name, labels)
+
+    def record_error(self, error: Union[BaseException, str]):
+        """Mark the innermost open span failed, for code that catches its own exceptions"""
+        span = _current_span.get()
+        if span is not None:
+            span.fail(error)
+
+    def timed(self, name: str, **labels) -> Callable:
+        """Decorator recording each call of a sync or async function as a span"""
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name, **labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every metric's current samples; histograms report count, sum, mean, p50/p95/p99 and max in seconds"""
+        with self._lock:
+            metrics = list(self.metrics.values())
+        return {
+            metric.name: {
+                'type': metric.kind,
+                'description': metric.description,
+                'samples': metric.samples()
+            }
+            for metric in metrics
+        }
+
+    def latency_rows(self) -> List[Dict[str, Any]]:
+        """One row per histogram series in milliseconds, slowest p95 first (for tables and health details)"""
+        rows = []
+        for name, metric in self.snapshot().items():
+            if metric['type'] != 'histogram':
+                continue
+            for sample in metric['samples']:
+                if not sample['count']:
+                    continue
+                rows.append({
+                    'metric': name,
+                    'labels': ",".join(f"{k}={v}" for k, v in sample['labels'].items()),
+                    'count': sample['count'],
+                    'mean_ms': sample['mean'] * 1000,
+                    'p50_ms': sample['p50'] * 1000,
+                    'p95_ms': sample['p95'] * 1000,
+                    'p99_ms': sample['p99'] * 1000,
+                    'max_ms': sample['max'] * 1000
+                })
+        rows.sort(key=lambda row: row['p95_ms'], reverse=True)
+        return rows
+
+    def get_recent_spans(self, limit: int = 100, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        spans = [span for span in list(self.recent_spans) if name is None or span.name == name]
+        return [span.to_dict() for span in spans[-limit:]]
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            metrics = sorted(self.metrics.values(), key=lambda m: m.name)
+
+        for metric in metrics:
+            if metric.description:
+                lines.append(f"# HELP {metric.name} {_escape_help(metric.description)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+            with metric._lock:
+                items = list(metric.series.items())
+            for key, series in items:
+                labels = list(zip(metric.labelnames, key))
+                if metric.kind == 'histogram':
+                    count, total, cumulative = series.export_buckets()
+                    for bound, bucket_count in zip(EXPORT_BUCKETS, cumulative):
+                        lines.append(f"{metric.name}_bucket{_format_labels(labels + [('le', repr(bound))])} {bucket_count}")
+                    lines.append(f"{metric.name}_bucket{_format_labels(labels + [('le', '+Inf')])} {count}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {total!r}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {count}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(series.value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Drop every metric and recorded span (tests and fresh runs)"""
+        with self._lock:
+            self.metrics.clear()
+        self.recent_spans.clear()
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+def start_metrics_server(port: int = 9108, host: str = "127.0.0.1",
+                         registry: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    """Serve GET /metrics in Prometheus text format from a daemon thread"""
+    registry = registry or metrics
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would flood stderr
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+# Shared registry for the whole process
+metrics = MetricsRegistry()
+timed = metrics.timed
+span = metrics.span
@@ -7,9 +7,13 @@ Share Runner signals with multiple contacts
 import requests
 import json
 import asyncio
+import time
 from datetime import datetime
 import logging
 
+from async_utils import run_async_safe
+from notification_dispatcher import NotificationDispatcher
+
 class MultiTelegramBot:
     """TrenchCoat Pro multi-user Telegram bot"""
     
@@ -24,13 +28,16 @@ class MultiTelegramBot:
             "spangle": None  # Will get Chat ID when they message bot
         }
         
+        # Concurrent fan-out over a pooled session
+        self.dispatcher = NotificationDispatcher()
+        
     def add_recipient(self, name: str, chat_id: str):
         """Add new recipient for signals"""
         self.recipients[name] = chat_id
         print(f"Added {name} to signal recipients: {chat_id}")
         
-    def send_runner_alert_to_all(self, coin_data: dict) -> dict:
-        """Send Runner alert to all recipients"""
+    def render_runner_alert(self, coin_data: dict):
+        """Render the Runner alert text and keyboard once for every recipient"""
         
         symbol = coin_data.get('symbol', 'Unknown')
         price = coin_data.get('current_price', 0)
@@ -64,33 +71,54 @@ Signal by: TrenchCoat Pro AI
             ]]
         }
         
-        # Send to all recipients
-        results = {}
+        return message, keyboard
+    
+    async def broadcast(self, text: str, keyboard: dict = None) -> dict:
+        """Send one message to every recipient concurrently"""
+        
+        deliveries = await self.dispatcher.send_telegram(
+            self.bot_token,
+            self.recipients,
+            text,
+            keyboard=json.dumps(keyboard) if keyboard else None,
+            parse_mode="HTML",
+            started=time.perf_counter()
+        )
+        
+        results = {name: False for name in self.recipients}
+        for delivery in deliveries:
+            results[delivery.recipient] = delivery.success
+            print(f"Signal sent to {delivery.recipient}: {'✅' if delivery.success else '❌'} ({delivery.latency_ms:.0f}ms)")
+        
         for name, chat_id in self.recipients.items():
-            if chat_id:
-                success = self.send_message(chat_id, message, keyboard)
-                results[name] = success
-                print(f"Signal sent to {name}: {'✅' if success else '❌'}")
-            else:
-                results[name] = False
+            if not chat_id:
                 print(f"No Chat ID for {name} - skipped")
-                
+        
         return results
+    
+    async def send_runner_alert_to_all_async(self, coin_data: dict) -> dict:
+        """Send Runner alert to all recipients concurrently"""
+        message, keyboard = self.render_runner_alert(coin_data)
+        return await self.broadcast(message, keyboard)
+    
+    async def _broadcast_and_close(self, text: str, keyboard: dict = None) -> dict:
+        try:
+            return await self.broadcast(text, keyboard)
+        finally:
+            await self.dispatcher.close()
+        
+    def send_runner_alert_to_all(self, coin_data: dict) -> dict:
+        """Send Runner alert to all recipients"""
+        message, keyboard = self.render_runner_alert(coin_data)
+        return run_async_safe(self._broadcast_and_close(message, keyboard))
         
     def send_group_message(self, custom_message: str) -> dict:
         """Send custom message to all recipients"""
-        
-        results = {}
-        for name, chat_id in self.recipients.items():
-            if chat_id:
-                success = self.send_message(chat_id, custom_message)
-                results[name] = success
-                print(f"Message sent to {name}: {'✅' if success else '❌'}")
-            else:
-                results[name] = False
-                print(f"No Chat ID for {name} - skipped")
-                
-        return results
+        return run_async_safe(self._broadcast_and_close(custom_message))
+    
+    def get_delivery_latency(self) -> dict:
+        """Per-recipient delivery latency of recent alerts"""
+        return self.dispatcher.get_latency_stats()
         
     def send_message(self, chat_id: str, text: str, keyboard: dict = None) -> bool:
         """Send message to specific chat ID"""
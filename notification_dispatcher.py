@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+TrenchCoat Pro - Async Notification Dispatcher
+Concurrent fan-out of rendered alerts to every recipient over pooled
+connections, under each platform's rate limit, with per-recipient latency
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+from adaptive_rate_limiter import AdaptiveRateLimiter, RateLimitConfig
+from metrics_registry import metrics
+
+alert_send_seconds = metrics.histogram(
+    'alert_send_seconds', "Fan-out start to delivery, per recipient", ('platform',)
+)
+alerts_sent = metrics.counter('alerts_sent_total', "Alert deliveries by outcome", ('platform', 'result'))
+
+@dataclass
+class DeliveryResult:
+    """Outcome of one message to one recipient"""
+    platform: str
+    recipient: str
+    success: bool
+    latency_ms: float  # From the start of the fan-out to this recipient's delivery
+    status: Optional[int] = None
+    error: Optional[str] = None
+
+# Telegram allows about 30 messages/second per bot; Discord webhooks 5 requests per 2 seconds
+DEFAULT_PLATFORM_LIMITS = {
+    'telegram': RateLimitConfig(provider='telegram', requests_per_second=30.0, burst_size=30),
+    'discord': RateLimitConfig(provider='discord', requests_per_second=2.5, burst_size=5),
+    'email': RateLimitConfig(provider='email', requests_per_second=2.0, burst_size=5),
+}
+
+class NotificationDispatcher:
+    """
+    Sends one already-rendered payload to many recipients at once.
+    Connections and rate limiters belong to the event loop they were created
+    on, so each loop using the dispatcher (e.g. a caller's loop and the alert
+    coalescer's timer loop) gets its own; a loop's session is closed once
+    that loop has closed.
+    """
+
+    def __init__(self, platform_limits: Optional[Dict[str, RateLimitConfig]] = None,
+                 max_connections: int = 100, timeout: float = 10, latency_window: int = 100):
+        self.platform_limits = dict(DEFAULT_PLATFORM_LIMITS)
+        self.platform_limits.update(platform_limits or {})
+        self.max_connections = max_connections
+        self.timeout = timeout
+
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._limiters: Dict[asyncio.AbstractEventLoop, Dict[str, AdaptiveRateLimiter]] = {}
+
+        # (platform, recipient) -> recent latencies in ms
+        self.latency_window = latency_window
+        self.recipient_latency: Dict[Tuple[str, str], deque] = {}
+        self.recipient_failures: Dict[Tuple[str, str], int] = {}
+
+    async def _bind_loop(self) -> aiohttp.ClientSession:
+        """The running loop's session; sessions left on loops that have since closed are closed here"""
+        loop = asyncio.get_running_loop()
+        for stale in [other for other in list(self._sessions) if other is not loop and other.is_closed()]:
+            self._limiters.pop(stale, None)
+            await self._close_session(self._sessions.pop(stale, None))
+        
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self._sessions[loop] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return session
+
+    def _limiter(self, platform: str) -> Optional[AdaptiveRateLimiter]:
+        config = self.platform_limits.get(platform)
+        if config is None:
+            return None
+        limiters = self._limiters.setdefault(asyncio.get_running_loop(), {})
+        limiter = limiters.get(platform)
+        if limiter is None:
+            limiter = limiters[platform] = AdaptiveRateLimiter(config)
+        return limiter
+
+    @staticmethod
+    async def _close_session(session: Optional[aiohttp.ClientSession]):
+        if session is None or session.closed:
+            return
+        try:
+            await session.close()
+        except Exception:
+            # A closed loop cannot schedule its transports' shutdown; the session is still marked closed
+            pass
+
+    async def close(self):
+        """Close every loop's session; ones on other running loops are closed on those loops"""
+        current = asyncio.get_running_loop()
+        sessions, self._sessions = self._sessions, {}
+        self._limiters = {}
+        for loop, session in sessions.items():
+            if loop is not current and loop.is_running():
+                asyncio.run_coroutine_threadsafe(self._close_session(session), loop)
+            else:
+                await self._close_session(session)
+
+    def _record(self, result: DeliveryResult) -> DeliveryResult:
+        alert_send_seconds.labels(platform=result.platform).observe(result.latency_ms / 1000)
+        alerts_sent.labels(platform=result.platform, result='ok' if result.success else 'failed').inc()
+        
+        key = (result.platform, result.recipient)
+        history = self.recipient_latency.get(key)
+        if history is None:
+            history = self.recipient_latency[key] = deque(maxlen=self.latency_window)
+        history.append(result.latency_ms)
+        if not result.success:
+            self.recipient_failures[key] = self.recipient_failures.get(key, 0) + 1
+        return result
+
+    async def post_json(self, platform: str, recipient: str, url: str, payload: Dict[str, Any],
+                        started: Optional[float] = None,
+                        is_success: Optional[Callable[[int, Any], bool]] = None) -> DeliveryResult:
+        """POST one payload; `is_success(status, body)` overrides the 2xx check"""
+        session = await self._bind_loop()
+        started = started if started is not None else time.perf_counter()
+
+        limiter = self._limiter(platform)
+        if limiter:
+            await limiter.acquire()
+
+        status = None
+        try:
+            async with session.post(url, json=payload) as response:
+                status = response.status
+                if is_success:
+                    body = await response.json(content_type=None)
+                    success = bool(is_success(status, body))
+                else:
+                    success = 200 <= status < 300
+                error = None if success else f"HTTP {status}"
+                if status == 429 and limiter:
+                    limiter.report_violation()
+        except Exception as e:
+            success, error = False, str(e) or type(e).__name__
+
+        return self._record(DeliveryResult(
+            platform=platform,
+            recipient=recipient,
+            success=success,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            status=status,
+            error=error
+        ))
+
+    async def run_blocking(self, platform: str, recipient: str, func: Callable[..., Any], *args,
+                           started: Optional[float] = None) -> DeliveryResult:
+        """Run a blocking sender (e.g. SMTP) in a worker thread so it never stalls the fan-out"""
+        await self._bind_loop()
+        started = started if started is not None else time.perf_counter()
+
+        limiter = self._limiter(platform)
+        if limiter:
+            await limiter.acquire()
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(None, func, *args)
+            success, error = result is not False, None
+        except Exception as e:
+            success, error = False, str(e) or type(e).__name__
+
+        return self._record(DeliveryResult(
+            platform=platform,
+            recipient=recipient,
+            success=success,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            error=error
+        ))
+
+    async def send_telegram(self, bot_token: str, recipients: Dict[str, Optional[str]], text: str,
+                            keyboard: Optional[str] = None, parse_mode: Optional[str] = None,
+                            started: Optional[float] = None,
+                            base_url: str = "https://api.telegram.org") -> List[DeliveryResult]:
+        """Send one rendered message to every chat concurrently; recipients without a chat ID are skipped"""
+        started = started if started is not None else time.perf_counter()
+        url = f"{base_url}/bot{bot_token}/sendMessage"
+
+        base_payload = {"text": text}
+        if parse_mode:
+            base_payload["parse_mode"] = parse_mode
+        if keyboard:
+            base_payload["reply_markup"] = keyboard
+
+        return list(await asyncio.gather(*[
+            self.post_json('telegram', name, url, {**base_payload, "chat_id": chat_id}, started,
+                           is_success=lambda status, body: status == 200 and body.get("ok", False))
+            for name, chat_id in recipients.items() if chat_id
+        ]))
+
+    async def send_discord(self, webhooks: Dict[str, str], payload: Dict[str, Any],
+                           started: Optional[float] = None) -> List[DeliveryResult]:
+        """Post the same payload to several webhooks concurrently"""
+        started = started if started is not None else time.perf_counter()
+        return list(await asyncio.gather(*[
+            self.post_json('discord', name, url, payload, started)
+            for name, url in webhooks.items()
+        ]))
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Delivery latency per platform:recipient over the recent window"""
+        stats = {}
+        for (platform, recipient), history in self.recipient_latency.items():
+            latencies = np.array(history)
+            stats[f"{platform}:{recipient}"] = {
+                'deliveries': len(latencies),
+                'failures': self.recipient_failures.get((platform, recipient), 0),
+                'last_ms': float(latencies[-1]),
+                'avg_ms': float(latencies.mean()),
+                'p95_ms': float(np.percentile(latencies, 95))
+            }
+        return stats
+
+# Shared dispatcher so every notifier reuses the same connection pool and limits
+notification_dispatcher = NotificationDispatcher()
@@ -26,32 +26,32 @@ async def populate_top_coins_images():
     
     print(f"Fetching images for {len(coins)} top coins...")
     
-    # Fetch images
+    # Fetch images concurrently; thumbnails are stored locally under data/coin_images
+    await coin_image_system.batch_fetch_images([{'ticker': ticker, 'ca': ca} for ticker, ca in coins])
+    
+    # Results are keyed by ticker only; read each coin's own entry so coins sharing a ticker keep their images
+    updates = []
     for ticker, ca in coins:
-        try:
-            print(f"Fetching image for {ticker}...")
-            coin_image = await coin_image_system.fetch_coin_image(ticker, ca)
-            
-            # Update database
-            conn = sqlite3.connect('data/trench.db')
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-            UPDATE coins 
-            SET image_url = ?, image_source = ?, image_verified = ?
-            WHERE ticker = ? AND ca = ?
-            """, (coin_image.image_url, coin_image.image_source, coin_image.verified, ticker, ca))
-            
-            conn.commit()
-            conn.close()
-            
-            print(f"  -> {coin_image.image_url[:50]}... from {coin_image.image_source}")
-            
-        except Exception as e:
-            print(f"  -> Error: {e}")
-        
-        # Rate limiting
-        await asyncio.sleep(1)
+        entry = coin_image_system.metadata.get(coin_image_system.get_cache_key(ticker, ca))
+        if entry is None:
+            print(f"  {ticker} -> Error: no image resolved")
+            continue
+        updates.append((entry['image_url'], entry['image_source'], entry.get('verified', False), ticker, ca))
+        local = entry.get('cached_path') or 'remote only'
+        print(f"  {ticker} -> {entry['image_url'][:50]}... from {entry['image_source']} ({local})")
+    
+    # Update database in one transaction
+    conn = sqlite3.connect('data/trench.db')
+    cursor = conn.cursor()
+    
+    cursor.executemany("""
+    UPDATE coins 
+    SET image_url = ?, image_source = ?, image_verified = ?
+    WHERE ticker = ? AND ca = ?
+    """, updates)
+    
+    conn.commit()
+    conn.close()
     
     print("Image population complete!")
 
@@ -16,6 +16,7 @@ from typing import Dict, List, Optional, Tuple
 import json
 import requests
 from dataclasses import dataclass
+from candle_service import get_candle_service, lttb
 
 @dataclass
 class ChartConfig:
@@ -30,6 +31,7 @@ class ChartConfig:
     background_color: str = "rgba(15, 20, 25, 0.95)"
     grid_color: str = "rgba(255, 255, 255, 0.1)"
     font_family: str = "Inter, system-ui, sans-serif"
+    max_points: int = 1000  # Roughly the plot width in pixels; longer series are downsampled
 
 class PremiumChartSystem:
     """
@@ -40,6 +42,7 @@ class PremiumChartSystem:
         self.db_path = db_path
         self.config = ChartConfig()
         self.chart_cache = {}
+        self.candle_service = get_candle_service()
         
     def get_coin_data(self, ticker: str = None, limit: int = 100) -> pd.DataFrame:
         """Retrieve coin data from database"""
@@ -76,6 +79,15 @@ class PremiumChartSystem:
         """
         fig = go.Figure()
         
+        # Prefer real rolled-up candles when the candle service has this coin
+        ticker = coin_data.get('ticker')
+        if not historical_data and ticker and self.candle_service.has_data(ticker):
+            line = self.candle_service.get_line(ticker, max_points=self.config.max_points)
+            historical_data = [
+                {"date": datetime.fromtimestamp(int(ts)).isoformat(), "price": float(price), "volume": float(volume)}
+                for ts, price, volume in zip(line['timestamp'], line['price'], line['volume'])
+            ]
+        
         # Sample data for demonstration (in production, use real historical data)
         if not historical_data:
             # Generate sample historical data
@@ -101,6 +113,19 @@ class PremiumChartSystem:
         prices = [item["price"] for item in historical_data]
         volumes = [item.get("volume", 0) for item in historical_data]
         
+        # Moving averages use the full series; only the plotted points are thinned
+        ma7 = pd.Series(prices).rolling(window=7).mean()
+        ma14 = pd.Series(prices).rolling(window=14).mean()
+        recent_prices = prices[-14:] if len(prices) >= 14 else prices
+        
+        if len(prices) > self.config.max_points:
+            keep = lttb(np.array([d.timestamp() for d in dates]), np.array(prices), self.config.max_points)
+            dates = [dates[i] for i in keep]
+            prices = [prices[i] for i in keep]
+            volumes = [volumes[i] for i in keep]
+            ma7 = ma7.iloc[keep].reset_index(drop=True)
+            ma14 = ma14.iloc[keep].reset_index(drop=True)
+        
         # Main price line with gradient fill
         fig.add_trace(go.Scatter(
             x=dates,
@@ -134,8 +159,7 @@ class PremiumChartSystem:
         ))
         
         # Add moving averages
-        if len(prices) >= 7:
-            ma7 = pd.Series(prices).rolling(window=7).mean()
+        if ma7.notna().any():
             fig.add_trace(go.Scatter(
                 x=dates,
                 y=ma7,
@@ -152,8 +176,7 @@ class PremiumChartSystem:
                              '<extra></extra>'
             ))
         
-        if len(prices) >= 14:
-            ma14 = pd.Series(prices).rolling(window=14).mean()
+        if ma14.notna().any():
             fig.add_trace(go.Scatter(
                 x=dates,
                 y=ma14,
@@ -171,7 +194,6 @@ class PremiumChartSystem:
             ))
         
         # Calculate support and resistance levels
-        recent_prices = prices[-14:] if len(prices) >= 14 else prices
         resistance = max(recent_prices)
         support = min(recent_prices)
         
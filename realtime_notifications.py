@@ -11,6 +11,8 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+from alert_coalescer import alert_coalescer
+
 class NotificationManager:
     """Unified notification system for TrenchCoat Pro"""
     
@@ -31,6 +33,10 @@ class NotificationManager:
         """Setup Discord notifications"""
         self.discord_webhook = webhook_url
         
+    async def shutdown(self):
+        """Send merged alerts still waiting on their window and save coalescer state"""
+        await alert_coalescer.drain()
+        
     def setup_whatsapp(self, api_key: str):
         """Setup WhatsApp Business API"""
         self.whatsapp_api_key = api_key
@@ -38,23 +44,31 @@ class NotificationManager:
     async def notify_runner_found(self, coin_data: Dict):
         """Send immediate notification when Runner is identified"""
         
-        # Create rich notification content
-        message = self._format_runner_alert(coin_data)
+        symbol = coin_data.get('symbol', 'UNKNOWN')
         
-        # Send to all enabled channels simultaneously
+        # Send to all enabled channels simultaneously; repeats within the
+        # coalescing window are merged and re-rendered with the latest numbers
         tasks = []
         
         if self.telegram_bot_token:
-            tasks.append(self._send_telegram(message, coin_data))
+            tasks.append(alert_coalescer.submit(
+                symbol, 'runner', f"telegram:{self.telegram_chat_id}", coin_data,
+                lambda data: self._send_telegram(self._format_runner_alert(data), data)))
             
         if self.discord_webhook:
-            tasks.append(self._send_discord(message, coin_data))
+            tasks.append(alert_coalescer.submit(
+                symbol, 'runner', self.discord_webhook, coin_data,
+                lambda data: self._send_discord(self._format_runner_alert(data), data)))
             
         if self.whatsapp_api_key:
-            tasks.append(self._send_whatsapp(message))
+            tasks.append(alert_coalescer.submit(
+                symbol, 'runner', 'whatsapp', coin_data,
+                lambda data: self._send_whatsapp(self._format_runner_alert(data))))
             
         if self.push_service_key:
-            tasks.append(self._send_push_notification(message, coin_data))
+            tasks.append(alert_coalescer.submit(
+                symbol, 'runner', 'push', coin_data,
+                lambda data: self._send_push_notification(self._format_runner_alert(data), data)))
             
         # Execute all notifications concurrently
         if tasks:
@@ -236,6 +250,7 @@ async def main():
     
     # Send notification
     await notifier.notify_runner_found(runner_data)
+    await notifier.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+TrenchCoat Pro - Sampling Profiler
+Opt-in, low-overhead stack sampling for long-running workers: every thread
+and every suspended asyncio task is sampled for a time window, then written
+as collapsed stacks, a flamegraph SVG and a hot-function summary
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import Counter
+from datetime import datetime
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PROFILE_DIR = Path(__file__).resolve().parent / "data" / "profiles"
+CONTROL_FILE_NAME = "control.json"
+
+Stack = Tuple[str, ...]
+
+def _coroutine_frames(coro) -> List[Any]:
+    """Frames of a suspended coroutine chain, outermost first"""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+    return frames
+
+class SamplingProfiler:
+    """
+    Samples stacks from a background thread while a capture is running;
+    nothing is hooked into the profiled code, so an idle profiler costs
+    nothing. Captures start and stop on demand (API, signal, or a control
+    file written by the admin command center).
+    """
+
+    def __init__(self, interval: float = 0.01, output_dir: Path = PROFILE_DIR,
+                 max_duration: float = 600.0):
+        self.interval = interval
+        self.output_dir = Path(output_dir)
+        self.max_duration = max_duration
+        self.targets: set = set()  # Worker names this process answers admin requests for
+
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.last_summary: Optional[Dict[str, Any]] = None
+
+        self._loops: "weakref.WeakSet[asyncio.AbstractEventLoop]" = weakref.WeakSet()
+        self._labels: Dict[Any, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._control_thread: Optional[threading.Thread] = None
+        self._signal_installed = False
+        self._handled_request: Optional[str] = None
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def name(self) -> str:
+        return "+".join(sorted(self.targets)) or "process"
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def watch_loop(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Also sample the suspended tasks of `loop` (default: the running loop)"""
+        self._loops.add(loop or asyncio.get_running_loop())
+
+    def start(self, duration: Optional[float] = None) -> bool:
+        """Begin a capture; it stops by itself after `duration` seconds (capped at max_duration)"""
+        with self._lock:
+            if self.running:
+                return False
+            self.stacks = Counter()
+            self.samples = 0
+            self.started_at = time.time()
+            self._stop.clear()
+            duration = min(duration or self.max_duration, self.max_duration)
+            self._thread = threading.Thread(
+                target=self._run, args=(duration,), name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+        self.logger.info(f"Profiler capture started for {self.name} ({duration:.0f}s)")
+        return True
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """End the capture, write its files and return the summary"""
+        thread = self._thread
+        if thread is None:
+            return None
+        self._stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
+        return self.last_summary
+
+    def toggle(self, duration: Optional[float] = None) -> bool:
+        """Start a capture, or stop the running one; True if a capture is now running"""
+        if self.running:
+            self.stop()
+            return False
+        return self.start(duration)
+
+    def _run(self, duration: float):
+        own_threads = {threading.get_ident()}
+        deadline = time.monotonic() + duration
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            self._sample(own_threads)
+            self._stop.wait(self.interval)
+        with self._lock:
+            try:
+                self.last_summary = self._write()
+            except OSError as e:
+                self.logger.error(f"Could not write profile: {e}")
+            self._thread = None
+
+    def _label(self, frame) -> str:
+        code = frame.f_code
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+        return label
+
+    def _sample(self, skip_threads: Iterable[int]):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id in skip_threads or thread_id == getattr(self._control_thread, 'ident', None):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            stack.append(f"thread:{names.get(thread_id, thread_id)}")
+            self.stacks[tuple(reversed(stack))] += 1
+
+        # Suspended tasks show where coroutines are waiting; the running one is already in its thread's stack
+        for loop in list(self._loops):
+            if loop.is_closed():
+                continue
+            try:
+                tasks = list(asyncio.all_tasks(loop))
+                current = asyncio.current_task(loop)
+            except RuntimeError:
+                continue  # Task set changed mid-iteration; catch it next sample
+            for task in tasks:
+                if task is current or task.done():
+                    continue
+                coro = task.get_coro()
+                frames = _coroutine_frames(coro)
+                if frames:
+                    root = f"task:{getattr(coro, '__qualname__', task.get_name())}"
+                    self.stacks[(root,) + tuple(self._label(f) for f in frames)] += 1
+        self.samples += 1
+
+    def summary(self, top: int = 25) -> Dict[str, Any]:
+        """Hottest functions by self samples (leaf) and total samples (anywhere on the stack)"""
+        self_counts, total_counts = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack[-1]] += count
+            for label in set(stack[1:]):
+                total_counts[label] += count
+        stack_total = sum(self.stacks.values()) or 1
+        return {
+            'name': self.name,
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            'duration_seconds': time.time() - self.started_at if self.started_at else 0,
+            'samples': self.samples,
+            'interval_seconds': self.interval,
+            'top_self': [
+                {'function': label, 'samples': count, 'percent': count / stack_total * 100}
+                for label, count in self_counts.most_common(top)
+            ],
+            'top_total': [
+                {'function': label, 'samples': count, 'percent': count / stack_total * 100}
+                for label, count in total_counts.most_common(top)
+            ]
+        }
+
+    def _write(self) -> Dict[str, Any]:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.name}_{datetime.fromtimestamp(self.started_at).strftime('%Y%m%d_%H%M%S')}"
+        folded_path = self.output_dir / f"{stem}.folded"
+        svg_path = self.output_dir / f"{stem}.svg"
+        summary_path = self.output_dir / f"{stem}_summary.json"
+
+        with open(folded_path, 'w') as f:
+            f.write(collapse_stacks(self.stacks))
+        with open(svg_path, 'w') as f:
+            f.write(render_flamegraph_svg(self.stacks, title=f"{self.name} - {self.samples} samples"))
+
+        summary = self.summary()
+        summary.update({'folded_path': str(folded_path), 'svg_path': str(svg_path)})
+        with open(summary_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        self.logger.info(f"Profile written to {folded_path}")
+        return summary
+
+    def install_signal_handler(self, signum: Optional[int] = None, duration: float = 60.0) -> bool:
+        """Toggle captures with a signal (SIGUSR2 by default; POSIX main thread only)"""
+        signum = signum if signum is not None else getattr(signal, 'SIGUSR2', None)
+        if signum is None or self._signal_installed:
+            return self._signal_installed
+
+        def handler(_signum, _frame):
+            # Writing files does not belong in a signal handler
+            if self.running:
+                threading.Thread(target=self.stop, daemon=True).start()
+            else:
+                self.start(duration)
+
+        try:
+            signal.signal(signum, handler)
+        except ValueError:
+            return False  # Not the main thread
+        self._signal_installed = True
+        return True
+
+    def enable_remote_control(self, poll_interval: float = 2.0):
+        """Follow start/stop requests written by request_profile() / stop_profiles()"""
+        if self._control_thread is not None:
+            return
+        control_file = self.output_dir / CONTROL_FILE_NAME
+
+        # Requests issued before this worker started are not for it
+        request = _read_control(control_file)
+        self._handled_request = request.get('request_id') if request else None
+
+        def poll():
+            last_mtime = None
+            while True:
+                try:
+                    mtime = control_file.stat().st_mtime
+                except OSError:
+                    mtime = None
+                if mtime is not None and mtime != last_mtime:
+                    last_mtime = mtime
+                    self._handle_request(_read_control(control_file))
+                time.sleep(poll_interval)
+
+        self._control_thread = threading.Thread(target=poll, name="profiler-control", daemon=True)
+        self._control_thread.start()
+
+    def _handle_request(self, request: Optional[Dict[str, Any]]):
+        if not request or request.get('request_id') == self._handled_request:
+            return
+        self._handled_request = request.get('request_id')
+        targets = request.get('targets')
+        if targets and not self.targets.intersection(targets):
+            return
+        if request.get('action') == 'start':
+            self.start(request.get('duration'))
+        elif request.get('action') == 'stop' and self.running:
+            self.stop()
+
+def _read_control(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def collapse_stacks(stacks: Counter) -> str:
+    """Brendan Gregg's collapsed format (`root;child;leaf count`), readable by flamegraph.pl and speedscope"""
+    return "".join(
+        f"{';'.join(label.replace(';', ':') for label in stack)} {count}\n"
+        for stack, count in sorted(stacks.items())
+    )
+
+def render_flamegraph_svg(stacks: Counter, title: str = "Flame Graph", width: int = 1200,
+                          frame_height: int = 16) -> str:
+    """Self-contained flamegraph SVG (hover a frame for its sample count)"""
+    # Merge stacks into a tree: label -> [count, children]
+    root = [0, {}]
+    for stack, count in stacks.items():
+        root[0] += count
+        node = root
+        for label in stack:
+            node = node[1].setdefault(label, [0, {}])
+            node[0] += count
+
+    def depth(node) -> int:
+        return 1 + max((depth(child) for child in node[1].values()), default=0)
+
+    total = root[0] or 1
+    levels = depth(root) - 1
+    top = 30
+    height = top + levels * frame_height + 10
+    scale = (width - 20) / total
+    rects = []
+
+    def draw(node, x: float, level: int):
+        for label, child in sorted(node[1].items()):
+            w = child[0] * scale
+            if w >= 0.5:
+                y = height - 10 - (level + 1) * frame_height
+                hue = int(hashlib.md5(label.encode('utf-8')).hexdigest()[:4], 16)
+                color = f"rgb({205 + hue % 50},{80 + hue % 130},{hue % 60})"
+                text = escape(label[:int(w / 7)]) if w > 30 else ""
+                rects.append(
+                    f'<g><title>{escape(label)} ({child[0]} samples, {child[0] / total:.1%})</title>'
+                    f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{frame_height - 1}" fill="{color}" rx="2"/>'
+                    f'<text x="{x + 3:.1f}" y="{y + frame_height - 4}">{text}</text></g>'
+                )
+                draw(child, x, level + 1)
+            x += w
+
+    draw(root, 10.0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="Verdana" font-size="11">'
+        f'<rect width="100%" height="100%" fill="#f8f8f8"/>'
+        f'<text x="{width / 2}" y="20" text-anchor="middle" font-size="15">{escape(title)}</text>'
+        + "".join(rects) +
+        '</svg>\n'
+    )
+
+def request_profile(duration: float = 60.0, targets: Optional[List[str]] = None,
+                    output_dir: Path = PROFILE_DIR) -> str:
+    """Ask running workers (all, or those named in `targets`) to start a capture"""
+    return _write_control({'action': 'start', 'duration': duration, 'targets': targets}, output_dir)
+
+def stop_profiles(targets: Optional[List[str]] = None, output_dir: Path = PROFILE_DIR) -> str:
+    """Ask running workers to end their captures early"""
+    return _write_control({'action': 'stop', 'targets': targets}, output_dir)
+
+def _write_control(request: Dict[str, Any], output_dir: Path) -> str:
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    request.update({'request_id': uuid.uuid4().hex, 'requested_at': datetime.now().isoformat()})
+    temp_path = output_dir / f"{CONTROL_FILE_NAME}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(request, f)
+    os.replace(temp_path, output_dir / CONTROL_FILE_NAME)
+    return request['request_id']
+
+def list_profiles(limit: int = 20, output_dir: Path = PROFILE_DIR) -> List[Dict[str, Any]]:
+    """Summaries of the most recent captures, newest first"""
+    summaries = []
+    paths = sorted(Path(output_dir).glob("*_summary.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in paths[:limit]:
+        try:
+            with open(path, 'r') as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return summaries
+
+# One profiler per process
+sampling_profiler = SamplingProfiler()
+
+def profile_worker(name: str) -> SamplingProfiler:
+    """
+    Register a long-running worker with this process's profiler: it will
+    answer admin requests addressed to `name`, toggle on SIGUSR2, and (when
+    called from a coroutine) sample the worker's asyncio tasks
+    """
+    sampling_profiler.targets.add(name)
+    sampling_profiler.enable_remote_control()
+    sampling_profiler.install_signal_handler()
+    try:
+        sampling_profiler.watch_loop()
+    except RuntimeError:
+        pass  # Not inside an event loop
+    return sampling_profiler
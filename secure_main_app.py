@@ -267,6 +267,7 @@ from src.sentiment.multi_platform_monitor import render_sentiment_analysis_inter
 from src.training.toe_in_water import render_toe_in_water_interface
 from src.training.daily_improvement_cycle import render_daily_improvement_interface
 from src.macro.market_health_analyzer import render_macro_market_intelligence
+from sampling_profiler import list_profiles, request_profile, stop_profiles
 
 class SecureTrenchCoatApp:
     """Main secure application"""
@@ -376,6 +377,60 @@ class SecureTrenchCoatApp:
             
             return selected_page
     
+    def render_profiler_controls(self):
+        """Start/stop sampling captures on the running workers and browse the results"""
+        st.subheader("🔬 Profiler")
+        
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            duration = st.number_input("Capture seconds", min_value=5, max_value=600, value=60, step=5)
+        with col2:
+            targets = st.multiselect(
+                "Workers (empty = all)",
+                ['master_enricher', 'automated_trader', 'hunt_hub_scanner', 'alpha_radar', 'event_bus']
+            )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("▶️ Start Capture", use_container_width=True):
+                request_profile(duration, targets or None)
+                st.success(f"🔬 Capture requested for {', '.join(targets) or 'all workers'} ({duration}s)")
+        with col2:
+            if st.button("⏹️ Stop Capture", use_container_width=True):
+                stop_profiles(targets or None)
+                st.info("⏹️ Stop requested; profiles appear below once written")
+        
+        profiles = list_profiles(limit=10)
+        if not profiles:
+            st.caption("No profiles captured yet")
+            return
+        
+        st.dataframe([{
+            'Worker': p['name'],
+            'Started': p['started_at'],
+            'Seconds': round(p['duration_seconds'], 1),
+            'Samples': p['samples'],
+            'Hottest': p['top_self'][0]['function'] if p['top_self'] else '-'
+        } for p in profiles], use_container_width=True)
+        
+        latest = profiles[0]
+        st.markdown(f"**Top hot functions — {latest['name']} ({latest['started_at']})**")
+        st.dataframe([{
+            'Function': row['function'],
+            'Self %': round(row['percent'], 1),
+            'Total %': round(next((t['percent'] for t in latest['top_total']
+                                   if t['function'] == row['function']), row['percent']), 1)
+        } for row in latest['top_self'][:15]], use_container_width=True)
+        
+        col1, col2 = st.columns(2)
+        for col, key, label, mime in ((col1, 'folded_path', "📄 Collapsed stacks", "text/plain"),
+                                      (col2, 'svg_path', "🔥 Flamegraph SVG", "image/svg+xml")):
+            path = Path(latest[key])
+            if path.exists():
+                with col:
+                    st.download_button(label, path.read_bytes(), file_name=path.name, mime=mime,
+                                       use_container_width=True)
+    
     def render_admin_command_center(self):
         """Special command center for Admin users"""
         username = st.session_state.get('username', '').upper()
@@ -445,6 +500,8 @@ class SecureTrenchCoatApp:
             if st.button("📊 Generate Intel Report", use_container_width=True):
                 st.info("📊 Comprehensive intelligence report generating...")
         
+        self.render_profiler_controls()
+        
         # Recent activity feed
         st.subheader("📡 Live Intelligence Feed")
         
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+TrenchCoat Pro - Hot-Path Snipe Executor
+Keeps Jupiter quotes and unsigned swap transactions pre-built for likely
+targets so that execution after a signal is just sign-and-send, and tracks
+signal-to-submit latency for every snipe
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Any, Union
+
+import numpy as np
+
+from async_utils import run_async_safe
+
+@dataclass
+class SnipeTarget:
+    """A token with a pre-built buy ready to go"""
+    token_address: str
+    sol_amount: float
+    max_slippage: float
+    added_at: float
+    prepared: Optional[Dict] = None  # Output of SolanaTrader.build_swap_transaction
+    refreshed_at: float = 0.0
+    refresh_failures: int = 0
+
+class SnipeExecutor:
+    """
+    Background pre-warmer plus sign-and-send execution for a SolanaTrader.
+    Watched targets get their quote and swap transaction rebuilt every
+    `refresh_interval` seconds; a snipe uses the prepared transaction when it
+    is younger than `max_quote_age`, otherwise it quotes and builds inline.
+    """
+
+    def __init__(self, trader,
+                 refresh_interval: float = 2.0,
+                 max_quote_age: float = 5.0,
+                 target_ttl: float = 600.0,
+                 fee_refresh_interval: float = 10.0,
+                 latency_window: int = 500):
+        self.trader = trader
+        self.refresh_interval = refresh_interval
+        # Jupiter quotes move fast and the baked-in blockhash expires after ~60s
+        self.max_quote_age = max_quote_age
+        self.target_ttl = target_ttl
+        self.fee_refresh_interval = fee_refresh_interval
+
+        self.targets: Dict[str, SnipeTarget] = {}
+        self.running = False
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.latencies_ms = deque(maxlen=latency_window)
+        self.stats = {
+            "hot_snipes": 0,
+            "cold_snipes": 0,
+            "failed_snipes": 0,
+            "refreshes": 0,
+            "refresh_failures": 0
+        }
+
+    # Target management
+
+    def watch(self, token_address: str, sol_amount: Optional[float] = None, max_slippage: float = 0.5):
+        """Start keeping a buy for this token pre-built"""
+        if sol_amount is None:
+            sol_amount = self.trader.min_trade_amount_sol
+        sol_amount = max(self.trader.min_trade_amount_sol, min(sol_amount, self.trader.max_trade_amount_sol))
+
+        target = self.targets.get(token_address)
+        if target:
+            target.sol_amount = sol_amount
+            target.max_slippage = max_slippage
+            target.added_at = time.time()
+        else:
+            self.targets[token_address] = SnipeTarget(token_address, sol_amount, max_slippage, time.time())
+
+    def unwatch(self, token_address: str):
+        self.targets.pop(token_address, None)
+
+    def is_hot(self, token_address: str) -> bool:
+        target = self.targets.get(token_address)
+        return bool(target and target.prepared and time.time() - target.refreshed_at <= self.max_quote_age)
+
+    # Background refresh
+
+    async def _prepare(self, target: SnipeTarget):
+        quote = await self.trader.get_quote(
+            input_mint=self.trader.tokens["SOL"],
+            output_mint=target.token_address,
+            amount=int(target.sol_amount * 1e9)
+        )
+        if not quote:
+            raise ValueError("no quote")
+
+        price_impact = float(quote.get("priceImpactPct", 0))
+        if abs(price_impact) > target.max_slippage:
+            # Keep the target but do not leave a stale hot transaction around
+            target.prepared = None
+            return
+
+        # Fee market for this route's pools and mints, so the hot transaction carries a competitive fee
+        await self.trader.refresh_compute_unit_price(quote, max_age=self.fee_refresh_interval)
+
+        prepared = await self.trader.build_swap_transaction(quote)
+        if not prepared:
+            raise ValueError("swap build failed")
+        prepared["price_impact"] = price_impact
+        target.prepared = prepared
+        target.refreshed_at = time.time()
+
+    async def refresh_once(self):
+        """Rebuild every watched target concurrently and drop expired ones"""
+        now = time.time()
+        for address in [a for a, t in self.targets.items() if now - t.added_at > self.target_ttl]:
+            del self.targets[address]
+
+        targets = list(self.targets.values())
+        results = await asyncio.gather(*(self._prepare(t) for t in targets), return_exceptions=True)
+
+        for target, result in zip(targets, results):
+            self.stats["refreshes"] += 1
+            if isinstance(result, Exception):
+                self.stats["refresh_failures"] += 1
+                target.refresh_failures += 1
+                logging.debug(f"Pre-build failed for {target.token_address}: {result}")
+            else:
+                target.refresh_failures = 0
+
+    async def run(self):
+        self.running = True
+        while self.running:
+            start = time.monotonic()
+            try:
+                await self.refresh_once()
+            except Exception as e:
+                logging.error(f"Snipe pre-warm cycle failed: {e}")
+            await asyncio.sleep(max(0.0, self.refresh_interval - (time.monotonic() - start)))
+
+    def start(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self.loop = asyncio.get_running_loop()
+            self._refresh_task = self.loop.create_task(self.run())
+        return self._refresh_task
+
+    def stop(self):
+        self.running = False
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+
+    # Execution
+
+    async def snipe(self, token_address: str, sol_amount: Optional[float] = None,
+                    signal_time: Optional[Union[float, datetime]] = None,
+                    wait_for_confirmation: bool = True) -> Dict[str, Any]:
+        """
+        Buy a token as fast as possible. `signal_time` (epoch seconds or datetime)
+        is when the signal arrived; signal-to-submit latency is measured from it.
+        """
+        if signal_time is None:
+            signal_time = time.time()
+        elif isinstance(signal_time, datetime):
+            signal_time = signal_time.timestamp()
+
+        target = self.targets.get(token_address)
+        hot = self.is_hot(token_address) and (sol_amount is None or abs(sol_amount - target.sol_amount) < 1e-9)
+
+        if hot:
+            prepared = target.prepared
+            # A prepared transaction is single-use
+            target.prepared = None
+            amount = target.sol_amount
+        else:
+            # Cold path: quote and build inline
+            amount = sol_amount if sol_amount is not None else (
+                target.sol_amount if target else self.trader.min_trade_amount_sol)
+            amount = max(self.trader.min_trade_amount_sol, min(amount, self.trader.max_trade_amount_sol))
+            cold_target = SnipeTarget(token_address, amount, target.max_slippage if target else 0.5, time.time())
+            try:
+                await self._prepare(cold_target)
+            except Exception as e:
+                self.stats["failed_snipes"] += 1
+                return {"status": "FAILED", "error": str(e), "path": "cold"}
+            prepared = cold_target.prepared
+            if prepared is None:
+                self.stats["failed_snipes"] += 1
+                return {"status": "FAILED", "error": "Price impact too high", "path": "cold"}
+
+        path = "hot" if hot else "cold"
+        tx_signature = await self.trader.send_signed_transaction(prepared["transaction_bytes"])
+        submit_ms = (time.time() - signal_time) * 1000
+
+        if not tx_signature:
+            self.stats["failed_snipes"] += 1
+            return {"status": "FAILED", "error": "Transaction failed", "path": path,
+                    "signal_to_submit_ms": submit_ms}
+
+        self.stats[f"{path}_snipes"] += 1
+        self.latencies_ms.append(submit_ms)
+        logging.info(f"{path.capitalize()} snipe submitted for {token_address} in {submit_ms:.0f}ms")
+
+        confirmed = None
+        if wait_for_confirmation:
+            confirmed = await self.trader._wait_for_confirmation(tx_signature)
+
+        return {
+            "type": "BUY",
+            "token_address": token_address,
+            "sol_amount": amount,
+            "expected_tokens": int(prepared["quote"]["outAmount"]),
+            "price_impact": prepared.get("price_impact", 0),
+            "transaction": tx_signature,
+            "timestamp": datetime.now().isoformat(),
+            "status": "SUCCESS",
+            "confirmed": confirmed,
+            "path": path,
+            "signal_to_submit_ms": submit_ms
+        }
+
+    def snipe_blocking(self, token_address: str, sol_amount: Optional[float] = None,
+                       signal_time: Optional[Union[float, datetime]] = None,
+                       timeout: float = 30.0) -> Dict[str, Any]:
+        """
+        snipe() for synchronous callers such as Streamlit pages, without waiting
+        for confirmation. Runs on the refresh loop while it is active so the
+        trader's connections are shared; otherwise quotes and sends on a
+        temporary loop. Must not be called from the refresh loop's own thread.
+        """
+        coro = self.snipe(token_address, sol_amount, signal_time, wait_for_confirmation=False)
+        if self.loop is not None and self.loop.is_running() and self._refresh_task and not self._refresh_task.done():
+            return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+        return run_async_safe(coro)
+
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """Signal-to-submit latency over the recent snipes"""
+        latencies = np.array(self.latencies_ms) if self.latencies_ms else np.empty(0)
+        return {
+            "count": len(latencies),
+            "last_ms": float(latencies[-1]) if len(latencies) else None,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else None,
+            "hot_targets": sum(1 for address in self.targets if self.is_hot(address)),
+            "watched_targets": len(self.targets),
+            **self.stats
+        }
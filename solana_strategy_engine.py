@@ -17,6 +17,8 @@ import logging
 from pathlib import Path
 import pickle
 import warnings
+
+from metrics_registry import metrics
 warnings.filterwarnings('ignore')
 
 # ML Imports
@@ -757,6 +759,7 @@ class SolanaStrategyEngine:
             }
         )
     
+    @metrics.timed('strategy_scan')
     def scan_for_signals(self) -> List[TradingSignal]:
         """Scan all coins for trading signals"""
         signals = []
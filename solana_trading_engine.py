@@ -7,30 +7,37 @@ Automated execution of Solana trades via Jupiter DEX
 import asyncio
 import json
 import base64
+import time
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 import requests
 import logging
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 from solders.transaction import Transaction
 from solana.rpc.async_api import AsyncClient
-from solana.rpc.commitment import Confirmed
 import aiohttp
+from confirmation_tracker import SignatureConfirmationTracker
 
 class SolanaTrader:
     """Professional Solana trading engine for TrenchCoat Pro"""
     
-    def __init__(self, rpc_endpoint: str = "https://api.mainnet-beta.solana.com"):
+    def __init__(self, rpc_endpoint: str = "https://api.mainnet-beta.solana.com",
+                 ws_endpoint: Optional[str] = None):
         self.rpc_endpoint = rpc_endpoint
+        self.ws_endpoint = ws_endpoint
         self.client = AsyncClient(rpc_endpoint)
+        # One tracker batches confirmation checks for every in-flight buy and sell
+        self.confirmations = SignatureConfirmationTracker(rpc_endpoint, ws_endpoint=ws_endpoint)
         self.jupiter_api = "https://quote-api.jup.ag/v6"
         
         # Trading configuration
         self.wallet_keypair = None
         self.wallet_pubkey = None
         self.slippage_bps = 50  # 0.5% slippage tolerance
-        self.priority_fee = 0.001  # SOL priority fee
+        self.priority_fee = 0.001  # SOL priority fee (floor; raised when the swap's accounts are contested)
+        self.dynamic_compute_unit_limit = False  # Let Jupiter simulate the swap to size its compute-unit limit
+        self.swap_compute_units = 300_000  # Typical Jupiter swap budget, converts CU prices to a total fee
         
         # Token addresses
         self.tokens = {
@@ -43,6 +50,75 @@ class SolanaTrader:
         self.max_trade_amount_sol = 0.1  # Maximum 0.1 SOL per trade
         self.min_trade_amount_sol = 0.01  # Minimum 0.01 SOL per trade
         
+        # Reused HTTP session (saves a TLS handshake per Jupiter call) and cached compute-unit price
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self._http_session_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Writable accounts of a swap -> (compute-unit price in micro-lamports, fetched at)
+        self.compute_unit_prices: Dict[frozenset, Tuple[int, float]] = {}
+        self.compute_unit_price_updated = 0.0
+        
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        # A session only works on the loop that created it (sync callers use a fresh loop per call)
+        if self._http_session is None or self._http_session.closed or self._http_session_loop is not loop:
+            self._http_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            self._http_session_loop = loop
+        return self._http_session
+        
+    @staticmethod
+    def swap_accounts(quote: Dict) -> List[str]:
+        """Writable accounts a swap locks: its mints and every pool on the route"""
+        accounts = {quote.get("inputMint"), quote.get("outputMint")}
+        for step in quote.get("routePlan", []):
+            info = step.get("swapInfo", {})
+            accounts.update((info.get("ammKey"), info.get("inputMint"), info.get("outputMint")))
+        accounts.discard(None)
+        return sorted(accounts)[:128]  # RPC limit for getRecentPrioritizationFees
+        
+    async def refresh_compute_unit_price(self, quote: Dict, max_age: float = 0.0,
+                                         percentile: float = 75) -> Optional[int]:
+        """
+        Cache the compute-unit price recently paid to write this swap's accounts.
+        With no accounts the RPC reports per-slot minimums (usually 0), so the
+        pools and mints are always passed.
+        """
+        accounts = self.swap_accounts(quote)
+        if not accounts:
+            return None
+        key = frozenset(accounts)
+        cached = self.compute_unit_prices.get(key)
+        if cached and time.time() - cached[1] < max_age:
+            return cached[0]
+        
+        try:
+            session = await self._get_http_session()
+            payload = {"jsonrpc": "2.0", "id": 1, "method": "getRecentPrioritizationFees", "params": [accounts]}
+            async with session.post(self.rpc_endpoint, json=payload) as response:
+                data = await response.json()
+            
+            fees = sorted(entry["prioritizationFee"] for entry in data.get("result", []))
+            if not fees:
+                return cached[0] if cached else None
+            index = min(len(fees) - 1, int(len(fees) * percentile / 100))
+            now = time.time()
+            if len(self.compute_unit_prices) >= 1000:
+                self.compute_unit_prices = {k: v for k, v in self.compute_unit_prices.items() if now - v[1] < 600}
+            self.compute_unit_prices[key] = (fees[index], now)
+            self.compute_unit_price_updated = now
+            return fees[index]
+            
+        except Exception as e:
+            logging.error(f"Failed to refresh compute unit price: {e}")
+            return cached[0] if cached else None
+        
+    def priority_fee_lamports(self, quote: Dict) -> int:
+        """Total priority fee for a swap: the configured fee, or the fee market for its accounts if higher"""
+        floor = int(self.priority_fee * 1e9)
+        cached = self.compute_unit_prices.get(frozenset(self.swap_accounts(quote)))
+        if cached is None:
+            return floor
+        return max(floor, cached[0] * self.swap_compute_units // 1_000_000)
+        
     def setup_wallet(self, private_key_base58: str):
         """Setup trading wallet from private key"""
         try:
@@ -102,14 +178,14 @@ class SolanaTrader:
                 "asLegacyTransaction": "false"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.jupiter_api}/quote", params=params) as response:
-                    if response.status == 200:
-                        quote_data = await response.json()
-                        return quote_data
-                    else:
-                        logging.error(f"Quote request failed: {response.status}")
-                        return None
+            session = await self._get_http_session()
+            async with session.get(f"{self.jupiter_api}/quote", params=params) as response:
+                if response.status == 200:
+                    quote_data = await response.json()
+                    return quote_data
+                else:
+                    logging.error(f"Quote request failed: {response.status}")
+                    return None
                         
         except Exception as e:
             logging.error(f"Failed to get quote: {e}")
@@ -118,79 +194,82 @@ class SolanaTrader:
     async def execute_swap(self, quote: Dict) -> Optional[str]:
         """Execute swap transaction using Jupiter"""
         
+        prepared = await self.build_swap_transaction(quote)
+        if not prepared:
+            return None
+        
+        tx_signature = await self.send_signed_transaction(prepared["transaction_bytes"])
+        if tx_signature:
+            # Wait for confirmation
+            await self._wait_for_confirmation(tx_signature)
+        
+        return tx_signature
+        
+    async def build_swap_transaction(self, quote: Dict) -> Optional[Dict]:
+        """Get the unsigned swap transaction for a quote from Jupiter (blockhash and compute budget included)"""
+        
         try:
             # Get swap transaction from Jupiter
             swap_request = {
                 "quoteResponse": quote,
                 "userPublicKey": str(self.wallet_pubkey),
                 "wrapAndUnwrapSol": True,
-                "prioritizationFeeLamports": int(self.priority_fee * 1e9)
+                "prioritizationFeeLamports": self.priority_fee_lamports(quote)
             }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.jupiter_api}/swap", 
-                    json=swap_request,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
+            if self.dynamic_compute_unit_limit:
+                swap_request["dynamicComputeUnitLimit"] = True
+            
+            session = await self._get_http_session()
+            async with session.post(
+                f"{self.jupiter_api}/swap", 
+                json=swap_request,
+                headers={"Content-Type": "application/json"}
+            ) as response:
+                
+                if response.status == 200:
+                    swap_data = await response.json()
+                    return {
+                        "quote": quote,
+                        "transaction_bytes": base64.b64decode(swap_data["swapTransaction"]),
+                        "last_valid_block_height": swap_data.get("lastValidBlockHeight"),
+                        "built_at": time.time()
+                    }
+                else:
+                    error_text = await response.text()
+                    logging.error(f"Swap request failed: {response.status} - {error_text}")
+                    return None
                     
-                    if response.status == 200:
-                        swap_data = await response.json()
-                        
-                        # Decode and sign transaction
-                        swap_transaction = swap_data["swapTransaction"]
-                        transaction_bytes = base64.b64decode(swap_transaction)
-                        transaction = Transaction.from_bytes(transaction_bytes)
-                        
-                        # Sign transaction
-                        transaction.sign([self.wallet_keypair])
-                        
-                        # Send transaction
-                        tx_response = await self.client.send_transaction(
-                            transaction, 
-                            opts={"skip_preflight": False, "max_retries": 3}
-                        )
-                        
-                        if tx_response.value:
-                            tx_signature = str(tx_response.value)
-                            
-                            # Wait for confirmation
-                            await self._wait_for_confirmation(tx_signature)
-                            
-                            return tx_signature
-                        else:
-                            logging.error("Failed to send transaction")
-                            return None
-                            
-                    else:
-                        error_text = await response.text()
-                        logging.error(f"Swap request failed: {response.status} - {error_text}")
-                        return None
-                        
+        except Exception as e:
+            logging.error(f"Failed to build swap: {e}")
+            return None
+            
+    async def send_signed_transaction(self, transaction_bytes: bytes) -> Optional[str]:
+        """Sign a prepared swap transaction and send it, returning the signature without waiting"""
+        
+        try:
+            # Decode and sign transaction
+            transaction = Transaction.from_bytes(transaction_bytes)
+            transaction.sign([self.wallet_keypair])
+            
+            # Send transaction
+            tx_response = await self.client.send_transaction(
+                transaction, 
+                opts={"skip_preflight": False, "max_retries": 3}
+            )
+            
+            if tx_response.value:
+                return str(tx_response.value)
+            
+            logging.error("Failed to send transaction")
+            return None
+            
         except Exception as e:
             logging.error(f"Failed to execute swap: {e}")
             return None
             
-    async def _wait_for_confirmation(self, signature: str, max_retries: int = 30):
+    async def _wait_for_confirmation(self, signature: str, timeout: float = 60.0) -> bool:
         """Wait for transaction confirmation"""
-        
-        for i in range(max_retries):
-            try:
-                response = await self.client.get_signature_status(signature)
-                if response.value and response.value[0]:
-                    status = response.value[0]
-                    if status.confirmation_status == Confirmed:
-                        logging.info(f"Transaction confirmed: {signature}")
-                        return True
-                        
-                await asyncio.sleep(2)  # Wait 2 seconds between checks
-                
-            except Exception as e:
-                logging.error(f"Error checking confirmation: {e}")
-                await asyncio.sleep(2)
-                
-        logging.warning(f"Transaction confirmation timeout: {signature}")
-        return False
+        return await self.confirmations.wait(signature, timeout)
         
     async def buy_token(self, token_address: str, sol_amount: float, max_slippage: float = 0.5) -> Optional[Dict]:
         """Buy token with SOL"""
@@ -376,6 +455,8 @@ Trade executed automatically by TrenchCoat Pro AI
             "wallet_connected": self.wallet_keypair is not None,
             "wallet_address": str(self.wallet_pubkey) if self.wallet_pubkey else None,
             "rpc_endpoint": self.rpc_endpoint,
+            "ws_endpoint": self.ws_endpoint,
+            "pending_confirmations": len(self.confirmations.pending),
             "max_trade_size": self.max_trade_amount_sol,
             "min_trade_size": self.min_trade_amount_sol,
             "slippage_tolerance": self.slippage_bps / 100,
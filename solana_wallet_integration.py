@@ -5,10 +5,336 @@ Solana Wallet Integration for Real Portfolio Tracking
 import streamlit as st
 import requests
 import json
-from typing import Dict, List, Any, Optional
+import asyncio
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+import aiohttp
 import pandas as pd
 
+from async_utils import run_async_safe
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+JUPITER_TOKEN_LIST_URL = "https://token.jup.ag/strict"
+
+def _loop_lock(owner: Any, attr: str) -> asyncio.Lock:
+    """Per-event-loop lock stored on `owner` (each asyncio.run call gets a fresh loop)"""
+    loop = asyncio.get_running_loop()
+    current = getattr(owner, attr, None)
+    if current is None or current[0] is not loop:
+        current = (loop, asyncio.Lock())
+        setattr(owner, attr, current)
+    return current[1]
+
+class TokenMetadataCache:
+    """
+    Persistent mint -> metadata cache. Token metadata practically never
+    changes, so entries live for a week and survive restarts on disk. The
+    file is read on first use, not at import.
+    """
+    
+    def __init__(self, path: Path = Path("data/token_metadata_cache.json"), ttl_seconds: float = 7 * 86400):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._loaded = False
+    
+    def _load(self):
+        if self._loaded:
+            return
+        with self.lock:
+            if self._loaded:
+                return
+            if self.path.exists():
+                try:
+                    # Entries put before the first read win over the file
+                    self.entries = {**json.loads(self.path.read_text()), **self.entries}
+                except (ValueError, OSError):
+                    pass
+            self._loaded = True
+    
+    def get(self, mint: str) -> Optional[Dict[str, Any]]:
+        self._load()
+        entry = self.entries.get(mint)
+        if entry and time.time() - entry.get('cached_at', 0) < self.ttl_seconds:
+            return entry['metadata']
+        return None
+    
+    def put(self, mint: str, metadata: Dict[str, Any]):
+        self._load()
+        with self.lock:
+            self.entries[mint] = {'metadata': metadata, 'cached_at': time.time()}
+            self._dirty = True
+    
+    def missing(self, mints: List[str]) -> List[str]:
+        return [mint for mint in dict.fromkeys(mints) if self.get(mint) is None]
+    
+    def save(self):
+        if not self._dirty:
+            return
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(self.entries))
+            tmp.replace(self.path)
+            self._dirty = False
+
+class SolPriceCache:
+    """SOL/USD price shared by every tracker, refreshed at most once per TTL"""
+    
+    def __init__(self, ttl_seconds: float = 30.0):
+        self.ttl_seconds = ttl_seconds
+        self.price: Optional[float] = None
+        self.updated_at = 0.0
+        self._lock = None
+    
+    def fresh(self) -> Optional[float]:
+        if self.price is not None and time.time() - self.updated_at < self.ttl_seconds:
+            return self.price
+        return None
+    
+    def set(self, price: float):
+        self.price = price
+        self.updated_at = time.time()
+    
+    async def get_async(self, session: aiohttp.ClientSession) -> float:
+        price = self.fresh()
+        if price is not None:
+            return price
+        
+        # Concurrent wallet refreshes share one lookup
+        async with _loop_lock(self, '_lock'):
+            price = self.fresh()
+            if price is not None:
+                return price
+            try:
+                async with session.get(f"https://price.jup.ag/v4/price?ids={SOL_MINT}") as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        if 'data' in data and SOL_MINT in data['data']:
+                            self.set(float(data['data'][SOL_MINT]['price']))
+                            return self.price
+                
+                async with session.get("https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd") as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        if 'solana' in data and 'usd' in data['solana']:
+                            self.set(float(data['solana']['usd']))
+                            return self.price
+            except Exception:
+                pass
+        
+        # Stale price beats the hard-coded default
+        return self.price if self.price is not None else 100.0
+
+# Shared across all trackers in the process
+token_metadata_cache = TokenMetadataCache()
+sol_price_cache = SolPriceCache()
+
+def _unknown_metadata(mint_address: str, decimals: int = 9) -> Dict[str, Any]:
+    return {
+        'symbol': mint_address[:8] + '...',
+        'name': 'Unknown Token',
+        'decimals': decimals,
+        'logoURI': ''
+    }
+
+class AsyncPortfolioEngine:
+    """
+    Async wallet portfolio fetcher. Balance and token accounts come from one
+    JSON-RPC batch request, metadata from the shared cache (Jupiter token list
+    plus getMultipleAccounts for mints it does not know), and many wallets
+    refresh concurrently.
+    """
+    
+    def __init__(self,
+                 rpc_endpoints: Optional[List[str]] = None,
+                 metadata_cache: Optional[TokenMetadataCache] = None,
+                 price_cache: Optional[SolPriceCache] = None,
+                 max_concurrent_wallets: int = 10):
+        self.rpc_endpoints = rpc_endpoints or [
+            "https://api.mainnet-beta.solana.com",
+            "https://solana-api.projectserum.com",
+            "https://rpc.ankr.com/solana"
+        ]
+        self.current_rpc = 0
+        self.metadata_cache = metadata_cache or token_metadata_cache
+        self.price_cache = price_cache or sol_price_cache
+        self.max_concurrent_wallets = max_concurrent_wallets
+        self.token_list_url = JUPITER_TOKEN_LIST_URL
+        self.token_list_ttl = 86400
+        self._token_index: Dict[str, Dict[str, Any]] = {}
+        self._token_index_loaded_at = 0.0
+        self._metadata_lock = None
+    
+    async def rpc_batch(self, session: aiohttp.ClientSession, calls: List[Tuple[str, list]]) -> List[Any]:
+        """Send several JSON-RPC calls in one HTTP request; results come back in call order"""
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        
+        last_error = None
+        start = self.current_rpc
+        for attempt in range(len(self.rpc_endpoints)):
+            # Walk from where this batch started so concurrent failures
+            # cannot advance the shared index past a working endpoint
+            index = (start + attempt) % len(self.rpc_endpoints)
+            rpc_url = self.rpc_endpoints[index]
+            try:
+                async with session.post(rpc_url, json=payload) as response:
+                    data = await response.json(content_type=None)
+                if not isinstance(data, list):
+                    # A single error object instead of per-call results means the
+                    # endpoint rejected the whole batch (rate limit, batching disabled)
+                    error = data.get('error') if isinstance(data, dict) else data
+                    raise ConnectionError(f"{rpc_url} rejected batch: {error}")
+                responses = {item.get('id'): item for item in data}
+                self.current_rpc = index
+                return [responses.get(i, {}).get('result') for i in range(len(calls))]
+            except Exception as e:
+                # Try next RPC endpoint
+                last_error = e
+        
+        raise ConnectionError(f"All RPC endpoints failed: {last_error}")
+    
+    async def _load_token_list(self, session: aiohttp.ClientSession, mints: List[str]):
+        """Fill the metadata cache for `mints` from the Jupiter token list (downloaded at most daily)"""
+        if time.time() - self._token_index_loaded_at > self.token_list_ttl:
+            self._token_index_loaded_at = time.time()
+            try:
+                async with session.get(self.token_list_url) as response:
+                    if response.status == 200:
+                        tokens = await response.json(content_type=None)
+                        self._token_index = {token.get('address'): token for token in tokens}
+            except Exception:
+                pass
+        
+        for mint in mints:
+            token = self._token_index.get(mint)
+            if token:
+                self.metadata_cache.put(mint, {
+                    'symbol': token.get('symbol', 'UNKNOWN'),
+                    'name': token.get('name', 'Unknown Token'),
+                    'decimals': token.get('decimals', 9),
+                    'logoURI': token.get('logoURI', '')
+                })
+    
+    async def _fetch_mint_accounts(self, session: aiohttp.ClientSession, mints: List[str]):
+        """Decimals for unlisted mints via getMultipleAccounts (100 mints per call, one batch request)"""
+        chunks = [mints[i:i + 100] for i in range(0, len(mints), 100)]
+        results = await self.rpc_batch(session, [
+            ("getMultipleAccounts", [chunk, {"encoding": "jsonParsed"}]) for chunk in chunks
+        ])
+        
+        for chunk, result in zip(chunks, results):
+            accounts = (result or {}).get('value') or [None] * len(chunk)
+            for mint, account in zip(chunk, accounts):
+                decimals = 9
+                try:
+                    decimals = account['data']['parsed']['info']['decimals']
+                except (KeyError, TypeError):
+                    pass
+                self.metadata_cache.put(mint, _unknown_metadata(mint, decimals))
+    
+    async def ensure_metadata(self, session: aiohttp.ClientSession, mints: List[str]):
+        if not self.metadata_cache.missing(mints):
+            return
+        
+        # Wallets refreshing concurrently often hold the same mints; fill them once
+        async with _loop_lock(self, '_metadata_lock'):
+            missing = self.metadata_cache.missing(mints)
+            if missing:
+                await self._load_token_list(session, missing)
+                missing = self.metadata_cache.missing(missing)
+            if missing:
+                await self._fetch_mint_accounts(session, missing)
+            self.metadata_cache.save()
+    
+    @staticmethod
+    def _parse_token_accounts(result: Optional[Dict]) -> List[Dict[str, Any]]:
+        tokens = []
+        for account in (result or {}).get('value', []):
+            try:
+                parsed_info = account['account']['data']['parsed']['info']
+                token_amount = parsed_info['tokenAmount']
+                
+                if float(token_amount['uiAmount'] or 0) > 0:
+                    tokens.append({
+                        'mint': parsed_info['mint'],
+                        'balance': float(token_amount['uiAmount']),
+                        'decimals': token_amount['decimals'],
+                        'account': account['pubkey']
+                    })
+            except (KeyError, ValueError, TypeError):
+                continue
+        return tokens
+    
+    async def get_portfolio(self, wallet_address: str,
+                            session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
+        """Get complete portfolio including SOL and SPL tokens"""
+        if session is None:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=20)) as own_session:
+                return await self.get_portfolio(wallet_address, own_session)
+        
+        try:
+            (balance, token_accounts), sol_price = await asyncio.gather(
+                self.rpc_batch(session, [
+                    ("getBalance", [wallet_address]),
+                    ("getTokenAccountsByOwner", [
+                        wallet_address,
+                        {"programId": TOKEN_PROGRAM_ID},
+                        {"encoding": "jsonParsed"}
+                    ])
+                ]),
+                self.price_cache.get_async(session)
+            )
+        except Exception as e:
+            return {
+                'wallet_address': wallet_address,
+                'timestamp': datetime.now().isoformat(),
+                'sol_balance': 0,
+                'sol_price_usd': self.price_cache.price or 100.0,
+                'tokens': [],
+                'total_tokens': 0,
+                'success': False,
+                'error': str(e)
+            }
+        
+        tokens = self._parse_token_accounts(token_accounts)
+        await self.ensure_metadata(session, [token['mint'] for token in tokens])
+        for token in tokens:
+            token.update(self.metadata_cache.get(token['mint']) or _unknown_metadata(token['mint']))
+        
+        success = balance is not None
+        return {
+            'wallet_address': wallet_address,
+            'timestamp': datetime.now().isoformat(),
+            'sol_balance': balance['value'] / 1_000_000_000 if success else 0,
+            'sol_price_usd': sol_price,
+            'tokens': tokens,
+            'total_tokens': len(tokens),
+            'success': success
+        }
+    
+    async def get_portfolios(self, wallet_addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Refresh several watched wallets concurrently over one HTTP session"""
+        semaphore = asyncio.Semaphore(self.max_concurrent_wallets)
+        
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=20)) as session:
+            async def fetch(address: str) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self.get_portfolio(address, session)
+            
+            portfolios = await asyncio.gather(*(fetch(address) for address in wallet_addresses))
+        
+        return dict(zip(wallet_addresses, portfolios))
+
 class SolanaWalletTracker:
     """Real Solana wallet portfolio tracking"""
     
@@ -19,6 +345,7 @@ class SolanaWalletTracker:
             "https://rpc.ankr.com/solana"
         ]
         self.current_rpc = 0
+        self.engine = AsyncPortfolioEngine(self.rpc_endpoints)
         
     def get_rpc_endpoint(self) -> str:
         """Get current RPC endpoint with fallback"""
@@ -120,28 +447,29 @@ class SolanaWalletTracker:
     
     def get_token_metadata(self, mint_address: str) -> Dict[str, Any]:
         """Get token metadata (symbol, name, etc.)"""
+        cached = token_metadata_cache.get(mint_address)
+        if cached:
+            return cached
+        
         try:
             # Using Jupiter API for token info
-            url = f"https://token.jup.ag/strict"
-            response = requests.get(url, timeout=10)
+            response = requests.get(JUPITER_TOKEN_LIST_URL, timeout=10)
             
             if response.status_code == 200:
                 tokens = response.json()
                 for token in tokens:
                     if token.get('address') == mint_address:
-                        return {
+                        metadata = {
                             'symbol': token.get('symbol', 'UNKNOWN'),
                             'name': token.get('name', 'Unknown Token'),
                             'decimals': token.get('decimals', 9),
                             'logoURI': token.get('logoURI', '')
                         }
+                        token_metadata_cache.put(mint_address, metadata)
+                        token_metadata_cache.save()
+                        return metadata
             
-            return {
-                'symbol': mint_address[:8] + '...',
-                'name': 'Unknown Token',
-                'decimals': 9,
-                'logoURI': ''
-            }
+            return _unknown_metadata(mint_address)
             
         except Exception:
             return {
@@ -153,16 +481,19 @@ class SolanaWalletTracker:
     
     def get_sol_price(self) -> float:
         """Get current SOL price in USD from Jupiter"""
+        cached = sol_price_cache.fresh()
+        if cached is not None:
+            return cached
+        
         try:
-            # SOL mint address
-            sol_mint = "So11111111111111111111111111111111111111112"
-            url = f"https://price.jup.ag/v4/price?ids={sol_mint}"
+            url = f"https://price.jup.ag/v4/price?ids={SOL_MINT}"
             
             response = requests.get(url, timeout=5)
             if response.status_code == 200:
                 data = response.json()
-                if 'data' in data and sol_mint in data['data']:
-                    return float(data['data'][sol_mint]['price'])
+                if 'data' in data and SOL_MINT in data['data']:
+                    sol_price_cache.set(float(data['data'][SOL_MINT]['price']))
+                    return sol_price_cache.price
             
             # Fallback to CoinGecko
             url = "https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd"
@@ -170,44 +501,30 @@ class SolanaWalletTracker:
             if response.status_code == 200:
                 data = response.json()
                 if 'solana' in data and 'usd' in data['solana']:
-                    return float(data['solana']['usd'])
+                    sol_price_cache.set(float(data['solana']['usd']))
+                    return sol_price_cache.price
                     
         except Exception:
             pass
         
         # Default fallback
-        return 100.0
+        return sol_price_cache.price if sol_price_cache.price is not None else 100.0
     
     def get_full_portfolio(self, wallet_address: str) -> Dict[str, Any]:
         """Get complete portfolio including SOL and SPL tokens"""
-        
-        # Get SOL balance
-        sol_data = self.get_wallet_balance(wallet_address)
-        
-        # Get token accounts
-        tokens = self.get_token_accounts(wallet_address)
-        
-        # Enrich token data with metadata
-        enriched_tokens = []
-        for token in tokens:
-            metadata = self.get_token_metadata(token['mint'])
-            token.update(metadata)
-            enriched_tokens.append(token)
-        
-        # Get current SOL price
-        sol_price = self.get_sol_price()
-        
-        portfolio = {
-            'wallet_address': wallet_address,
-            'timestamp': datetime.now().isoformat(),
-            'sol_balance': sol_data.get('balance_sol', 0) if sol_data.get('success') else 0,
-            'sol_price_usd': sol_price,
-            'tokens': enriched_tokens,
-            'total_tokens': len(enriched_tokens),
-            'success': sol_data.get('success', False)
-        }
-        
-        return portfolio
+        return run_async_safe(self.engine.get_portfolio(wallet_address))
+    
+    def get_portfolios(self, wallet_addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Refresh several watched wallets concurrently"""
+        return run_async_safe(self.engine.get_portfolios(wallet_addresses))
+    
+    async def get_full_portfolio_async(self, wallet_address: str) -> Dict[str, Any]:
+        """get_full_portfolio for callers already inside an event loop"""
+        return await self.engine.get_portfolio(wallet_address)
+    
+    async def get_portfolios_async(self, wallet_addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """get_portfolios for callers already inside an event loop"""
+        return await self.engine.get_portfolios(wallet_addresses)
 
 # Streamlit integration
 def render_solana_wallet_section():
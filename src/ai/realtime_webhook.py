@@ -17,6 +17,7 @@ from src.analysis.rug_intelligence import RugIntelligenceEngine
 from src.trading.automated_trader import AutomatedTrader
 from src.data.database import CoinDatabase
 from src.data.free_api_providers import FreeAPIProviders
+from loop_monitor import loop_health, monitor_loop
 
 app = FastAPI(title="TrenchCoat AI Pipeline")
 
@@ -26,6 +27,11 @@ db = CoinDatabase()
 rug_engine = RugIntelligenceEngine(db)
 trader = AutomatedTrader()
 
+@app.on_event("startup")
+async def start_loop_monitor():
+    """Watch the server's event loop for blocking calls in request handlers"""
+    monitor_loop('realtime_webhook')
+
 @app.post("/webhook/telegram-signal")
 async def process_telegram_signal(
     signal: Dict[str, Any],
@@ -220,6 +226,11 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "TrenchCoat AI Pipeline"}
 
+@app.get("/health/loop")
+async def loop_health_check():
+    """Event loop lag, recent stalls (with stacks) and task counts"""
+    return {"loops": loop_health(), "timestamp": datetime.now().isoformat()}
+
 def start_webhook_server():
     """Start the webhook server"""
     logger.info("🚀 Starting TrenchCoat AI Pipeline webhook server...")
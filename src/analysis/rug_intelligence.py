@@ -10,6 +10,7 @@ import json
 from loguru import logger
 import aiohttp
 from src.data.database import CoinDatabase
+from src.analysis.streaming_rug_detector import StreamingRugDetector
 
 class RugStatus(Enum):
     HEALTHY = "HEALTHY"
@@ -75,6 +76,8 @@ class RugIntelligenceEngine:
         self.active_tokens: Dict[str, TokenLifecycle] = {}
         self.rug_patterns = {}
         self.profit_opportunities = []
+        # Rolling per-token windows for real-time rug checks
+        self.streaming_detector = StreamingRugDetector()
         
     async def analyze_historical_rugs(self) -> List[TokenLifecycle]:
         """Analyze all historical tokens to identify rug patterns"""
@@ -402,54 +405,34 @@ class RugIntelligenceEngine:
                 'risk_level': 'EXTREME'
             }
     
-    async def real_time_rug_detection(self, contract_address: str) -> Dict[str, Any]:
-        """Real-time rug detection for active positions"""
+    async def real_time_rug_detection(self, contract_address: str,
+                                      current_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Real-time rug detection for active positions (pass current_data to reuse a feed tick)"""
         # Get latest price data
-        from src.data.free_api_providers import FreeAPIProviders
-        
-        async with FreeAPIProviders() as api:
-            current_data = await api.get_comprehensive_data(contract_address)
+        if current_data is None:
+            from src.data.free_api_providers import FreeAPIProviders
+            
+            async with FreeAPIProviders() as api:
+                current_data = await api.get_comprehensive_data(contract_address)
         
-        if not current_data or contract_address not in self.active_tokens:
+        if not current_data:
             return {'rug_detected': False}
         
-        token = self.active_tokens[contract_address]
-        current_price = current_data.get('price', 0)
-        
-        # Update token data
-        if current_price > token.peak_price:
-            token.peak_price = current_price
-        
-        # Rug detection signals
-        rug_signals = []
-        
-        # 1. Sharp price drop (>15% in minutes)
-        price_drop = (token.peak_price - current_price) / token.peak_price
-        if price_drop > 0.15:
-            rug_signals.append(f"Sharp drop: {price_drop:.1%}")
-        
-        # 2. Volume spike + price drop
-        current_volume = current_data.get('volume_24h', 0)
-        if current_volume > token.peak_volume * 2 and price_drop > 0.1:
-            rug_signals.append("Volume spike + price drop")
-        
-        # 3. Liquidity drain detection
-        current_liquidity = current_data.get('liquidity', 0)
-        if hasattr(token, 'peak_liquidity') and current_liquidity < token.peak_liquidity * 0.5:
-            rug_signals.append("Liquidity drain detected")
+        timestamp = current_data.get('timestamp')
+        result = self.streaming_detector.on_tick(
+            contract_address,
+            current_data.get('price') or 0,
+            current_data.get('volume_24h') or 0,
+            current_data.get('liquidity') or 0,
+            timestamp if isinstance(timestamp, (datetime, int, float)) else None
+        )
         
-        # Decision
-        rug_detected = len(rug_signals) >= 2 or price_drop > 0.3
+        # Keep the lifecycle record in step with the stream
+        token = self.active_tokens.get(contract_address)
+        if token and result.get('current_price', 0) > token.peak_price:
+            token.peak_price = result['current_price']
         
-        return {
-            'rug_detected': rug_detected,
-            'confidence': len(rug_signals) / 5.0,  # Max 5 signals
-            'signals': rug_signals,
-            'price_drop': price_drop,
-            'current_price': current_price,
-            'peak_price': token.peak_price,
-            'action': 'SELL_IMMEDIATELY' if rug_detected else 'HOLD'
-        }
+        return result
     
     def generate_daily_report(self) -> Dict[str, Any]:
         """Generate daily performance report"""
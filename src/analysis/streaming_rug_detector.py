@@ -0,0 +1,162 @@
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterable, Set, Union
+
+from src.data.tick_feed import load_tick_file
+
+@dataclass
+class RugRules:
+    """Thresholds for the streaming rug rules"""
+    window_seconds: float = 300.0   # Rolling window the rules look back over
+    capacity: int = 1024            # Max ticks kept per token, whatever the window
+    drop_threshold: float = 0.15    # Drop from window peak that counts as a signal
+    severe_drop: float = 0.30       # Drop from window peak that is a rug on its own
+    volume_spike_ratio: float = 2.0  # Volume vs window average
+    volume_spike_drop: float = 0.10  # Price drop required alongside a volume spike
+    liquidity_drain: float = 0.5    # Liquidity vs window peak
+    min_signals: int = 2
+
+class _TokenWindow:
+    """
+    Rolling per-token state. Ticks live in bounded deques; window maxima are
+    kept in monotonic deques of (sequence, value), so every tick is O(1) amortized.
+    """
+    __slots__ = ('times', 'volumes', 'price_max', 'liquidity_max',
+                 'volume_sum', 'first_seq', 'next_seq')
+
+    def __init__(self):
+        self.times = deque()
+        self.volumes = deque()
+        self.price_max = deque()
+        self.liquidity_max = deque()
+        self.volume_sum = 0.0
+        self.first_seq = 0
+        self.next_seq = 0
+
+    def _evict(self, cutoff: float, capacity: int):
+        times = self.times
+        while times and (times[0] < cutoff or len(times) >= capacity):
+            times.popleft()
+            self.volume_sum -= self.volumes.popleft()
+            self.first_seq += 1
+        while self.price_max and self.price_max[0][0] < self.first_seq:
+            self.price_max.popleft()
+        while self.liquidity_max and self.liquidity_max[0][0] < self.first_seq:
+            self.liquidity_max.popleft()
+
+    @staticmethod
+    def _push_max(window: deque, seq: int, value: float):
+        while window and window[-1][1] <= value:
+            window.pop()
+        window.append((seq, value))
+
+    def push(self, timestamp: float, price: float, volume: float, liquidity: float):
+        seq = self.next_seq
+        self.next_seq += 1
+        self.times.append(timestamp)
+        self.volumes.append(volume)
+        self.volume_sum += volume
+        self._push_max(self.price_max, seq, price)
+        self._push_max(self.liquidity_max, seq, liquidity)
+
+class StreamingRugDetector:
+    """
+    Incremental rug detector for watched tokens.
+    Each tick updates the token's rolling window and evaluates the drop,
+    volume-spike and liquidity-drain rules against the last `window_seconds`
+    of ticks only, without any API round-trips.
+    """
+
+    def __init__(self, rules: Optional[RugRules] = None):
+        self.rules = rules or RugRules()
+        self.windows: Dict[str, _TokenWindow] = {}
+        self.ticks_processed = 0
+
+    def on_tick(self, contract_address: str, price: float, volume: float = 0.0,
+                liquidity: float = 0.0, timestamp: Optional[Union[float, datetime]] = None) -> Dict[str, Any]:
+        """Feed one tick and return the rug evaluation for its token"""
+        if timestamp is None:
+            timestamp = time.time()
+        elif isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+
+        rules = self.rules
+        window = self.windows.get(contract_address)
+        if window is None:
+            window = self.windows[contract_address] = _TokenWindow()
+        self.ticks_processed += 1
+
+        if price <= 0:
+            return {'rug_detected': False}
+
+        window._evict(timestamp - rules.window_seconds, rules.capacity)
+
+        # Baselines come from the ticks before this one
+        prior_ticks = len(window.times)
+        volume_baseline = window.volume_sum / prior_ticks if prior_ticks else 0.0
+        liquidity_peak = window.liquidity_max[0][1] if window.liquidity_max else 0.0
+
+        window.push(timestamp, price, volume, liquidity)
+        peak_price = window.price_max[0][1]
+
+        signals = []
+        price_drop = (peak_price - price) / peak_price
+
+        # 1. Sharp price drop within the window
+        if price_drop > rules.drop_threshold:
+            signals.append(f"Sharp drop: {price_drop:.1%}")
+
+        # 2. Volume spike + price drop
+        if volume_baseline > 0 and volume > volume_baseline * rules.volume_spike_ratio \
+                and price_drop > rules.volume_spike_drop:
+            signals.append("Volume spike + price drop")
+
+        # 3. Liquidity drain detection
+        if liquidity_peak > 0 and liquidity < liquidity_peak * rules.liquidity_drain:
+            signals.append("Liquidity drain detected")
+
+        rug_detected = len(signals) >= rules.min_signals or price_drop > rules.severe_drop
+
+        return {
+            'rug_detected': rug_detected,
+            'confidence': len(signals) / 5.0,  # Max 5 signals
+            'signals': signals,
+            'price_drop': price_drop,
+            'current_price': price,
+            'peak_price': peak_price,
+            'action': 'SELL_IMMEDIATELY' if rug_detected else 'HOLD'
+        }
+
+    def forget(self, contract_address: str):
+        self.windows.pop(contract_address, None)
+
+    def retain(self, addresses: Set[str]):
+        """Drop state for every token not in `addresses`"""
+        for address in [a for a in self.windows if a not in addresses]:
+            del self.windows[address]
+
+    def replay(self, ticks: Union[str, Path, Iterable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Run recorded ticks (a tick file path or an iterable of tick dicts)
+        through the detector and return every tick that flagged a rug.
+        """
+        if isinstance(ticks, (str, Path)):
+            ticks = load_tick_file(ticks)
+
+        alerts = []
+        for tick in ticks:
+            result = self.on_tick(
+                tick['contract_address'],
+                tick.get('price', 0),
+                tick.get('volume_24h', 0),
+                tick.get('liquidity', 0),
+                tick.get('timestamp')
+            )
+            if result['rug_detected']:
+                result['contract_address'] = tick['contract_address']
+                result['timestamp'] = tick.get('timestamp')
+                alerts.append(result)
+        return alerts
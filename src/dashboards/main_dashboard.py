@@ -704,6 +704,9 @@ class CryptoDashboard:
         data = self._get_coin_analysis_data(symbol)
         
         if data is not None:
+            # Keys the strategy's incremental indicator state
+            data.attrs['symbol'] = symbol
+            
             # Fit strategy
             st.session_state.strategy.fit(data)
             
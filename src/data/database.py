@@ -1,15 +1,34 @@
 import sqlite3
+import numbers
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Union
 import pandas as pd
+import numpy as np
 from loguru import logger
 from config.config import settings
+from src.data.timeseries_store import PriceSeriesStore
 
 class CoinDatabase:
-    def __init__(self, db_path: Optional[Path] = None):
+    # Columns of the wide indicator_snapshots table (one row per snapshot)
+    INDICATOR_SNAPSHOT_COLUMNS = (
+        'rsi', 'macd', 'macd_signal', 'macd_histogram', 'sma_20', 'sma_50',
+        'bb_upper', 'bb_middle', 'bb_lower', 'volume_ratio', 'atr', 'momentum'
+    )
+    
+    # How long a symbol/address that matched no coin is remembered as unknown
+    UNKNOWN_COIN_TTL = 300.0
+    
+    def __init__(self, db_path: Optional[Path] = None, timeseries_path: Optional[Path] = None,
+                 timeseries_mmap: bool = False):
         self.db_path = db_path or settings.database_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._coin_ids: Dict[str, int] = {}  # symbol/contract address -> coins.id
+        self._coin_symbols: Dict[int, str] = {}  # coins.id -> symbol
+        self._unknown_coins: Dict[str, float] = {}  # key -> time it matched no coin
+        # Optional columnar store; when set, price writes are mirrored into it and reads prefer it
+        self.timeseries = PriceSeriesStore(timeseries_path, mmap=timeseries_mmap) if timeseries_path else None
         self._init_database()
     
     def _init_database(self):
@@ -67,6 +86,21 @@ class CoinDatabase:
                 )
             """)
             
+            # Wide indicator snapshots - one row per (coin, timestamp, timeframe)
+            snapshot_columns = ",\n".join(
+                f"                    {name} REAL" for name in self.INDICATOR_SNAPSHOT_COLUMNS
+            )
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS indicator_snapshots (
+                    coin_id INTEGER NOT NULL,
+                    timestamp TIMESTAMP NOT NULL,
+                    timeframe TEXT NOT NULL,
+{snapshot_columns},
+                    FOREIGN KEY (coin_id) REFERENCES coins(id),
+                    PRIMARY KEY (coin_id, timeframe, timestamp)
+                )
+            """)
+            
             # Telegram signals table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS telegram_signals (
@@ -131,6 +165,12 @@ class CoinDatabase:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_telegram_signals_timestamp ON telegram_signals(timestamp)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_telegram_signals_coin ON telegram_signals(coin_symbol)")
             
+            # Older databases predate the contract address column
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(coins)")}
+            if 'contract_address' not in columns:
+                cursor.execute("ALTER TABLE coins ADD COLUMN contract_address TEXT")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_coins_contract_address ON coins(contract_address)")
+            
             conn.commit()
             logger.info(f"Database initialized at {self.db_path}")
     
@@ -138,16 +178,103 @@ class CoinDatabase:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT OR REPLACE INTO coins (symbol, name, market_cap, volume_24h, 
+                INSERT OR REPLACE INTO coins (symbol, name, contract_address, market_cap, volume_24h, 
                     circulating_supply, max_supply, ath, ath_date, atl, atl_date, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
-                symbol, name, kwargs.get('market_cap'), kwargs.get('volume_24h'),
-                kwargs.get('circulating_supply'), kwargs.get('max_supply'),
+                symbol, name, kwargs.get('contract_address'), kwargs.get('market_cap'),
+                kwargs.get('volume_24h'), kwargs.get('circulating_supply'), kwargs.get('max_supply'),
                 kwargs.get('ath'), kwargs.get('ath_date'), kwargs.get('atl'),
                 kwargs.get('atl_date'), datetime.now()
             ))
-            return cursor.lastrowid
+            coin_id = cursor.lastrowid
+        
+        # REPLACE assigns a new id, so drop entries still pointing at the old one
+        old_id = self._coin_ids.get(symbol)
+        if old_id is not None:
+            self._coin_ids = {k: v for k, v in self._coin_ids.items() if v != old_id}
+        self._coin_ids[symbol] = coin_id
+        self._coin_symbols[coin_id] = symbol
+        self._unknown_coins.pop(symbol, None)
+        if kwargs.get('contract_address'):
+            self._coin_ids[kwargs['contract_address']] = coin_id
+            self._unknown_coins.pop(kwargs['contract_address'], None)
+        return coin_id
+    
+    def _lookup_coins(self, keys: Iterable[str] = (), ids: Iterable[int] = (), chunk_size: int = 400):
+        """Load only the requested coins (by symbol/address or id) into the in-memory maps"""
+        keys, ids = list(keys), list(ids)
+        rows = []
+        with sqlite3.connect(self.db_path) as conn:
+            for i in range(0, len(keys), chunk_size):
+                chunk = keys[i:i + chunk_size]
+                placeholders = ", ".join("?" * len(chunk))
+                rows += conn.execute(f"""
+                    SELECT id, symbol, contract_address FROM coins
+                    WHERE symbol IN ({placeholders}) OR contract_address IN ({placeholders})
+                """, chunk + chunk).fetchall()
+            for i in range(0, len(ids), chunk_size):
+                chunk = ids[i:i + chunk_size]
+                rows += conn.execute(f"""
+                    SELECT id, symbol, contract_address FROM coins
+                    WHERE id IN ({", ".join("?" * len(chunk))})
+                """, chunk).fetchall()
+        
+        for coin_id, symbol, contract_address in rows:
+            if symbol:
+                self._coin_ids[symbol] = coin_id
+            if contract_address:
+                self._coin_ids[contract_address] = coin_id
+            self._coin_symbols[coin_id] = symbol
+        
+        # Remember misses so repeated lookups of unlisted tokens skip the query
+        now = time.time()
+        for key in keys:
+            if key not in self._coin_ids:
+                self._unknown_coins[key] = now
+    
+    def _is_known_unknown(self, key: str) -> bool:
+        missed_at = self._unknown_coins.get(key)
+        return missed_at is not None and time.time() - missed_at < self.UNKNOWN_COIN_TTL
+    
+    def get_coin_id(self, symbol_or_address: str) -> Optional[int]:
+        """Resolve a coin id by symbol or contract address from the in-memory map"""
+        if symbol_or_address not in self._coin_ids and not self._is_known_unknown(symbol_or_address):
+            self._lookup_coins([symbol_or_address])
+        return self._coin_ids.get(symbol_or_address)
+    
+    def _resolve_coin_ids(self, keys: Iterable[Union[str, int]]) -> Dict[Union[str, int], Optional[int]]:
+        """Resolve many coins at once with at most one targeted lookup for unseen keys"""
+        keys = set(keys)
+        missing = [
+            k for k in keys
+            if not isinstance(k, numbers.Integral) and k not in self._coin_ids
+            and not self._is_known_unknown(k)
+        ]
+        if missing:
+            self._lookup_coins(missing)
+        return {k: int(k) if isinstance(k, numbers.Integral) else self._coin_ids.get(k) for k in keys}
+    
+    @staticmethod
+    def _log_unknown_coins(rows: List[Dict[str, Any]], coin_ids: Dict[Union[str, int], Optional[int]], what: str):
+        unknown = [coin for coin, coin_id in coin_ids.items() if coin_id is None]
+        if unknown:
+            skipped = sum(1 for row in rows if coin_ids[row['coin']] is None)
+            logger.warning(f"Unknown coins {', '.join(map(str, unknown[:5]))}"
+                           f"{'...' if len(unknown) > 5 else ''}, skipping {skipped} {what}")
+    
+    @staticmethod
+    def _db_value(value: Any) -> Any:
+        """Convert NumPy/pandas scalars into values sqlite3 can bind (NaN -> NULL)"""
+        if value is None:
+            return None
+        if isinstance(value, (np.datetime64, pd.Timestamp)):
+            return pd.Timestamp(value).to_pydatetime()
+        if isinstance(value, (np.integer,)):
+            return int(value)
+        if isinstance(value, (float, np.floating)):
+            return None if np.isnan(value) else float(value)
+        return value
     
     def add_price_data(self, coin_id: int, timestamp: datetime, timeframe: str,
                       open_price: float, high: float, low: float, close: float,
@@ -159,10 +286,166 @@ class CoinDatabase:
                     open, high, low, close, volume, quote_volume)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (coin_id, timestamp, timeframe, open_price, high, low, close, volume, quote_volume))
+        
+        if self.timeseries:
+            self._mirror_to_timeseries(coin_id, timeframe, [timestamp], [open_price], [high],
+                                       [low], [close], [volume], [quote_volume])
+    
+    def _mirror_to_timeseries(self, coin_id: int, timeframe: str, timestamps, open_prices,
+                              highs, lows, closes, volumes, quote_volumes):
+        if coin_id not in self._coin_symbols:
+            self._lookup_coins(ids=[coin_id])
+        symbol = self._coin_symbols.get(coin_id)
+        if symbol is None:
+            return
+        self.timeseries.write(
+            symbol, timeframe, timestamps,
+            open=open_prices, high=highs, low=lows, close=closes, volume=volumes,
+            quote_volume=[np.nan if v is None else v for v in quote_volumes]
+        )
+    
+    def add_price_data_bulk(self, coin: Union[str, int], timeframe: str, timestamps,
+                            open_prices, highs, lows, closes, volumes,
+                            quote_volumes=None) -> int:
+        """Insert a block of OHLCV bars for one coin from arrays in a single transaction"""
+        coin_id = self._resolve_coin_ids([coin])[coin]
+        if coin_id is None:
+            logger.warning(f"Unknown coin {coin}, skipping {len(timestamps)} price bars")
+            return 0
+        
+        if quote_volumes is None:
+            quote_volumes = [None] * len(timestamps)
+        
+        columns = [
+            np.asarray(values).tolist() if isinstance(values, np.ndarray) else list(values)
+            for values in (open_prices, highs, lows, closes, volumes, quote_volumes)
+        ]
+        rows = [
+            (coin_id, self._db_value(ts), timeframe, *(self._db_value(v) for v in values))
+            for ts, *values in zip(timestamps, *columns)
+        ]
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO price_data (coin_id, timestamp, timeframe,
+                    open, high, low, close, volume, quote_volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        
+        if self.timeseries:
+            self._mirror_to_timeseries(coin_id, timeframe, timestamps, *columns)
+        return len(rows)
+    
+    def add_indicator(self, coin_id: int, timestamp: datetime, timeframe: str,
+                      indicator_name: str, indicator_value: float,
+                      parameters: Optional[str] = None):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT INTO indicators (coin_id, timestamp, timeframe,
+                    indicator_name, indicator_value, parameters)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (coin_id, self._db_value(timestamp), timeframe, indicator_name,
+                  indicator_value, parameters))
+    
+    def add_indicators_bulk(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert wide indicator rows into the long indicators table in one transaction.
+        Each row has 'coin' (symbol, address or id), 'timestamp', 'timeframe' and
+        one key per indicator value.
+        """
+        rows = list(rows)
+        coin_ids = self._resolve_coin_ids(row['coin'] for row in rows)
+        self._log_unknown_coins(rows, coin_ids, "indicator rows")
+        
+        records = []
+        for row in rows:
+            coin_id = coin_ids[row['coin']]
+            if coin_id is None:
+                continue
+            timestamp = self._db_value(row['timestamp'])
+            for name, value in row.items():
+                if name in ('coin', 'timestamp', 'timeframe'):
+                    continue
+                value = self._db_value(value)
+                if isinstance(value, float):
+                    records.append((coin_id, timestamp, row['timeframe'], name, value))
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("""
+                INSERT INTO indicators (coin_id, timestamp, timeframe,
+                    indicator_name, indicator_value)
+                VALUES (?, ?, ?, ?, ?)
+            """, records)
+        return len(records)
+    
+    def add_indicator_snapshots(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Upsert wide indicator snapshots (one row per coin/timestamp) in one transaction"""
+        rows = list(rows)
+        coin_ids = self._resolve_coin_ids(row['coin'] for row in rows)
+        self._log_unknown_coins(rows, coin_ids, "indicator snapshots")
+        
+        records = [
+            (coin_ids[row['coin']], self._db_value(row['timestamp']), row['timeframe'],
+             *(self._db_value(row.get(name)) for name in self.INDICATOR_SNAPSHOT_COLUMNS))
+            for row in rows if coin_ids[row['coin']] is not None
+        ]
+        
+        columns = ", ".join(self.INDICATOR_SNAPSHOT_COLUMNS)
+        placeholders = ", ".join("?" * (3 + len(self.INDICATOR_SNAPSHOT_COLUMNS)))
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(f"""
+                INSERT OR REPLACE INTO indicator_snapshots (coin_id, timestamp, timeframe, {columns})
+                VALUES ({placeholders})
+            """, records)
+        return len(records)
+    
+    def add_indicator_snapshot_arrays(self, coin: Union[str, int], timeframe: str,
+                                      timestamps, indicators: Dict[str, np.ndarray]) -> int:
+        """Upsert a per-bar indicator history (e.g. IndicatorEngine.compute_series output)"""
+        arrays = {
+            name: np.asarray(values).tolist()
+            for name, values in indicators.items() if name in self.INDICATOR_SNAPSHOT_COLUMNS
+        }
+        rows = [
+            {'coin': coin, 'timestamp': ts, 'timeframe': timeframe,
+             **{name: values[i] for name, values in arrays.items()}}
+            for i, ts in enumerate(timestamps)
+        ]
+        return self.add_indicator_snapshots(rows)
+    
+    def get_indicator_snapshots(self, symbol: str, timeframe: str,
+                                start_date: Optional[datetime] = None,
+                                end_date: Optional[datetime] = None) -> pd.DataFrame:
+        coin_id = self.get_coin_id(symbol)
+        columns = ", ".join(self.INDICATOR_SNAPSHOT_COLUMNS)
+        with sqlite3.connect(self.db_path) as conn:
+            query = f"""
+                SELECT timestamp, {columns}
+                FROM indicator_snapshots
+                WHERE coin_id = ? AND timeframe = ?
+            """
+            params = [coin_id, timeframe]
+            
+            if start_date:
+                query += " AND timestamp >= ?"
+                params.append(start_date)
+            
+            if end_date:
+                query += " AND timestamp <= ?"
+                params.append(end_date)
+            
+            query += " ORDER BY timestamp"
+            
+            df = pd.read_sql_query(query, conn, params=params, parse_dates=['timestamp'])
+            df.set_index('timestamp', inplace=True)
+            return df
     
     def get_price_data(self, symbol: str, timeframe: str, 
                       start_date: Optional[datetime] = None,
                       end_date: Optional[datetime] = None) -> pd.DataFrame:
+        if self.timeseries and self.timeseries.has_series(symbol, timeframe):
+            return self.timeseries.read_frame(symbol, timeframe, start_date, end_date)
+        
         with sqlite3.connect(self.db_path) as conn:
             query = """
                 SELECT p.timestamp, p.open, p.high, p.low, p.close, p.volume
@@ -186,6 +469,53 @@ class CoinDatabase:
             df.set_index('timestamp', inplace=True)
             return df
     
+    def get_price_arrays(self, symbol: str, timeframe: str,
+                         start_date: Optional[datetime] = None,
+                         end_date: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """OHLCV as NumPy arrays with int64 epoch-second timestamps"""
+        if self.timeseries and self.timeseries.has_series(symbol, timeframe):
+            return self.timeseries.read(symbol, timeframe, start_date, end_date,
+                                        columns=['open', 'high', 'low', 'close', 'volume'])
+        
+        df = self.get_price_data(symbol, timeframe, start_date, end_date)
+        arrays = {'timestamp': (df.index.asi8 // 1_000_000_000).astype(np.int64)}
+        arrays.update({name: df[name].to_numpy(dtype=np.float64) for name in df.columns})
+        return arrays
+    
+    def migrate_price_data_to_timeseries(self, batch_rows: int = 100000) -> int:
+        """Copy every price_data series into the columnar store, one series at a time"""
+        if not self.timeseries:
+            raise ValueError("CoinDatabase was created without a timeseries_path")
+        
+        migrated = 0
+        with sqlite3.connect(self.db_path) as conn:
+            series = conn.execute("""
+                SELECT DISTINCT c.symbol, p.timeframe
+                FROM price_data p JOIN coins c ON p.coin_id = c.id
+            """).fetchall()
+            
+            for symbol, timeframe in series:
+                cursor = conn.execute("""
+                    SELECT p.timestamp, p.open, p.high, p.low, p.close, p.volume, p.quote_volume
+                    FROM price_data p JOIN coins c ON p.coin_id = c.id
+                    WHERE c.symbol = ? AND p.timeframe = ?
+                    ORDER BY p.timestamp
+                """, (symbol, timeframe))
+                while True:
+                    rows = cursor.fetchmany(batch_rows)
+                    if not rows:
+                        break
+                    timestamps, *columns = zip(*rows)
+                    columns = [np.array(values, dtype=np.float64) for values in columns]
+                    self.timeseries.write(
+                        symbol, timeframe, list(timestamps),
+                        **dict(zip(('open', 'high', 'low', 'close', 'volume', 'quote_volume'), columns))
+                    )
+                    migrated += len(rows)
+                logger.info(f"Migrated {symbol} {timeframe} price data to time-series store")
+        
+        return migrated
+    
     def add_telegram_signal(self, **kwargs):
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
@@ -8,6 +8,7 @@ from loguru import logger
 from dataclasses import dataclass, field
 import json
 from src.data.database import CoinDatabase
+from src.data.indicator_engine import IndicatorEngine, IndicatorConfig
 from config.config import settings
 
 @dataclass
@@ -34,6 +35,22 @@ class RateLimiter:
             self.last_call = asyncio.get_event_loop().time()
 
 class DataEnrichmentPipeline:
+    # Stored indicator name -> indicator engine output
+    INDICATOR_COLUMNS = {
+        'rsi': 'rsi',
+        'macd': 'macd',
+        'macd_signal': 'macd_signal',
+        'macd_histogram': 'macd_histogram',
+        'sma_20': 'sma_fast',
+        'sma_50': 'sma_slow',
+        'bb_upper': 'bb_upper',
+        'bb_middle': 'bb_middle',
+        'bb_lower': 'bb_lower',
+        'volume_ratio': 'volume_ratio',
+        'atr': 'atr',
+        'momentum': 'momentum',
+    }
+    
     def __init__(self, db: CoinDatabase):
         self.db = db
         self.session: Optional[aiohttp.ClientSession] = None
@@ -44,6 +61,7 @@ class DataEnrichmentPipeline:
         }
         self.cache = {}
         self.cache_ttl = 300  # 5 minutes
+        self.indicator_engine = IndicatorEngine(IndicatorConfig(trend_ma_fast=20, trend_ma_slow=50))
         
     def _initialize_providers(self) -> List[APIProvider]:
         """Initialize API providers with their configurations"""
@@ -238,7 +256,8 @@ class DataEnrichmentPipeline:
         
         return result
     
-    async def enrich_technical_indicators(self, address: str, df: pd.DataFrame) -> Dict[str, Any]:
+    async def enrich_technical_indicators(self, address: str, df: pd.DataFrame,
+                                          symbol: Optional[str] = None) -> Dict[str, Any]:
         """Calculate technical indicators from price data"""
         if df.empty or len(df) < 20:
             return {}
@@ -249,50 +268,18 @@ class DataEnrichmentPipeline:
             return {}
         
         try:
-            # Simple Moving Averages
-            df['sma_20'] = df['close'].rolling(window=20).mean()
-            df['sma_50'] = df['close'].rolling(window=50).mean()
-            
-            # Exponential Moving Averages
-            df['ema_12'] = df['close'].ewm(span=12).mean()
-            df['ema_26'] = df['close'].ewm(span=26).mean()
-            
-            # MACD
-            df['macd'] = df['ema_12'] - df['ema_26']
-            df['macd_signal'] = df['macd'].ewm(span=9).mean()
-            df['macd_histogram'] = df['macd'] - df['macd_signal']
-            
-            # RSI
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['rsi'] = 100 - (100 / (1 + rs))
-            
-            # Bollinger Bands
-            df['bb_middle'] = df['close'].rolling(window=20).mean()
-            bb_std = df['close'].rolling(window=20).std()
-            df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
-            df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
-            
-            # Volume indicators
-            df['volume_sma'] = df['volume'].rolling(window=20).mean()
-            df['volume_ratio'] = df['volume'] / df['volume_sma']
-            
-            # Get latest values
-            latest = df.iloc[-1]
+            # One pass of the incremental engine over the OHLCV arrays
+            values = self.indicator_engine.compute_series(
+                df['close'].to_numpy(dtype=float),
+                df['high'].to_numpy(dtype=float),
+                df['low'].to_numpy(dtype=float),
+                df['volume'].to_numpy(dtype=float)
+            )
+            latest = {name: series[-1] for name, series in values.items()}
             
             indicators = {
-                'rsi': float(latest['rsi']) if pd.notna(latest['rsi']) else None,
-                'macd': float(latest['macd']) if pd.notna(latest['macd']) else None,
-                'macd_signal': float(latest['macd_signal']) if pd.notna(latest['macd_signal']) else None,
-                'macd_histogram': float(latest['macd_histogram']) if pd.notna(latest['macd_histogram']) else None,
-                'sma_20': float(latest['sma_20']) if pd.notna(latest['sma_20']) else None,
-                'sma_50': float(latest['sma_50']) if pd.notna(latest['sma_50']) else None,
-                'bb_upper': float(latest['bb_upper']) if pd.notna(latest['bb_upper']) else None,
-                'bb_middle': float(latest['bb_middle']) if pd.notna(latest['bb_middle']) else None,
-                'bb_lower': float(latest['bb_lower']) if pd.notna(latest['bb_lower']) else None,
-                'volume_ratio': float(latest['volume_ratio']) if pd.notna(latest['volume_ratio']) else None,
+                name: float(latest[key]) if np.isfinite(latest[key]) else None
+                for name, key in self.INDICATOR_COLUMNS.items()
             }
             
             # Add signals
@@ -301,16 +288,17 @@ class DataEnrichmentPipeline:
             
             indicators['macd_signal_type'] = 'bullish' if indicators['macd_histogram'] and indicators['macd_histogram'] > 0 else 'bearish'
             
-            # Store indicators in database
-            for name, value in indicators.items():
-                if value is not None and not isinstance(value, str):
-                    self.db.add_indicator(
-                        coin_id=self.db.get_coin_id(address),
-                        timestamp=latest.name,
-                        timeframe='1h',
-                        indicator_name=name,
-                        indicator_value=value
-                    )
+            # Store the snapshot as one wide row; coins are usually added by
+            # symbol without a contract address, so fall back to the symbol
+            coin_id = self.db.get_coin_id(address)
+            if coin_id is None and symbol:
+                coin_id = self.db.get_coin_id(symbol)
+            self.db.add_indicator_snapshots([{
+                'coin': coin_id if coin_id is not None else address,
+                'timestamp': df.index[-1],
+                'timeframe': '1h',
+                **{name: value for name, value in indicators.items() if not isinstance(value, str)}
+            }])
             
             return indicators
             
@@ -358,7 +346,7 @@ class DataEnrichmentPipeline:
                                    start_date=datetime.now() - timedelta(days=30))
         
         if not df.empty:
-            indicators = await self.enrich_technical_indicators(address, df)
+            indicators = await self.enrich_technical_indicators(address, df, symbol)
             merged_data['technical_indicators'] = indicators
         
         # Calculate enrichment score
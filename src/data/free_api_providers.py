@@ -332,8 +332,8 @@ class FreeAPIProviders:
         age = (datetime.now() - cache_entry['timestamp']).total_seconds()
         return age < self.cache_ttl
     
-    async def _make_request(self, endpoint_name: str, **kwargs) -> Optional[Dict]:
-        """Make rate-limited request to API endpoint"""
+    async def _make_request(self, endpoint_name: str, use_cache: bool = True, **kwargs) -> Optional[Dict]:
+        """Make rate-limited request to API endpoint (use_cache=False always hits the API)"""
         endpoint = self.endpoints[endpoint_name]
         
         # Format URL and params
@@ -345,9 +345,9 @@ class FreeAPIProviders:
             else:
                 params[key] = value
         
-        # Check cache
-        cache_key = self._get_cache_key(endpoint_name, params)
-        if cache_key in self.cache and self._is_cache_valid(self.cache[cache_key]):
+        # Check cache (keyed on the URL too, since path parameters like the DexScreener address live there)
+        cache_key = self._get_cache_key(url, params)
+        if use_cache and cache_key in self.cache and self._is_cache_valid(self.cache[cache_key]):
             return self.cache[cache_key]['data']
         
         # Rate limit
@@ -359,10 +359,11 @@ class FreeAPIProviders:
                     data = await response.json()
                     
                     # Cache the response
-                    self.cache[cache_key] = {
-                        'data': data,
-                        'timestamp': datetime.now()
-                    }
+                    if use_cache:
+                        self.cache[cache_key] = {
+                            'data': data,
+                            'timestamp': datetime.now()
+                        }
                     
                     return data
                 elif response.status == 429:
@@ -413,31 +414,57 @@ class FreeAPIProviders:
             if solana_pairs:
                 # Sort by liquidity and take the best
                 best_pair = max(solana_pairs, key=lambda x: float(x.get('liquidity', {}).get('usd', 0)))
-                
-                return {
-                    'price': float(best_pair.get('priceUsd', 0)),
-                    'price_change_24h': float(best_pair.get('priceChange', {}).get('h24', 0)),
-                    'volume_24h': float(best_pair.get('volume', {}).get('h24', 0)),
-                    'liquidity': float(best_pair.get('liquidity', {}).get('usd', 0)),
-                    'market_cap': float(best_pair.get('marketCap', 0)),
-                    'fdv': float(best_pair.get('fdv', 0)),
-                    'pair_address': best_pair.get('pairAddress'),
-                    'dex_id': best_pair.get('dexId'),
-                    'price_change_5m': float(best_pair.get('priceChange', {}).get('m5', 0)),
-                    'price_change_1h': float(best_pair.get('priceChange', {}).get('h1', 0)),
-                    'price_change_6h': float(best_pair.get('priceChange', {}).get('h6', 0)),
-                    'txns_24h': best_pair.get('txns', {}).get('h24', {}),
-                    'buys_24h': best_pair.get('txns', {}).get('h24', {}).get('buys', 0),
-                    'sells_24h': best_pair.get('txns', {}).get('h24', {}).get('sells', 0)
-                }
+                return self._summarize_dexscreener_pair(best_pair)
         
         return {}
     
-    async def get_jupiter_price(self, token_addresses: List[str]) -> Dict[str, Any]:
+    async def get_dexscreener_batch(self, addresses: List[str], use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Get token data for many addresses, 30 per DexScreener request"""
+        best_pairs: Dict[str, Dict] = {}
+        
+        for i in range(0, len(addresses), 30):
+            batch = addresses[i:i+30]
+            data = await self._make_request("dexscreener_token", use_cache=use_cache, address=",".join(batch))
+            
+            if not data or not data.get('pairs'):
+                continue
+            
+            # Keep the most liquid Solana pair per token
+            for pair in data['pairs']:
+                address = pair.get('baseToken', {}).get('address')
+                if pair.get('chainId') != 'solana' or address not in batch:
+                    continue
+                current = best_pairs.get(address)
+                liquidity = float(pair.get('liquidity', {}).get('usd', 0))
+                if current is None or liquidity > float(current.get('liquidity', {}).get('usd', 0)):
+                    best_pairs[address] = pair
+        
+        return {address: self._summarize_dexscreener_pair(pair) for address, pair in best_pairs.items()}
+    
+    def _summarize_dexscreener_pair(self, best_pair: Dict) -> Dict[str, Any]:
+        """Normalize a DexScreener pair into our token data fields"""
+        return {
+            'price': float(best_pair.get('priceUsd', 0)),
+            'price_change_24h': float(best_pair.get('priceChange', {}).get('h24', 0)),
+            'volume_24h': float(best_pair.get('volume', {}).get('h24', 0)),
+            'liquidity': float(best_pair.get('liquidity', {}).get('usd', 0)),
+            'market_cap': float(best_pair.get('marketCap', 0)),
+            'fdv': float(best_pair.get('fdv', 0)),
+            'pair_address': best_pair.get('pairAddress'),
+            'dex_id': best_pair.get('dexId'),
+            'price_change_5m': float(best_pair.get('priceChange', {}).get('m5', 0)),
+            'price_change_1h': float(best_pair.get('priceChange', {}).get('h1', 0)),
+            'price_change_6h': float(best_pair.get('priceChange', {}).get('h6', 0)),
+            'txns_24h': best_pair.get('txns', {}).get('h24', {}),
+            'buys_24h': best_pair.get('txns', {}).get('h24', {}).get('buys', 0),
+            'sells_24h': best_pair.get('txns', {}).get('h24', {}).get('sells', 0)
+        }
+    
+    async def get_jupiter_price(self, token_addresses: List[str], use_cache: bool = True) -> Dict[str, Any]:
         """Get prices from Jupiter"""
         # Batch multiple addresses
         ids = ",".join(token_addresses)
-        data = await self._make_request("jupiter_price", token_address=ids)
+        data = await self._make_request("jupiter_price", use_cache=use_cache, token_address=ids)
         
         results = {}
         if data and 'data' in data:
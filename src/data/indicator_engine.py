@@ -0,0 +1,297 @@
+from typing import Dict, Optional, Any
+from dataclasses import dataclass
+import numpy as np
+
+@dataclass
+class IndicatorConfig:
+    """Periods and smoothing options for the indicator engine"""
+    rsi_period: int = 14
+    rsi_method: str = "sma"  # sma (rolling mean of gains/losses) or wilder
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    ema_adjust: bool = True  # Same meaning as pandas ewm(adjust=...)
+    trend_ma_fast: int = 20
+    trend_ma_slow: int = 50
+    bb_period: int = 20
+    bb_std: float = 2.0
+    bb_ddof: int = 1  # 1 matches pandas rolling().std(), 0 is population std
+    volume_ma_period: int = 20
+    atr_period: int = 14
+    momentum_period: int = 10
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "IndicatorConfig":
+        """Build from a strategy config dict, ignoring unrelated keys"""
+        return cls(**{k: v for k, v in config.items() if k in cls.__dataclass_fields__})
+
+class _RollingWindow:
+    """Ring buffer with O(1) running mean and sliding Welford variance"""
+
+    def __init__(self, period: int, width: int):
+        self.period = period
+        self.buffer = np.zeros((period, width))
+        self.count = 0
+        self.pos = 0
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    def oldest(self) -> np.ndarray:
+        """Value that the next push will evict (pushed `period` ticks ago)"""
+        return self.buffer[self.pos]
+
+    def push(self, x: np.ndarray):
+        if self.count < self.period:
+            self.count += 1
+            delta = x - self.mean
+            self.mean = self.mean + delta / self.count
+            self.m2 = self.m2 + delta * (x - self.mean)
+        else:
+            old = self.buffer[self.pos].copy()
+            old_mean = self.mean
+            self.mean = old_mean + (x - old) / self.period
+            self.m2 = np.maximum(self.m2 + (x - old) * (x - self.mean + old - old_mean), 0.0)
+        self.buffer[self.pos] = x
+        self.pos = (self.pos + 1) % self.period
+
+    def mean_value(self) -> np.ndarray:
+        return self.mean if self.ready else np.full_like(self.mean, np.nan)
+
+    def std_value(self, ddof: int = 1) -> np.ndarray:
+        if not self.ready or self.period - ddof <= 0:
+            return np.full_like(self.mean, np.nan)
+        return np.sqrt(self.m2 / (self.period - ddof))
+
+class _EMA:
+    """Exponential moving average with pandas ewm(span=...) semantics"""
+
+    def __init__(self, span: int, width: int, adjust: bool = True):
+        self.decay = 1.0 - 2.0 / (span + 1)
+        self.adjust = adjust
+        self.num = np.zeros(width)
+        self.den = np.zeros(width)
+        self.value = np.full(width, np.nan)
+        self.started = False
+
+    def push(self, x: np.ndarray) -> np.ndarray:
+        if self.adjust:
+            self.num = x + self.decay * self.num
+            self.den = 1.0 + self.decay * self.den
+            self.value = self.num / self.den
+        elif not self.started:
+            self.value = np.array(x, dtype=float)
+        else:
+            self.value = (1.0 - self.decay) * x + self.decay * self.value
+        self.started = True
+        return self.value
+
+class _RSI:
+    """RSI over a rolling mean (pandas-style) or Wilder smoothing"""
+
+    def __init__(self, period: int, width: int, method: str = "sma"):
+        if method not in ("sma", "wilder"):
+            raise ValueError(f"Unknown RSI method: {method}")
+        self.period = period
+        self.method = method
+        self.gains = _RollingWindow(period, width)
+        self.losses = _RollingWindow(period, width)
+        self.avg_gain = np.zeros(width)
+        self.avg_loss = np.zeros(width)
+
+    def push(self, delta: np.ndarray):
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        if self.method == "wilder" and self.gains.ready:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+            return
+        self.gains.push(gain)
+        self.losses.push(loss)
+        self.avg_gain = self.gains.mean
+        self.avg_loss = self.losses.mean
+
+    def value(self) -> np.ndarray:
+        if not self.gains.ready:
+            return np.full_like(self.avg_gain, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = self.avg_gain / self.avg_loss
+            return 100.0 - (100.0 / (1.0 + rs))
+
+class IndicatorState:
+    """
+    Incremental indicator state for `width` coins ticking in lockstep.
+    Every update is O(1) per coin: no window is ever recomputed.
+    """
+
+    def __init__(self, config: Optional[IndicatorConfig] = None, width: int = 1):
+        self.config = config or IndicatorConfig()
+        self.width = width
+        self.ticks = 0
+        c = self.config
+
+        self.sma_fast = _RollingWindow(c.trend_ma_fast, width)
+        self.sma_slow = _RollingWindow(c.trend_ma_slow, width)
+        self.ema_fast = _EMA(c.macd_fast, width, c.ema_adjust)
+        self.ema_slow = _EMA(c.macd_slow, width, c.ema_adjust)
+        self.macd_signal = _EMA(c.macd_signal, width, c.ema_adjust)
+        self.rsi = _RSI(c.rsi_period, width, c.rsi_method)
+        self.bollinger = _RollingWindow(c.bb_period, width)
+        self.volume_ma = _RollingWindow(c.volume_ma_period, width)
+        self.true_range = _RollingWindow(c.atr_period, width)
+        self.lookback = _RollingWindow(c.momentum_period, width)
+
+        self.prev_close: Optional[np.ndarray] = None
+        self.last: Dict[str, np.ndarray] = {}
+
+    def update(self, close, high=None, low=None, volume=None) -> Dict[str, np.ndarray]:
+        """Feed one bar for every lane and return the latest indicator values"""
+        close = np.broadcast_to(np.asarray(close, dtype=float), (self.width,))
+        high = close if high is None else np.broadcast_to(np.asarray(high, dtype=float), (self.width,))
+        low = close if low is None else np.broadcast_to(np.asarray(low, dtype=float), (self.width,))
+        c = self.config
+
+        # Trend and MACD
+        self.sma_fast.push(close)
+        self.sma_slow.push(close)
+        macd = self.ema_fast.push(close) - self.ema_slow.push(close)
+        macd_signal = self.macd_signal.push(macd)
+
+        # RSI (the first bar contributes a zero move, as pandas' diff/where does)
+        delta = np.zeros(self.width) if self.prev_close is None else close - self.prev_close
+        self.rsi.push(delta)
+
+        # Bollinger Bands
+        self.bollinger.push(close)
+        bb_middle = self.bollinger.mean_value()
+        bb_std = self.bollinger.std_value(c.bb_ddof)
+
+        # ATR
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = np.maximum(high - low, np.maximum(np.abs(high - self.prev_close),
+                                                   np.abs(low - self.prev_close)))
+        self.true_range.push(tr)
+
+        # Momentum (pct change over momentum_period bars)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.lookback.ready:
+                momentum = close / self.lookback.oldest() - 1.0
+            else:
+                momentum = np.full(self.width, np.nan)
+        self.lookback.push(close)
+
+        # Volume
+        if volume is not None:
+            volume = np.broadcast_to(np.asarray(volume, dtype=float), (self.width,))
+            self.volume_ma.push(volume)
+            volume_ma = self.volume_ma.mean_value()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                volume_ratio = volume / volume_ma
+        else:
+            volume_ma = volume_ratio = np.full(self.width, np.nan)
+
+        self.prev_close = close.copy()
+        self.ticks += 1
+
+        self.last = {
+            'rsi': self.rsi.value(),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd - macd_signal,
+            'ema_fast': self.ema_fast.value,
+            'ema_slow': self.ema_slow.value,
+            'sma_fast': self.sma_fast.mean_value(),
+            'sma_slow': self.sma_slow.mean_value(),
+            'bb_middle': bb_middle,
+            'bb_upper': bb_middle + bb_std * c.bb_std,
+            'bb_lower': bb_middle - bb_std * c.bb_std,
+            'bb_width': 2 * bb_std * c.bb_std,
+            'atr': self.true_range.mean_value(),
+            'momentum': momentum,
+            'volume_ma': volume_ma,
+            'volume_ratio': volume_ratio,
+        }
+        return self.last
+
+    def run(self, close: np.ndarray, high: Optional[np.ndarray] = None,
+            low: Optional[np.ndarray] = None, volume: Optional[np.ndarray] = None,
+            record: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Feed a history of bars along the last axis. Returns the latest values,
+        or the full per-bar history (time on the last axis) when record=True.
+        """
+        close = np.asarray(close, dtype=float)
+        steps = close.shape[-1]
+        history = {}
+        for t in range(steps):
+            values = self.update(
+                close[..., t],
+                None if high is None else np.asarray(high, dtype=float)[..., t],
+                None if low is None else np.asarray(low, dtype=float)[..., t],
+                None if volume is None else np.asarray(volume, dtype=float)[..., t],
+            )
+            if record:
+                for name, value in values.items():
+                    history.setdefault(name, np.empty((self.width, steps)))[:, t] = value
+        if record:
+            return history
+        return self.last
+
+class IndicatorEngine:
+    """Per-coin incremental indicators plus a batch mode over many coins"""
+
+    def __init__(self, config: Optional[IndicatorConfig] = None):
+        self.config = config or IndicatorConfig()
+        self.states: Dict[str, IndicatorState] = {}
+
+    def _state(self, key: str) -> IndicatorState:
+        if key not in self.states:
+            self.states[key] = IndicatorState(self.config)
+        return self.states[key]
+
+    def update(self, key: str, close: float, high: Optional[float] = None,
+               low: Optional[float] = None, volume: Optional[float] = None) -> Dict[str, float]:
+        """Apply one new tick for a coin and return its latest indicators"""
+        values = self._state(key).update(close, high, low, volume)
+        return {name: float(value[0]) for name, value in values.items()}
+
+    def warm_up(self, key: str, close, high=None, low=None, volume=None) -> Dict[str, float]:
+        """Feed a block of historical bars for a coin"""
+        values = self._state(key).run(close, high, low, volume)
+        return {name: float(value[0]) for name, value in values.items()}
+
+    def latest(self, key: str) -> Dict[str, float]:
+        state = self.states.get(key)
+        if state is None or not state.last:
+            return {}
+        return {name: float(value[0]) for name, value in state.last.items()}
+
+    def ticks(self, key: str) -> int:
+        state = self.states.get(key)
+        return state.ticks if state else 0
+
+    def reset(self, key: str):
+        self.states.pop(key, None)
+
+    def compute_batch(self, close: np.ndarray, high: Optional[np.ndarray] = None,
+                      low: Optional[np.ndarray] = None, volume: Optional[np.ndarray] = None
+                      ) -> Dict[str, np.ndarray]:
+        """Latest indicators for N coins from (N, T) arrays, one vectorized pass"""
+        close = np.atleast_2d(np.asarray(close, dtype=float))
+        state = IndicatorState(self.config, width=close.shape[0])
+        return state.run(close, high, low, volume)
+
+    def compute_series(self, close, high=None, low=None, volume=None) -> Dict[str, np.ndarray]:
+        """Full per-bar indicator history for a single coin"""
+        state = IndicatorState(self.config)
+        history = state.run(np.asarray(close, dtype=float)[np.newaxis, :],
+                            None if high is None else np.asarray(high, dtype=float)[np.newaxis, :],
+                            None if low is None else np.asarray(low, dtype=float)[np.newaxis, :],
+                            None if volume is None else np.asarray(volume, dtype=float)[np.newaxis, :],
+                            record=True)
+        return {name: values[0] for name, values in history.items()}
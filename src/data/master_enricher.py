@@ -16,6 +16,11 @@ import traceback
 from src.data.free_api_providers import FreeAPIProviders
 from src.data.database import CoinDatabase
 from config.config import settings
+from metrics_registry import metrics
+from sampling_profiler import profile_worker
+
+# Shared with turbo_enrichment so every enrichment path reports into one series
+coins_enriched = metrics.counter('enrichment_coins_total', "Coins run through enrichment", ('source', 'result'))
 
 @dataclass
 class EnrichmentTask:
@@ -130,6 +135,7 @@ class MasterEnricher:
         Main method to enrich all coins in the database
         """
         logger.info("🚀 Starting master enrichment process...")
+        profile_worker('master_enricher')
         
         self.stats = EnrichmentStats(start_time=datetime.now())
         self.progress_callback = progress_callback
@@ -202,10 +208,11 @@ class MasterEnricher:
                 task.last_attempt = datetime.now()
                 
                 # Get comprehensive data from all APIs
-                enriched_data = await api_provider.get_comprehensive_data(
-                    task.contract_address, 
-                    task.symbol
-                )
+                async with metrics.span('http_fetch', provider='free_apis'):
+                    enriched_data = await api_provider.get_comprehensive_data(
+                        task.contract_address, 
+                        task.symbol
+                    )
                 
                 if enriched_data and enriched_data.get('enrichment_score', 0) > 0:
                     # Save to database
@@ -215,6 +222,7 @@ class MasterEnricher:
                         task.status = "completed"
                         self.stats.successful += 1
                         self.stats.processed += 1
+                        coins_enriched.labels(source='master', result='success').inc()
                         
                         logger.info(
                             f"✅ {task.symbol} enriched successfully "
@@ -245,10 +253,12 @@ class MasterEnricher:
         task.retry_count = max_attempts
         self.stats.failed += 1
         self.stats.processed += 1
+        coins_enriched.labels(source='master', result='failed').inc()
         
         logger.error(f"❌ Failed to enrich {task.symbol} after {max_attempts} attempts")
         return False
     
+    @metrics.timed('db_write', source='master')
     async def _save_enriched_data(self, task: EnrichmentTask, data: Dict[str, Any]) -> bool:
         """Save enriched data to database"""
         try:
@@ -335,6 +345,7 @@ class MasterEnricher:
                 return True
                 
         except Exception as e:
+            metrics.record_error(e)
             logger.error(f"Error saving data for {task.symbol}: {e}")
             return False
     
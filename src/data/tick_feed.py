@@ -0,0 +1,184 @@
+import asyncio
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Set, Callable, Awaitable, Iterator, Iterable, Union
+from datetime import datetime
+from dataclasses import dataclass, asdict
+from loguru import logger
+
+@dataclass
+class PriceTick:
+    """Lightweight market snapshot for one token"""
+    contract_address: str
+    price: float
+    volume_24h: float
+    liquidity: float
+    timestamp: datetime
+    price_source: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+TickCallback = Callable[[Dict[str, PriceTick]], Awaitable[None]]
+
+def append_tick_file(path: Union[str, Path], ticks: Iterable[PriceTick]):
+    """Append ticks to a JSONL recording (epoch-second timestamps)"""
+    with open(path, 'a') as f:
+        for tick in ticks:
+            record = tick.to_dict()
+            record['timestamp'] = tick.timestamp.timestamp()
+            f.write(json.dumps(record) + "\n")
+
+def load_tick_file(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Read a recorded tick file (.jsonl or .csv) as dicts in file order"""
+    path = Path(path)
+    with open(path, newline='') as f:
+        rows = csv.DictReader(f) if path.suffix == '.csv' else (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            timestamp = row['timestamp']
+            try:
+                timestamp = float(timestamp)
+            except (TypeError, ValueError):
+                timestamp = datetime.fromisoformat(timestamp).timestamp()
+            yield {
+                'contract_address': row['contract_address'],
+                'timestamp': timestamp,
+                'price': float(row.get('price') or 0),
+                'volume_24h': float(row.get('volume_24h') or 0),
+                'liquidity': float(row.get('liquidity') or 0)
+            }
+
+class TickFeed:
+    """
+    Shared price-tick subscription service.
+    Consumers register the addresses they care about; every tick the union is
+    fetched once in batched requests and each consumer gets the ticks for its
+    own addresses. Consumers run in subscription order.
+    """
+
+    def __init__(self, interval: float = 1.0, api_factory: Optional[Callable[[], Any]] = None,
+                 record_path: Optional[Union[str, Path]] = None):
+        self.interval = interval
+        self.api_factory = api_factory
+        # Optional JSONL recording of every tick, replayable with load_tick_file
+        self.record_path = record_path
+        self.running = False
+
+        self._consumers: Dict[str, TickCallback] = {}
+        self._interest: Dict[str, Set[str]] = {}
+        self.latest: Dict[str, PriceTick] = {}
+
+        self.stats = {
+            'ticks': 0,
+            'addresses_fetched': 0,
+            'last_fetch_ms': 0.0,
+            'consumer_errors': 0
+        }
+
+    def subscribe(self, consumer: str, callback: TickCallback, addresses: Optional[Set[str]] = None):
+        """Register a consumer callback, optionally with its initial addresses"""
+        self._consumers[consumer] = callback
+        self._interest[consumer] = set(addresses or ())
+
+    def unsubscribe(self, consumer: str):
+        self._consumers.pop(consumer, None)
+        self._interest.pop(consumer, None)
+
+    def set_interest(self, consumer: str, addresses: Set[str]):
+        """Replace the set of addresses a consumer wants ticks for"""
+        self._interest[consumer] = set(addresses)
+
+    def watched_addresses(self) -> Set[str]:
+        """Union of every consumer's addresses"""
+        watched = set()
+        for consumer in self._consumers:
+            watched |= self._interest.get(consumer, set())
+        return watched
+
+    async def fetch_ticks(self, api, addresses: List[str]) -> Dict[str, PriceTick]:
+        """Fetch one tick per address: DexScreener in batches, Jupiter for whatever is missing"""
+        now = datetime.now()
+        ticks = {}
+
+        dex_data = await api.get_dexscreener_batch(addresses, use_cache=False)
+        for address, data in dex_data.items():
+            if data.get('price', 0) > 0:
+                ticks[address] = PriceTick(
+                    contract_address=address,
+                    price=data['price'],
+                    volume_24h=data.get('volume_24h', 0),
+                    liquidity=data.get('liquidity', 0),
+                    timestamp=now,
+                    price_source='dexscreener'
+                )
+
+        missing = [address for address in addresses if address not in ticks]
+        if missing:
+            jupiter_data = await api.get_jupiter_price(missing, use_cache=False)
+            for address, data in jupiter_data.items():
+                price = float(data.get('price') or 0)
+                if price > 0:
+                    # Jupiter has no volume/liquidity; carry the last known values forward
+                    previous = self.latest.get(address)
+                    ticks[address] = PriceTick(
+                        contract_address=address,
+                        price=price,
+                        volume_24h=previous.volume_24h if previous else 0,
+                        liquidity=previous.liquidity if previous else 0,
+                        timestamp=now,
+                        price_source='jupiter'
+                    )
+
+        return ticks
+
+    async def poll_once(self, api) -> Dict[str, PriceTick]:
+        """Fetch the watched addresses once and fan the ticks out to consumers"""
+        addresses = sorted(self.watched_addresses())
+        if not addresses:
+            return {}
+
+        start = time.perf_counter()
+        ticks = await self.fetch_ticks(api, addresses)
+        self.stats['last_fetch_ms'] = (time.perf_counter() - start) * 1000
+        self.stats['ticks'] += 1
+        self.stats['addresses_fetched'] += len(addresses)
+        self.latest.update(ticks)
+        if self.record_path and ticks:
+            append_tick_file(self.record_path, ticks.values())
+
+        for consumer, callback in list(self._consumers.items()):
+            wanted = self._interest.get(consumer, set())
+            consumer_ticks = {address: ticks[address] for address in wanted if address in ticks}
+            if not consumer_ticks:
+                continue
+            try:
+                await callback(consumer_ticks)
+            except Exception as e:
+                self.stats['consumer_errors'] += 1
+                logger.error(f"Tick consumer {consumer} failed: {e}")
+
+        return ticks
+
+    async def run(self):
+        """Poll every `interval` seconds until stop() is called, reusing one API session"""
+        if self.api_factory is None:
+            from src.data.free_api_providers import FreeAPIProviders
+            self.api_factory = FreeAPIProviders
+
+        self.running = True
+        logger.info(f"📡 Starting tick feed ({self.interval:.1f}s interval)")
+
+        async with self.api_factory() as api:
+            while self.running:
+                start = time.monotonic()
+                try:
+                    await self.poll_once(api)
+                except Exception as e:
+                    logger.error(f"Tick feed poll failed: {e}")
+
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - start)))
+
+    def stop(self):
+        self.running = False
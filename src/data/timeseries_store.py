@@ -0,0 +1,362 @@
+import calendar
+import json
+import re
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Union
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'quote_volume')
+
+# Record layout of the append-only tail file
+TAIL_DTYPE = np.dtype([('timestamp', '<i8')] + [(name, '<f8') for name in PRICE_COLUMNS])
+
+def to_epoch_seconds(values) -> np.ndarray:
+    """Convert datetimes, pandas timestamps or epoch numbers to int64 epoch seconds"""
+    if isinstance(values, (datetime, pd.Timestamp, np.datetime64, int, float, str)):
+        return to_epoch_seconds([values])[0]
+    if isinstance(values, (list, tuple)) and all(type(v) is datetime for v in values):
+        # Live single-bar appends; same naive-as-UTC rule as pandas without its overhead
+        return np.array([calendar.timegm(v.utctimetuple()) for v in values], dtype=np.int64)
+    array = np.asarray(values)
+    if array.dtype.kind in 'iuf':
+        return array.astype(np.int64)
+    return (pd.to_datetime(array).asi8 // 1_000_000_000).astype(np.int64)
+
+class PriceSeriesStore:
+    """
+    Columnar time-series store for coin OHLCV bars.
+
+    Each (coin, timeframe) series is split into fixed-size chunks of
+    `chunk_rows` bars. Timestamps are integer epoch seconds, delta-encoded
+    into the narrowest integer width that fits; price columns are float64.
+    Chunks are zlib-compressed .npz files, or raw .npy directories that are
+    memory-mapped on read when the store is opened with mmap=True.
+
+    Small in-order appends (live bars) go to a fixed-width tail.bin file per
+    series instead of rewriting the tail chunk; the tail is folded into
+    chunks once it reaches `tail_rows` bars or an upsert overlaps it.
+    """
+
+    def __init__(self, root: Union[str, Path] = Path("./data/timeseries"),
+                 chunk_rows: int = 4096, mmap: bool = False, tail_rows: int = 1024):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.chunk_rows = chunk_rows
+        self.mmap = mmap
+        self.tail_rows = tail_rows
+        self._indexes: Dict[Path, List[Dict[str, Any]]] = {}
+        self._tails: Dict[Path, Dict[str, Any]] = {}  # series dir -> tail rows / last timestamp
+        self._stale_chunks: List[Path] = []  # replaced chunks a reader still had mapped
+
+    @staticmethod
+    def _safe_name(value: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', str(value))
+
+    def _series_dir(self, coin: str, timeframe: str) -> Path:
+        return self.root / self._safe_name(coin) / self._safe_name(timeframe)
+
+    def _index(self, series_dir: Path) -> List[Dict[str, Any]]:
+        if series_dir not in self._indexes:
+            index_file = series_dir / "index.json"
+            self._indexes[series_dir] = (
+                json.loads(index_file.read_text()) if index_file.exists() else []
+            )
+        return self._indexes[series_dir]
+
+    def _save_index(self, series_dir: Path, index: List[Dict[str, Any]]):
+        tmp = series_dir / "index.json.tmp"
+        tmp.write_text(json.dumps(index))
+        tmp.replace(series_dir / "index.json")
+        self._indexes[series_dir] = index
+
+    # Append-only tail
+
+    def _tail_state(self, series_dir: Path) -> Dict[str, Any]:
+        if series_dir not in self._tails:
+            tail_file = series_dir / "tail.bin"
+            rows, last = 0, None
+            if tail_file.exists():
+                # A torn final record from a crash is ignored
+                rows = tail_file.stat().st_size // TAIL_DTYPE.itemsize
+                if rows:
+                    with open(tail_file, 'rb') as f:
+                        f.seek((rows - 1) * TAIL_DTYPE.itemsize)
+                        last = int(np.frombuffer(f.read(TAIL_DTYPE.itemsize), dtype=TAIL_DTYPE)['timestamp'][0])
+            self._tails[series_dir] = {'rows': rows, 'last': last}
+        return self._tails[series_dir]
+
+    def _read_tail(self, series_dir: Path) -> Optional[Dict[str, np.ndarray]]:
+        rows = self._tail_state(series_dir)['rows']
+        if not rows:
+            return None
+        records = np.fromfile(series_dir / "tail.bin", dtype=TAIL_DTYPE, count=rows)
+        index = self._index(series_dir)
+        if index:
+            # Skip bars already folded into chunks by a compaction cut short before the unlink
+            records = records[records['timestamp'] > index[-1]['end']]
+            if not len(records):
+                return None
+        return {name: records[name].copy() for name in TAIL_DTYPE.names}
+
+    def _append_tail(self, series_dir: Path, columns: Dict[str, np.ndarray]):
+        records = np.empty(len(columns['timestamp']), dtype=TAIL_DTYPE)
+        for name in TAIL_DTYPE.names:
+            records[name] = columns[name]
+        state = self._tail_state(series_dir)
+        with open(series_dir / "tail.bin", 'r+b' if state['rows'] else 'wb') as f:
+            # Overwrite any torn record left past the last whole one
+            f.seek(state['rows'] * TAIL_DTYPE.itemsize)
+            f.write(records.tobytes())
+            f.truncate()
+        state['rows'] += len(records)
+        state['last'] = int(records['timestamp'][-1])
+
+    def _compact_tail(self, series_dir: Path):
+        """Fold the tail file into chunks"""
+        tail = self._read_tail(series_dir)
+        if tail is not None:
+            self._merge_into_chunks(series_dir, tail)
+        tail_file = series_dir / "tail.bin"
+        if tail_file.exists():
+            tail_file.unlink()
+        self._tails[series_dir] = {'rows': 0, 'last': None}
+
+    def compact(self, coin: str, timeframe: str):
+        """Fold appended bars into compressed chunks now rather than at the next threshold"""
+        series_dir = self._series_dir(coin, timeframe)
+        if series_dir.exists():
+            self._compact_tail(series_dir)
+
+    # Chunk encoding
+
+    @staticmethod
+    def _delta_encode(timestamps: np.ndarray) -> np.ndarray:
+        deltas = np.diff(timestamps)
+        for dtype in (np.uint8, np.uint16, np.uint32):
+            if len(deltas) == 0 or deltas.max() <= np.iinfo(dtype).max:
+                return deltas.astype(dtype)
+        return deltas.astype(np.int64)
+
+    def _write_chunk(self, series_dir: Path, number: int, columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        timestamps = columns['timestamp']
+        # Fresh names, so chunks being replaced stay intact (and mapped readers
+        # valid) until the new index is saved
+        name = f"{number:06d}.{uuid.uuid4().hex[:8]}"
+        if self.mmap:
+            chunk_dir = series_dir / name
+            chunk_dir.mkdir()
+            for column, values in columns.items():
+                np.save(chunk_dir / f"{column}.npy", values)
+        else:
+            name += ".npz"
+            np.savez_compressed(
+                series_dir / name,
+                t0=timestamps[:1],
+                dt=self._delta_encode(timestamps),
+                **{k: v for k, v in columns.items() if k != 'timestamp'}
+            )
+        return {
+            'chunk': name,
+            'start': int(timestamps[0]),
+            'end': int(timestamps[-1]),
+            'rows': int(len(timestamps)),
+        }
+
+    def _read_chunk(self, series_dir: Path, entry: Dict[str, Any],
+                    columns: Optional[List[str]] = None, mmap: Optional[bool] = None) -> Dict[str, np.ndarray]:
+        path = series_dir / entry['chunk']
+        if path.is_dir():
+            wanted = ['timestamp'] + [c for c in (columns or PRICE_COLUMNS) if c != 'timestamp']
+            mmap = self.mmap if mmap is None else mmap
+            return {
+                name: np.load(path / f"{name}.npy", mmap_mode='r' if mmap else None)
+                for name in wanted if (path / f"{name}.npy").exists()
+            }
+        with np.load(path) as chunk:
+            timestamps = np.empty(len(chunk['dt']) + 1, dtype=np.int64)
+            timestamps[0] = chunk['t0'][0]
+            np.cumsum(chunk['dt'], dtype=np.int64, out=timestamps[1:])
+            timestamps[1:] += timestamps[0]
+            result = {'timestamp': timestamps}
+            for name in (columns or PRICE_COLUMNS):
+                if name in chunk.files:
+                    result[name] = chunk[name]
+            return result
+
+    # Public API
+
+    def write(self, coin: str, timeframe: str, timestamps, **columns) -> int:
+        """
+        Upsert bars for one series. Small in-order appends go to the tail
+        file; other writes replace chunks from the first affected one on.
+        """
+        timestamps = np.atleast_1d(to_epoch_seconds(timestamps))
+        if len(timestamps) == 0:
+            return 0
+        new = {'timestamp': timestamps}
+        for name in PRICE_COLUMNS:
+            values = columns.get(name)
+            new[name] = (np.full(len(timestamps), np.nan) if values is None
+                         else np.asarray(values, dtype=np.float64))
+
+        series_dir = self._series_dir(coin, timeframe)
+        series_dir.mkdir(parents=True, exist_ok=True)
+        self._purge_stale_chunks()
+        index = self._index(series_dir)
+        tail = self._tail_state(series_dir)
+
+        last = tail['last'] if tail['last'] is not None else (index[-1]['end'] if index else None)
+        in_order = (last is None or timestamps[0] > last) and bool(np.all(np.diff(timestamps) > 0))
+        if in_order and len(timestamps) < self.tail_rows:
+            self._append_tail(series_dir, new)
+            if tail['rows'] >= self.tail_rows:
+                self._compact_tail(series_dir)
+            return len(timestamps)
+
+        # Chunk rewrites must see bars still sitting in the tail
+        if tail['rows']:
+            self._compact_tail(series_dir)
+        self._merge_into_chunks(series_dir, new)
+        return len(timestamps)
+
+    def _merge_into_chunks(self, series_dir: Path, new: Dict[str, np.ndarray]):
+        index = self._index(series_dir)
+
+        # Reload from the first chunk the new bars could touch
+        first = len(index)
+        lowest = int(new['timestamp'].min())
+        for i, entry in enumerate(index):
+            if entry['end'] >= lowest or (i == len(index) - 1 and entry['rows'] < self.chunk_rows):
+                first = i
+                break
+        # Loaded into memory, not mapped, so the old files can be removed below
+        existing = [self._read_chunk(series_dir, entry, mmap=False) for entry in index[first:]]
+
+        merged = {
+            name: np.concatenate([np.asarray(c.get(name, np.full(len(c['timestamp']), np.nan)))
+                                  for c in existing] + [new[name]])
+            for name in new
+        }
+        # Sort by time and keep the most recent write for duplicate timestamps
+        order = np.argsort(merged['timestamp'], kind='stable')[::-1]
+        _, keep = np.unique(merged['timestamp'][order], return_index=True)
+        keep = order[keep]
+        merged = {name: values[keep] for name, values in merged.items()}
+
+        rewritten = []
+        for offset in range(0, len(merged['timestamp']), self.chunk_rows):
+            chunk = {name: values[offset:offset + self.chunk_rows] for name, values in merged.items()}
+            rewritten.append(self._write_chunk(series_dir, first + len(rewritten), chunk))
+
+        replaced = index[first:]
+        self._save_index(series_dir, index[:first] + rewritten)
+        for entry in replaced:
+            self._remove_chunk(series_dir, entry)
+
+    def _remove_chunk(self, series_dir: Path, entry: Dict[str, Any]):
+        self._remove_path(series_dir / entry['chunk'])
+
+    def _remove_path(self, path: Path):
+        try:
+            if path.is_dir():
+                for file in path.iterdir():
+                    file.unlink()
+                path.rmdir()
+            elif path.exists():
+                path.unlink()
+        except PermissionError:
+            # Windows refuses to delete files that are still memory-mapped by
+            # arrays a caller holds; retry on a later write
+            self._stale_chunks.append(path)
+
+    def _purge_stale_chunks(self):
+        stale, self._stale_chunks = self._stale_chunks, []
+        for path in stale:
+            self._remove_path(path)
+
+    def read(self, coin: str, timeframe: str, start=None, end=None,
+             columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Range query returning {'timestamp': int64 epoch seconds, column: float64 array}"""
+        series_dir = self._series_dir(coin, timeframe)
+        index = self._index(series_dir)
+        start_ts = None if start is None else int(to_epoch_seconds(start))
+        end_ts = None if end is None else int(to_epoch_seconds(end))
+
+        chunks = [
+            self._read_chunk(series_dir, entry, columns)
+            for entry in index
+            if (start_ts is None or entry['end'] >= start_ts)
+            and (end_ts is None or entry['start'] <= end_ts)
+        ]
+        # Tail bars all come after the last chunk
+        tail = self._read_tail(series_dir)
+        if tail is not None and (start_ts is None or tail['timestamp'][-1] >= start_ts) \
+                and (end_ts is None or tail['timestamp'][0] <= end_ts):
+            chunks.append(tail)
+        names = ['timestamp'] + [c for c in (columns or PRICE_COLUMNS) if c != 'timestamp']
+        if not chunks:
+            return {name: np.empty(0, dtype=np.int64 if name == 'timestamp' else np.float64)
+                    for name in names}
+
+        if len(chunks) == 1:
+            result = {name: chunks[0][name] for name in names if name in chunks[0]}
+        else:
+            result = {name: np.concatenate([c[name] for c in chunks])
+                      for name in names if name in chunks[0]}
+
+        lo = 0 if start_ts is None else np.searchsorted(result['timestamp'], start_ts, side='left')
+        hi = len(result['timestamp']) if end_ts is None else \
+            np.searchsorted(result['timestamp'], end_ts, side='right')
+        return {name: values[lo:hi] for name, values in result.items()}
+
+    def read_frame(self, coin: str, timeframe: str, start=None, end=None) -> pd.DataFrame:
+        """Range query as a DataFrame indexed by timestamp (built from the arrays, not rows)"""
+        arrays = self.read(coin, timeframe, start, end, columns=['open', 'high', 'low', 'close', 'volume'])
+        index = pd.DatetimeIndex(pd.to_datetime(arrays.pop('timestamp'), unit='s'), name='timestamp')
+        return pd.DataFrame(arrays, index=index)
+
+    def read_many(self, coins: List[str], timeframe: str, start=None, end=None,
+                  columns: Optional[List[str]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        return {coin: self.read(coin, timeframe, start, end, columns) for coin in coins}
+
+    def has_series(self, coin: str, timeframe: str) -> bool:
+        series_dir = self._series_dir(coin, timeframe)
+        return bool(self._index(series_dir)) or self._tail_state(series_dir)['rows'] > 0
+
+    def last_timestamp(self, coin: str, timeframe: str) -> Optional[int]:
+        series_dir = self._series_dir(coin, timeframe)
+        tail = self._tail_state(series_dir)
+        if tail['last'] is not None:
+            return tail['last']
+        index = self._index(series_dir)
+        return index[-1]['end'] if index else None
+
+    def series_info(self, coin: str, timeframe: str) -> Dict[str, Any]:
+        series_dir = self._series_dir(coin, timeframe)
+        index = self._index(series_dir)
+        tail = self._read_tail(series_dir)
+        size = sum(f.stat().st_size for f in series_dir.rglob('*') if f.is_file()) \
+            if index or tail is not None else 0
+        return {
+            'chunks': len(index),
+            'rows': sum(entry['rows'] for entry in index) + (0 if tail is None else len(tail['timestamp'])),
+            'tail_rows': 0 if tail is None else len(tail['timestamp']),
+            'start': index[0]['start'] if index else (None if tail is None else int(tail['timestamp'][0])),
+            'end': self.last_timestamp(coin, timeframe),
+            'bytes_on_disk': size,
+        }
+
+    def delete_series(self, coin: str, timeframe: str):
+        series_dir = self._series_dir(coin, timeframe)
+        for entry in self._index(series_dir):
+            self._remove_chunk(series_dir, entry)
+        for name in ("index.json", "tail.bin"):
+            if (series_dir / name).exists():
+                (series_dir / name).unlink()
+        self._indexes.pop(series_dir, None)
+        self._tails.pop(series_dir, None)
+        logger.info(f"Deleted time series {coin}/{timeframe}")
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+SENTIMENT AGGREGATION STORE
+Rolling per-token, per-platform time buckets updated as posts arrive, so
+window queries ("last 1h", "last 24h") merge a handful of buckets instead of
+rescanning every post
+"""
+import hashlib
+import math
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+class _Bucket:
+    """Running totals for one token on one platform over one bucket interval"""
+    __slots__ = ('count', 'sentiment_sum', 'sentiment_sq_sum', 'weighted_sum', 'engagement',
+                 'bullish', 'bearish', 'neutral', 'hashtags', 'influencers')
+
+    def __init__(self):
+        self.count = 0
+        self.sentiment_sum = 0.0
+        self.sentiment_sq_sum = 0.0
+        self.weighted_sum = 0.0
+        self.engagement = 0
+        self.bullish = 0
+        self.bearish = 0
+        self.neutral = 0
+        self.hashtags = Counter()
+        self.influencers: Dict[str, float] = {}
+
+    def add(self, sentiment, max_influencers: int):
+        self.count += 1
+        self.sentiment_sum += sentiment.sentiment_score
+        self.sentiment_sq_sum += sentiment.sentiment_score ** 2
+        self.weighted_sum += sentiment.weighted_sentiment
+        self.engagement += sentiment.engagement
+
+        label = sentiment.sentiment_label
+        if label == "BULLISH":
+            self.bullish += 1
+        elif label == "BEARISH":
+            self.bearish += 1
+        else:
+            self.neutral += 1
+
+        self.hashtags.update(sentiment.hashtags)
+
+        # Only the strongest few authors per bucket are worth keeping
+        influence = sentiment.influence_score * sentiment.engagement
+        if influence > self.influencers.get(sentiment.author, -1.0):
+            self.influencers[sentiment.author] = influence
+            if len(self.influencers) > max_influencers:
+                weakest = min(self.influencers, key=self.influencers.get)
+                del self.influencers[weakest]
+
+    def merge(self, other: '_Bucket'):
+        self.count += other.count
+        self.sentiment_sum += other.sentiment_sum
+        self.sentiment_sq_sum += other.sentiment_sq_sum
+        self.weighted_sum += other.weighted_sum
+        self.engagement += other.engagement
+        self.bullish += other.bullish
+        self.bearish += other.bearish
+        self.neutral += other.neutral
+        self.hashtags.update(other.hashtags)
+        for author, influence in other.influencers.items():
+            if influence > self.influencers.get(author, -1.0):
+                self.influencers[author] = influence
+
+    @property
+    def avg_sentiment(self) -> float:
+        return self.sentiment_sum / self.count if self.count else 0.0
+
+    @property
+    def avg_weighted_sentiment(self) -> float:
+        return self.weighted_sum / self.count if self.count else 0.0
+
+    @property
+    def sentiment_std(self) -> float:
+        if not self.count:
+            return 0.0
+        variance = self.sentiment_sq_sum / self.count - self.avg_sentiment ** 2
+        return math.sqrt(max(variance, 0.0))
+
+Timestamp = Union[float, datetime]
+
+def _epoch(timestamp: Optional[Timestamp]) -> float:
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return float(timestamp)
+
+class SentimentAggregationStore:
+    """
+    Time-bucketed sentiment aggregates keyed by token and platform.
+    Posts are folded into `bucket_seconds` buckets on arrival (re-deliveries
+    of the same post are ignored) and buckets older than the retention
+    window are dropped.
+    """
+
+    def __init__(self, bucket_seconds: int = 300, retention_hours: float = 168,
+                 max_influencers_per_bucket: int = 10, max_seen_posts: int = 100000):
+        self.bucket_seconds = bucket_seconds
+        self.retention_seconds = retention_hours * 3600
+        self.max_influencers_per_bucket = max_influencers_per_bucket
+
+        # token -> platform -> bucket start -> totals
+        self.buckets: Dict[str, Dict[str, Dict[int, _Bucket]]] = {}
+        self.last_ingest: Dict[str, float] = {}
+
+        self.max_seen_posts = max_seen_posts
+        self._seen_posts: "OrderedDict[bytes, None]" = OrderedDict()
+
+    @staticmethod
+    def _post_key(sentiment) -> bytes:
+        raw = f"{sentiment.platform}|{sentiment.author}|{_epoch(sentiment.timestamp)}|{sentiment.content}"
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).digest()
+
+    def add(self, sentiment, tokens: Optional[Iterable[str]] = None) -> bool:
+        """Fold one SentimentData into the buckets of each token it mentions; False if already seen"""
+        key = self._post_key(sentiment)
+        if key in self._seen_posts:
+            return False
+        self._seen_posts[key] = None
+        if len(self._seen_posts) > self.max_seen_posts:
+            self._seen_posts.popitem(last=False)
+
+        timestamp = _epoch(sentiment.timestamp)
+        if timestamp < time.time() - self.retention_seconds:
+            return False
+        start = int(timestamp // self.bucket_seconds) * self.bucket_seconds
+
+        for token in set(tokens if tokens is not None else sentiment.token_mentions):
+            platforms = self.buckets.setdefault(token, {})
+            buckets = platforms.setdefault(sentiment.platform, {})
+            bucket = buckets.get(start)
+            if bucket is None:
+                bucket = buckets[start] = _Bucket()
+            bucket.add(sentiment, self.max_influencers_per_bucket)
+        return True
+
+    def add_many(self, sentiments: Iterable, token_symbol: Optional[str] = None) -> int:
+        """Add a batch of posts, optionally all attributed to one token; returns how many were new"""
+        tokens = [token_symbol] if token_symbol else None
+        added = sum(1 for sentiment in sentiments if self.add(sentiment, tokens))
+        if token_symbol:
+            self.last_ingest[token_symbol] = time.time()
+        self.prune()
+        return added
+
+    def is_fresh(self, token_symbol: str, max_age_seconds: float) -> bool:
+        """Whether the token was ingested recently enough to skip refetching"""
+        last = self.last_ingest.get(token_symbol)
+        return last is not None and time.time() - last < max_age_seconds
+
+    def prune(self, now: Optional[Timestamp] = None):
+        """Drop buckets past the retention window"""
+        cutoff = _epoch(now) - self.retention_seconds
+        for token in list(self.buckets):
+            platforms = self.buckets[token]
+            for platform in list(platforms):
+                buckets = platforms[platform]
+                for start in [s for s in buckets if s + self.bucket_seconds <= cutoff]:
+                    del buckets[start]
+                if not buckets:
+                    del platforms[platform]
+            if not platforms:
+                del self.buckets[token]
+                self.last_ingest.pop(token, None)
+
+    def _window(self, token_symbol: str, start: float, end: float,
+                platforms: Optional[Iterable[str]] = None) -> Dict[str, _Bucket]:
+        """Merged totals per platform for buckets overlapping [start, end)"""
+        merged = {}
+        for platform, buckets in self.buckets.get(token_symbol, {}).items():
+            if platforms is not None and platform not in platforms:
+                continue
+            total = _Bucket()
+            for bucket_start, bucket in buckets.items():
+                if bucket_start + self.bucket_seconds > start and bucket_start < end:
+                    total.merge(bucket)
+            if total.count:
+                merged[platform] = total
+        return merged
+
+    def window_totals(self, token_symbol: str, window_seconds: Optional[float] = None,
+                      platforms: Optional[Iterable[str]] = None,
+                      now: Optional[Timestamp] = None) -> _Bucket:
+        """All-platform totals for the last `window_seconds` (whole retention when None)"""
+        now = _epoch(now)
+        start = now - (window_seconds if window_seconds is not None else self.retention_seconds)
+        end = now + self.bucket_seconds
+        total = _Bucket()
+        for bucket in self._window(token_symbol, start, end, platforms).values():
+            total.merge(bucket)
+        return total
+
+    def platform_breakdown(self, token_symbol: str, window_seconds: Optional[float] = None,
+                           now: Optional[Timestamp] = None) -> Dict[str, Dict[str, Any]]:
+        """Mentions, average sentiment and engagement per platform"""
+        now = _epoch(now)
+        start = now - (window_seconds if window_seconds is not None else self.retention_seconds)
+        end = now + self.bucket_seconds
+        return {
+            platform: {
+                'mentions': bucket.count,
+                'avg_sentiment': bucket.avg_sentiment,
+                'total_engagement': bucket.engagement
+            }
+            for platform, bucket in self._window(token_symbol, start, end).items()
+        }
+
+    def timeline(self, token_symbol: str, hours: int = 24,
+                 now: Optional[Timestamp] = None) -> List[Dict[str, Any]]:
+        """Hourly mention counts and average sentiment, oldest first"""
+        now = _epoch(now)
+        current_hour = int(now // 3600) * 3600
+        hourly = {}
+        for buckets in self.buckets.get(token_symbol, {}).values():
+            for bucket_start, bucket in buckets.items():
+                hour = int(bucket_start // 3600) * 3600
+                if hour > current_hour - hours * 3600:
+                    hourly.setdefault(hour, _Bucket()).merge(bucket)
+
+        points = []
+        for i in range(hours - 1, -1, -1):
+            hour = current_hour - i * 3600
+            bucket = hourly.get(hour)
+            points.append({
+                'hour': datetime.fromtimestamp(hour),
+                'mentions': bucket.count if bucket else 0,
+                'avg_sentiment': bucket.avg_sentiment if bucket else None
+            })
+        return points
+
+    def summarize(self, token_symbol: str, window_seconds: Optional[float] = None,
+                  now: Optional[Timestamp] = None) -> Dict[str, Any]:
+        """Fields of a PlatformSentimentSummary for the token over the window"""
+        now = _epoch(now)
+        total = self.window_totals(token_symbol, window_seconds, now=now)
+
+        # Sentiment momentum (change over last 24h)
+        recent = self.window_totals(token_symbol, 24 * 3600, now=now)
+        retained = self.window_totals(token_symbol, now=now)
+        older_count = retained.count - recent.count
+        older_avg = (retained.weighted_sum - recent.weighted_sum) / older_count if older_count > 0 else 0
+        sentiment_momentum = recent.avg_weighted_sentiment - older_avg
+
+        # Confidence level based on volume and consistency
+        confidence_level = min(
+            (total.count / 100) * 0.5 +
+            (1 - total.sentiment_std) * 0.5,
+            1.0
+        ) if total.count else 0.0
+
+        return {
+            'token_symbol': token_symbol,
+            'total_mentions': total.count,
+            'avg_sentiment': total.avg_weighted_sentiment,
+            'bullish_count': total.bullish,
+            'bearish_count': total.bearish,
+            'neutral_count': total.neutral,
+            'total_engagement': total.engagement,
+            'top_influencers': sorted(total.influencers, key=total.influencers.get, reverse=True)[:5],
+            'trending_hashtags': [tag for tag, _ in total.hashtags.most_common(5)],
+            'sentiment_momentum': sentiment_momentum,
+            'confidence_level': confidence_level
+        }
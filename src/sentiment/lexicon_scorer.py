@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+FAST LEXICON SENTIMENT SCORER
+Dependency-free crypto sentiment scoring: one tokenisation pass per text,
+dictionary lookups for terms and phrases, and a hash memo so duplicate
+posts are only scored once
+"""
+import hashlib
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+WORD_RE = re.compile(r"\w+")
+
+# Crypto-specific terms; phrases are matched on word boundaries like single words
+BULLISH_TERMS = [
+    'moon', 'mooning', 'bullish', 'pump', 'gem', 'diamond', 'hold', 'hodl', 'buy', 'accumulate',
+    'to the moon', 'diamond hands', 'this is it', 'huge potential', 'next 100x',
+    'golden opportunity', 'perfect entry', 'loading up', 'all in'
+]
+
+BEARISH_TERMS = [
+    'dump', 'crash', 'bearish', 'sell', 'exit', 'scam', 'rug', 'dead', 'rip',
+    'paper hands', 'getting out', 'this is over', 'red flag', 'avoid',
+    'ponzi', 'scam coin', 'exit liquidity', 'dump incoming'
+]
+
+# General-purpose polarity lexicon: word -> (polarity, subjectivity)
+POLARITY_LEXICON = {
+    'good': (0.7, 0.6), 'great': (0.8, 0.75), 'amazing': (0.6, 0.9), 'awesome': (1.0, 1.0),
+    'best': (1.0, 0.3), 'better': (0.5, 0.5), 'strong': (0.43, 0.73), 'solid': (0.3, 0.5),
+    'love': (0.5, 0.6), 'nice': (0.6, 1.0), 'huge': (0.4, 0.9), 'fast': (0.2, 0.6),
+    'growing': (0.3, 0.4), 'ready': (0.2, 0.5), 'perfect': (1.0, 1.0), 'golden': (0.3, 0.5),
+    'undervalued': (0.4, 0.6), 'excellent': (1.0, 1.0), 'exciting': (0.3, 0.8), 'happy': (0.8, 1.0),
+    'profit': (0.4, 0.4), 'winning': (0.5, 0.75), 'safe': (0.5, 0.5), 'legit': (0.5, 0.6),
+    'bad': (-0.7, 0.67), 'worst': (-1.0, 1.0), 'terrible': (-1.0, 1.0), 'awful': (-1.0, 1.0),
+    'risky': (-0.5, 0.7), 'weak': (-0.38, 0.62), 'sure': (0.5, 0.89), 'wrong': (-0.5, 0.9),
+    'dead': (-0.2, 0.4), 'fake': (-0.5, 1.0), 'worried': (-0.4, 0.7), 'scary': (-0.5, 1.0),
+    'fear': (-0.5, 0.8), 'loss': (-0.4, 0.4), 'losing': (-0.4, 0.6), 'down': (-0.16, 0.29),
+    'dip': (-0.1, 0.3), 'warning': (-0.3, 0.5), 'overvalued': (-0.4, 0.6), 'slow': (-0.3, 0.4),
+    'stupid': (-0.8, 1.0), 'sad': (-0.5, 1.0), 'hate': (-0.8, 0.9), 'poor': (-0.4, 0.6)
+}
+
+INTENSIFIERS = {'very': 1.3, 'really': 1.3, 'super': 1.5, 'extremely': 1.5, 'so': 1.2, 'mega': 1.5}
+NEGATIONS = {'not', 'no', 'never', 'dont', 'don', 'isnt', 'isn', 'nothing', 'without'}
+
+def _phrase_index(terms: Iterable[str]) -> Dict[str, List[Tuple[str, ...]]]:
+    """First word -> every term (as a word tuple) starting with it"""
+    index: Dict[str, List[Tuple[str, ...]]] = {}
+    for term in terms:
+        words = tuple(WORD_RE.findall(term.lower()))
+        if words:
+            index.setdefault(words[0], []).append(words)
+    return index
+
+class LexiconSentimentScorer:
+    """
+    Crypto-aware lexicon scorer returning (sentiment, confidence) like the
+    old TextBlob + regex combination. Every occurrence of every term counts,
+    so overlapping phrases ('to the moon' and 'moon') both score.
+    """
+
+    def __init__(self,
+                 bullish_terms: Sequence[str] = BULLISH_TERMS,
+                 bearish_terms: Sequence[str] = BEARISH_TERMS,
+                 memo_size: int = 50000):
+        self.bullish_terms = list(bullish_terms)
+        self.bearish_terms = list(bearish_terms)
+        self._bullish = _phrase_index(self.bullish_terms)
+        self._bearish = _phrase_index(self.bearish_terms)
+
+        # Keyed by a digest of the lowercased text so memory stays small for long posts
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[bytes, Tuple[float, float]]" = OrderedDict()
+        self.stats = {'scored': 0, 'memo_hits': 0}
+
+    @staticmethod
+    def _count(words: List[str], index: Dict[str, List[Tuple[str, ...]]]) -> int:
+        matches = 0
+        for i, word in enumerate(words):
+            for phrase in index.get(word, ()):
+                if len(phrase) == 1 or tuple(words[i:i + len(phrase)]) == phrase:
+                    matches += 1
+        return matches
+
+    @staticmethod
+    def _polarity(words: List[str]) -> Tuple[float, float]:
+        """Average polarity/subjectivity of lexicon words, with intensifiers and negation"""
+        polarities = []
+        subjectivities = []
+        for i, word in enumerate(words):
+            entry = POLARITY_LEXICON.get(word)
+            if entry is None:
+                continue
+            polarity, subjectivity = entry
+
+            previous = words[i - 1] if i else ''
+            if previous in INTENSIFIERS:
+                polarity = max(-1.0, min(1.0, polarity * INTENSIFIERS[previous]))
+                subjectivity = min(1.0, subjectivity * INTENSIFIERS[previous])
+            if previous in NEGATIONS or (i > 1 and words[i - 2] in NEGATIONS):
+                polarity *= -0.5
+
+            polarities.append(polarity)
+            subjectivities.append(subjectivity)
+
+        if not polarities:
+            return 0.0, 0.0
+        return sum(polarities) / len(polarities), sum(subjectivities) / len(subjectivities)
+
+    def score_lowered(self, lowered: str) -> Tuple[float, float]:
+        """Score already-lowercased text without touching the memo"""
+        words = WORD_RE.findall(lowered)
+        base_sentiment, confidence = self._polarity(words)
+
+        # Crypto-specific pattern matching
+        bullish_matches = self._count(words, self._bullish)
+        bearish_matches = self._count(words, self._bearish)
+
+        # Combine scores
+        pattern_sentiment = 0
+        if bullish_matches > bearish_matches:
+            pattern_sentiment = min(bullish_matches * 0.2, 0.8)
+        elif bearish_matches > bullish_matches:
+            pattern_sentiment = -min(bearish_matches * 0.2, 0.8)
+
+        # Weighted combination
+        final_sentiment = (base_sentiment * 0.6) + (pattern_sentiment * 0.4)
+        final_confidence = min(confidence + (abs(pattern_sentiment) * 0.3), 1.0)
+
+        return final_sentiment, final_confidence
+
+    @staticmethod
+    def _key(lowered: str) -> bytes:
+        return hashlib.blake2b(lowered.strip().encode('utf-8'), digest_size=16).digest()
+
+    def _remember(self, key: bytes, result: Tuple[float, float]):
+        self._memo[key] = result
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    def score(self, text: str) -> Tuple[float, float]:
+        """Score one text, reusing the memoised result for duplicates"""
+        lowered = text.lower()
+        key = self._key(lowered)
+        cached = self._memo.get(key)
+        if cached is not None:
+            self.stats['memo_hits'] += 1
+            self._memo.move_to_end(key)
+            return cached
+
+        result = self.score_lowered(lowered)
+        self.stats['scored'] += 1
+        self._remember(key, result)
+        return result
+
+    def score_many(self, texts: Sequence[str], processes: Optional[int] = None,
+                   min_parallel: int = 20000) -> List[Tuple[float, float]]:
+        """
+        Score a batch. Duplicates (within the batch or already memoised) are
+        scored once; when `processes` is set and at least `min_parallel`
+        unique texts remain they are scored in a process pool.
+        """
+        keys = []
+        lowered_by_key: Dict[bytes, str] = {}
+        pending: Dict[bytes, str] = {}
+        for text in texts:
+            lowered = text.lower()
+            key = self._key(lowered)
+            keys.append(key)
+            lowered_by_key[key] = lowered
+            if key in self._memo:
+                self.stats['memo_hits'] += 1
+            elif key not in pending:
+                pending[key] = lowered
+            else:
+                self.stats['memo_hits'] += 1
+
+        if pending:
+            lowered_texts = list(pending.values())
+            if processes and len(lowered_texts) >= min_parallel:
+                chunk_size = max(1, len(lowered_texts) // (processes * 4))
+                chunks = [lowered_texts[i:i + chunk_size] for i in range(0, len(lowered_texts), chunk_size)]
+                with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                         initargs=(self.bullish_terms, self.bearish_terms)) as pool:
+                    results = [result for chunk in pool.map(_score_chunk, chunks) for result in chunk]
+            else:
+                results = [self.score_lowered(lowered) for lowered in lowered_texts]
+
+            self.stats['scored'] += len(results)
+            for key, result in zip(pending, results):
+                self._remember(key, result)
+
+        # A batch larger than the memo can evict its own early entries
+        return [self._memo.get(key) or self.score_lowered(lowered_by_key[key]) for key in keys]
+
+    def clear_memo(self):
+        self._memo.clear()
+
+_worker_scorer: Optional[LexiconSentimentScorer] = None
+
+def _init_worker(bullish_terms: Sequence[str], bearish_terms: Sequence[str]):
+    global _worker_scorer
+    _worker_scorer = LexiconSentimentScorer(bullish_terms, bearish_terms, memo_size=0)
+
+def _score_chunk(lowered_texts: List[str]) -> List[Tuple[float, float]]:
+    return [_worker_scorer.score_lowered(lowered) for lowered in lowered_texts]
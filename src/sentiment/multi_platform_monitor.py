@@ -18,9 +18,14 @@ import requests
 from urllib.parse import quote_plus
 import hashlib
 import hmac
-from textblob import TextBlob
 import logging
 
+from src.sentiment.lexicon_scorer import LexiconSentimentScorer
+from src.sentiment.aggregation_store import SentimentAggregationStore
+
+TOKEN_MENTION_RE = re.compile(r'\$([A-Z]{3,10})\b')
+COMMON_TOKENS = ['BTC', 'ETH', 'SOL', 'ADA', 'DOT', 'AVAX', 'MATIC', 'LINK']
+
 @dataclass
 class SentimentData:
     """Structured sentiment data from any platform"""
@@ -107,10 +112,12 @@ class MultiPlatformSentimentMonitor:
         }
         
         # Initialize session state
-        if 'sentiment_data' not in st.session_state:
-            st.session_state.sentiment_data = []
         if 'sentiment_summaries' not in st.session_state:
             st.session_state.sentiment_summaries = {}
+        if 'sentiment_store' not in st.session_state:
+            st.session_state.sentiment_store = SentimentAggregationStore()
+        if 'sentiment_scorer' not in st.session_state:
+            st.session_state.sentiment_scorer = LexiconSentimentScorer()
         if 'sentiment_config' not in st.session_state:
             st.session_state.sentiment_config = {
                 'update_interval': 300,  # 5 minutes
@@ -126,56 +133,29 @@ class MultiPlatformSentimentMonitor:
             'bullish', 'bearish', 'fud', 'fomo', 'dyor', 'nfa', 'ath', 'btfd'
         ]
         
-        # Sentiment analysis patterns
-        self.bullish_patterns = [
-            r'\b(moon|mooning|bullish|pump|gem|diamond|hold|hodl|buy|accumulate)\b',
-            r'\b(to the moon|diamond hands|this is it|huge potential|next 100x)\b',
-            r'\b(golden opportunity|perfect entry|loading up|all in)\b'
-        ]
-        
-        self.bearish_patterns = [
-            r'\b(dump|crash|bearish|sell|exit|scam|rug|dead|rip)\b',
-            r'\b(paper hands|getting out|this is over|red flag|avoid)\b',
-            r'\b(ponzi|scam coin|exit liquidity|dump incoming)\b'
-        ]
+        # Crypto-aware lexicon scorer with a memo shared by every platform, and the
+        # rolling aggregates every view reads from; both survive Streamlit reruns
+        self.sentiment_scorer = st.session_state.sentiment_scorer
+        self.sentiment_store = st.session_state.sentiment_store
     
     def extract_token_mentions(self, text: str) -> List[str]:
         """Extract cryptocurrency token mentions from text"""
         # Look for $TOKEN pattern
-        token_pattern = r'\$([A-Z]{3,10})\b'
-        tokens = re.findall(token_pattern, text.upper())
+        tokens = TOKEN_MENTION_RE.findall(text.upper())
         
         # Look for common token names
-        common_tokens = ['BTC', 'ETH', 'SOL', 'ADA', 'DOT', 'AVAX', 'MATIC', 'LINK']
-        for token in common_tokens:
-            if token.lower() in text.lower():
-                tokens.append(token)
+        lowered = text.lower()
+        tokens.extend(token for token in COMMON_TOKENS if token.lower() in lowered)
         
         return list(set(tokens))
     
     def analyze_sentiment(self, text: str) -> Tuple[float, float]:
         """Analyze sentiment of text content"""
-        # Basic TextBlob sentiment
-        blob = TextBlob(text)
-        base_sentiment = blob.sentiment.polarity
-        confidence = blob.sentiment.subjectivity
-        
-        # Crypto-specific pattern matching
-        bullish_matches = sum(len(re.findall(pattern, text.lower())) for pattern in self.bullish_patterns)
-        bearish_matches = sum(len(re.findall(pattern, text.lower())) for pattern in self.bearish_patterns)
-        
-        # Combine scores
-        pattern_sentiment = 0
-        if bullish_matches > bearish_matches:
-            pattern_sentiment = min(bullish_matches * 0.2, 0.8)
-        elif bearish_matches > bullish_matches:
-            pattern_sentiment = -min(bearish_matches * 0.2, 0.8)
-        
-        # Weighted combination
-        final_sentiment = (base_sentiment * 0.6) + (pattern_sentiment * 0.4)
-        final_confidence = min(confidence + (abs(pattern_sentiment) * 0.3), 1.0)
-        
-        return final_sentiment, final_confidence
+        return self.sentiment_scorer.score(text)
+    
+    def analyze_many(self, texts: List[str], processes: Optional[int] = None) -> List[Tuple[float, float]]:
+        """Analyze a batch of texts; duplicates are scored once, large batches can use a process pool"""
+        return self.sentiment_scorer.score_many(texts, processes=processes)
     
     async def fetch_twitter_sentiment(self, query: str, max_results: int = 100) -> List[SentimentData]:
         """Fetch sentiment data from Twitter (simulated - would need Twitter API v2)"""
@@ -388,6 +368,23 @@ class MultiPlatformSentimentMonitor:
         
         return all_sentiments
     
+    async def refresh_token_sentiment(self, token_symbol: str,
+                                      max_age_seconds: Optional[float] = None) -> PlatformSentimentSummary:
+        """Fetch new posts only when the token's aggregates are stale, then summarize from the store"""
+        if max_age_seconds is None:
+            max_age_seconds = st.session_state.sentiment_config['update_interval']
+        
+        if not self.sentiment_store.is_fresh(token_symbol, max_age_seconds):
+            sentiments = await self.fetch_all_platform_sentiment(token_symbol)
+            self.sentiment_store.add_many(sentiments, token_symbol)
+        
+        return self.get_sentiment_summary(token_symbol)
+    
+    def get_sentiment_summary(self, token_symbol: str,
+                              window_seconds: Optional[float] = None) -> PlatformSentimentSummary:
+        """Summary over the last `window_seconds` (whole retention when None) from the aggregation store"""
+        return PlatformSentimentSummary(**self.sentiment_store.summarize(token_symbol, window_seconds))
+    
     def calculate_sentiment_summary(self, sentiments: List[SentimentData], token_symbol: str) -> PlatformSentimentSummary:
         """Calculate comprehensive sentiment summary for a token"""
         if not sentiments:
@@ -526,9 +523,10 @@ class MultiPlatformSentimentMonitor:
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            # Simulate fetching from each platform
-            all_sentiments = []
+            # Simulate fetching from each platform, unless the aggregates are still fresh
             platforms = ['Twitter', 'Reddit', 'Telegram', 'Discord', 'YouTube']
+            if self.sentiment_store.is_fresh(token_symbol, st.session_state.sentiment_config['update_interval']):
+                platforms = []
             
             for i, platform in enumerate(platforms):
                 status_text.text(f'Fetching data from {platform}...')
@@ -546,14 +544,13 @@ class MultiPlatformSentimentMonitor:
                 elif platform.lower() == 'youtube':
                     sentiments = asyncio.run(self.fetch_youtube_sentiment(token_symbol))
                 
-                all_sentiments.extend(sentiments)
+                self.sentiment_store.add_many(sentiments, token_symbol)
                 time.sleep(0.5)  # Simulate processing time
             
             # Calculate summary
-            summary = self.calculate_sentiment_summary(all_sentiments, token_symbol)
+            summary = self.get_sentiment_summary(token_symbol)
             
             # Store results
-            st.session_state.sentiment_data = all_sentiments
             st.session_state.sentiment_summaries[token_symbol] = summary
             
             status_text.text('Analysis complete!')
@@ -614,21 +611,12 @@ class MultiPlatformSentimentMonitor:
         # Platform breakdown
         st.subheader(f"📊 Platform Breakdown for ${summary.token_symbol}")
         
-        # Get platform-specific data
-        platform_data = {}
-        for sentiment in st.session_state.sentiment_data:
-            if summary.token_symbol in sentiment.token_mentions:
-                platform = sentiment.platform
-                if platform not in platform_data:
-                    platform_data[platform] = []
-                platform_data[platform].append(sentiment)
-        
         # Create platform comparison
         platform_comparison = []
-        for platform, sentiments in platform_data.items():
-            avg_sentiment = np.mean([s.sentiment_score for s in sentiments])
-            total_engagement = sum(s.engagement for s in sentiments)
-            mention_count = len(sentiments)
+        for platform, stats in self.sentiment_store.platform_breakdown(summary.token_symbol).items():
+            avg_sentiment = stats['avg_sentiment']
+            total_engagement = stats['total_engagement']
+            mention_count = stats['mentions']
             
             platform_comparison.append({
                 'Platform': platform.title(),
@@ -658,24 +646,17 @@ class MultiPlatformSentimentMonitor:
         # Recent sentiment timeline (sample data)
         st.subheader("📈 Sentiment Timeline (Last 24h)")
         
-        # Generate sample timeline data
+        # Hourly timeline from the aggregation buckets
         timeline_data = []
-        for i in range(24):
-            hour = datetime.now() - timedelta(hours=23-i)
-            # Simulate sentiment for each hour
-            hourly_sentiments = [s for s in st.session_state.sentiment_data 
-                               if summary.token_symbol in s.token_mentions and 
-                               abs((s.timestamp - hour).total_seconds()) < 1800]  # Within 30 min
-            
-            if hourly_sentiments:
-                avg_sentiment = np.mean([s.sentiment_score for s in hourly_sentiments])
-            else:
+        for point in self.sentiment_store.timeline(summary.token_symbol, hours=24):
+            avg_sentiment = point['avg_sentiment']
+            if avg_sentiment is None:
                 avg_sentiment = np.random.normal(summary.avg_sentiment, 0.1)  # Simulate based on overall sentiment
             
             timeline_data.append({
-                'Hour': hour.strftime('%H:00'),
+                'Hour': point['hour'].strftime('%H:00'),
                 'Sentiment': avg_sentiment,
-                'Mentions': len(hourly_sentiments)
+                'Mentions': point['mentions']
             })
         
         timeline_df = pd.DataFrame(timeline_data)
@@ -1,8 +1,9 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 from src.models.base_model import BaseTradingModel, TradingSignal, SignalType
+from src.data.indicator_engine import IndicatorEngine, IndicatorConfig
 from loguru import logger
 
 class MomentumStrategy(BaseTradingModel):
@@ -34,6 +35,11 @@ class MomentumStrategy(BaseTradingModel):
         
         super().__init__("Momentum Strategy", default_config)
         self.indicators = {}
+        self.indicator_engine = IndicatorEngine(self._indicator_config())
+        self._last_bar: Dict[str, Tuple[Any, float]] = {}
+    
+    def _indicator_config(self) -> IndicatorConfig:
+        return IndicatorConfig.from_dict({**self.config, 'ema_adjust': False})
     
     def fit(self, data: pd.DataFrame, **kwargs):
         """Fit the model (calculate optimal parameters from historical data)"""
@@ -51,57 +57,43 @@ class MomentumStrategy(BaseTradingModel):
         # This could be expanded to include ML-based pattern recognition
         pass
     
-    def _calculate_indicators(self, data: pd.DataFrame) -> Dict[str, pd.Series]:
-        """Calculate all technical indicators"""
-        indicators = {}
-        
-        # Price data
-        close = data['close']
-        high = data['high']
-        low = data['low']
-        volume = data['volume']
-        
-        # RSI
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(self.config['rsi_period']).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(self.config['rsi_period']).mean()
-        rs = gain / loss
-        indicators['rsi'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        exp1 = close.ewm(span=self.config['macd_fast'], adjust=False).mean()
-        exp2 = close.ewm(span=self.config['macd_slow'], adjust=False).mean()
-        indicators['macd'] = exp1 - exp2
-        indicators['macd_signal'] = indicators['macd'].ewm(
-            span=self.config['macd_signal'], adjust=False
-        ).mean()
-        indicators['macd_histogram'] = indicators['macd'] - indicators['macd_signal']
-        
-        # Volume analysis
-        indicators['volume_ma'] = volume.rolling(self.config['volume_ma_period']).mean()
-        indicators['volume_ratio'] = volume / indicators['volume_ma']
-        
-        # ATR for volatility
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        indicators['atr'] = tr.rolling(self.config['atr_period']).mean()
-        
-        # Trend indicators
-        indicators['sma_fast'] = close.rolling(self.config['trend_ma_fast']).mean()
-        indicators['sma_slow'] = close.rolling(self.config['trend_ma_slow']).mean()
-        
-        # Price momentum
-        indicators['momentum'] = close.pct_change(periods=10)
-        
-        # Bollinger Bands
-        bb_period = 20
-        bb_std = close.rolling(bb_period).std()
-        indicators['bb_middle'] = close.rolling(bb_period).mean()
-        indicators['bb_upper'] = indicators['bb_middle'] + (bb_std * 2)
-        indicators['bb_lower'] = indicators['bb_middle'] - (bb_std * 2)
-        indicators['bb_width'] = indicators['bb_upper'] - indicators['bb_lower']
+    def _calculate_indicators(self, data: pd.DataFrame) -> Dict[str, float]:
+        """
+        Update the symbol's incremental indicators with unseen bars and return the latest values.
+        
+        State is kept per `data.attrs['symbol']`; frames without it share one state,
+        which is rebuilt whenever a different series is passed in.
+        """
+        symbol = data.attrs.get('symbol', 'UNKNOWN')
+        
+        # Periods may have been changed through self.config since the last call
+        config = self._indicator_config()
+        if config != self.indicator_engine.config:
+            self.indicator_engine = IndicatorEngine(config)
+            self._last_bar.clear()
+        
+        # Only bars after the last one fed to the engine need processing
+        start = 0
+        last_seen = self._last_bar.get(symbol)
+        if last_seen is not None:
+            label, close = last_seen
+            if label in data.index and data.index.is_unique and data.loc[label, 'close'] == close:
+                start = data.index.get_loc(label) + 1
+            else:
+                self.indicator_engine.reset(symbol)
+        
+        new_bars = data.iloc[start:]
+        if len(new_bars) > 0:
+            self.indicator_engine.warm_up(
+                symbol,
+                new_bars['close'].to_numpy(dtype=float),
+                new_bars['high'].to_numpy(dtype=float),
+                new_bars['low'].to_numpy(dtype=float),
+                new_bars['volume'].to_numpy(dtype=float)
+            )
+            self._last_bar[symbol] = (data.index[-1], data['close'].iloc[-1])
+        
+        indicators = self.indicator_engine.latest(symbol)
         
         # Store for later use
         self.indicators = indicators
@@ -118,13 +110,12 @@ class MomentumStrategy(BaseTradingModel):
                 confidence=0.0
             )
         
-        # Calculate indicators
+        # Update indicators
         indicators = self._calculate_indicators(data)
         
         # Get latest values
         latest = data.iloc[-1]
-        latest_indicators = {k: v.iloc[-1] if len(v) > 0 else np.nan 
-                           for k, v in indicators.items()}
+        latest_indicators = indicators
         
         # Generate signal
         signal_type, confidence, reasoning = self._generate_signal(
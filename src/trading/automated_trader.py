@@ -9,7 +9,10 @@ from loguru import logger
 
 from src.analysis.rug_intelligence import RugIntelligenceEngine, RugStatus
 from src.data.database import CoinDatabase
+from src.data.tick_feed import TickFeed, PriceTick
 from src.telegram.telegram_monitor import TelegramSignalMonitor
+from loop_monitor import monitor_loop
+from sampling_profiler import profile_worker
 
 class TradeStatus(Enum):
     PENDING = "PENDING"
@@ -83,6 +86,8 @@ class AutomatedTrader:
         self.db = CoinDatabase()
         self.rug_engine = RugIntelligenceEngine(self.db)
         self.telegram_monitor = TelegramSignalMonitor(self.db)
+        # One price feed shared by the position and rug monitors
+        self.tick_feed = TickFeed(interval=1.0)
         
         self.initial_balance = initial_balance
         self.current_balance = initial_balance
@@ -106,18 +111,35 @@ class AutomatedTrader:
     async def start_trading_engine(self):
         """Start the automated trading engine"""
         logger.info("🚀 STARTING AUTOMATED TRADING ENGINE")
+        profile_worker('automated_trader')
+        monitor_loop('automated_trader')
         logger.info(f"💰 Initial balance: ${self.initial_balance:,.2f}")
         logger.info(f"🎯 Max position size: {self.max_position_size:.1%}")
         
         self.trading_active = True
         
+        # Rug checks are subscribed first so emergency exits win over regular exits on the same tick
+        self.tick_feed.subscribe('rug_detection', self._rug_detection_monitor)
+        self.tick_feed.subscribe('positions', self._position_monitor)
+        self._sync_tick_interest()
+        
         # Start monitoring systems
         await asyncio.gather(
             self._telegram_signal_processor(),
-            self._position_monitor(),
-            self._rug_detection_monitor(),
+            self.tick_feed.run(),
             self._performance_tracker()
         )
+        
+    def _sync_tick_interest(self):
+        """Point the tick feed at the addresses of the current open positions"""
+        addresses = {trade.contract_address for trade in self.current_session.active_trades}
+        self.tick_feed.set_interest('positions', addresses)
+        self.tick_feed.set_interest('rug_detection', addresses if self.rug_detection_active else set())
+        # Closed positions no longer need rolling rug windows
+        self.rug_engine.streaming_detector.retain(addresses)
+    
+    def _active_trades_for(self, contract_address: str) -> List[Trade]:
+        return [t for t in self.current_session.active_trades if t.contract_address == contract_address]
     
     async def _telegram_signal_processor(self):
         """Process incoming Telegram signals in real-time"""
@@ -204,6 +226,7 @@ class AutomatedTrader:
         # Add to active trades
         self.current_session.active_trades.append(trade)
         self.current_session.total_trades += 1
+        self._sync_tick_interest()
         
         # Update balance (simulated)
         self.current_balance -= position_value
@@ -219,29 +242,21 @@ class AutomatedTrader:
         
         return trade
     
-    async def _position_monitor(self):
-        """Monitor all active positions"""
-        logger.info("👀 Starting position monitor...")
-        
-        while self.trading_active:
-            if not self.current_session.active_trades:
-                await asyncio.sleep(10)
-                continue
-            
-            # Check each active trade
-            for trade in self.current_session.active_trades.copy():
-                await self._update_trade_status(trade)
-            
-            await asyncio.sleep(2)  # Check every 2 seconds
+    async def _position_monitor(self, ticks: Dict[str, PriceTick]):
+        """Update all active positions from one batch of feed ticks"""
+        for address, tick in ticks.items():
+            for trade in self._active_trades_for(address):
+                await self._update_trade_status(trade, tick.to_dict())
     
-    async def _update_trade_status(self, trade: Trade):
-        """Update individual trade status"""
+    async def _update_trade_status(self, trade: Trade, current_data: Optional[Dict] = None):
+        """Update individual trade status (fetches a fresh snapshot when no tick is given)"""
         try:
             # Get current price
-            from src.data.free_api_providers import FreeAPIProviders
-            
-            async with FreeAPIProviders() as api:
-                current_data = await api.get_comprehensive_data(trade.contract_address)
+            if current_data is None:
+                from src.data.free_api_providers import FreeAPIProviders
+                
+                async with FreeAPIProviders() as api:
+                    current_data = await api.get_comprehensive_data(trade.contract_address)
             
             if not current_data:
                 return
@@ -285,22 +300,24 @@ class AutomatedTrader:
         except Exception as e:
             logger.error(f"Error updating trade {trade.id}: {e}")
     
-    async def _rug_detection_monitor(self):
-        """Monitor for rug pulls in active positions"""
-        logger.info("🚨 Starting rug detection monitor...")
-        
-        while self.trading_active and self.rug_detection_active:
-            if not self.current_session.active_trades:
-                await asyncio.sleep(5)
+    async def _rug_detection_monitor(self, ticks: Dict[str, PriceTick]):
+        """Check active positions for rug pulls using one batch of feed ticks"""
+        if not self.rug_detection_active:
+            return
+        
+        for address, tick in ticks.items():
+            trades = self._active_trades_for(address)
+            if not trades:
                 continue
             
-            # Check each position for rug signals
-            for trade in self.current_session.active_trades.copy():
-                rug_analysis = await self.rug_engine.real_time_rug_detection(trade.contract_address)
+            rug_analysis = await self.rug_engine.real_time_rug_detection(address, tick.to_dict())
+            
+            if rug_analysis.get('rug_detected'):
+                confidence = rug_analysis.get('confidence', 0)
+                signals = rug_analysis.get('signals', [])
                 
-                if rug_analysis.get('rug_detected'):
-                    confidence = rug_analysis.get('confidence', 0)
-                    signals = rug_analysis.get('signals', [])
+                for trade in trades:
+                    trade.current_price = tick.price
                     
                     logger.warning(f"🚨 RUG DETECTED: {trade.symbol}")
                     logger.warning(f"   Confidence: {confidence:.2f}")
@@ -308,8 +325,6 @@ class AutomatedTrader:
                     
                     # EMERGENCY EXIT
                     await self._exit_trade(trade, "RUG_DETECTED", emergency=True)
-            
-            await asyncio.sleep(1)  # Check every second for rugs
     
     async def _exit_trade(self, trade: Trade, reason: str, emergency: bool = False):
         """Exit a trade"""
@@ -350,6 +365,7 @@ class AutomatedTrader:
         # Move to completed trades
         self.current_session.active_trades.remove(trade)
         self.current_session.completed_trades.append(trade)
+        self._sync_tick_interest()
         
         # Log exit
         pnl_percent = price_change * 100
@@ -36,11 +36,12 @@ class SniperTrade:
     profit_loss_percent: Optional[float] = None
     strategy_used: str = ""
     confidence_score: float = 0.0
-    status: str = "active"  # active, closed, stopped
+    status: str = "active"  # active, closed, stopped, failed
     max_price_reached: float = 0.0
     drawdown: float = 0.0
     hold_time_minutes: int = 0
     rug_detected: bool = False
+    signal_to_submit_ms: Optional[float] = None  # Live snipes only, measured when the transaction is sent
     
     @property
     def is_profitable(self) -> bool:
@@ -99,6 +100,39 @@ class SolanaSniperBot:
             st.session_state.simulation_mode = True
         if 'portfolio_balance' not in st.session_state:
             st.session_state.portfolio_balance = 10.0  # Starting with 10 SOL for testing
+        if 'snipe_executor' not in st.session_state:
+            st.session_state.snipe_executor = self._build_snipe_executor()
+        self.snipe_executor = st.session_state.snipe_executor
+    
+    def _build_snipe_executor(self):
+        """Hot-path executor for live trades, when a trading wallet is configured"""
+        try:
+            private_key = st.secrets.get("SOLANA_PRIVATE_KEY")
+        except Exception:
+            private_key = None
+        if not private_key:
+            return None
+        
+        try:
+            from solana_trading_engine import SolanaTrader
+            from snipe_executor import SnipeExecutor
+        except ImportError as e:
+            logging.warning(f"Live sniping unavailable: {e}")
+            return None
+        
+        trader = SolanaTrader()
+        if not trader.setup_wallet(private_key):
+            return None
+        executor = SnipeExecutor(trader)
+        
+        # Confident Telegram calls get their buys pre-built as soon as they are seen
+        try:
+            from incoming_coins_monitor import incoming_coins_processor
+            incoming_coins_processor.attach_snipe_executor(
+                executor, st.session_state.sniper_config['min_confidence'])
+        except ImportError:
+            pass
+        return executor
     
     def analyze_telegram_signal(self, signal_data: Dict) -> SniperSignal:
         """Analyze a Telegram signal and generate sniper recommendation"""
@@ -263,6 +297,20 @@ class SolanaSniperBot:
             
             st.success(f"🎯 Test trade executed: {trade.symbol} @ ${trade.entry_price:.6f}")
         
+        elif self.snipe_executor:
+            result = self.snipe_executor.snipe_blocking(
+                trade.token_address, self.test_trade_amount, signal_time=signal.timestamp)
+            # Measured by the executor when the transaction is sent
+            trade.signal_to_submit_ms = result.get('signal_to_submit_ms')
+            
+            if result.get('status') == 'SUCCESS':
+                st.session_state.sniper_trades.append(trade)
+                st.session_state.portfolio_balance -= result['sol_amount']
+                st.success(f"🎯 Live snipe sent ({result['path']} path): {trade.symbol} in {trade.signal_to_submit_ms:.0f}ms")
+            else:
+                trade.status = "failed"
+                st.error(f"Live snipe failed for {trade.symbol}: {result.get('error')}")
+        
         return trade
     
     def simulate_trade_outcomes(self):
@@ -608,6 +656,7 @@ class SolanaSniperBot:
                 'P&L (%)': f"{trade.profit_loss_percent:+.1f}%" if trade.profit_loss_percent else "N/A",
                 'P&L (SOL)': f"{trade.profit_loss:+.3f}" if trade.profit_loss else "N/A", 
                 'Hold Time': f"{trade.hold_time_minutes}m",
+                'Signal→Submit': f"{trade.signal_to_submit_ms:.0f}ms" if trade.signal_to_submit_ms is not None else "N/A",
                 'Strategy': trade.strategy_used,
                 'Status': trade.status,
                 'Rug Detected': "Yes" if trade.rug_detected else "No"
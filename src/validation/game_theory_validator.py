@@ -7,6 +7,7 @@ import nashpy as nash
 from scipy.optimize import minimize, LinearConstraint
 from loguru import logger
 import json
+import itertools
 
 class MarketRegime(Enum):
     BULL = "BULL"
@@ -38,10 +39,31 @@ class GameTheoryValidator:
     Models the market as a multi-player game
     """
     
-    def __init__(self):
+    # Actions sampled for each player when simulating the game
+    SIMULATED_ACTIONS = ["buy", "sell", "hold"]
+    # Action order used by the vectorized payoff tables
+    ACTION_INDEX = {"buy": 0, "sell": 1, "hold": 2, "provide_liquidity": 3}
+    REGIME_MODIFIERS = {
+        MarketRegime.BULL: {"buy": 1.5, "sell": 0.5, "hold": 1.0},
+        MarketRegime.BEAR: {"buy": 0.5, "sell": 1.5, "hold": 0.8},
+        MarketRegime.SIDEWAYS: {"buy": 0.9, "sell": 0.9, "hold": 1.1},
+        MarketRegime.VOLATILE: {"buy": 0.7, "sell": 0.7, "hold": 1.3}
+    }
+    
+    def __init__(self,
+                 support_enumeration_limit: int = 6,
+                 max_action_profiles: int = 256,
+                 solver_tolerance: float = 1e-8):
         self.players = self._initialize_players()
         self.strategy_space = self._define_strategy_space()
         self.market_regimes = {}
+        # Support enumeration is exponential in the number of strategies; bigger games use faster solvers
+        self.support_enumeration_limit = support_enumeration_limit
+        self.max_action_profiles = max_action_profiles
+        self.solver_tolerance = solver_tolerance
+        # (regime, strategy space, player set) -> solved action profiles
+        self._solve_cache: Dict[Tuple, Dict[str, Any]] = {}
+        self.cache_stats = {'hits': 0, 'misses': 0}
         
     def _initialize_players(self) -> List[MarketPlayer]:
         """Initialize different types of market players"""
@@ -113,23 +135,41 @@ class GameTheoryValidator:
                               player_actions: Dict[str, str],
                               market_regime: MarketRegime) -> np.ndarray:
         """Calculate payoff matrix for current market state"""
-        n_players = len(self.players)
-        
-        # Initialize payoff matrix
-        payoffs = np.zeros((n_players, n_players))
-        
-        # Calculate payoffs based on actions and market regime
-        for i, player_i in enumerate(self.players):
-            for j, player_j in enumerate(self.players):
-                if i != j:
-                    payoff = self._calculate_pairwise_payoff(
-                        player_i, player_j,
-                        player_actions.get(player_i.name, "hold"),
-                        player_actions.get(player_j.name, "hold"),
-                        market_regime, market_data
-                    )
-                    payoffs[i, j] = payoff
+        actions = np.array([[
+            self.ACTION_INDEX.get(player_actions.get(player.name, "hold"), self.ACTION_INDEX["hold"])
+            for player in self.players
+        ]])
+        volatility = market_data['close'].pct_change().std()
+        return self._build_payoff_matrices(actions, market_regime, volatility)[0]
+    
+    def _build_payoff_matrices(self,
+                               action_profiles: np.ndarray,
+                               regime: MarketRegime,
+                               volatility: float = 0.0) -> np.ndarray:
+        """
+        Payoff matrices for K action profiles at once.
+        action_profiles is (K, n_players) of ACTION_INDEX codes; returns (K, n, n)
+        with the same values _calculate_pairwise_payoff gives pair by pair.
+        """
+        risk_tolerance = np.array([p.risk_tolerance for p in self.players])
+        market_impact = np.array([p.market_impact for p in self.players])
+        
+        a1 = action_profiles[:, :, np.newaxis]  # row player action
+        a2 = action_profiles[:, np.newaxis, :]  # column player action
+        buy, sell = self.ACTION_INDEX["buy"], self.ACTION_INDEX["sell"]
+        liquidity = self.ACTION_INDEX["provide_liquidity"]
+        
+        base = np.where(
+            (a1 == buy) & (a2 == sell), 0.02 * self.REGIME_MODIFIERS[regime]["buy"],
+            np.where(
+                (a1 == buy) & (a2 == buy), -0.01 * market_impact[np.newaxis, np.newaxis, :],
+                np.where(a1 == liquidity, 0.001 * volatility * 100, 0.0)
+            )
+        )
         
+        payoffs = base * risk_tolerance[np.newaxis, :, np.newaxis] * (1 - market_impact)[np.newaxis, np.newaxis, :]
+        n = len(self.players)
+        payoffs[:, np.arange(n), np.arange(n)] = 0.0
         return payoffs
     
     def _calculate_pairwise_payoff(self,
@@ -143,12 +183,7 @@ class GameTheoryValidator:
         base_payoff = 0
         
         # Market regime modifiers
-        regime_modifiers = {
-            MarketRegime.BULL: {"buy": 1.5, "sell": 0.5, "hold": 1.0},
-            MarketRegime.BEAR: {"buy": 0.5, "sell": 1.5, "hold": 0.8},
-            MarketRegime.SIDEWAYS: {"buy": 0.9, "sell": 0.9, "hold": 1.1},
-            MarketRegime.VOLATILE: {"buy": 0.7, "sell": 0.7, "hold": 1.3}
-        }
+        regime_modifiers = self.REGIME_MODIFIERS
         
         # Action interactions
         if action1 == "buy" and action2 == "sell":
@@ -169,24 +204,110 @@ class GameTheoryValidator:
         return base_payoff
     
     def find_nash_equilibrium(self, payoff_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """Find Nash equilibrium using nashpy"""
+        """Find Nash equilibrium using nashpy (zero-sum game on the payoff matrix)"""
+        n = payoff_matrix.shape[0]
         try:
             game = nash.Game(payoff_matrix)
-            equilibria = list(game.support_enumeration())
             
-            if equilibria:
-                # Return first equilibrium found
-                return equilibria[0]
-            else:
+            if n <= self.support_enumeration_limit:
+                # Only the first equilibrium is used, so stop enumerating once it is found
+                equilibrium = next(game.support_enumeration(), None)
+                if equilibrium is not None:
+                    return equilibrium
                 # If no pure strategy equilibrium, compute mixed strategy
-                n = payoff_matrix.shape[0]
                 return np.ones(n) / n, np.ones(n) / n
+            
+            # Support enumeration would blow up: Lemke-Howson, then replicator dynamics
+            try:
+                sigma_1, sigma_2 = game.lemke_howson(initial_dropped_label=0)
+                if self._is_valid_strategy(sigma_1) and self._is_valid_strategy(sigma_2):
+                    return sigma_1, sigma_2
+            except Exception as e:
+                logger.debug(f"Lemke-Howson failed, using replicator dynamics: {e}")
+            
+            return self._replicator_dynamics(payoff_matrix, -payoff_matrix)
                 
         except Exception as e:
             logger.error(f"Error finding Nash equilibrium: {e}")
-            n = payoff_matrix.shape[0]
             return np.ones(n) / n, np.ones(n) / n
     
+    @staticmethod
+    def _is_valid_strategy(sigma: np.ndarray) -> bool:
+        return bool(np.all(np.isfinite(sigma)) and np.all(sigma >= -1e-9) and abs(sigma.sum() - 1) < 1e-6)
+    
+    def _replicator_dynamics(self,
+                             payoff_a: np.ndarray,
+                             payoff_b: np.ndarray,
+                             max_iterations: int = 10000) -> Tuple[np.ndarray, np.ndarray]:
+        """Two-population discrete replicator dynamics, iterated until strategies move less than the tolerance"""
+        n, m = payoff_a.shape
+        # Shift payoffs positive so the multiplicative update is well defined
+        a = payoff_a - payoff_a.min() + 1.0
+        b = payoff_b - payoff_b.min() + 1.0
+        x = np.ones(n) / n
+        y = np.ones(m) / m
+        
+        for _ in range(max_iterations):
+            fitness_x = a @ y
+            fitness_y = b.T @ x
+            new_x = x * fitness_x / (x @ fitness_x)
+            new_y = y * fitness_y / (y @ fitness_y)
+            converged = max(np.abs(new_x - x).max(), np.abs(new_y - y).max()) < self.solver_tolerance
+            x, y = new_x, new_y
+            if converged:
+                break
+        
+        return x, y
+    
+    def _solve_regime(self, regime: MarketRegime) -> Dict[str, Any]:
+        """Solve every simulated action profile for a regime once and cache the result"""
+        key = (
+            regime,
+            json.dumps(self.strategy_space, sort_keys=True),
+            tuple((p.name, p.risk_tolerance, p.market_impact) for p in self.players)
+        )
+        cached = self._solve_cache.get(key)
+        if cached is not None:
+            self.cache_stats['hits'] += 1
+            return cached
+        self.cache_stats['misses'] += 1
+        
+        action_combinations = self._generate_action_combinations()
+        profiles = np.array([
+            [self.ACTION_INDEX[combo[player.name]] for player in self.players]
+            for combo in action_combinations
+        ])
+        # Simulated actions never include provide_liquidity, so volatility does not enter the payoffs
+        payoff_matrices = self._build_payoff_matrices(profiles, regime)
+        
+        # Identical matrices (common across the product space) share one solve
+        results = []
+        solved: Dict[bytes, Tuple[np.ndarray, np.ndarray]] = {}
+        for actions, payoff_matrix in zip(action_combinations, payoff_matrices):
+            matrix_key = payoff_matrix.tobytes()
+            if matrix_key not in solved:
+                solved[matrix_key] = self.find_nash_equilibrium(payoff_matrix)
+            eq_strategy_1, eq_strategy_2 = solved[matrix_key]
+            
+            results.append({
+                'actions': actions,
+                'equilibrium': (eq_strategy_1, eq_strategy_2),
+                'expected_payoff': float(eq_strategy_1 @ payoff_matrix @ eq_strategy_2)
+            })
+        
+        payoffs = [r['expected_payoff'] for r in results]
+        solution = {
+            'results': results,
+            'best': max(results, key=lambda x: x['expected_payoff']),
+            'worst': min(results, key=lambda x: x['expected_payoff']),
+            'payoff_variance': float(np.var(payoffs)),
+        }
+        self._solve_cache[key] = solution
+        return solution
+    
+    def clear_cache(self):
+        self._solve_cache.clear()
+    
     def validate_strategy(self,
                          strategy_name: str,
                          strategy_params: Dict[str, Any],
@@ -197,32 +318,13 @@ class GameTheoryValidator:
         # Detect market regime
         regime = self.detect_market_regime(market_data)
         
-        # Simulate different player actions
-        action_combinations = self._generate_action_combinations()
-        
-        results = []
-        for actions in action_combinations:
-            # Calculate payoff matrix
-            payoff_matrix = self.calculate_payoff_matrix(market_data, actions, regime)
-            
-            # Find Nash equilibrium
-            eq_strategy_1, eq_strategy_2 = self.find_nash_equilibrium(payoff_matrix)
-            
-            # Calculate expected payoffs
-            expected_payoff = np.dot(eq_strategy_1, np.dot(payoff_matrix, eq_strategy_2))
-            
-            results.append({
-                'actions': actions,
-                'equilibrium': (eq_strategy_1, eq_strategy_2),
-                'expected_payoff': expected_payoff
-            })
-        
-        # Analyze results
-        best_result = max(results, key=lambda x: x['expected_payoff'])
-        worst_result = min(results, key=lambda x: x['expected_payoff'])
+        # Equilibria for this regime are solved once and shared across validations
+        solution = self._solve_regime(regime)
+        best_result = solution['best']
+        worst_result = solution['worst']
         
         # Calculate strategy robustness
-        payoff_variance = np.var([r['expected_payoff'] for r in results])
+        payoff_variance = solution['payoff_variance']
         robustness_score = 1 / (1 + payoff_variance)  # Higher score = more robust
         
         # Evolutionary stability analysis
@@ -253,20 +355,27 @@ class GameTheoryValidator:
         }
         
         return validation_result
-    
+
+    def validate_batch(self,
+                       strategies: Dict[str, Dict[str, Any]],
+                       market_data: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """Validate several strategies against the same market data, sharing one regime solve"""
+        return {
+            name: self.validate_strategy(name, params, market_data)
+            for name, params in strategies.items()
+        }
+
     def _generate_action_combinations(self) -> List[Dict[str, str]]:
         """Generate possible action combinations for players"""
-        actions = ["buy", "sell", "hold"]
-        combinations = []
+        actions = self.SIMULATED_ACTIONS
+        names = [player.name for player in self.players]
         
-        # Generate a subset of combinations (full cartesian product would be too large)
-        for _ in range(10):
-            combo = {}
-            for player in self.players:
-                combo[player.name] = np.random.choice(actions)
-            combinations.append(combo)
+        # Small games use the full cartesian product; larger ones are sampled
+        if len(actions) ** len(names) <= self.max_action_profiles:
+            return [dict(zip(names, combo)) for combo in itertools.product(actions, repeat=len(names))]
         
-        return combinations
+        sampled = np.random.choice(actions, size=(self.max_action_profiles, len(names)))
+        return [dict(zip(names, row)) for row in sampled]
     
     def _analyze_evolutionary_stability(self,
                                       strategy_params: Dict,
@@ -281,16 +390,15 @@ class GameTheoryValidator:
         # Initialize population with random strategies
         population = np.random.rand(population_size, len(strategy_params))
         
+        volatility = np.std(market_data['close'].pct_change())
+        
         for gen in range(generations):
-            # Calculate fitness for each strategy
-            fitness = np.array([
-                self._calculate_strategy_fitness(
-                    individual, market_data, regime
-                ) for individual in population
-            ])
+            # Calculate fitness for the whole population at once
+            fitness = self._calculate_population_fitness(population, volatility, regime)
             
-            # Selection
-            probabilities = fitness / fitness.sum()
+            # Selection (uniform if every strategy has zero fitness)
+            total = fitness.sum()
+            probabilities = fitness / total if total > 0 else np.full(population_size, 1 / population_size)
             selected_indices = np.random.choice(
                 population_size, population_size, p=probabilities
             )
@@ -314,9 +422,17 @@ class GameTheoryValidator:
                                    market_data: pd.DataFrame,
                                    regime: MarketRegime) -> float:
         """Calculate fitness of a strategy in current market"""
+        volatility = np.std(market_data['close'].pct_change())
+        return float(self._calculate_population_fitness(strategy_vector[np.newaxis, :], volatility, regime)[0])
+    
+    def _calculate_population_fitness(self,
+                                      population: np.ndarray,
+                                      volatility: float,
+                                      regime: MarketRegime) -> np.ndarray:
+        """Fitness of every strategy vector (rows of population) in one pass"""
         # Simple fitness function based on expected return and risk
-        expected_return = np.random.normal(0.001, 0.01)  # Simplified
-        risk = np.std(market_data['close'].pct_change()) * strategy_vector.sum()
+        expected_return = np.random.normal(0.001, 0.01, len(population))  # Simplified
+        risk = volatility * population.sum(axis=1)
         
         # Fitness = return - risk penalty
         fitness = expected_return - 0.5 * risk
@@ -327,7 +443,7 @@ class GameTheoryValidator:
         elif regime == MarketRegime.BEAR:
             fitness *= 0.8
         
-        return max(0, fitness)
+        return np.maximum(0, fitness)
     
     def _analyze_coalition_formation(self,
                                    players: List[MarketPlayer],
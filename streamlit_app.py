@@ -181,10 +181,14 @@ def show_detailed_coin_view(coin):
         
             # Get image for fullscreen view
             if coin.get('image_url'):
-                large_image_html = f'<img src="{coin["image_url"]}" alt="{ticker}" style="width: 180px; height: 180px; border-radius: 50%; object-fit: cover; border: 4px solid rgba(16, 185, 129, 0.4); box-shadow: 0 12px 40px rgba(16, 185, 129, 0.5); margin: 0 auto 20px auto; display: block;" onerror="this.outerHTML=\'<div class=&quot;coin-logo&quot; style=&quot;width: 180px; height: 180px; font-size: 48px; margin: 0 auto 20px auto;&quot;>{ticker[:2].upper()}</div>\'">'
+                image_src = coin['image_url']
+                if COIN_IMAGES_AVAILABLE:
+                    # Serve the stored thumbnail instead of re-fetching the remote image
+                    image_src = coin_image_system.get_image_src(ticker, coin.get('ca', ''), 180, fallback_url=image_src)
+                large_image_html = f'<img src="{image_src}" alt="{ticker}" style="width: 180px; height: 180px; border-radius: 50%; object-fit: cover; border: 4px solid rgba(16, 185, 129, 0.4); box-shadow: 0 12px 40px rgba(16, 185, 129, 0.5); margin: 0 auto 20px auto; display: block;" onerror="this.outerHTML=\'<div class=&quot;coin-logo&quot; style=&quot;width: 180px; height: 180px; font-size: 48px; margin: 0 auto 20px auto;&quot;>{ticker[:2].upper()}</div>\'">'
             elif COIN_IMAGES_AVAILABLE:
                 try:
-                    fallback_url = coin_image_system.get_image_url(ticker, coin['ca'])
+                    fallback_url = coin_image_system.get_image_src(ticker, coin['ca'], 180)
                     large_image_html = f'<img src="{fallback_url}" alt="{ticker}" style="width: 180px; height: 180px; border-radius: 50%; object-fit: cover; border: 4px solid rgba(16, 185, 129, 0.4); box-shadow: 0 12px 40px rgba(16, 185, 129, 0.5); margin: 0 auto 20px auto; display: block;" onerror="this.outerHTML=\'<div class=&quot;coin-logo&quot; style=&quot;width: 180px; height: 180px; font-size: 48px; margin: 0 auto 20px auto;&quot;>{ticker[:2].upper()}</div>\'">'
                 except:
                     logo_text = ticker[:2].upper() if len(ticker) >= 2 else ticker.upper()
@@ -1630,11 +1634,14 @@ with tab2:
                             if coin['image_url']:
                                 # Use real coin image from database
                                 image_url = coin['image_url']
+                                if COIN_IMAGES_AVAILABLE:
+                                    # Serve the stored thumbnail instead of re-fetching the remote image
+                                    image_url = coin_image_system.get_image_src(ticker, coin['ca'], 48, fallback_url=image_url)
                                 logo_html = f'<img src="{image_url}" alt="{ticker}" style="width: 48px; height: 48px; border-radius: 50%; object-fit: cover; border: 1px solid rgba(255, 255, 255, 0.1);">'
                             elif COIN_IMAGES_AVAILABLE:
                                 # Fallback to coin image system
                                 try:
-                                    fallback_url = coin_image_system.get_image_url(ticker, coin['ca'])
+                                    fallback_url = coin_image_system.get_image_src(ticker, coin['ca'], 48)
                                     logo_html = f'<img src="{fallback_url}" alt="{ticker}" style="width: 48px; height: 48px; border-radius: 50%; object-fit: cover; border: 1px solid rgba(255, 255, 255, 0.1);">'
                                 except:
                                     # Error fallback - text logo
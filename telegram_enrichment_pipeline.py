@@ -14,6 +14,8 @@ import numpy as np
 from dataclasses import dataclass
 import logging
 
+from src.data.indicator_engine import IndicatorState, IndicatorConfig
+
 @dataclass
 class EnrichedCoin:
     """Enriched coin data structure"""
@@ -275,48 +277,36 @@ class TelegramEnrichmentPipeline:
         """Calculate RSI indicator"""
         if len(prices) < period + 1:
             return 50.0  # Neutral RSI
-            
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
         
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
+        engine = IndicatorState(IndicatorConfig(rsi_period=period))
+        engine.run(np.asarray(prices, dtype=float))
         
-        if avg_loss == 0:
+        if engine.rsi.avg_loss[0] == 0:
             return 100.0
-            
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
         
-        return rsi
+        return float(engine.last['rsi'][0])
     
     def calculate_macd(self, prices: List[float]) -> float:
         """Calculate MACD indicator"""
         if len(prices) < 26:
             return 0.0
-            
-        # Simple MACD calculation
-        ema_12 = sum(prices[-12:]) / 12
-        ema_26 = sum(prices[-26:]) / 26
         
-        return ema_12 - ema_26
+        # Simple MACD calculation (12 vs 26 period moving average)
+        engine = IndicatorState(IndicatorConfig(trend_ma_fast=12, trend_ma_slow=26))
+        latest = engine.run(np.asarray(prices, dtype=float))
+        
+        return float(latest['sma_fast'][0] - latest['sma_slow'][0])
     
     def calculate_bollinger_bands(self, prices: List[float], period: int = 20) -> Tuple[float, float]:
         """Calculate Bollinger Bands"""
         if len(prices) < period:
             current_price = prices[-1] if prices else 1.0
             return current_price * 1.05, current_price * 0.95
-            
-        recent_prices = prices[-period:]
-        sma = sum(recent_prices) / period
-        variance = sum((p - sma) ** 2 for p in recent_prices) / period
-        std_dev = variance ** 0.5
         
-        upper_band = sma + (2 * std_dev)
-        lower_band = sma - (2 * std_dev)
+        engine = IndicatorState(IndicatorConfig(bb_period=period, bb_ddof=0))
+        latest = engine.run(np.asarray(prices, dtype=float))
         
-        return upper_band, lower_band
+        return float(latest['bb_upper'][0]), float(latest['bb_lower'][0])
     
     def combine_enrichment_data(
         self, 
@@ -122,6 +122,63 @@ class TestDataLayer(unittest.TestCase):
         conn.close()
 
 
+class TestPriceSeriesStore(unittest.TestCase):
+    """Test the columnar time-series price store"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_range_query_and_upsert(self):
+        """Test chunked writes, range reads and overlapping upserts"""
+        import numpy as np
+        from src.data.timeseries_store import PriceSeriesStore, to_epoch_seconds
+        
+        for mmap in (False, True):
+            store = PriceSeriesStore(os.path.join(self.temp_dir.name, str(mmap)), chunk_rows=100, mmap=mmap)
+            timestamps = 1_700_000_000 + np.arange(1000) * 60
+            closes = np.linspace(1.0, 2.0, 1000)
+            
+            store.write('TEST', '1m', timestamps[:600], close=closes[:600])
+            store.write('TEST', '1m', timestamps[600:], close=closes[600:])
+            store.write('TEST', '1m', timestamps[250:260], close=np.zeros(10))
+            
+            result = store.read('TEST', '1m', start=timestamps[200], end=timestamps[799])
+            expected = closes[200:800].copy()
+            expected[50:60] = 0
+            
+            self.assertEqual(store.series_info('TEST', '1m')['chunks'], 10)
+            np.testing.assert_array_equal(result['timestamp'], timestamps[200:800])
+            np.testing.assert_array_equal(result['close'], expected)
+        
+        self.assertEqual(to_epoch_seconds(datetime(2024, 1, 1)), 1704067200)
+    
+    def test_mapped_chunks_are_replaced_not_unlinked_in_place(self):
+        """Test a rewrite survives files that cannot be deleted while mapped (Windows) and purges them later"""
+        import numpy as np
+        from pathlib import Path
+        from src.data.timeseries_store import PriceSeriesStore
+        
+        store = PriceSeriesStore(self.temp_dir.name, chunk_rows=100, mmap=True, tail_rows=10)
+        timestamps = 1_700_000_000 + np.arange(300) * 60
+        store.write('TEST', '1m', timestamps, close=np.ones(300))
+        held = store.read('TEST', '1m')['close']
+        
+        with patch.object(Path, 'unlink', side_effect=PermissionError("file is mapped")):
+            store.write('TEST', '1m', timestamps[150:160], close=np.zeros(10))
+        self.assertEqual(len(store._stale_chunks), 2)
+        self.assertEqual(held.sum(), 300)
+        
+        store.write('TEST', '1m', timestamps[-1:] + 60, close=[2.0])
+        self.assertEqual(store._stale_chunks, [])
+        series_dir = Path(self.temp_dir.name) / 'TEST' / '1m'
+        self.assertEqual(len([p for p in series_dir.iterdir() if p.is_dir()]), 3)
+        result = store.read('TEST', '1m')
+        self.assertEqual((len(result['close']), result['close'].sum()), (301, 292))
+
+
 class TestAPIIntegrations(unittest.TestCase):
     """Test external API integrations"""
     
@@ -162,6 +219,1693 @@ class TestAPIIntegrations(unittest.TestCase):
         self.assertTrue(result is None or result == {})
 
 
+class TestTickFeed(unittest.TestCase):
+    """Test shared tick feed fan-out and streaming rug detection"""
+    
+    def test_one_batched_fetch_fans_out(self):
+        """Test every watched address is fetched once per tick and routed to its consumers"""
+        from src.data.tick_feed import TickFeed
+        
+        class FakeAPI:
+            def __init__(self):
+                self.dex_calls = []
+                self.jupiter_calls = []
+            
+            async def get_dexscreener_batch(self, addresses, use_cache=True):
+                self.dex_calls.append(list(addresses))
+                return {a: {'price': 1.0, 'volume_24h': 10, 'liquidity': 100} for a in addresses if a != 'C'}
+            
+            async def get_jupiter_price(self, addresses, use_cache=True):
+                self.jupiter_calls.append(list(addresses))
+                return {'C': {'price': 2.0}}
+        
+        received = {}
+        
+        def consumer(name):
+            async def callback(ticks):
+                received[name] = ticks
+            return callback
+        
+        feed = TickFeed()
+        feed.subscribe('rug_detection', consumer('rug_detection'), {'A', 'B'})
+        feed.subscribe('positions', consumer('positions'), {'B', 'C'})
+        
+        api = FakeAPI()
+        ticks = asyncio.run(feed.poll_once(api))
+        
+        self.assertEqual(api.dex_calls, [['A', 'B', 'C']])
+        self.assertEqual(api.jupiter_calls, [['C']])
+        self.assertEqual(set(ticks), {'A', 'B', 'C'})
+        self.assertEqual(set(received['rug_detection']), {'A', 'B'})
+        self.assertEqual(set(received['positions']), {'B', 'C'})
+        self.assertEqual(received['positions']['C'].price_source, 'jupiter')
+    
+    def test_streaming_rug_replay(self):
+        """Test the streaming rug detector only flags drops inside its rolling window"""
+        from src.analysis.streaming_rug_detector import StreamingRugDetector, RugRules
+        
+        ticks = []
+        # FAST: 40% collapse within a minute
+        for i, price in enumerate([1.0, 1.0, 0.95, 0.6]):
+            ticks.append({'contract_address': 'FAST', 'timestamp': 1000 + i * 15,
+                          'price': price, 'volume_24h': 100, 'liquidity': 5000})
+        # SLOW: same total decline spread over hours
+        for i, price in enumerate([1.0, 0.9, 0.8, 0.7, 0.6]):
+            ticks.append({'contract_address': 'SLOW', 'timestamp': 1000 + i * 3600,
+                          'price': price, 'volume_24h': 100, 'liquidity': 5000})
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'ticks.jsonl')
+            with open(path, 'w') as f:
+                for tick in ticks:
+                    f.write(json.dumps(tick) + "\n")
+            
+            alerts = StreamingRugDetector(RugRules(window_seconds=300)).replay(path)
+        
+        self.assertEqual([a['contract_address'] for a in alerts], ['FAST'])
+        self.assertAlmostEqual(alerts[0]['price_drop'], 0.4)
+
+
+class TestConfirmationTracker(unittest.TestCase):
+    """Test batched signature confirmation against a local fake RPC server"""
+    
+    def _run_with_fake_rpc(self, scenario):
+        from aiohttp import web
+        
+        calls = []
+        
+        async def rpc(request):
+            body = await request.json()
+            signatures = body['params'][0]
+            calls.append(list(signatures))
+            # Nothing is visible on the first poll; afterwards everything lands at once
+            value = [None] * len(signatures) if len(calls) == 1 else [
+                {'confirmationStatus': 'confirmed', 'err': None} if sig != 'bad' else
+                {'confirmationStatus': 'processed', 'err': {'InstructionError': [0, 'Custom']}}
+                for sig in signatures
+            ]
+            return web.json_response({'jsonrpc': '2.0', 'id': body['id'], 'result': {'value': value}})
+        
+        async def ws_handler(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            async for message in ws:
+                body = json.loads(message.data)
+                await ws.send_json({'jsonrpc': '2.0', 'id': body['id'], 'result': body['id'] + 100})
+                await ws.send_json({'jsonrpc': '2.0', 'method': 'signatureNotification',
+                                    'params': {'subscription': body['id'] + 100,
+                                               'result': {'value': {'err': None}}}})
+            return ws
+        
+        async def main():
+            app = web.Application()
+            app.router.add_post('/', rpc)
+            app.router.add_get('/ws', ws_handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                return await scenario(f"http://127.0.0.1:{port}/", f"ws://127.0.0.1:{port}/ws")
+            finally:
+                await runner.cleanup()
+        
+        return asyncio.run(main()), calls
+    
+    def test_batched_polling(self):
+        """Test concurrent signatures share each getSignatureStatuses call"""
+        from confirmation_tracker import SignatureConfirmationTracker
+        
+        async def scenario(rpc_url, ws_url):
+            tracker = SignatureConfirmationTracker(rpc_url, poll_interval=0.05)
+            results = await asyncio.gather(*(tracker.wait(sig, timeout=5) for sig in ['a', 'b', 'bad']))
+            await tracker.close()
+            return results, tracker
+        
+        (results, tracker), calls = self._run_with_fake_rpc(scenario)
+        
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(sorted(calls[0]), ['a', 'b', 'bad'])
+        self.assertIn('bad', tracker.errors)
+    
+    def test_websocket_subscription(self):
+        """Test signatureSubscribe notifications resolve before the next poll"""
+        from confirmation_tracker import SignatureConfirmationTracker
+        
+        async def scenario(rpc_url, ws_url):
+            tracker = SignatureConfirmationTracker(rpc_url, ws_endpoint=ws_url, ws_poll_interval=30)
+            result = await tracker.wait('a', timeout=5)
+            await tracker.close()
+            return result
+        
+        result, calls = self._run_with_fake_rpc(scenario)
+        
+        self.assertTrue(result)
+        self.assertEqual(len(calls), 1)
+
+
+class TestSnipeExecutor(unittest.TestCase):
+    """Test hot-path snipe execution"""
+    
+    def test_snipe_hot_path(self):
+        """Test pre-built buys are sign-and-send and cold snipes still quote inline"""
+        from snipe_executor import SnipeExecutor
+        
+        class FakeTrader:
+            tokens = {"SOL": "So11111111111111111111111111111111111111112"}
+            min_trade_amount_sol = 0.01
+            max_trade_amount_sol = 0.1
+            
+            def __init__(self):
+                self.calls = []
+            
+            async def refresh_compute_unit_price(self, quote, max_age=0.0):
+                self.calls.append('fee')
+            
+            async def get_quote(self, input_mint, output_mint, amount):
+                self.calls.append('quote')
+                return {'outAmount': '1000', 'priceImpactPct': '0.1'}
+            
+            async def build_swap_transaction(self, quote):
+                self.calls.append('build')
+                return {'quote': quote, 'transaction_bytes': b'tx'}
+            
+            async def send_signed_transaction(self, transaction_bytes):
+                self.calls.append('send')
+                return 'sig'
+        
+        async def scenario():
+            trader = FakeTrader()
+            executor = SnipeExecutor(trader)
+            executor.watch('HOT', 0.05)
+            await executor.refresh_once()
+            trader.calls.clear()
+            
+            hot = await executor.snipe('HOT', wait_for_confirmation=False)
+            hot_calls = list(trader.calls)
+            cold = await executor.snipe('COLD', wait_for_confirmation=False)
+            return hot, hot_calls, cold, executor.get_latency_stats()
+        
+        hot, hot_calls, cold, stats = asyncio.run(scenario())
+        
+        self.assertEqual(hot['path'], 'hot')
+        self.assertEqual(hot_calls, ['send'])
+        self.assertEqual(cold['path'], 'cold')
+        self.assertEqual(cold['status'], 'SUCCESS')
+        self.assertEqual((stats['hot_snipes'], stats['cold_snipes'], stats['count']), (1, 1, 2))
+    
+    def test_blocking_snipe_runs_on_refresh_loop(self):
+        """Test synchronous callers submit on the loop that keeps the buys pre-built"""
+        import threading
+        import time
+        from snipe_executor import SnipeExecutor
+        
+        class FakeTrader:
+            tokens = {"SOL": "So11111111111111111111111111111111111111112"}
+            min_trade_amount_sol = 0.01
+            max_trade_amount_sol = 0.1
+            
+            def __init__(self):
+                self.send_threads = []
+            
+            async def refresh_compute_unit_price(self, quote, max_age=0.0):
+                pass
+            
+            async def get_quote(self, input_mint, output_mint, amount):
+                return {'outAmount': '1000', 'priceImpactPct': '0.1'}
+            
+            async def build_swap_transaction(self, quote):
+                return {'quote': quote, 'transaction_bytes': b'tx'}
+            
+            async def send_signed_transaction(self, transaction_bytes):
+                self.send_threads.append(threading.current_thread().name)
+                return 'sig'
+        
+        trader = FakeTrader()
+        executor = SnipeExecutor(trader, refresh_interval=0.01)
+        executor.watch('HOT', 0.05)
+        loop = asyncio.new_event_loop()
+        worker = threading.Thread(target=loop.run_forever, name='refresh-loop', daemon=True)
+        worker.start()
+        try:
+            async def start():
+                executor.start()
+            asyncio.run_coroutine_threadsafe(start(), loop).result(5)
+            for _ in range(100):
+                if executor.is_hot('HOT'):
+                    break
+                time.sleep(0.01)
+            
+            result = executor.snipe_blocking('HOT', 0.05, signal_time=time.time() - 0.2)
+        finally:
+            loop.call_soon_threadsafe(executor.stop)
+            time.sleep(0.05)
+            loop.call_soon_threadsafe(loop.stop)
+            worker.join(5)
+            loop.close()
+        
+        self.assertEqual(result['path'], 'hot')
+        self.assertEqual(trader.send_threads, ['refresh-loop'])
+        self.assertGreaterEqual(result['signal_to_submit_ms'], 200)
+
+
+class TestHuntHubScanner(unittest.TestCase):
+    """Test launch detection, dedup and queued scoring"""
+    
+    def test_conditional_scan_and_queued_scoring(self):
+        """Test unchanged feeds return 304, duplicates are dropped and workers score launches"""
+        from aiohttp import web
+        import aiohttp
+        from hunt_hub_scanner import HuntHubScanner, SeenTokenWindow
+        
+        seen_etags = []
+        
+        async def new_tokens(request):
+            seen_etags.append(request.headers.get('If-None-Match'))
+            if request.headers.get('If-None-Match') == '"v1"':
+                return web.Response(status=304)
+            tokens = [{'mint': 'A', 'symbol': 'AAA'}, {'mint': 'B'}, {'mint': 'A'}]
+            return web.json_response({'tokens': tokens}, headers={'ETag': '"v1"'})
+        
+        async def main():
+            app = web.Application()
+            app.router.add_get('/new', new_tokens)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            
+            scanner = HuntHubScanner({'endpoints': {'pumpfun': f"http://127.0.0.1:{port}/new"}})
+            scanner.session = aiohttp.ClientSession()
+            scanner.score_queue = asyncio.Queue()
+            scanner._worker_tasks = [asyncio.create_task(scanner._score_worker()) for _ in range(2)]
+            
+            async def no_market_data(token):
+                return {}
+            scanner._fetch_market_data = no_market_data
+            
+            try:
+                found = [await scanner._scan_pumpfun(), await scanner._scan_pumpfun()]
+                await scanner.score_queue.join()
+                return found, scanner.get_scanner_stats(), await scanner.get_latest_launches()
+            finally:
+                await scanner.stop()
+                await runner.cleanup()
+        
+        found, stats, launches = asyncio.run(main())
+        
+        self.assertEqual(found, [2, 0])
+        self.assertEqual(seen_etags, [None, '"v1"'])
+        self.assertEqual(stats['platforms']['pumpfun']['not_modified'], 1)
+        self.assertEqual(stats['scored'], 2)
+        self.assertEqual(sorted(l['token'].address for l in launches), ['A', 'B'])
+        
+        window = SeenTokenWindow(ttl_seconds=60, max_size=2)
+        self.assertTrue(window.add('A'))
+        self.assertFalse(window.add('A'))
+        window.add('B')
+        window.add('C')
+        self.assertEqual((len(window), 'A' in window), (2, False))
+    
+    def test_launch_is_marked_seen_only_once_queued(self):
+        """Test launches that could not be queued are retried and quiet polls stay near 0.5s"""
+        from hunt_hub_scanner import HuntHubScanner, PlatformPoller
+        
+        async def main():
+            scanner = HuntHubScanner({})
+            not_started = await scanner._process_launch({'mint': 'A'}, 'pumpfun')
+            scanner.score_queue = asyncio.Queue(maxsize=1)
+            queued = await scanner._process_launch({'mint': 'A'}, 'pumpfun')
+            full = await scanner._process_launch({'mint': 'B'}, 'pumpfun')
+            return not_started, queued, full, scanner
+        
+        not_started, queued, full, scanner = asyncio.run(main())
+        self.assertEqual((not_started, queued, full), (False, True, False))
+        self.assertIn('A', scanner.seen_tokens)
+        self.assertNotIn('B', scanner.seen_tokens)
+        self.assertEqual((scanner.stats['queued'], scanner.stats['dropped']), (1, 1))
+        
+        poller = PlatformPoller()
+        for _ in range(20):
+            poller.record(0)
+        self.assertEqual(poller.interval, 0.5)
+        poller.record(3)
+        self.assertEqual(poller.interval, poller.min_interval)
+
+
+class TestAlphaRadar(unittest.TestCase):
+    """Test the concurrent alpha radar detection cycle"""
+    
+    def test_concurrent_cycle_with_history_deltas(self):
+        """Test tokens are scanned in parallel and history is only fetched as deltas"""
+        from alpha_radar_system import AlphaRadarSystem
+        
+        class FakeRadar(AlphaRadarSystem):
+            def __init__(self):
+                super().__init__({'max_concurrency': 50})
+                self.since_requests = []
+                self.now = 100.0
+            
+            async def _fetch_trending_tokens(self):
+                return [{'address': f"T{i}", 'symbol': f"T{i}", 'volume_24h': 10} for i in range(200)]
+            
+            async def _fetch_historical_data(self, address, since=None):
+                await asyncio.sleep(0.02)
+                self.since_requests.append(since)
+                start = 0 if since is None else int(since) + 1
+                return [{'timestamp': t, 'price': 1.0, 'volume': 10} for t in range(start, int(self.now))]
+            
+            async def _fetch_transactions(self, address):
+                await asyncio.sleep(0.02)
+                return []
+            
+            async def _fetch_social_data(self, symbol):
+                await asyncio.sleep(0.02)
+                return {}
+        
+        async def scenario():
+            radar = FakeRadar()
+            await radar.run_detection_cycle()
+            radar.now = 103.0
+            signals = await radar.run_detection_cycle()
+            return radar, signals
+        
+        radar, signals = asyncio.run(scenario())
+        stats = radar.get_radar_stats()
+        
+        # 200 tokens x 3 sequential 20ms fetches would take 12s per cycle
+        self.assertLess(stats['last_cycle_s'], 2.0)
+        self.assertEqual(stats['cycles'], 2)
+        self.assertEqual(radar.since_requests.count(99), 200)
+        self.assertEqual(stats['history_points_fetched'], 200 * 103)
+        self.assertEqual(len(radar.history_cache['T0']), 103)
+        self.assertEqual(signals, [])
+
+
+class TestLexiconSentiment(unittest.TestCase):
+    """Test the lexicon sentiment scorer"""
+    
+    def test_scores_and_memo(self):
+        """Test crypto terms drive polarity and duplicates are only scored once"""
+        from src.sentiment.lexicon_scorer import LexiconSentimentScorer
+        
+        scorer = LexiconSentimentScorer()
+        bullish, _ = scorer.score("$SOL to the moon! Diamond hands")
+        bearish, _ = scorer.score("Warning: rug pull, dump incoming, avoid")
+        negated, _ = scorer.score("not good")
+        
+        self.assertGreater(bullish, 0.1)
+        self.assertLess(bearish, -0.1)
+        self.assertLess(negated, 0)
+        
+        texts = ["Loading up on $BONK", "loading up on $bonk", "RIP $BONK, total scam"] * 50
+        results = scorer.score_many(texts)
+        
+        self.assertEqual(len(results), 150)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], scorer.score("Loading up on $BONK"))
+        self.assertEqual(scorer.stats['scored'], 5)
+
+
+class TestSentimentAggregationStore(unittest.TestCase):
+    """Test rolling sentiment aggregation"""
+    
+    def test_window_queries(self):
+        """Test window summaries, platform breakdown and duplicate posts"""
+        from dataclasses import dataclass, field
+        from src.sentiment.aggregation_store import SentimentAggregationStore
+        
+        @dataclass
+        class Post:
+            platform: str
+            content: str
+            timestamp: datetime
+            author: str
+            sentiment_score: float
+            engagement: int = 100
+            influence_score: float = 0.5
+            token_mentions: list = field(default_factory=lambda: ['SOL'])
+            hashtags: list = field(default_factory=lambda: ['#SOL'])
+            
+            @property
+            def sentiment_label(self):
+                return "BULLISH" if self.sentiment_score >= 0.1 else "BEARISH" if self.sentiment_score <= -0.1 else "NEUTRAL"
+            
+            @property
+            def weighted_sentiment(self):
+                return self.sentiment_score
+        
+        now = datetime.now()
+        posts = [
+            Post('twitter', 'moon', now - timedelta(minutes=10), 'a', 0.8),
+            Post('reddit', 'rug', now - timedelta(minutes=30), 'b', -0.4),
+            Post('twitter', 'old news', now - timedelta(hours=30), 'c', -0.6),
+        ]
+        
+        store = SentimentAggregationStore(bucket_seconds=300)
+        self.assertEqual(store.add_many(posts + posts[:1], 'SOL'), 3)
+        
+        last_hour = store.summarize('SOL', 3600)
+        self.assertEqual(last_hour['total_mentions'], 2)
+        self.assertAlmostEqual(last_hour['avg_sentiment'], 0.2)
+        self.assertEqual((last_hour['bullish_count'], last_hour['bearish_count']), (1, 1))
+        
+        everything = store.summarize('SOL')
+        self.assertEqual(everything['total_mentions'], 3)
+        self.assertAlmostEqual(everything['sentiment_momentum'], 0.2 - (-0.6))
+        self.assertEqual(everything['trending_hashtags'], ['#SOL'])
+        
+        breakdown = store.platform_breakdown('SOL', 24 * 3600)
+        self.assertEqual(set(breakdown), {'twitter', 'reddit'})
+        self.assertEqual(sum(point['mentions'] for point in store.timeline('SOL', hours=24)), 2)
+        self.assertTrue(store.is_fresh('SOL', 60))
+
+
+class TestDataAggregator(unittest.TestCase):
+    """Test multi-source conflict resolution"""
+    
+    def test_batch_matches_single_coin(self):
+        """Test vectorized aggregate_many matches aggregate_coin_data"""
+        from intelligent_data_aggregator import IntelligentDataAggregator
+        
+        aggregator = IntelligentDataAggregator()
+        coins = [
+            {'data_sources': {
+                'coingecko': {'price': 100.0, 'volume_24h': 1000, 'rsi': 55.0, 'twitter_followers': 10, 'is_honeypot': False},
+                'coinmarketcap': {'price': 101.0, 'volume_24h': 1200, 'rsi': 60.0, 'twitter_followers': 14, 'is_honeypot': False},
+                'dexscreener': {'price': 99.0, 'volume_24h': 900, 'rsi': 40.0, 'is_honeypot': True},
+                'birdeye': {'price': 250.0, 'volume_24h': 1100, 'liquidity': 'n/a'},
+                'gmgn': {'error': 'timeout'}
+            }},
+            {'data_sources': {
+                'jupiter': {'price': 0.5, 'market_cap': 5e5},
+                'raydium': {'price': 0.6, 'market_cap': 4e5}
+            }},
+            {'data_sources': {'coingecko': {'price': 1.0}}}
+        ]
+        
+        batch = aggregator.aggregate_many(coins)
+        
+        for coin, batched in zip(coins, batch):
+            single = aggregator.aggregate_coin_data(coin)
+            for category in ('core_metrics', 'technical_indicators', 'social_metrics',
+                             'security_analysis', 'defi_metrics'):
+                self.assertEqual(list(single[category]), list(batched[category]))
+                for metric, expected in single[category].items():
+                    actual = batched[category][metric]
+                    if isinstance(expected['value'], float):
+                        self.assertAlmostEqual(actual['value'], expected['value'], places=9)
+                    else:
+                        self.assertEqual(actual['value'], expected['value'])
+                    self.assertEqual(actual['sources'], expected['sources'])
+                    self.assertEqual(actual['resolution_method'], expected['resolution_method'])
+                    self.assertEqual([c.get('source') for c in actual['conflicts']],
+                                     [c.get('source') for c in expected['conflicts']])
+                    self.assertEqual(actual['metadata'].keys(), expected['metadata'].keys())
+            self.assertAlmostEqual(batched['metadata']['overall_confidence'],
+                                   single['metadata']['overall_confidence'])
+        
+        price = batch[0]['core_metrics']['price']
+        self.assertEqual(price['metadata']['removed_count'], 1)
+        self.assertEqual(batch[0]['social_metrics']['twitter_followers']['variance'], 8)
+
+
+class TestDataNormalizer(unittest.TestCase):
+    """Test compiled provider extraction plans"""
+    
+    def test_normalize_many_columnar(self):
+        """Test records and float64 columns agree with per-response normalization"""
+        from decimal import Decimal
+        import numpy as np
+        from data_normalization_schemas import DataNormalizer
+        
+        normalizer = DataNormalizer()
+        responses = [
+            {'pairs': [{'priceUsd': '0.0012', 'priceChange': {'h24': -3.5},
+                        'baseToken': {'symbol': 'bonk', 'address': 'DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263'}}]},
+            {'pairs': [{'priceUsd': '$1,250.75', 'baseToken': {'symbol': 'wif'}}]},
+            {'pairs': []}
+        ]
+        
+        records = normalizer.normalize_many('dexscreener', responses)
+        self.assertEqual(records[0].symbol, 'BONK')
+        self.assertEqual(records[0].address, 'DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263')
+        self.assertEqual(records[1].price_usd, Decimal('1250.75'))
+        self.assertEqual(records[2].address, 'unknown')
+        
+        columns = normalizer.normalize_many('dexscreener', responses, columnar=True)
+        self.assertEqual(columns['price_usd'].dtype, np.float64)
+        self.assertEqual(columns['price_usd'][1], 1250.75)
+        self.assertTrue(np.isnan(columns['price_usd'][2]))
+        self.assertEqual(columns['price_change_24h'][0], -3.5)
+        self.assertEqual(columns['symbol'], ['BONK', 'WIF', None])
+        self.assertEqual(columns['data_provider'], ['dexscreener'] * 3)
+        
+        exact = normalizer.normalize_many('dexscreener', responses, columnar=True, use_decimal=True)
+        self.assertEqual(list(exact['price_usd']), [Decimal('0.0012'), Decimal('1250.75'), None])
+
+class TestCoinImageSystem(unittest.TestCase):
+    """Test racing image sources and the content-addressed store"""
+    
+    def test_race_sources_and_store_locally(self):
+        """Test the fastest valid source wins, slow sources are cancelled and images are stored once"""
+        from aiohttp import web
+        import struct
+        import zlib
+        from coin_image_system import CoinImageSystem, PIL_AVAILABLE
+        
+        def chunk(tag, data):
+            return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+        
+        # A real 256x256 RGBA PNG, so Pillow has something to resize
+        rows = b''.join(b'\x00' + b'\xff\x80\x00\xff' * 256 for _ in range(256))
+        png = (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', 256, 256, 8, 6, 0, 0, 0))
+               + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+        
+        async def slow_source(request):
+            await asyncio.sleep(5)
+            return web.json_response({'icon': 'http://example.com/slow.png'})
+        
+        async def fast_source(request):
+            port = request.url.port
+            return web.json_response({'pairs': [{'info': {'imageUrl': f"http://127.0.0.1:{port}/logo.png"}}]})
+        
+        async def missing_source(request):
+            return web.Response(status=404)
+        
+        async def logo(request):
+            return web.Response(body=png, content_type='image/png')
+        
+        async def main(cache_dir):
+            app = web.Application()
+            app.router.add_get('/slow', slow_source)
+            app.router.add_get('/fast', fast_source)
+            app.router.add_get('/missing', missing_source)
+            app.router.add_get('/logo.png', logo)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            
+            system = CoinImageSystem(cache_dir=cache_dir, flush_every=10)
+            system.image_sources = [
+                {'name': 'slow', 'url_template': f"http://127.0.0.1:{port}/slow", 'data_path': 'icon', 'rate_limit': 5.0},
+                {'name': 'missing', 'url_template': f"http://127.0.0.1:{port}/missing", 'data_path': 'icon', 'rate_limit': 5.0},
+                {'name': 'fast', 'url_template': f"http://127.0.0.1:{port}/fast", 'data_path': 'pairs.0.info.imageUrl', 'rate_limit': 5.0}
+            ]
+            try:
+                started = asyncio.get_running_loop().time()
+                images = await system.batch_fetch_images([{'ticker': 'AAA', 'ca': 'addr1'}, {'ticker': 'BBB', 'ca': 'addr2'}])
+                elapsed = asyncio.get_running_loop().time() - started
+                await asyncio.sleep(0.1)
+                return system, images, elapsed
+            finally:
+                await runner.cleanup()
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            system, images, elapsed = asyncio.run(main(cache_dir))
+            
+            # The slow source is abandoned rather than awaited
+            self.assertLess(elapsed, 3)
+            self.assertEqual({image.image_source for image in images.values()}, {'fast'})
+            
+            # Both coins share one logo, so it is stored once under its hash
+            self.assertEqual(images['AAA'].content_hash, images['BBB'].content_hash)
+            self.assertTrue(os.path.exists(images['AAA'].cached_path))
+            self.assertIn(images['AAA'].content_hash, images['AAA'].cached_path)
+            stored = [name for _, _, files in os.walk(cache_dir) for name in files if name != 'image_metadata.json']
+            if PIL_AVAILABLE:
+                from PIL import Image
+                self.assertEqual(sorted(stored), sorted(f"{images['AAA'].content_hash}_{size}.png" for size in (64, 192)))
+                with Image.open(images['AAA'].cached_path) as thumbnail:
+                    self.assertLessEqual(max(thumbnail.size), 192)
+            else:
+                self.assertEqual(len(stored), 1)
+            
+            # The index is flushed once at the end of the batch
+            with open(os.path.join(cache_dir, 'image_metadata.json')) as f:
+                self.assertEqual(len(json.load(f)), 2)
+            self.assertTrue(system.get_image_src('AAA', 'addr1', 48).startswith('data:image/png;base64,'))
+            self.assertTrue(system.get_image_src('ZZZ', 'none').startswith('http'))
+    
+    def test_bulk_source_is_a_shared_fallback(self):
+        """Test a bulk coin list is only downloaded when per-coin sources miss, and once per batch"""
+        from aiohttp import web
+        from coin_image_system import CoinImageSystem
+        
+        hits = {'bulk': 0}
+        
+        async def bulk_source(request):
+            hits['bulk'] += 1
+            await asyncio.sleep(0.1)
+            return web.json_response({'Data': {'logo': 'http://example.com/shared.png'}})
+        
+        async def missing_source(request):
+            return web.Response(status=404)
+        
+        async def main(cache_dir):
+            app = web.Application()
+            app.router.add_get('/bulk', bulk_source)
+            app.router.add_get('/missing', missing_source)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            
+            system = CoinImageSystem(cache_dir=cache_dir)
+            system.image_sources = [
+                {'name': 'bulk', 'url_template': f"http://127.0.0.1:{port}/bulk", 'data_path': 'Data.logo',
+                 'rate_limit': 50.0, 'bulk': True},
+                {'name': 'missing', 'url_template': f"http://127.0.0.1:{port}/missing", 'data_path': 'icon', 'rate_limit': 50.0}
+            ]
+            # Thumbnails are not under test here
+            async def no_store(image_url, session):
+                return None
+            system.store_image = no_store
+            try:
+                return await system.batch_fetch_images(
+                    [{'ticker': f"C{i}", 'ca': f"addr{i}"} for i in range(4)])
+            finally:
+                await runner.cleanup()
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            images = asyncio.run(main(cache_dir))
+        
+        self.assertEqual(hits['bulk'], 1)
+        self.assertEqual({image.image_source for image in images.values()}, {'bulk'})
+        self.assertEqual(len(images), 4)
+
+class TestDiscordQueue(unittest.TestCase):
+    """Test the heap/token-bucket Discord delivery queue"""
+    
+    def _message(self, channel, url, title, priority):
+        from enhanced_blog_with_queue import QueuedMessage
+        return QueuedMessage(channel=channel, webhook_url=url, embed={'title': title},
+                             priority=priority, created_at=datetime.now())
+    
+    def test_drains_at_header_rate_and_persists(self):
+        """Test buckets follow X-RateLimit headers, priority order holds and state reaches the DB"""
+        from aiohttp import web
+        from enhanced_blog_with_queue import DiscordRateLimitQueue, MessagePriority, QUEUED_MESSAGES_SCHEMA
+        
+        windows = {}
+        received = []
+        rejected = []
+        
+        async def webhook(request):
+            name = request.match_info['name']
+            now = asyncio.get_running_loop().time()
+            state = windows.setdefault(name, {'remaining': 0, 'reset': 0.0})
+            if now >= state['reset']:
+                state['remaining'], state['reset'] = 2, now + 0.3
+            if state['remaining'] == 0:
+                rejected.append(name)
+                return web.json_response({'retry_after': state['reset'] - now}, status=429,
+                                         headers={'X-RateLimit-Reset-After': f"{state['reset'] - now:.3f}"})
+            state['remaining'] -= 1
+            received.append((name, (await request.json())['embeds'][0]['title'], now))
+            return web.Response(status=204, headers={
+                'X-RateLimit-Limit': '2',
+                'X-RateLimit-Remaining': str(state['remaining']),
+                'X-RateLimit-Reset-After': f"{state['reset'] - now:.3f}"
+            })
+        
+        async def main(db_path):
+            app = web.Application()
+            app.router.add_post('/hooks/{name}', webhook)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            url_a = f"http://127.0.0.1:{port}/hooks/a"
+            url_b = f"http://127.0.0.1:{port}/hooks/b"
+            
+            queue = DiscordRateLimitQueue(db_path=db_path, flush_size=1000, flush_interval=0.05)
+            queue.add_to_queue(self._message('a', url_a, 'low', MessagePriority.LOW))
+            for i in range(3):
+                queue.add_to_queue(self._message('a', url_a, f"normal-{i}", MessagePriority.NORMAL))
+            queue.add_to_queue(self._message('a', url_a, 'critical', MessagePriority.CRITICAL))
+            queue.add_to_queue(self._message('b', url_b, 'other', MessagePriority.NORMAL))
+            
+            processor = asyncio.create_task(queue.process_queues())
+            try:
+                for _ in range(100):
+                    if queue.sent_count == 6:
+                        break
+                    await asyncio.sleep(0.05)
+            finally:
+                queue.processing = False
+                await processor
+                await queue.cleanup()
+                await runner.cleanup()
+            return queue
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'queue.db')
+            conn = sqlite3.connect(db_path)
+            conn.execute(QUEUED_MESSAGES_SCHEMA)
+            conn.commit()
+            conn.close()
+            
+            queue = asyncio.run(main(db_path))
+            
+            self.assertEqual(queue.sent_count, 6)
+            self.assertEqual(rejected, [])
+            self.assertEqual([title for name, title, _ in received if name == 'a'],
+                             ['critical', 'normal-0', 'normal-1', 'normal-2', 'low'])
+            times = [t for name, _, t in received if name == 'a']
+            # Five sends at two per 0.3s window need at least two resets
+            self.assertGreaterEqual(times[-1] - times[0], 0.55)
+            
+            conn = sqlite3.connect(db_path)
+            statuses = [row[0] for row in conn.execute("SELECT status FROM queued_messages")]
+            conn.close()
+            self.assertEqual(statuses, ['sent'] * 6)
+    
+    def test_retry_before_first_flush_writes_one_row(self):
+        """Test a message requeued before its insert is flushed is stored once"""
+        from aiohttp import web
+        from enhanced_blog_with_queue import DiscordRateLimitQueue, MessagePriority, QUEUED_MESSAGES_SCHEMA
+        
+        attempts = []
+        
+        async def webhook(request):
+            attempts.append(request.path)
+            return web.Response(status=500 if len(attempts) == 1 else 204)
+        
+        async def main(db_path):
+            app = web.Application()
+            app.router.add_post('/hook', webhook)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            
+            queue = DiscordRateLimitQueue(db_path=db_path, flush_size=1000, flush_interval=60)
+            queue.add_to_queue(self._message('a', f"http://127.0.0.1:{port}/hook", 'retry', MessagePriority.NORMAL))
+            processor = asyncio.create_task(queue.process_queues())
+            try:
+                for _ in range(100):
+                    if queue.sent_count == 1:
+                        break
+                    await asyncio.sleep(0.02)
+            finally:
+                queue.processing = False
+                await processor
+                await queue.cleanup()
+                await runner.cleanup()
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'queue.db')
+            conn = sqlite3.connect(db_path)
+            conn.execute(QUEUED_MESSAGES_SCHEMA)
+            conn.commit()
+            conn.close()
+            
+            asyncio.run(main(db_path))
+            
+            conn = sqlite3.connect(db_path)
+            rows = conn.execute("SELECT id, status, retry_count FROM queued_messages").fetchall()
+            conn.close()
+            self.assertEqual(len(attempts), 2)
+            self.assertEqual(rows, [(1, 'sent', 1)])
+    
+    def test_pending_messages_survive_restart(self):
+        """Test queued rows are reloaded in priority order by a new queue"""
+        from enhanced_blog_with_queue import DiscordRateLimitQueue, MessagePriority, QUEUED_MESSAGES_SCHEMA
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'queue.db')
+            conn = sqlite3.connect(db_path)
+            conn.execute(QUEUED_MESSAGES_SCHEMA)
+            conn.commit()
+            conn.close()
+            
+            first = DiscordRateLimitQueue(db_path=db_path)
+            first.add_to_queue(self._message('a', 'http://hook', 'normal', MessagePriority.NORMAL))
+            first.add_to_queue(self._message('a', 'http://hook', 'high', MessagePriority.HIGH))
+            first.flush()
+            
+            second = DiscordRateLimitQueue(db_path=db_path)
+            self.assertEqual(second.load_pending(), 2)
+            self.assertEqual(second.load_pending(), 0)
+            self.assertEqual(second.message_queues['a'][0][-1].embed['title'], 'high')
+            self.assertEqual(second.get_queue_stats()['total_queued'], 2)
+
+class TestNotificationDispatcher(unittest.TestCase):
+    """Test concurrent notification fan-out"""
+    
+    def test_concurrent_fan_out_with_latency(self):
+        """Test recipients are sent to concurrently and each delivery latency is recorded"""
+        from aiohttp import web
+        from notification_dispatcher import NotificationDispatcher
+        
+        payloads = []
+        
+        async def send_message(request):
+            payload = await request.json()
+            payloads.append(payload)
+            await asyncio.sleep(0.2)
+            return web.json_response({'ok': payload['chat_id'] != 'blocked'})
+        
+        async def webhook(request):
+            return web.Response(status=204)
+        
+        async def main(dispatcher):
+            app = web.Application()
+            app.router.add_post('/bottoken/sendMessage', send_message)
+            app.router.add_post('/hook/{name}', webhook)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+            
+            recipients = {f"user{i}": str(i) for i in range(5)}
+            recipients.update({'blocked': 'blocked', 'pending': None})
+            try:
+                started = asyncio.get_running_loop().time()
+                telegram, discord = await asyncio.gather(
+                    dispatcher.send_telegram('token', recipients, 'Runner!', base_url=base),
+                    dispatcher.send_discord({'alerts': f"{base}/hook/alerts"}, {'content': 'Runner!'})
+                )
+                return telegram, discord, asyncio.get_running_loop().time() - started
+            finally:
+                await dispatcher.close()
+                await runner.cleanup()
+        
+        dispatcher = NotificationDispatcher()
+        telegram, discord, elapsed = asyncio.run(main(dispatcher))
+        
+        # Six 200ms sends finish together rather than one after another
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(len(telegram), 6)
+        self.assertEqual({d.recipient for d in telegram if not d.success}, {'blocked'})
+        self.assertTrue(discord[0].success)
+        self.assertTrue(all(p['text'] == 'Runner!' for p in payloads))
+        
+        stats = dispatcher.get_latency_stats()
+        self.assertEqual(stats['telegram:blocked']['failures'], 1)
+        self.assertGreaterEqual(stats['telegram:user0']['last_ms'], 200)
+        self.assertNotIn('telegram:pending', stats)
+        
+        # A second event loop gets its own session and limiters
+        telegram, _, _ = asyncio.run(main(dispatcher))
+        self.assertEqual(stats['telegram:user0']['deliveries'], 1)
+        self.assertEqual(dispatcher.get_latency_stats()['telegram:user0']['deliveries'], 2)
+    
+    def test_sessions_are_per_loop_and_closed_with_their_loop(self):
+        """Test a session left on a finished loop is closed on rebind while other running loops keep theirs"""
+        import threading
+        import time
+        from aiohttp import web
+        from notification_dispatcher import NotificationDispatcher
+        
+        async def webhook(request):
+            return web.Response(status=204)
+        
+        # The server and a long-lived "coalescer" loop run in their own threads
+        server_loop = asyncio.new_event_loop()
+        other_loop = asyncio.new_event_loop()
+        threads = [threading.Thread(target=loop.run_forever, daemon=True) for loop in (server_loop, other_loop)]
+        for thread in threads:
+            thread.start()
+        
+        async def start_server():
+            app = web.Application()
+            app.router.add_post('/hook', webhook)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/hook"
+        
+        runner, url = asyncio.run_coroutine_threadsafe(start_server(), server_loop).result(5)
+        dispatcher = NotificationDispatcher()
+        
+        async def send():
+            delivery = await dispatcher.post_json('discord', 'alerts', url, {'content': 'Runner!'})
+            return delivery.success, dispatcher._sessions[asyncio.get_running_loop()]
+        
+        try:
+            ok_other, other_session = asyncio.run_coroutine_threadsafe(send(), other_loop).result(5)
+            ok_first, first_session = asyncio.run(send())
+            ok_second, second_session = asyncio.run(send())
+            
+            self.assertTrue(ok_other and ok_first and ok_second)
+            self.assertTrue(first_session.closed)
+            self.assertFalse(second_session.closed)
+            self.assertFalse(other_session.closed)
+            self.assertEqual(len(dispatcher._sessions), 2)
+            
+            asyncio.run(dispatcher.close())
+            self.assertEqual(dispatcher._sessions, {})
+            self.assertTrue(second_session.closed)
+            for _ in range(50):
+                if other_session.closed:
+                    break
+                time.sleep(0.01)
+            self.assertTrue(other_session.closed)
+        finally:
+            asyncio.run_coroutine_threadsafe(runner.cleanup(), server_loop).result(5)
+            for loop, thread in zip((server_loop, other_loop), threads):
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join(5)
+                loop.close()
+
+class TestAlertCoalescer(unittest.TestCase):
+    """Test per-coin alert coalescing"""
+    
+    def test_rapid_updates_merge_into_one_trailing_send(self):
+        """Test the first alert is sent at once and repeats become one send with the latest numbers"""
+        from alert_coalescer import AlertCoalescer
+        
+        sent = []
+        
+        async def send(data):
+            sent.append(dict(data))
+            return True
+        
+        async def main(coalescer):
+            first = await coalescer.submit('pepe', 'runner', 'discord', {'price': 1.0, 'volume': 10}, send)
+            updates = [
+                await coalescer.submit('PEPE', 'runner', 'discord', {'price': 1.0 + i / 10}, send)
+                for i in range(1, 6)
+            ]
+            other = await coalescer.submit('PEPE', 'runner', 'telegram:1', {'price': 1.5}, send)
+            self.assertEqual(coalescer.pending_count(), 1)
+            await asyncio.sleep(0.35)
+            return first, updates, other
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_path = os.path.join(temp_dir, 'coalescer.json')
+            coalescer = AlertCoalescer(window_seconds=0.2, state_path=state_path, flush_every=3)
+            first, updates, other = asyncio.run(main(coalescer))
+            
+            self.assertEqual(first, ('sent', True))
+            self.assertTrue(all(status == 'merged' for status, _ in updates))
+            self.assertEqual(other[0], 'sent')
+            
+            # Initial discord, telegram, then one merged discord send
+            self.assertEqual(len(sent), 3)
+            self.assertEqual(sent[-1], {'price': 1.5, 'volume': 10})
+            self.assertEqual(coalescer.stats['coalesced_sends'], 1)
+            self.assertEqual(coalescer.pending_count(), 0)
+            
+            # Three sends reached flush_every, so the windows were persisted
+            with open(state_path) as f:
+                self.assertIn('PEPE|runner|discord', json.load(f))
+            
+            # A restarted coalescer keeps still-open windows
+            reloaded = AlertCoalescer(window_seconds=60, state_path=state_path)
+            status, _ = asyncio.run(reloaded.submit('PEPE', 'runner', 'discord', {'price': 2.0}, send))
+            self.assertEqual(status, 'merged')
+            for window in reloaded.windows.values():
+                if window.flush_future:
+                    window.flush_future.cancel()
+    
+    def test_trailing_send_survives_closed_caller_loop(self):
+        """Test merged alerts still go out when each submit runs in its own asyncio.run"""
+        import time
+        from alert_coalescer import AlertCoalescer
+        
+        sent = []
+        
+        async def send(data):
+            sent.append(dict(data))
+            return True
+        
+        coalescer = AlertCoalescer(window_seconds=0.2, state_path=None)
+        for price in (1, 2, 3):
+            asyncio.run(coalescer.submit('PEPE', 'runner', 'discord', {'p': price}, send))
+        time.sleep(0.4)
+        self.assertEqual(sent, [{'p': 1}, {'p': 3}])
+        self.assertEqual(coalescer.pending_count(), 0)
+        
+        # The next window's updates are sent by drain() on shutdown
+        for price in (4, 5):
+            asyncio.run(coalescer.submit('PEPE', 'runner', 'discord', {'p': price}, send))
+        asyncio.run(coalescer.drain())
+        self.assertEqual(sent[-1], {'p': 5})
+        self.assertEqual(coalescer.pending_count(), 0)
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test the shared metrics registry"""
+    
+    def test_counters_histograms_and_spans(self):
+        """Test per-thread counters add up, histograms report percentiles and spans nest"""
+        import threading
+        from metrics_registry import MetricsRegistry
+        
+        registry = MetricsRegistry()
+        sent = registry.counter('alerts_sent_total', "Alerts", ('platform',))
+        
+        def send_many():
+            for _ in range(10000):
+                sent.labels(platform='telegram').inc()
+        
+        threads = [threading.Thread(target=send_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sent.labels(platform='telegram').value, 40000)
+        
+        latency = registry.histogram('http_fetch_seconds', labelnames=('provider',))
+        for ms in range(1, 101):
+            latency.labels(provider='dexscreener').observe(ms / 1000)
+        sample = registry.snapshot()['http_fetch_seconds']['samples'][0]
+        self.assertEqual(sample['count'], 100)
+        self.assertAlmostEqual(sample['p50'], 0.050, delta=0.003)
+        self.assertAlmostEqual(sample['p95'], 0.095, delta=0.005)
+        self.assertEqual(sample['max'], 0.1)
+        
+        @registry.timed('strategy_scan')
+        def scan():
+            with registry.span('db_write', source='scan'):
+                raise ValueError("locked")
+        
+        with self.assertRaises(ValueError):
+            scan()
+        inner, outer = registry.get_recent_spans()
+        self.assertEqual(inner['parent_id'], outer['span_id'])
+        self.assertEqual(inner['trace_id'], outer['trace_id'])
+        self.assertEqual(inner['error'], 'ValueError')
+        
+        with self.assertRaises(ValueError):
+            registry.gauge('alerts_sent_total')
+        
+        text = registry.render_prometheus()
+        self.assertIn('# TYPE alerts_sent_total counter', text)
+        self.assertIn('alerts_sent_total{platform="telegram"} 40000.0', text)
+        self.assertIn('http_fetch_seconds_bucket{provider="dexscreener",le="0.05"} 50', text)
+        self.assertIn('http_fetch_seconds_count{provider="dexscreener"} 100', text)
+        self.assertIn('db_write_errors_total{source="scan"} 1.0', text)
+    
+    def test_handled_errors_and_dead_thread_cells(self):
+        """Test swallowed exceptions still count as span errors and finished threads' cells are folded"""
+        import threading
+        from metrics_registry import MetricsRegistry
+        
+        registry = MetricsRegistry()
+        
+        @registry.timed('db_write', source='turbo')
+        def update_database():
+            try:
+                raise OSError("disk I/O error")
+            except OSError as e:
+                registry.record_error(e)
+                return 0
+        
+        self.assertEqual(update_database(), 0)
+        with registry.span('http_fetch', provider='dexscreener') as span:
+            span.fail("HTTP 503")
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot['db_write_errors_total']['samples'][0]['value'], 1)
+        self.assertEqual(snapshot['http_fetch_errors_total']['samples'][0]['value'], 1)
+        
+        sent = registry.counter('alerts_sent_total', labelnames=('platform',)).labels(platform='discord')
+        latency = registry.histogram('alert_send_seconds')
+        for _ in range(50):
+            thread = threading.Thread(target=lambda: (sent.inc(), latency.observe(0.01)))
+            thread.start()
+            thread.join()
+        sent.inc()
+        
+        self.assertEqual(sent.value, 51)
+        self.assertEqual(latency.labels().count, 50)
+        self.assertEqual(len(sent._cells.cells()), 2)  # Base cell plus this thread's
+        self.assertAlmostEqual(latency.labels().quantile(0.5), 0.01, delta=0.001)
+    
+    def test_instances_report_their_own_latency(self):
+        """Test caches and pools read their own series, not the process-wide totals"""
+        from database_connection_pool import DatabaseConnectionPool
+        
+        with patch.dict(sys.modules, {'streamlit': sys.modules.get('streamlit', MagicMock())}), \
+                tempfile.TemporaryDirectory() as tmp:
+            from enhanced_caching_system import EnhancedCacheSystem
+            
+            busy, idle = (EnhancedCacheSystem(cache_dir=os.path.join(tmp, name)) for name in ('busy', 'idle'))
+            busy.set('key', 'value')
+            for _ in range(5):
+                busy.get('key')
+            self.assertGreater(busy.get_stats()['avg_access_time_ms'], 0)
+            self.assertEqual(idle.get_stats()['avg_access_time_ms'], 0.0)
+            self.assertEqual(idle.get_stats()['p95_access_time_ms'], {})
+            
+            # Same file name in different directories
+            pools = []
+            for name in ('a', 'b'):
+                os.mkdir(os.path.join(tmp, name))
+                pools.append(DatabaseConnectionPool(os.path.join(tmp, name, 'trench.db'), pool_size=1, max_overflow=0))
+            try:
+                pools[0].execute_query("SELECT 1", fetch='one')
+                self.assertGreater(pools[0].get_stats()['average_query_time'], 0)
+                self.assertEqual(pools[1].get_stats()['average_query_time'], 0.0)
+            finally:
+                for pool in pools:
+                    pool.close_all()
+
+class TestSamplingProfiler(unittest.TestCase):
+    """Test the opt-in sampling profiler"""
+    
+    def test_capture_threads_and_tasks(self):
+        """Test a capture sees busy threads and suspended tasks and writes its files"""
+        import threading
+        import time
+        from sampling_profiler import SamplingProfiler, list_profiles
+        
+        def crunch_numbers(seconds):
+            end = time.time() + seconds
+            while time.time() < end:
+                sum(range(1000))
+        
+        async def wait_for_signals():
+            await asyncio.sleep(5)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = SamplingProfiler(interval=0.002, output_dir=tmp)
+            profiler.targets.add('unit_worker')
+            
+            async def run_capture():
+                profiler.watch_loop()
+                waiter = asyncio.ensure_future(wait_for_signals())
+                self.assertTrue(profiler.start(10))
+                self.assertFalse(profiler.start(10))
+                worker = threading.Thread(target=crunch_numbers, args=(0.3,), name='cruncher')
+                worker.start()
+                await asyncio.get_running_loop().run_in_executor(None, worker.join)
+                summary = profiler.stop()
+                waiter.cancel()
+                return summary
+            
+            summary = asyncio.run(run_capture())
+            self.assertFalse(profiler.running)
+            self.assertGreater(summary['samples'], 10)
+            hot = [row['function'] for row in summary['top_self']]
+            self.assertTrue(any(f.startswith('crunch_numbers') for f in hot))
+            
+            with open(summary['folded_path']) as f:
+                folded = f.read().splitlines()
+            self.assertTrue(any(line.startswith('thread:cruncher;') for line in folded))
+            self.assertTrue(any(line.startswith('task:') and 'wait_for_signals;' in line for line in folded))
+            self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in folded))
+            with open(summary['svg_path']) as f:
+                self.assertIn('crunch_numbers', f.read())
+            self.assertEqual(list_profiles(output_dir=tmp)[0]['name'], 'unit_worker')
+    
+    def test_remote_control(self):
+        """Test workers only answer new admin requests addressed to them"""
+        import time
+        from sampling_profiler import SamplingProfiler, request_profile, stop_profiles
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            request_profile(30, output_dir=tmp)  # Issued before the worker started
+            profiler = SamplingProfiler(interval=0.01, output_dir=tmp)
+            profiler.targets.add('alpha_radar')
+            profiler.enable_remote_control(poll_interval=0.02)
+            time.sleep(0.1)
+            self.assertFalse(profiler.running)
+            
+            request_profile(30, targets=['hunt_hub_scanner'], output_dir=tmp)
+            time.sleep(0.1)
+            self.assertFalse(profiler.running)
+            
+            request_profile(30, targets=['alpha_radar'], output_dir=tmp)
+            for _ in range(50):
+                if profiler.running:
+                    break
+                time.sleep(0.02)
+            self.assertTrue(profiler.running)
+            
+            stop_profiles(output_dir=tmp)
+            for _ in range(100):
+                if profiler.last_summary:
+                    break
+                time.sleep(0.02)
+            self.assertFalse(profiler.running)
+            self.assertTrue(os.path.exists(profiler.last_summary['svg_path']))
+    
+    def test_event_bus_registers_on_start(self):
+        """Test building an event bus leaves the profiler alone until it is started, as get_event_bus does"""
+        import event_system
+        from sampling_profiler import PROFILE_DIR
+        
+        self.assertTrue(PROFILE_DIR.is_absolute())
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(event_system, 'profile_worker') as register:
+            bus = event_system.EventBus(persistence_path=tmp)
+            register.assert_not_called()
+            bus.start()
+            register.assert_called_once_with('event_bus')
+        
+        # The process-wide bus is started where it is created
+        with patch.object(event_system, '_event_bus', None), \
+                patch.object(event_system, 'EventBus') as bus_class:
+            self.assertIs(event_system.get_event_bus(), bus_class.return_value)
+            event_system.get_event_bus()
+            bus_class.return_value.start.assert_called_once_with()
+
+class TestLoopMonitor(unittest.TestCase):
+    """Test event loop lag and stall detection"""
+    
+    def test_blocking_call_is_caught_with_stack(self):
+        """Test a blocking call in a coroutine is recorded with its stack and task counts are kept"""
+        import time
+        from loop_monitor import monitor_loop, loop_health
+        
+        def save_trade_sync():
+            time.sleep(0.3)  # Stands in for a blocking sqlite write
+        
+        async def exit_position():
+            save_trade_sync()
+        
+        async def watch_price():
+            await asyncio.sleep(5)
+        
+        async def run_service():
+            monitor = monitor_loop('unit_trader', interval=0.02, slow_threshold=0.05, task_count_interval=0.01)
+            self.assertIs(monitor_loop('other_service'), monitor)
+            watchers = [asyncio.ensure_future(watch_price()) for _ in range(3)]
+            await asyncio.sleep(0.1)
+            await asyncio.ensure_future(exit_position())
+            await asyncio.sleep(0.1)
+            status = [s for s in loop_health() if s['loop'] == 'unit_trader'][0]
+            monitor.stop()
+            for watcher in watchers:
+                watcher.cancel()
+            return status
+        
+        status = asyncio.run(run_service())
+        self.assertEqual(status['stalls'], 1)
+        stall = status['recent_stalls'][0]
+        self.assertEqual(stall['task'], 'TestLoopMonitor.test_blocking_call_is_caught_with_stack.<locals>.exit_position')
+        self.assertIn('save_trade_sync', stall['stack'])
+        self.assertGreater(stall['duration_ms'], 250)
+        self.assertGreater(status['max_lag_ms'], 250)
+        self.assertLess(status['p50_lag_ms'], 50)
+        self.assertEqual(status['task_counts'][
+            'TestLoopMonitor.test_blocking_call_is_caught_with_stack.<locals>.watch_price'], 3)
+    
+    def test_monitors_are_freed_with_their_loop(self):
+        """Test neither a finished asyncio.run nor stop() leaves its monitor registered"""
+        import gc
+        import time
+        import weakref
+        import loop_monitor
+        from loop_monitor import monitor_loop
+        
+        created = []
+        
+        async def service():
+            created.append(weakref.ref(monitor_loop('short_lived', interval=0.01, slow_threshold=0.02)))
+            await asyncio.sleep(0.02)
+        
+        for _ in range(5):
+            asyncio.run(service())
+        for _ in range(100):
+            gc.collect()
+            if all(ref() is None for ref in created):
+                break
+            time.sleep(0.01)
+        self.assertEqual([ref() for ref in created], [None] * 5)
+        
+        async def restart():
+            first = monitor_loop('restarted')
+            first.stop()
+            second = monitor_loop('restarted')
+            second.stop()
+            return first is not second, asyncio.get_running_loop() in loop_monitor._monitors
+        
+        self.assertEqual(asyncio.run(restart()), (True, False))
+
+class TestAsyncPortfolioEngine(unittest.TestCase):
+    """Test batched wallet RPC, endpoint failover and the token metadata cache"""
+    
+    def test_batched_refresh_with_failover_and_cache(self):
+        """Test a rejected batch fails over, wallets share metadata lookups and the cache loads lazily"""
+        from aiohttp import web
+        
+        hits = {'bad': 0, 'good': [], 'tokens': 0}
+        holdings = {'W1': ['MintA', 'MintB'], 'W2': ['MintB']}
+        
+        def token_account(mint):
+            return {'pubkey': f"acct-{mint}", 'account': {'data': {'parsed': {'info': {
+                'mint': mint, 'tokenAmount': {'uiAmount': 5.0, 'decimals': 6}}}}}}
+        
+        async def bad_rpc(request):
+            hits['bad'] += 1
+            return web.json_response({'jsonrpc': '2.0', 'id': None,
+                                      'error': {'code': -32005, 'message': 'rate limited'}})
+        
+        async def good_rpc(request):
+            calls = await request.json()
+            hits['good'].append([call['method'] for call in calls])
+            results = []
+            for call in calls:
+                if call['method'] == 'getBalance':
+                    result = {'value': 2_000_000_000}
+                elif call['method'] == 'getTokenAccountsByOwner':
+                    result = {'value': [token_account(m) for m in holdings[call['params'][0]]]}
+                else:
+                    result = {'value': [{'data': {'parsed': {'info': {'decimals': 6}}}} for _ in call['params'][0]]}
+                results.append({'jsonrpc': '2.0', 'id': call['id'], 'result': result})
+            return web.json_response(list(reversed(results)))
+        
+        async def token_list(request):
+            hits['tokens'] += 1
+            return web.json_response([{'address': 'MintA', 'symbol': 'AAA', 'name': 'Token A', 'decimals': 6}])
+        
+        with patch.dict(sys.modules, {'streamlit': sys.modules.get('streamlit', MagicMock())}), \
+                tempfile.TemporaryDirectory() as tmp:
+            from solana_wallet_integration import (AsyncPortfolioEngine, SolanaWalletTracker,
+                                                   SolPriceCache, TokenMetadataCache)
+            
+            cache_path = os.path.join(tmp, 'token_metadata_cache.json')
+            price_cache = SolPriceCache()
+            price_cache.set(150.0)
+            
+            async def main():
+                app = web.Application()
+                app.router.add_post('/bad', bad_rpc)
+                app.router.add_post('/good', good_rpc)
+                app.router.add_get('/tokens', token_list)
+                runner = web.AppRunner(app)
+                await runner.setup()
+                site = web.TCPSite(runner, '127.0.0.1', 0)
+                await site.start()
+                base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+                
+                try:
+                    engine = AsyncPortfolioEngine([f"{base}/bad", f"{base}/good"],
+                                                  metadata_cache=TokenMetadataCache(cache_path),
+                                                  price_cache=price_cache)
+                    engine.token_list_url = f"{base}/tokens"
+                    first = await engine.get_portfolios(['W1', 'W2'])
+                    metadata_calls = len(hits['good'])
+                    second = await engine.get_portfolios(['W1', 'W2'])
+                    return first, metadata_calls, second
+                finally:
+                    await runner.cleanup()
+            
+            class StubEngine:
+                async def get_portfolio(self, wallet_address):
+                    await asyncio.sleep(0)
+                    return {'wallet_address': wallet_address, 'success': True}
+            
+            async def streamlit_style_caller():
+                # Sync entry point called from inside a running loop
+                tracker = SolanaWalletTracker()
+                tracker.engine = StubEngine()
+                return tracker.get_full_portfolio('W2')
+            
+            first, metadata_calls, second = asyncio.run(main())
+            nested = asyncio.run(streamlit_style_caller())
+            
+            # Both wallets' first batches were in flight when the bad endpoint answered
+            self.assertEqual(hits['bad'], 2)
+            self.assertEqual(hits['tokens'], 1)
+            # One balance+accounts batch per wallet, one shared getMultipleAccounts for MintB
+            self.assertEqual(metadata_calls, 3)
+            self.assertEqual(hits['good'].count(['getMultipleAccounts']), 1)
+            self.assertEqual(hits['good'][:3].count(['getBalance', 'getTokenAccountsByOwner']), 2)
+            self.assertEqual(len(hits['good']), 3 + 2)
+            
+            for portfolios in (first, second):
+                w1 = portfolios['W1']
+                self.assertTrue(w1['success'])
+                self.assertEqual(w1['sol_balance'], 2.0)
+                self.assertEqual(w1['sol_price_usd'], 150.0)
+                self.assertEqual([t['symbol'] for t in w1['tokens']], ['AAA', 'MintB...'])
+            self.assertEqual(nested, {'wallet_address': 'W2', 'success': True})
+            
+            reloaded = TokenMetadataCache(cache_path)
+            self.assertFalse(reloaded._loaded)
+            self.assertEqual(reloaded.get('MintA')['name'], 'Token A')
+            self.assertEqual(reloaded.missing(['MintA', 'MintB', 'MintC']), ['MintC'])
+
+class TestCoinDatabaseBulk(unittest.TestCase):
+    """Test CoinDatabase bulk ingest and coin id resolution"""
+    
+    def setUp(self):
+        import types
+        from pathlib import Path
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / 'coins.db'
+        # config.py imports streamlit and shadows the config/ directory here
+        config_module = types.ModuleType('config.config')
+        config_module.settings = types.SimpleNamespace(database_path=self.db_path)
+        self.modules = patch.dict(sys.modules, {
+            'streamlit': sys.modules.get('streamlit', MagicMock()),
+            'config.config': config_module
+        })
+        self.modules.start()
+    
+    def tearDown(self):
+        self.modules.stop()
+        self.temp_dir.cleanup()
+    
+    def test_bulk_ingest_with_targeted_lookups(self):
+        """Test bulk price/indicator writes resolve symbols, addresses and NumPy ids with cached misses"""
+        import numpy as np
+        from src.data.database import CoinDatabase
+        
+        CoinDatabase(self.db_path).add_coin('AAA', 'Token A', contract_address='addrA')
+        db = CoinDatabase(self.db_path)
+        lookups = patch.object(db, '_lookup_coins', wraps=db._lookup_coins).start()
+        self.addCleanup(patch.stopall)
+        
+        timestamps = np.datetime64('2024-01-01T00:00') + np.arange(5) * np.timedelta64(1, 'h')
+        closes = np.linspace(1.0, 2.0, 5)
+        self.assertEqual(db.add_price_data_bulk('addrA', '1h', timestamps, closes, closes + 0.1,
+                                                closes - 0.1, closes, np.full(5, 10.0)), 5)
+        coin_id = db.get_coin_id('AAA')
+        self.assertEqual(lookups.call_count, 1)
+        
+        arrays = db.get_price_arrays('AAA', '1h')
+        np.testing.assert_array_equal(arrays['close'], closes)
+        self.assertEqual(arrays['timestamp'][0], 1704067200)
+        
+        written = db.add_indicators_bulk([
+            {'coin': np.int64(coin_id), 'timestamp': timestamps[0], 'timeframe': '1h', 'rsi': 55.0, 'atr': np.nan},
+            {'coin': 'UNLISTED', 'timestamp': timestamps[0], 'timeframe': '1h', 'rsi': 40.0}
+        ])
+        self.assertEqual(written, 1)
+        
+        snapshots = db.add_indicator_snapshot_arrays(np.int64(coin_id), '1h', timestamps, {
+            'rsi': np.arange(5.0), 'sma_20': np.full(5, np.nan), 'unsupported': np.ones(5)
+        })
+        self.assertEqual(snapshots, 5)
+        self.assertEqual(db.add_indicator_snapshots([
+            {'coin': 'UNLISTED', 'timestamp': timestamps[0], 'timeframe': '1h', 'rsi': 1.0}
+        ]), 0)
+        frame = db.get_indicator_snapshots('AAA', '1h')
+        np.testing.assert_array_equal(frame['rsi'].to_numpy(), np.arange(5.0))
+        self.assertTrue(frame['sma_20'].isna().all())
+        
+        # The unlisted key was looked up once, then served from the miss cache
+        self.assertEqual(lookups.call_args_list[1][0][0], ['UNLISTED'])
+        self.assertIsNone(db.get_coin_id('UNLISTED'))
+        self.assertEqual(lookups.call_count, 2)
+        
+        new_id = db.add_coin('UNLISTED', 'Now listed')
+        self.assertEqual(db._resolve_coin_ids(['UNLISTED']), {'UNLISTED': new_id})
+        
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM indicators").fetchone()[0], 1)
+    
+    def test_price_writes_mirror_into_timeseries_store(self):
+        """Test single-bar appends land in the store's tail and overlapping bulk writes compact it"""
+        import numpy as np
+        from datetime import timedelta
+        from src.data.database import CoinDatabase
+        
+        base = datetime(2024, 1, 1)
+        for mmap in (False, True):
+            db = CoinDatabase(self.db_path.with_name(f'mirror_{mmap}.db'),
+                              self.db_path.with_name(f'timeseries_{mmap}'), timeseries_mmap=mmap)
+            self.assertEqual(db.timeseries.mmap, mmap)
+            db.timeseries.tail_rows = 16
+            coin_id = db.add_coin('AAA', 'Token A')
+            
+            for i in range(30):
+                db.add_price_data(coin_id, base + timedelta(hours=i), '1h', i, i + 1, i - 1, float(i), 10.0)
+            info = db.timeseries.series_info('AAA', '1h')
+            self.assertEqual((info['chunks'], info['tail_rows'], info['rows']), (1, 14, 30))
+            before = db.get_price_arrays('AAA', '1h')
+            np.testing.assert_array_equal(before['close'], np.arange(30.0))
+            self.assertEqual(db.timeseries.last_timestamp('AAA', '1h'), 1704067200 + 29 * 3600)
+            
+            timestamps = [base + timedelta(hours=i) for i in range(20, 40)]
+            closes = np.arange(20.0, 40.0) + 100
+            db.add_price_data_bulk('AAA', '1h', timestamps, closes, closes, closes, closes, np.ones(20))
+            
+            info = db.timeseries.series_info('AAA', '1h')
+            self.assertEqual((info['tail_rows'], info['rows']), (0, 40))
+            frame = db.get_price_data('AAA', '1h')
+            np.testing.assert_array_equal(frame['close'].to_numpy(),
+                                          np.concatenate([np.arange(20.0), closes]))
+            # Arrays read before the rewrite stay valid (old chunk files are replaced, not rewritten)
+            np.testing.assert_array_equal(before['close'], np.arange(30.0))
+            
+            with sqlite3.connect(db.db_path) as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM price_data").fetchone()[0], 40)
+
+class TestHealthChecker(unittest.TestCase):
+    """Test scheduled health checks and cached snapshot reads"""
+    
+    def setUp(self):
+        self.modules = patch.dict(sys.modules, {'streamlit': sys.modules.get('streamlit', MagicMock())})
+        self.modules.start()
+        import threading
+        from health_check_system import HealthChecker, HealthCheckResult, HealthStatus
+        self.HealthCheckResult, self.HealthStatus = HealthCheckResult, HealthStatus
+        self.checker = HealthChecker(db_path=os.path.join(tempfile.gettempdir(), 'unused.db'), max_workers=2)
+        self.checker.checks = {}
+        self.release = threading.Event()
+    
+    def tearDown(self):
+        self.release.set()
+        self.checker.executor.shutdown(wait=True)
+        self.modules.stop()
+    
+    def _slow_check(self, status):
+        def check():
+            self.release.wait(5)
+            return self.HealthCheckResult(name='slow', status=status, message='late')
+        return check
+    
+    def test_snapshot_read_does_not_wait_for_checks(self):
+        """Test get_overall_health returns at once, reporting unfinished checks as pending"""
+        import time
+        self.checker.register_check('slow', self._slow_check(self.HealthStatus.HEALTHY), timeout=5)
+        self.checker.register_check('fast', lambda: self.HealthCheckResult(
+            name='fast', status=self.HealthStatus.HEALTHY, message='ok'), timeout=5)
+        
+        started = time.time()
+        health = self.checker.get_overall_health()
+        self.assertLess(time.time() - started, 0.5)
+        self.assertTrue(health['individual_checks']['slow']['running'])
+        self.assertEqual(health['individual_checks']['slow']['status'], 'unknown')
+        
+        self.checker.submit_check('fast').result(timeout=5)
+        health = self.checker.get_overall_health()
+        self.assertEqual(health['individual_checks']['fast']['status'], 'healthy')
+        self.assertEqual((health['checks_pending'], health['overall_status']), (1, 'unknown'))
+    
+    def test_timeout_then_late_result_counts_one_failure(self):
+        """Test a timed-out run is reported at its deadline and its late result replaces it without a second count"""
+        import time
+        for late_status, failures in ((self.HealthStatus.WARNING, 1), (self.HealthStatus.HEALTHY, 0)):
+            self.release.clear()
+            self.checker.register_check('slow', self._slow_check(late_status), timeout=0.1)
+            future = self.checker.submit_check('slow')
+            time.sleep(0.2)
+            
+            health = self.checker.get_overall_health()
+            slow = health['individual_checks']['slow']
+            self.assertEqual((slow['status'], slow['message']), ('critical', 'Check timed out after 0.1s'))
+            self.assertTrue(slow['running'])
+            self.assertEqual(self.checker.checks['slow']['consecutive_failures'], 1)
+            
+            self.release.set()
+            future.result(timeout=5)
+            self.assertEqual(self.checker.latest_results['slow'].message, 'late')
+            self.assertEqual(self.checker.latest_results['slow'].status, late_status)
+            self.assertEqual(self.checker.checks['slow']['consecutive_failures'], failures)
+            self.assertEqual(self.checker._timed_out, set())
+
+class TestAPIHealthMonitoring(unittest.TestCase):
+    """Test the provider ring buffers and latency sketch behind API health monitoring"""
+    
+    def setUp(self):
+        stubs = {name: sys.modules.get(name, MagicMock())
+                 for name in ('streamlit', 'plotly', 'plotly.graph_objects', 'plotly.subplots')}
+        self.modules = patch.dict(sys.modules, stubs)
+        self.modules.start()
+        import api_health_monitoring
+        self.api = api_health_monitoring
+    
+    def tearDown(self):
+        self.modules.stop()
+    
+    def _metric(self, i, response_time_ms, success=True):
+        return self.api.HealthMetric(timestamp=datetime(2024, 1, 1) + timedelta(minutes=i),
+                                     response_time_ms=response_time_ms,
+                                     status_code=200 if success else 500, success=success)
+    
+    def test_ring_buffer_wraparound(self):
+        """Test aggregates, percentiles and history only cover what the ring buffer still holds"""
+        import numpy as np
+        buffer = self.api.ProviderMetricsBuffer(capacity=5, window=3, ewma_alpha=0.5)
+        for i in range(8):
+            buffer.push(self._metric(i, 10.0 * (i + 1), success=i % 3 != 0))
+        
+        history = buffer.history()
+        np.testing.assert_array_equal(history['response_time_ms'], [40.0, 50.0, 60.0, 70.0, 80.0])
+        self.assertTrue(np.all(np.diff(history['timestamps']) > 0))
+        self.assertEqual((buffer.count, buffer.pos, buffer.window_size), (5, 3, 3))
+        self.assertAlmostEqual(buffer.avg_response_time_ms, 70.0)
+        self.assertAlmostEqual(buffer.error_rate, 1 / 3)  # Check 6 failed
+        
+        fresh = self.api.LatencySketch()
+        for value in history['response_time_ms']:
+            fresh.add(value)
+        np.testing.assert_array_equal(buffer.latency_sketch.counts, fresh.counts)
+        self.assertAlmostEqual(buffer.percentiles()['p50'], 60.0, delta=60.0 * 0.021)
+        
+        since = datetime(2024, 1, 1) + timedelta(minutes=5, seconds=30)
+        np.testing.assert_array_equal(buffer.history(since=since)['response_time_ms'], [70.0, 80.0])
+    
+    def test_latency_sketch_quantile_error_bound(self):
+        """Test sketch quantiles stay within the bucket's ~2% relative error of the exact values"""
+        import math
+        import numpy as np
+        values = np.random.default_rng(7).lognormal(mean=5.0, sigma=1.5, size=5000)
+        sketch = self.api.LatencySketch()
+        for value in values:
+            sketch.add(value)
+        for value in values[:1000]:
+            sketch.remove(value)
+        
+        kept = np.sort(values[1000:])
+        qs = (0.01, 0.5, 0.9, 0.95, 0.99, 1.0)
+        for q, estimate in zip(qs, sketch.quantiles(qs)):
+            exact = kept[max(math.ceil(q * len(kept)), 1) - 1]
+            self.assertLessEqual(abs(estimate - exact) / exact, math.sqrt(1.04) - 1 + 1e-9)
+    
+    def test_restart_keeps_provider_history(self):
+        """Test stopping and restarting a provider keeps its buffer and status"""
+        monitor = self.api.APIHealthMonitor(check_interval=3600)
+        checks = iter(range(10))
+        
+        async def fake_check(provider):
+            return self._metric(next(checks), 100.0)
+        monitor._check_provider_health = fake_check
+        
+        async def main():
+            await monitor.start_monitoring(['dexscreener'])
+            await asyncio.sleep(0.05)
+            buffer = monitor.metrics_buffers['dexscreener']
+            await monitor.stop_monitoring()
+            await monitor.start_monitoring(['dexscreener'])
+            await asyncio.sleep(0.05)
+            await monitor.stop_monitoring()
+            return buffer
+        
+        buffer = asyncio.run(main())
+        self.assertIs(monitor.metrics_buffers['dexscreener'], buffer)
+        self.assertEqual(buffer.count, 2)
+        self.assertEqual(monitor._status_counts[monitor.health_status['dexscreener'].status], 1)
+        self.assertEqual(sum(monitor._status_counts.values()), 1)
+
 class TestTradingLogic(unittest.TestCase):
     """Test trading strategies and logic"""
     
@@ -266,6 +2010,246 @@ class TestRiskManagement(unittest.TestCase):
         self.assertGreater(drawdown, 0.15)  # Should trigger protection
 
 
+class TestIndicatorEngine(unittest.TestCase):
+    """Test the incremental indicator engine against the pandas formulas"""
+    
+    def setUp(self):
+        import numpy as np
+        rng = np.random.default_rng(42)
+        self.close = np.cumprod(1 + rng.normal(0, 0.03, 200)) * 0.001
+        self.volume = rng.uniform(1000, 100000, 200)
+    
+    def test_matches_pandas_rolling_indicators(self):
+        """Test streaming values match pandas rolling/ewm recomputation"""
+        import numpy as np
+        import pandas as pd
+        from src.data.indicator_engine import IndicatorEngine
+        
+        close = pd.Series(self.close)
+        volume = pd.Series(self.volume)
+        series = IndicatorEngine().compute_series(self.close, volume=self.volume)
+        
+        delta = close.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        macd = close.ewm(span=12).mean() - close.ewm(span=26).mean()
+        expected = {
+            'rsi': 100 - (100 / (1 + gain / loss)),
+            'macd': macd,
+            'macd_signal': macd.ewm(span=9).mean(),
+            'sma_fast': close.rolling(window=20).mean(),
+            'sma_slow': close.rolling(window=50).mean(),
+            'bb_upper': close.rolling(window=20).mean() + close.rolling(window=20).std() * 2,
+            'volume_ratio': volume / volume.rolling(window=20).mean(),
+            'momentum': close.pct_change(periods=10),
+        }
+        
+        for name, reference in expected.items():
+            np.testing.assert_allclose(series[name], reference.to_numpy(), rtol=1e-9, err_msg=name)
+    
+    def test_incremental_updates_match_batch(self):
+        """Test tick-by-tick updates equal the vectorized multi-coin batch"""
+        import numpy as np
+        from src.data.indicator_engine import IndicatorEngine
+        
+        engine = IndicatorEngine()
+        for price, volume in zip(self.close, self.volume):
+            streamed = engine.update('COIN', price, volume=volume)
+        
+        closes = np.vstack([self.close, self.close[::-1]])
+        volumes = np.vstack([self.volume, self.volume[::-1]])
+        batch = engine.compute_batch(closes, volume=volumes)
+        
+        self.assertEqual(engine.ticks('COIN'), len(self.close))
+        for name in ('rsi', 'macd', 'bb_lower', 'volume_ratio'):
+            self.assertAlmostEqual(batch[name][0], streamed[name], places=9)
+        self.assertFalse(np.isclose(batch['rsi'][0], batch['rsi'][1]))
+    
+    def test_wilder_rsi(self):
+        """Test Wilder smoothing equals the ewm(alpha=1/period) form after seeding"""
+        import pandas as pd
+        from src.data.indicator_engine import IndicatorEngine, IndicatorConfig
+        
+        engine = IndicatorEngine(IndicatorConfig(rsi_method='wilder'))
+        latest = engine.warm_up('COIN', self.close)
+        
+        delta = pd.Series(self.close).diff().fillna(0)
+        gain = delta.clip(lower=0)
+        loss = -delta.clip(upper=0)
+        seed_gain, seed_loss = gain.iloc[:14].mean(), loss.iloc[:14].mean()
+        for g, l in zip(gain.iloc[14:], loss.iloc[14:]):
+            seed_gain = (seed_gain * 13 + g) / 14
+            seed_loss = (seed_loss * 13 + l) / 14
+        
+        self.assertAlmostEqual(latest['rsi'], 100 - 100 / (1 + seed_gain / seed_loss), places=9)
+    
+    def test_strategy_follows_config_changes(self):
+        """Test the momentum strategy rebuilds its engine when its periods change"""
+        import pandas as pd
+        from src.strategies.momentum_strategy import MomentumStrategy
+        
+        data = pd.DataFrame({'close': self.close[:60], 'high': self.close[:60] * 1.01,
+                             'low': self.close[:60] * 0.99, 'volume': self.volume[:60]})
+        data.attrs['symbol'] = 'COIN'
+        strategy = MomentumStrategy()
+        default_rsi = strategy._calculate_indicators(data)['rsi']
+        
+        strategy.config['rsi_period'] = 5
+        fast_rsi = strategy._calculate_indicators(data)['rsi']
+        
+        delta = pd.Series(self.close[:60]).diff()
+        gain = delta.where(delta > 0, 0).rolling(window=5).mean().iloc[-1]
+        loss = (-delta.where(delta < 0, 0)).rolling(window=5).mean().iloc[-1]
+        self.assertAlmostEqual(fast_rsi, 100 - 100 / (1 + gain / loss), places=9)
+        self.assertNotAlmostEqual(fast_rsi, default_rsi)
+
+
+class TestCandleService(unittest.TestCase):
+    """Test multi-resolution candle rollups and chart downsampling"""
+    
+    def test_tick_rollups(self):
+        """Test ticks roll up into 1m/5m/1h candles with correct OHLCV"""
+        from candle_service import CandleService
+        
+        service = CandleService()
+        start = 1_700_000_000 - 1_700_000_000 % 3600
+        for i, price in enumerate([1.0, 3.0, 0.5, 2.0]):
+            service.add_tick('test', price, volume=10, timestamp=start + i * 150)
+        
+        five_minute = service.get_candles('TEST', resolution='5m')
+        self.assertEqual(list(five_minute['open']), [1.0, 0.5])
+        self.assertEqual(list(five_minute['high']), [3.0, 2.0])
+        self.assertEqual(list(five_minute['volume']), [20.0, 20.0])
+        
+        hourly = service.get_candles('TEST', resolution='1h')
+        self.assertEqual((hourly['open'][0], hourly['high'][0], hourly['low'][0], hourly['close'][0]),
+                         (1.0, 3.0, 0.5, 2.0))
+    
+    def test_downsampling_to_width(self):
+        """Test long ranges are capped at max_points while keeping extremes"""
+        import numpy as np
+        from candle_service import CandleService, lttb
+        
+        service = CandleService()
+        timestamps = 1_700_000_000 + np.arange(5 * 1440) * 60
+        prices = 1 + np.sin(np.arange(len(timestamps)) / 50.0)
+        prices[1234] = 5.0
+        service.add_candles('TEST', timestamps, prices, prices, prices, prices, np.ones(len(prices)))
+        
+        candles = service.get_candles('TEST', max_points=300)
+        self.assertLessEqual(len(candles['timestamp']), 300)
+        self.assertEqual(candles['high'].max(), 5.0)
+        self.assertEqual(candles['volume'].sum(), len(prices))
+        
+        line = service.get_line('TEST', max_points=200)
+        self.assertEqual(len(line['price']), 200)
+        self.assertIn(1234, lttb(timestamps, prices, 200))
+    
+    def test_backfilled_candles_are_merged(self):
+        """Test bars older than the last candle are inserted or folded in, not silently lost"""
+        import numpy as np
+        from candle_service import CandleService
+        
+        service = CandleService(retention={'1m': 30})
+        start = 1_700_000_000 - 1_700_000_000 % 3600
+        recent = start + 600 + np.arange(10) * 60
+        service.add_candles('TEST', recent, *([np.ones(10)] * 4), np.ones(10))
+        
+        # A late backfill of the ten minutes before, with one bar overlapping the loaded range
+        backfill = start + np.arange(11) * 60
+        highs = np.full(11, 2.0)
+        service.add_candles('TEST', backfill, np.ones(11), highs, np.ones(11), np.ones(11), np.ones(11))
+        
+        minute = service.get_candles('TEST', resolution='1m')
+        self.assertEqual(list(minute['timestamp']), list(start + np.arange(20) * 60))
+        self.assertEqual(minute['volume'][10], 2.0)
+        self.assertEqual(minute['high'][10], 2.0)
+        hourly = service.get_candles('TEST', resolution='1h')
+        self.assertEqual((len(hourly['timestamp']), hourly['volume'][0], hourly['high'][0]), (1, 21.0, 2.0))
+        self.assertEqual(service.get_stats()['dropped']['1m'], 0)
+        
+        # Once the 1m retention has been exceeded, bars before the kept range are counted as dropped
+        service.add_candles('TEST', start + 1200 + np.arange(60) * 60, *([np.ones(60)] * 4), np.ones(60))
+        service.add_candles('TEST', [start - 60], [1.0], [1.0], [1.0], [1.0], [1.0])
+        self.assertEqual(service.get_stats()['dropped']['1m'], 1)
+        self.assertEqual(service.get_stats()['dropped']['1h'], 0)
+    
+    @unittest.skipUnless(hasattr(__import__('time'), 'tzset'), "time.tzset is POSIX only")
+    def test_naive_datetimes_are_local_time(self):
+        """Test wall-clock chart windows line up with recorded ticks outside UTC"""
+        import time
+        from datetime import timezone
+        from candle_service import CandleService, _to_epoch
+        
+        previous_tz = os.environ.get('TZ')
+        os.environ['TZ'] = 'America/New_York'
+        time.tzset()
+        try:
+            now = datetime.now()
+            service = CandleService()
+            service.add_tick('test', 1.5, timestamp=now - timedelta(minutes=10))
+            service.add_tick('test', 2.5)
+            
+            candles = service.get_candles('TEST', now - timedelta(hours=1), now + timedelta(minutes=1),
+                                          resolution='1m')
+            self.assertEqual(len(candles['timestamp']), 2)
+            
+            aware = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+            self.assertEqual(_to_epoch(aware), 1704110400)
+            self.assertEqual(_to_epoch(datetime(2024, 1, 1, 7, 0)), 1704110400)
+            
+            # Dates in the chart frame round-trip as start/end arguments
+            frame = service.get_candles_frame('TEST', max_points=10)
+            first = frame['date'].iloc[0].to_pydatetime()
+            self.assertEqual(_to_epoch(first), int(candles['timestamp'][0]))
+            self.assertEqual(len(service.get_candles('TEST', first, first, resolution='1m')['timestamp']), 1)
+        finally:
+            if previous_tz is None:
+                os.environ.pop('TZ', None)
+            else:
+                os.environ['TZ'] = previous_tz
+            time.tzset()
+
+
+class TestGameTheoryValidator(unittest.TestCase):
+    """Test vectorized payoffs and cached equilibrium solves"""
+    
+    def test_vectorized_payoffs_match_pairwise(self):
+        """Test batched payoff matrices equal the pairwise definition"""
+        import numpy as np
+        import pandas as pd
+        from src.validation.game_theory_validator import GameTheoryValidator, MarketRegime
+        
+        validator = GameTheoryValidator()
+        market_data = pd.DataFrame({'close': np.linspace(1.0, 2.0, 60)})
+        actions = dict(zip([p.name for p in validator.players],
+                           ["buy", "sell", "buy", "provide_liquidity"]))
+        
+        matrix = validator.calculate_payoff_matrix(market_data, actions, MarketRegime.BULL)
+        for i, p1 in enumerate(validator.players):
+            for j, p2 in enumerate(validator.players):
+                expected = 0 if i == j else validator._calculate_pairwise_payoff(
+                    p1, p2, actions[p1.name], actions[p2.name], MarketRegime.BULL, market_data)
+                self.assertAlmostEqual(matrix[i, j], expected)
+    
+    def test_regime_solve_is_cached(self):
+        """Test repeated validations reuse one solve and large games use the fallback solvers"""
+        import numpy as np
+        import pandas as pd
+        from src.validation.game_theory_validator import GameTheoryValidator
+        
+        validator = GameTheoryValidator(support_enumeration_limit=2)
+        market_data = pd.DataFrame({'close': np.linspace(1.0, 1.05, 60)})
+        results = validator.validate_batch({'a': {'x': 1}, 'b': {'y': 2}}, market_data)
+        
+        self.assertEqual(validator.cache_stats, {'hits': 1, 'misses': 1})
+        self.assertEqual(results['a']['expected_payoff'], results['b']['expected_payoff'])
+        
+        sigma_1, sigma_2 = validator.find_nash_equilibrium(np.random.rand(8, 8))
+        self.assertAlmostEqual(sigma_1.sum(), 1.0)
+        self.assertAlmostEqual(sigma_2.sum(), 1.0)
+
+
 class TestUIComponents(unittest.TestCase):
     """Test UI components and dashboard functionality"""
     
@@ -373,9 +2357,33 @@ def run_all_tests():
     
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestDataLayer))
+    suite.addTests(loader.loadTestsFromTestCase(TestPriceSeriesStore))
     suite.addTests(loader.loadTestsFromTestCase(TestAPIIntegrations))
+    suite.addTests(loader.loadTestsFromTestCase(TestTickFeed))
+    suite.addTests(loader.loadTestsFromTestCase(TestConfirmationTracker))
+    suite.addTests(loader.loadTestsFromTestCase(TestSnipeExecutor))
+    suite.addTests(loader.loadTestsFromTestCase(TestHuntHubScanner))
+    suite.addTests(loader.loadTestsFromTestCase(TestAlphaRadar))
+    suite.addTests(loader.loadTestsFromTestCase(TestLexiconSentiment))
+    suite.addTests(loader.loadTestsFromTestCase(TestSentimentAggregationStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestDataAggregator))
+    suite.addTests(loader.loadTestsFromTestCase(TestDataNormalizer))
+    suite.addTests(loader.loadTestsFromTestCase(TestCoinImageSystem))
+    suite.addTests(loader.loadTestsFromTestCase(TestDiscordQueue))
+    suite.addTests(loader.loadTestsFromTestCase(TestNotificationDispatcher))
+    suite.addTests(loader.loadTestsFromTestCase(TestAlertCoalescer))
+    suite.addTests(loader.loadTestsFromTestCase(TestMetricsRegistry))
+    suite.addTests(loader.loadTestsFromTestCase(TestSamplingProfiler))
+    suite.addTests(loader.loadTestsFromTestCase(TestLoopMonitor))
+    suite.addTests(loader.loadTestsFromTestCase(TestAsyncPortfolioEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestCoinDatabaseBulk))
+    suite.addTests(loader.loadTestsFromTestCase(TestHealthChecker))
+    suite.addTests(loader.loadTestsFromTestCase(TestAPIHealthMonitoring))
     suite.addTests(loader.loadTestsFromTestCase(TestTradingLogic))
     suite.addTests(loader.loadTestsFromTestCase(TestRiskManagement))
+    suite.addTests(loader.loadTestsFromTestCase(TestIndicatorEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestCandleService))
+    suite.addTests(loader.loadTestsFromTestCase(TestGameTheoryValidator))
     suite.addTests(loader.loadTestsFromTestCase(TestUIComponents))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
     
@@ -12,6 +12,8 @@ import time
 from datetime import datetime
 from typing import Dict, List, Any, Tuple
 
+from metrics_registry import metrics
+
 class TurboEnrichment:
     """High-speed enrichment for demonstration"""
     
@@ -42,8 +44,10 @@ class TurboEnrichment:
         try:
             url = f"https://api.dexscreener.com/latest/dex/tokens/{ca}"
             
-            async with self.session.get(url) as response:
+            async with metrics.span('http_fetch', provider='dexscreener') as span, self.session.get(url) as response:
                 self.stats['api_calls'] += 1
+                if response.status >= 400:
+                    span.fail(f"HTTP {response.status}")
                 
                 if response.status == 200:
                     data = await response.json()
@@ -125,6 +129,9 @@ class TurboEnrichment:
                 self.stats['processed'] += 1
             
             batch_time = time.time() - batch_start
+            coins_total = metrics.counter('enrichment_coins_total', "Coins run through enrichment", ('source', 'result'))
+            coins_total.labels(source='turbo', result='success').inc(successful_in_batch)
+            coins_total.labels(source='turbo', result='failed').inc(len(batch) - successful_in_batch)
             batch_rate = len(batch) / batch_time
             
             print(f"  Batch {i//batch_size + 1}: {successful_in_batch}/{len(batch)} successful")
@@ -135,6 +142,7 @@ class TurboEnrichment:
         
         return results
     
+    @metrics.timed('db_write', source='turbo')
     def update_database_turbo(self, results: List[Dict[str, Any]]) -> int:
         """Turbo database update"""
         if not results:
@@ -188,6 +196,7 @@ class TurboEnrichment:
             return updated
             
         except Exception as e:
+            metrics.record_error(e)
             print(f"Database update error: {e}")
             return 0
     
@@ -207,6 +216,9 @@ class TurboEnrichment:
         print(f"Speed: {self.stats['processed']/duration:.1f} coins/second")
         print(f"API Calls: {self.stats['api_calls']:,}")
         
+        fetch = metrics.histogram('http_fetch_seconds', labelnames=('provider',)).labels(provider='dexscreener').sample()
+        print(f"Fetch latency: p50 {fetch['p50'] * 1000:.0f}ms, p95 {fetch['p95'] * 1000:.0f}ms, max {fetch['max'] * 1000:.0f}ms")
+        
         # Show database totals
         try:
             conn = sqlite3.connect(self.db_path)
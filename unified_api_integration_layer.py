@@ -21,6 +21,7 @@ from intelligent_data_aggregator import IntelligentDataAggregator, DataPoint
 from api_credential_manager import APICredentialManager
 from api_health_monitoring import APIHealthMonitor
 from adaptive_rate_limiter import GlobalRateLimitCoordinator, RateLimitCache
+from loop_monitor import monitor_loop
 
 @dataclass
 class EnrichmentRequest:
@@ -109,6 +110,7 @@ class UnifiedAPIManager:
     async def initialize(self):
         """Initialize the API management system"""
         self.logger.info("Initializing Unified API Manager...")
+        monitor_loop('unified_api')
         
         # Create HTTP session
         timeout = aiohttp.ClientTimeout(total=self.config['default_timeout'])
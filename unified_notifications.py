@@ -5,15 +5,18 @@ Send Runner alerts to all platforms simultaneously
 """
 
 import asyncio
-import requests
 import json
 import smtplib
 import ssl
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 import logging
 
+from alert_coalescer import alert_coalescer
+from notification_dispatcher import notification_dispatcher
+
 class UnifiedNotificationSystem:
     """All-in-one notification system for TrenchCoat Pro"""
     
@@ -50,6 +53,13 @@ class UnifiedNotificationSystem:
             "send_to_all": True
         }
         
+        # Shared concurrent sender and the per-recipient results of the last alert
+        self.dispatcher = notification_dispatcher
+        self.last_deliveries = []
+        
+        # Repeat alerts for a coin within the window are merged per platform
+        self.coalescer = alert_coalescer
+        
     def add_telegram_recipient(self, name: str, chat_id: str):
         """Add new Telegram recipient"""
         self.telegram_config["recipients"][name] = chat_id
@@ -61,38 +71,56 @@ class UnifiedNotificationSystem:
         print(f"\n🚀 SENDING RUNNER ALERT: {coin_data.get('symbol', 'Unknown')}")
         print("=" * 50)
         
+        # Every recipient's latency is measured from this moment
+        started = time.perf_counter()
+        self.last_deliveries = []
+        
+        symbol = coin_data.get('symbol', 'Unknown')
+        
         # Create tasks for all platforms
         tasks = []
+        platforms = []
         
         if self.settings["email_enabled"]:
-            tasks.append(self._send_email_alert(coin_data))
+            tasks.append(self.coalescer.submit(symbol, 'runner', 'email', coin_data,
+                                               lambda data: self._send_email_alert(data, started)))
+            platforms.append("Email")
             
         if self.settings["telegram_enabled"]:
-            tasks.append(self._send_telegram_alerts(coin_data))
+            tasks.append(self.coalescer.submit(symbol, 'runner', 'telegram', coin_data,
+                                               lambda data: self._send_telegram_alerts(data, started)))
+            platforms.append("Telegram")
             
         if self.settings["discord_enabled"]:
-            tasks.append(self._send_discord_alert(coin_data))
+            tasks.append(self.coalescer.submit(symbol, 'runner', self.discord_config["webhook_url"], coin_data,
+                                               lambda data: self._send_discord_alert(data, started)))
+            platforms.append("Discord")
             
         # Execute all notifications concurrently
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Report results
-        platforms = ["Email", "Telegram", "Discord"]
         success_count = 0
+        merged_count = 0
         
         for i, result in enumerate(results):
             if isinstance(result, Exception):
                 print(f"❌ {platforms[i]}: Failed - {result}")
-            elif result:
+                continue
+            status, delivered = result
+            if status == 'merged':
+                print(f"⏸️ {platforms[i]}: Merged into pending update")
+                merged_count += 1
+            elif delivered:
                 print(f"✅ {platforms[i]}: Success")
                 success_count += 1
             else:
                 print(f"❌ {platforms[i]}: Failed")
                 
-        print(f"\n📊 Summary: {success_count}/{len(platforms)} platforms notified")
-        return success_count > 0
+        print(f"\n📊 Summary: {success_count}/{len(platforms)} platforms notified, {merged_count} merged")
+        return success_count > 0 or merged_count > 0
         
-    async def _send_email_alert(self, coin_data: dict) -> bool:
+    async def _send_email_alert(self, coin_data: dict, started: float = None) -> bool:
         """Send email notification"""
         
         try:
@@ -163,19 +191,26 @@ class UnifiedNotificationSystem:
             html_part = MIMEText(html_content, "html")
             message.attach(html_part)
             
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.email_config["smtp_server"], self.email_config["smtp_port"]) as server:
-                server.starttls(context=context)
-                server.login(self.email_config["email"], self.email_config["password"])
-                server.send_message(message)
-                
-            return True
+            # SMTP is blocking, so it runs in a worker thread alongside the other platforms
+            delivery = await self.dispatcher.run_blocking('email', message["To"], self._deliver_email, message,
+                                                          started=started)
+            self.last_deliveries.append(delivery)
+            if not delivery.success:
+                logging.error(f"Email notification failed: {delivery.error}")
+            return delivery.success
             
         except Exception as e:
             logging.error(f"Email notification failed: {e}")
             return False
+    
+    def _deliver_email(self, message: MIMEMultipart):
+        context = ssl.create_default_context()
+        with smtplib.SMTP(self.email_config["smtp_server"], self.email_config["smtp_port"]) as server:
+            server.starttls(context=context)
+            server.login(self.email_config["email"], self.email_config["password"])
+            server.send_message(message)
             
-    async def _send_telegram_alerts(self, coin_data: dict) -> bool:
+    async def _send_telegram_alerts(self, coin_data: dict, started: float = None) -> bool:
         """Send Telegram notifications to all recipients"""
         
         try:
@@ -211,36 +246,29 @@ Signal by: TrenchCoat Pro AI
                 ]]
             }
             
-            # Send to all recipients
-            base_url = f"https://api.telegram.org/bot{self.telegram_config['bot_token']}"
-            success_count = 0
+            # Send to all recipients concurrently
+            deliveries = await self.dispatcher.send_telegram(
+                self.telegram_config['bot_token'],
+                self.telegram_config["recipients"],
+                message,
+                keyboard=json.dumps(keyboard),
+                started=started
+            )
+            self.last_deliveries.extend(deliveries)
             
-            for name, chat_id in self.telegram_config["recipients"].items():
-                if chat_id:
-                    try:
-                        payload = {
-                            "chat_id": chat_id,
-                            "text": message,
-                            "reply_markup": json.dumps(keyboard)
-                        }
+            for delivery in deliveries:
+                if delivery.success:
+                    print(f"  📱 {delivery.recipient}: Telegram sent ({delivery.latency_ms:.0f}ms)")
+                else:
+                    print(f"  ❌ {delivery.recipient}: Telegram failed - {delivery.error}")
                         
-                        response = requests.post(f"{base_url}/sendMessage", json=payload, timeout=10)
-                        if response.status_code == 200:
-                            success_count += 1
-                            print(f"  📱 {name}: Telegram sent")
-                        else:
-                            print(f"  ❌ {name}: Telegram failed")
-                            
-                    except Exception as e:
-                        print(f"  ❌ {name}: Telegram error - {e}")
-                        
-            return success_count > 0
+            return any(delivery.success for delivery in deliveries)
             
         except Exception as e:
             logging.error(f"Telegram notifications failed: {e}")
             return False
             
-    async def _send_discord_alert(self, coin_data: dict) -> bool:
+    async def _send_discord_alert(self, coin_data: dict, started: float = None) -> bool:
         """Send Discord notification"""
         
         try:
@@ -306,15 +334,38 @@ Signal by: TrenchCoat Pro AI
                 "embeds": [embed]
             }
             
-            response = requests.post(self.discord_config["webhook_url"], json=payload, timeout=10)
-            response.raise_for_status()
+            deliveries = await self.dispatcher.send_discord(
+                {"trading-signals": self.discord_config["webhook_url"]}, payload, started=started
+            )
+            self.last_deliveries.extend(deliveries)
             
-            return True
+            for delivery in deliveries:
+                if not delivery.success:
+                    logging.error(f"Discord notification failed: {delivery.error}")
+            return all(delivery.success for delivery in deliveries)
             
         except Exception as e:
             logging.error(f"Discord notification failed: {e}")
             return False
             
+    async def send_discord_notification(self, message: str, title: str, color: int = 0x10B981,
+                                        channel_type: str = "trading-signals") -> bool:
+        """Send a plain embed to the Discord signals webhook"""
+        
+        payload = {
+            "username": "TrenchCoat Pro Signals",
+            "embeds": [{
+                "title": title,
+                "description": message[:4096],  # Discord limit
+                "color": color,
+                "timestamp": datetime.now().isoformat()
+            }]
+        }
+        
+        deliveries = await self.dispatcher.send_discord({channel_type: self.discord_config["webhook_url"]}, payload)
+        self.last_deliveries = deliveries
+        return all(delivery.success for delivery in deliveries)
+        
     async def send_test_all_platforms(self):
         """Send test notification to all platforms"""
         
@@ -331,6 +382,11 @@ Signal by: TrenchCoat Pro AI
         
         return await self.send_runner_alert(test_data)
         
+    async def shutdown(self):
+        """Send any merged alerts still waiting on their window, save coalescer state and close connections"""
+        await self.coalescer.drain()
+        await self.dispatcher.close()
+        
     def get_notification_status(self):
         """Get current notification system status"""
         
@@ -353,9 +409,16 @@ Signal by: TrenchCoat Pro AI
         print(f"🎮 Discord: {discord_status}")
         print(f"   └── #trading-signals channel")
         
+        # Delivery latency per recipient
+        for recipient, stats in self.dispatcher.get_latency_stats().items():
+            print(f"⏱️ {recipient}: last {stats['last_ms']:.0f}ms, p95 {stats['p95_ms']:.0f}ms")
+        
         print(f"\n🎯 System Status: ALL PLATFORMS OPERATIONAL")
         print(f"⚡ Ready for instant Runner alerts!")
 
+# Global notifier instance
+unified_notifier = UnifiedNotificationSystem()
+
 # Test and usage
 async def main():
     """Test unified notification system"""
@@ -374,6 +437,8 @@ async def main():
     print("  📧 Email (professional HTML)")
     print("  📱 Telegram (you + Bravo + Spangle when they join)")
     print("  🎮 Discord (rich embeds with @here notification)")
+    
+    await notifier.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file